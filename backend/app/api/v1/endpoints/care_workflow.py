@@ -1,5 +1,5 @@
 # backend/app/api/v1/endpoints/care_workflow.py - UPDATED VERSION
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from app.database import get_db
@@ -10,6 +10,9 @@ from app.schemas.care_workflow import (
     RiskAssessmentCreate, RiskAssessmentResponse, RiskAssessmentUpdate,
     ProspectiveWorkflowResponse
 )
+from app.services.participant_stats import ParticipantStatsService, get_participant_stats_cache
+from app.services.workflow_board import WorkflowBoardService
+from app.services.workflow_state import WorkflowStateService
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import logging
@@ -19,95 +22,67 @@ logger = logging.getLogger(__name__)
 
 # Prospective Workflow Endpoints
 
+@router.get("/workflow-board")
+def get_workflow_board(
+    stage: Optional[List[str]] = Query(None, description="care_plan, risk_assessment or ready_for_onboarding"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Prospective participants with their workflow flags and counts per stage, oldest first.
+
+    Pass ``next_cursor`` back as ``cursor`` for the next page.  Repeat ``stage`` to
+    show several stages; the counts always cover the whole board.
+    """
+    try:
+        return WorkflowBoardService.board(db, stages=stage, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/participants/{participant_id}/prospective-workflow", response_model=ProspectiveWorkflowResponse)
 def get_prospective_workflow(
     participant_id: int,
     db: Session = Depends(get_db)
 ):
     """Get the prospective workflow status for a participant"""
-    participant = db.query(Participant).filter(Participant.id == participant_id).first()
-    if not participant:
+    row = WorkflowStateService.get(db, participant_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Participant not found")
-    
-    # Get or create prospective workflow
-    workflow = db.query(ProspectiveWorkflow).filter(
-        ProspectiveWorkflow.participant_id == participant_id
-    ).first()
+    workflow = row.ProspectiveWorkflow
+    participant_name = f"{row.first_name} {row.last_name}"
     
     if not workflow:
-        # Check if participant has existing care plan or risk assessment
-        latest_care_plan = db.query(CarePlan).filter(
-            CarePlan.participant_id == participant_id
-        ).order_by(desc(CarePlan.created_at)).first()
-        
-        latest_risk_assessment = db.query(RiskAssessment).filter(
-            RiskAssessment.participant_id == participant_id
-        ).order_by(desc(RiskAssessment.created_at)).first()
-        
-        # Create workflow with current status
-        workflow = ProspectiveWorkflow(
+        # Nothing recorded yet: no care plan or risk assessment has been saved
+        return ProspectiveWorkflowResponse(
+            id=None,
             participant_id=participant_id,
-            care_plan_completed=latest_care_plan is not None,
-            risk_assessment_completed=latest_risk_assessment is not None,
-            care_plan_id=latest_care_plan.id if latest_care_plan else None,
-            risk_assessment_id=latest_risk_assessment.id if latest_risk_assessment else None,
-            care_plan_completed_date=latest_care_plan.created_at if latest_care_plan else None,
-            risk_assessment_completed_date=latest_risk_assessment.created_at if latest_risk_assessment else None
+            care_plan_completed=False,
+            risk_assessment_completed=False,
+            ai_review_completed=False,
+            quotation_generated=False,
+            ready_for_onboarding=False,
+            created_at="",
+            participant_name=participant_name,
+            participant_status=row.status
         )
-        db.add(workflow)
-        db.commit()
-        db.refresh(workflow)
-        
-        # Also update participant's care_plan_completed flag if needed
-        if latest_care_plan and not participant.care_plan_completed:
-            participant.care_plan_completed = True
-            db.commit()
-    else:
-        # Verify workflow status is accurate
-        latest_care_plan = db.query(CarePlan).filter(
-            CarePlan.participant_id == participant_id
-        ).order_by(desc(CarePlan.created_at)).first()
-        
-        latest_risk_assessment = db.query(RiskAssessment).filter(
-            RiskAssessment.participant_id == participant_id
-        ).order_by(desc(RiskAssessment.created_at)).first()
-        
-        # Update workflow if it's out of sync
-        needs_update = False
-        
-        if latest_care_plan and not workflow.care_plan_completed:
-            workflow.care_plan_completed = True
-            workflow.care_plan_id = latest_care_plan.id
-            workflow.care_plan_completed_date = latest_care_plan.created_at
-            needs_update = True
-            
-        if latest_risk_assessment and not workflow.risk_assessment_completed:
-            workflow.risk_assessment_completed = True
-            workflow.risk_assessment_id = latest_risk_assessment.id
-            workflow.risk_assessment_completed_date = latest_risk_assessment.created_at
-            needs_update = True
-            
-        if needs_update:
-            workflow.updated_at = datetime.now()
-            db.commit()
-            db.refresh(workflow)
     
     return ProspectiveWorkflowResponse(
         id=workflow.id,
         participant_id=workflow.participant_id,
-        care_plan_completed=workflow.care_plan_completed,
-        risk_assessment_completed=workflow.risk_assessment_completed,
-        ai_review_completed=workflow.ai_review_completed,
-        quotation_generated=workflow.quotation_generated,
-        ready_for_onboarding=workflow.ready_for_onboarding,
+        care_plan_completed=bool(workflow.care_plan_completed),
+        risk_assessment_completed=bool(workflow.risk_assessment_completed),
+        ai_review_completed=bool(workflow.ai_review_completed),
+        quotation_generated=bool(workflow.quotation_generated),
+        ready_for_onboarding=bool(workflow.ready_for_onboarding),
         care_plan_id=workflow.care_plan_id,
         risk_assessment_id=workflow.risk_assessment_id,
         workflow_notes=workflow.workflow_notes,
         manager_comments=workflow.manager_comments,
         created_at=workflow.created_at.isoformat() if workflow.created_at else "",
         updated_at=workflow.updated_at.isoformat() if workflow.updated_at else "",
-        participant_name=f"{participant.first_name} {participant.last_name}",
-        participant_status=participant.status
+        participant_name=participant_name,
+        participant_status=row.status
     )
 
 @router.post("/participants/{participant_id}/convert-to-onboarded")
@@ -126,35 +101,15 @@ def convert_to_onboarded(
             ProspectiveWorkflow.participant_id == participant_id
         ).first()
         
-        if not workflow:
-            # Create workflow based on existing data
-            latest_care_plan = db.query(CarePlan).filter(
-                CarePlan.participant_id == participant_id
-            ).order_by(desc(CarePlan.created_at)).first()
-            
-            latest_risk_assessment = db.query(RiskAssessment).filter(
-                RiskAssessment.participant_id == participant_id
-            ).order_by(desc(RiskAssessment.created_at)).first()
-            
-            workflow = ProspectiveWorkflow(
-                participant_id=participant_id,
-                care_plan_completed=latest_care_plan is not None,
-                risk_assessment_completed=latest_risk_assessment is not None,
-                care_plan_id=latest_care_plan.id if latest_care_plan else None,
-                risk_assessment_id=latest_risk_assessment.id if latest_risk_assessment else None
-            )
-            db.add(workflow)
-            db.commit()
-            db.refresh(workflow)
-        
         # Check if care plan and risk assessment are completed
-        if not workflow.care_plan_completed or not workflow.risk_assessment_completed:
+        if not workflow or not workflow.care_plan_completed or not workflow.risk_assessment_completed:
             raise HTTPException(
                 status_code=400, 
                 detail="Care plan and risk assessment must be completed before onboarding"
             )
         
         # Update participant status
+        ParticipantStatsService.record_transition(db, participant.status, "onboarded")
         participant.status = "onboarded"
         participant.onboarding_completed = True
         participant.care_plan_completed = True
@@ -177,6 +132,7 @@ def convert_to_onboarded(
             workflow.manager_comments = approval_notes
         
         db.commit()
+        get_participant_stats_cache().invalidate()
         
         logger.info(f"Participant {participant_id} successfully converted to onboarded status")
         
@@ -275,40 +231,12 @@ def create_care_plan(
             **care_plan_data.dict()
         )
         db.add(care_plan)
-        db.commit()
-        db.refresh(care_plan)
-        
-        # Update participant care_plan_completed flag
-        participant.care_plan_completed = True
         participant.updated_at = datetime.now()
         
-        # Update or create prospective workflow
-        workflow = db.query(ProspectiveWorkflow).filter(
-            ProspectiveWorkflow.participant_id == participant_id
-        ).first()
-        
-        if workflow:
-            workflow.care_plan_completed = True
-            workflow.care_plan_id = care_plan.id
-            workflow.care_plan_completed_date = datetime.now()
-            workflow.updated_at = datetime.now()
-            
-            # Auto-calculate ready_for_onboarding
-            workflow.ready_for_onboarding = (
-                workflow.care_plan_completed and 
-                workflow.risk_assessment_completed
-            )
-        else:
-            # Create workflow if it doesn't exist
-            new_workflow = ProspectiveWorkflow(
-                participant_id=participant_id,
-                care_plan_completed=True,
-                care_plan_id=care_plan.id,
-                care_plan_completed_date=datetime.now()
-            )
-            db.add(new_workflow)
-        
+        # Workflow and participant care_plan_completed change with the care plan
+        WorkflowStateService.record(db, participant_id, care_plan=care_plan)
         db.commit()
+        db.refresh(care_plan)
         
         logger.info(f"Care plan created successfully for participant {participant_id}")
         
@@ -405,21 +333,10 @@ def update_care_plan(
             setattr(care_plan, field, value)
         
         care_plan.updated_at = datetime.now()
+        WorkflowStateService.record(db, participant_id, care_plan=care_plan)
         db.commit()
         db.refresh(care_plan)
         
-        # Ensure workflow is updated
-        workflow = db.query(ProspectiveWorkflow).filter(
-            ProspectiveWorkflow.participant_id == participant_id
-        ).first()
-        
-        if workflow and not workflow.care_plan_completed:
-            workflow.care_plan_completed = True
-            workflow.care_plan_id = care_plan.id
-            workflow.care_plan_completed_date = datetime.now()
-            workflow.updated_at = datetime.now()
-            db.commit()
-        
         logger.info(f"Care plan updated successfully for participant {participant_id}")
         
         return CarePlanResponse(
@@ -480,36 +397,11 @@ def create_risk_assessment(
             **risk_assessment_data.dict()
         )
         db.add(risk_assessment)
-        db.commit()
-        db.refresh(risk_assessment)
-        
-        # Update prospective workflow
-        workflow = db.query(ProspectiveWorkflow).filter(
-            ProspectiveWorkflow.participant_id == participant_id
-        ).first()
-        
-        if workflow:
-            workflow.risk_assessment_completed = True
-            workflow.risk_assessment_id = risk_assessment.id
-            workflow.risk_assessment_completed_date = datetime.now()
-            workflow.updated_at = datetime.now()
-            
-            # Auto-calculate ready_for_onboarding
-            workflow.ready_for_onboarding = (
-                workflow.care_plan_completed and 
-                workflow.risk_assessment_completed
-            )
-        else:
-            # Create workflow if it doesn't exist
-            new_workflow = ProspectiveWorkflow(
-                participant_id=participant_id,
-                risk_assessment_completed=True,
-                risk_assessment_id=risk_assessment.id,
-                risk_assessment_completed_date=datetime.now()
-            )
-            db.add(new_workflow)
         
+        # Workflow changes with the risk assessment
+        WorkflowStateService.record(db, participant_id, risk_assessment=risk_assessment)
         db.commit()
+        db.refresh(risk_assessment)
         
         logger.info(f"Risk assessment created successfully for participant {participant_id}")
         
@@ -606,27 +498,10 @@ def update_risk_assessment(
             setattr(risk_assessment, field, value)
         
         risk_assessment.updated_at = datetime.now()
+        WorkflowStateService.record(db, participant_id, risk_assessment=risk_assessment)
         db.commit()
         db.refresh(risk_assessment)
         
-        # Ensure workflow is updated
-        workflow = db.query(ProspectiveWorkflow).filter(
-            ProspectiveWorkflow.participant_id == participant_id
-        ).first()
-        
-        if workflow and not workflow.risk_assessment_completed:
-            workflow.risk_assessment_completed = True
-            workflow.risk_assessment_id = risk_assessment.id
-            workflow.risk_assessment_completed_date = datetime.now()
-            workflow.updated_at = datetime.now()
-            
-            # Auto-calculate ready_for_onboarding
-            workflow.ready_for_onboarding = (
-                workflow.care_plan_completed and 
-                workflow.risk_assessment_completed
-            )
-            db.commit()
-        
         logger.info(f"Risk assessment updated successfully for participant {participant_id}")
         
         return RiskAssessmentResponse(
@@ -1,26 +1,45 @@
 # backend/app/api/v1/endpoints/document.py - COMPLETE FIXED FILE WITH INLINE PREVIEW
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Query
+from fastapi import BackgroundTasks, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc
-from app.database import get_db
+from app.database import get_db, get_session_factory
 from app.models.participant import Participant
 from app.models.document import Document, DocumentCategory
-from app.services.document_service import DocumentService
+from app.services.document_service import DocumentService, get_category_registry
+from app.services.audit_service import AuditLogService
+from app.services.audit_pack_service import AuditPackService
+from app.services.dossier_service import PYPDF_AVAILABLE, DossierService
+from app.services.document_import_service import (
+    DirectoryImportSource,
+    DocumentImportError,
+    DocumentImportService,
+    ZipImportSource,
+    load_manifest,
+    resolve_import_directory,
+)
+from app.models.audit import AuditPackExport
+from app.services.notification_service import DocumentNotificationService
+from app.services.document_compression import StoredFile, accepts_encoding, iter_decompressed, store_file
+from app.core.pagination import TOTAL_MODE_PATTERN
+from app.core.storage import get_storage
+from app.core.download_tokens import (
+    PERMISSION_DOWNLOAD,
+    PERMISSION_PREVIEW,
+    DownloadGrant,
+    InvalidDownloadToken,
+    sign_download,
+    verify_download,
+)
+from app.services.access_log_buffer import AccessLogBuffer, get_access_log_buffer
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 import uuid
-import shutil
 from pathlib import Path
 import json
 import logging
 
-BASE_DIR = Path(__file__).resolve().parents[4]
-# Keep all uploaded participant documents under backend/uploads/documents so
-# FastAPI can serve them via the existing ``/uploads`` mount in ``main.py``.
-UPLOAD_DIR = BASE_DIR / "uploads" / "documents"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
@@ -49,34 +68,42 @@ def validate_file(file: UploadFile) -> Optional[str]:
     
     return None
 
-def ensure_upload_directory_exists(participant_id: int) -> Path:
-    """Ensure upload directory exists and return the path"""
-    upload_dir = UPLOAD_DIR / str(participant_id)
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    return upload_dir
+def split_tags(tags: Optional[List[str]]) -> Optional[List[str]]:
+    """Accept ``tags`` as repeated query params and/or comma-separated values"""
+    if not tags:
+        return None
+    return [tag.strip() for value in tags for tag in value.split(',') if tag.strip()]
+
+def parse_expiry_date(expiry_date: Optional[str]) -> Optional[datetime]:
+    """Parse a form expiry date (YYYY-MM-DD, optionally with a time part) as a naive datetime"""
+    if not expiry_date:
+        return None
+    try:
+        # Drop any time/timezone part so the value stays timezone-naive
+        date_part = expiry_date.split('T')[0]
+        return datetime.strptime(date_part, '%Y-%m-%d')
+    except Exception as e:
+        logger.error(f"Error parsing expiry date '{expiry_date}': {str(e)}")
+        raise HTTPException(status_code=400, detail="Invalid expiry date format. Expected YYYY-MM-DD")
 
-def save_uploaded_file(file: UploadFile, participant_id: int) -> tuple[str, str, str]:
-    """Save uploaded file and return (filename, absolute_path, relative_path)."""
+def save_uploaded_file(file: UploadFile, participant_id: int) -> tuple[str, str, StoredFile]:
+    """Save uploaded file and return (filename, storage_key, stored).
+    
+    Eligible MIME types are compressed on the way to storage, so the stored
+    filename may carry a ``.zst`` suffix; ``stored`` records codec and sizes.
+    """
     # Generate unique filename
     file_extension = Path(file.filename).suffix if file.filename else ""
     unique_filename = f"{participant_id}_{uuid.uuid4().hex}{file_extension}"
-    
-    # Ensure participant directory exists
-    participant_dir = ensure_upload_directory_exists(participant_id)
-    
-    file_path = participant_dir / unique_filename
+    key = f"uploads/documents/{participant_id}/{unique_filename}"
     
     # Save file
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        logger.info(f"Successfully saved file to: {file_path}")
+        stored = store_file(file.file, key, file.content_type)
 
-        absolute_path = str(file_path.resolve())
-        relative_path = str(file_path.relative_to(BASE_DIR))
+        logger.info(f"Successfully saved file to: {stored.key} (codec: {stored.codec or 'none'})")
 
-        return unique_filename, absolute_path, relative_path
+        return stored.name, stored.key, stored
         
     except Exception as e:
         logger.error(f"Error saving file: {str(e)}")
@@ -92,6 +119,7 @@ def format_document_response(doc: Document, participant_id: int) -> Dict[str, An
         "original_filename": doc.original_filename,
         "file_size": doc.file_size,
         "mime_type": doc.mime_type,
+        "sha256": doc.sha256,
         "category": doc.category,
         "description": doc.description,
         "tags": doc.tags or [],
@@ -104,9 +132,178 @@ def format_document_response(doc: Document, participant_id: int) -> Dict[str, An
         "created_at": doc.created_at.isoformat() if doc.created_at else None,
         "updated_at": doc.updated_at.isoformat() if doc.updated_at else None,
         "download_url": f"/api/v1/participants/{participant_id}/documents/{doc.id}/download",
+        "signed_url": f"/api/v1/documents/files/{sign_document_download(doc)}",
         "status": doc.status
     }
 
+def sign_document_download(doc: Document) -> str:
+    """Mint a short-lived token that lets the SPA fetch ``doc`` without a DB lookup"""
+    return sign_download(DownloadGrant(
+        document_id=doc.id,
+        participant_id=doc.participant_id,
+        key=doc.file_path,
+        mime_type=doc.mime_type,
+        filename=doc.original_filename,
+        file_size=doc.file_size,
+        codec=doc.storage_codec,
+        stored_size=doc.stored_size,
+    ))
+
+def build_file_response(
+    request: Request,
+    storage,
+    *,
+    key: str,
+    mime_type: str,
+    filename: str,
+    file_size: int,
+    codec: Optional[str] = None,
+    stored_size: Optional[int] = None,
+    inline: bool = False,
+) -> Response:
+    """Build the preview/download response for a stored file.
+
+    Shared by the regular download endpoint and the signed URL handler, which
+    has no ``Document`` row and passes the values carried by its token.
+    """
+    # THIS IS THE KEY PART - Set appropriate headers based on whether it's for preview or download
+    headers = {}
+    
+    if inline:
+        # For preview - display inline in browser (THIS FIXES THE DOWNLOAD ISSUE)
+        headers["Content-Disposition"] = f"inline; filename=\"{filename}\""
+        
+        # Add specific headers for different file types
+        if mime_type == "application/pdf":
+            headers.update({
+                "Content-Type": "application/pdf",
+                "X-Content-Type-Options": "nosniff",
+                "Cache-Control": "no-cache, no-store, must-revalidate",
+                "Pragma": "no-cache",
+                "Expires": "0"
+            })
+        elif mime_type.startswith("image/"):
+            headers.update({
+                "Content-Type": mime_type,
+                "Cache-Control": "max-age=3600"  # Cache images for 1 hour
+            })
+        elif mime_type == "text/plain":
+            headers.update({
+                "Content-Type": "text/plain; charset=utf-8",
+                "X-Content-Type-Options": "nosniff"
+            })
+        
+        logger.info(f"Setting inline headers for preview: {headers}")
+    else:
+        # For download - force download
+        headers["Content-Disposition"] = f"attachment; filename=\"{filename}\""
+        logger.info(f"Setting attachment headers for download: {headers}")
+    
+    # Local files are sent directly; other backends are streamed
+    local_path = storage.local_path(key)
+    
+    # Compressed documents go out as-is when the client can decode them,
+    # otherwise they are decompressed on the fly
+    if codec:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_encoding(request.headers.get("accept-encoding"), codec):
+            headers["Content-Encoding"] = codec
+            if local_path is not None:
+                return FileResponse(
+                    path=str(local_path),
+                    media_type=mime_type,
+                    headers=headers
+                )
+            if stored_size:
+                headers["Content-Length"] = str(stored_size)
+            return StreamingResponse(
+                storage.iter_chunks(key),
+                media_type=mime_type,
+                headers=headers
+            )
+        headers["Content-Length"] = str(file_size)
+        return StreamingResponse(
+            iter_decompressed(key, codec, storage),
+            media_type=mime_type,
+            headers=headers
+        )
+    
+    if local_path is None:
+        headers["Content-Length"] = str(file_size)
+        return StreamingResponse(
+            storage.iter_chunks(key),
+            media_type=mime_type,
+            headers=headers
+        )
+    
+    # Return the file
+    return FileResponse(
+        path=str(local_path),
+        filename=filename,
+        media_type=mime_type,
+        headers=headers
+    )
+
+DUPLICATE_POLICIES = ("reject", "new_version", "return_existing")
+
+def handle_duplicate_upload(
+    db: Session,
+    request: Request,
+    existing: Document,
+    policy: str,
+    *,
+    original_filename: str,
+    title: str,
+    description: Optional[str],
+    expiry_date: Optional[datetime],
+) -> Dict[str, Any]:
+    """Apply ``policy`` to an upload whose content matches ``existing``"""
+    participant_id = existing.participant_id
+    if policy == "reject":
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "An identical document already exists for this participant",
+                "existing_document_id": existing.id,
+            }
+        )
+    
+    document = existing
+    if policy == "new_version":
+        try:
+            document = DocumentService.create_version(
+                db=db,
+                document_id=existing.id,
+                participant_id=participant_id,
+                filename=existing.filename,
+                original_filename=original_filename,
+                file_path=existing.file_path,
+                file_size=existing.file_size,
+                mime_type=existing.mime_type,
+                storage_codec=existing.storage_codec,
+                stored_size=existing.stored_size,
+                sha256=existing.sha256,
+                title=title,
+                description=description,
+                expiry_date=expiry_date,
+                uploaded_by="System User"  # Replace with actual user from auth
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        
+        DocumentService.log_document_access(
+            db=db,
+            document_id=document.id,
+            user_id=1,  # Replace with actual user ID from auth
+            user_role="admin",
+            access_type="upload",
+            ip_address=request.client.host if request.client else None
+        )
+    
+    response = format_document_response(document, participant_id)
+    response["duplicate_of"] = existing.id
+    return response
+
 @router.get("/document-categories")
 def get_document_categories(
     active_only: bool = True,
@@ -149,10 +346,25 @@ async def upload_document(
     tags: Optional[str] = Form(None),
     visible_to_support_worker: bool = Form(False),
     expiry_date: Optional[str] = Form(None),
+    duplicate_policy: str = Form("reject"),
     db: Session = Depends(get_db)
 ):
-    """Upload a document for a participant"""
+    """Upload a document for a participant.
+    
+    If the participant already has a current document with identical
+    content, ``duplicate_policy`` decides what happens: ``reject`` (409 with
+    the existing document id), ``new_version`` (record the upload as a new
+    version of that document, sharing its stored file) or ``return_existing``
+    (return the existing document unchanged).  Duplicate responses carry
+    ``duplicate_of``.
+    """
     try:
+        if duplicate_policy not in DUPLICATE_POLICIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"duplicate_policy must be one of: {', '.join(DUPLICATE_POLICIES)}"
+            )
+        
         # Verify participant exists
         participant = db.query(Participant).filter(Participant.id == participant_id).first()
         if not participant:
@@ -164,11 +376,7 @@ async def upload_document(
             raise HTTPException(status_code=400, detail=error)
         
         # Validate category exists
-        category_exists = db.query(DocumentCategory).filter(
-            DocumentCategory.category_id == category,
-            DocumentCategory.is_active == True
-        ).first()
-        if not category_exists:
+        if not get_category_registry().is_valid(db, category):
             raise HTTPException(status_code=400, detail=f"Invalid category: {category}")
         
         # Parse tags
@@ -179,25 +387,26 @@ async def upload_document(
             except:
                 tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
         
-        # Parse expiry date - FIXED: Make it timezone-naive
-        expiry_datetime = None
-        if expiry_date:
-            try:
-                # Parse the date and ensure it's timezone-naive
-                if 'T' in expiry_date:
-                    # Remove timezone info if present
-                    date_part = expiry_date.split('T')[0] if 'T' in expiry_date else expiry_date
-                    expiry_datetime = datetime.strptime(date_part, '%Y-%m-%d')
-                else:
-                    # Just a date string
-                    expiry_datetime = datetime.strptime(expiry_date, '%Y-%m-%d')
-                    
-            except Exception as e:
-                logger.error(f"Error parsing expiry date '{expiry_date}': {str(e)}")
-                raise HTTPException(status_code=400, detail=f"Invalid expiry date format. Expected YYYY-MM-DD")
+        # Parse expiry date
+        expiry_datetime = parse_expiry_date(expiry_date)
         
         # Save file
-        filename, absolute_path, relative_path = save_uploaded_file(file, participant_id)
+        filename, storage_key, stored = save_uploaded_file(file, participant_id)
+        
+        existing = DocumentService.find_duplicate(db, participant_id, stored.sha256)
+        if existing:
+            # The identical bytes are already stored; drop the new copy
+            get_storage().delete(storage_key)
+            return handle_duplicate_upload(
+                db,
+                request,
+                existing,
+                duplicate_policy,
+                original_filename=file.filename,
+                title=title,
+                description=description,
+                expiry_date=expiry_datetime
+            )
         
         # Create document record using service
         document = DocumentService.create_document(
@@ -206,9 +415,12 @@ async def upload_document(
             title=title,
             filename=filename,
             original_filename=file.filename,
-            file_path=relative_path,
-            file_size=file.size or 0,
+            file_path=storage_key,
+            file_size=stored.size,
             mime_type=file.content_type,
+            storage_codec=stored.codec,
+            stored_size=stored.stored_size,
+            sha256=stored.sha256,
             category=category,
             description=description,
             tags=tag_list,
@@ -236,8 +448,8 @@ async def upload_document(
         logger.error(f"Error uploading document: {str(e)}")
         # Clean up file if it was saved
         try:
-            if 'absolute_path' in locals():
-                Path(absolute_path).unlink(missing_ok=True)
+            if 'storage_key' in locals():
+                get_storage().delete(storage_key)
         except:
             pass
         raise HTTPException(status_code=500, detail=f"Failed to upload document: {str(e)}")
@@ -245,17 +457,28 @@ async def upload_document(
 @router.get("/participants/{participant_id}/documents")
 def get_participant_documents(
     participant_id: int,
+    response: Response,
     search: Optional[str] = None,
     category: Optional[str] = None,
     is_expired: Optional[bool] = None,
     visible_to_support_worker: Optional[bool] = None,
     sort_by: str = "created_at",
     sort_order: str = "desc",
-    page: int = 1,
-    page_size: int = 20,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = None,
+    total: str = Query("none", pattern=TOTAL_MODE_PATTERN),
+    include_versions: bool = False,
+    tags: Optional[List[str]] = Query(None),
     db: Session = Depends(get_db)
 ):
-    """Get documents for a participant with filtering and pagination"""
+    """Get documents for a participant with filtering and keyset pagination.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch the
+    next page.  ``total=exact|estimate`` adds an ``X-Total-Count`` header.
+    Only current versions are listed unless ``include_versions`` is set.
+    ``tags`` (repeated or comma-separated) keeps documents with every tag.
+    """
     try:
         # Verify participant exists
         participant = db.query(Participant).filter(Participant.id == participant_id).first()
@@ -263,7 +486,7 @@ def get_participant_documents(
             raise HTTPException(status_code=404, detail="Participant not found")
         
         # Get documents using service
-        documents, total = DocumentService.get_documents_for_participant(
+        result = DocumentService.get_documents_for_participant(
             db=db,
             participant_id=participant_id,
             search=search,
@@ -273,18 +496,84 @@ def get_participant_documents(
             sort_by=sort_by,
             sort_order=sort_order,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            cursor=cursor,
+            total=total,
+            current_only=not include_versions,
+            tags=split_tags(tags)
         )
+        result.apply_headers(response)
         
         # Format response
-        return [format_document_response(doc, participant_id) for doc in documents]
+        return [format_document_response(doc, participant_id) for doc in result.items]
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching documents: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/participants/{participant_id}/documents/search")
+def search_participant_documents(
+    participant_id: int,
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    is_expired: Optional[bool] = None,
+    visible_to_support_worker: Optional[bool] = None,
+    tags: Optional[List[str]] = Query(None),
+    include_versions: bool = False,
+    sort_by: str = "created_at",
+    sort_order: str = "desc",
+    page_size: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get a page of documents together with facet counts for the same filters.
+
+    Facets count every matching document (not just the page) by category,
+    tag and expiry state (``expired``, ``expiring_soon``, ``valid``, ``none``),
+    so the UI can render filters without fetching the whole list.
+    """
+    try:
+        participant = db.query(Participant).filter(Participant.id == participant_id).first()
+        if not participant:
+            raise HTTPException(status_code=404, detail="Participant not found")
+        
+        filters = dict(
+            search=search,
+            category=category,
+            is_expired=is_expired,
+            visible_to_support_worker=visible_to_support_worker,
+            current_only=not include_versions,
+            tags=split_tags(tags),
+        )
+        result = DocumentService.get_documents_for_participant(
+            db=db,
+            participant_id=participant_id,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page_size=page_size,
+            cursor=cursor,
+            **filters
+        )
+        facets = DocumentService.get_document_facets(db, participant_id, **filters)
+        
+        return {
+            "items": [format_document_response(doc, participant_id) for doc in result.items],
+            "next_cursor": result.next_cursor,
+            "facets": facets
+        }
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching documents: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/participants/{participant_id}/documents/stats")
 def get_document_stats(
     participant_id: int,
@@ -306,6 +595,94 @@ def get_document_stats(
         logger.error(f"Error fetching document stats: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/participants/{participant_id}/documents/access-history")
+def get_participant_access_history(
+    participant_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Get the audit trail of who accessed a participant's documents"""
+    try:
+        participant = db.query(Participant).filter(Participant.id == participant_id).first()
+        if not participant:
+            raise HTTPException(status_code=404, detail="Participant not found")
+
+        return AuditLogService.get_access_history(
+            db=db,
+            participant_id=participant_id,
+            user_id=user_id,
+            start=start,
+            end=end,
+            limit=limit
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching access history: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/participants/{participant_id}/documents/dossier")
+def download_participant_dossier(
+    participant_id: int,
+    request: Request,
+    document_ids: Optional[List[int]] = Query(None),
+    categories: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Download one PDF combining the participant's generated and uploaded PDFs.
+
+    The latest generated PDF of each type comes first, followed by current
+    uploaded PDFs (optionally limited to ``document_ids``/``categories``),
+    after a cover page and a linked table of contents.  Source PDFs are merged
+    without re-rendering; files that cannot be read are listed in the
+    ``X-Dossier-Skipped`` header instead of failing the download.
+    """
+    try:
+        if not PYPDF_AVAILABLE:
+            raise HTTPException(status_code=503, detail="PDF merging is not available on this server")
+        
+        participant = db.query(Participant).filter(Participant.id == participant_id).first()
+        if not participant:
+            raise HTTPException(status_code=404, detail="Participant not found")
+        
+        sources = DossierService.collect_sources(db, participant_id, document_ids, categories)
+        output, report = DossierService.build(participant, sources)
+        
+        try:
+            DossierService.log_access(
+                db,
+                report,
+                user_id=1,  # Replace with actual user ID from auth
+                user_role="admin",
+                ip_address=request.client.host if request.client else None
+            )
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to log dossier access: {e}")
+        
+        filename = f"dossier_{participant.first_name}_{participant.last_name}.pdf".replace(" ", "_").replace("/", "_")
+        return StreamingResponse(
+            DossierService.iter_output(output),
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": f"attachment; filename=\"{filename}\"",
+                "Content-Length": str(report.size),
+                "X-Dossier-Documents": str(len(report.entries)),
+                "X-Dossier-Pages": str(report.page_count),
+                "X-Dossier-Skipped": json.dumps(report.skipped, separators=(",", ":")),
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building dossier: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/participants/{participant_id}/documents/{document_id}")
 def get_document(
     participant_id: int,
@@ -341,6 +718,99 @@ def get_document(
         logger.error(f"Error fetching document: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/participants/{participant_id}/documents/{document_id}/versions")
+async def upload_document_version(
+    participant_id: int,
+    document_id: int,
+    request: Request,
+    file: UploadFile = File(...),
+    title: Optional[str] = Form(None),
+    description: Optional[str] = Form(None),
+    expiry_date: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
+    """Upload a new version of a document (e.g. a re-issued agreement).
+    
+    The new version becomes current and the previous one is kept in the
+    version history; category, tags and visibility carry over.
+    """
+    try:
+        error = validate_file(file)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        
+        expiry_datetime = parse_expiry_date(expiry_date)
+        
+        filename, storage_key, stored = save_uploaded_file(file, participant_id)
+        
+        try:
+            document = DocumentService.create_version(
+                db=db,
+                document_id=document_id,
+                participant_id=participant_id,
+                filename=filename,
+                original_filename=file.filename,
+                file_path=storage_key,
+                file_size=stored.size,
+                mime_type=file.content_type,
+                storage_codec=stored.codec,
+                stored_size=stored.stored_size,
+                sha256=stored.sha256,
+                title=title,
+                description=description,
+                expiry_date=expiry_datetime,
+                uploaded_by="System User"  # Replace with actual user from auth
+            )
+        except ValueError as e:
+            get_storage().delete(storage_key)
+            raise HTTPException(status_code=409, detail=str(e))
+        
+        if not document:
+            get_storage().delete(storage_key)
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        DocumentService.log_document_access(
+            db=db,
+            document_id=document.id,
+            user_id=1,  # Replace with actual user ID from auth
+            user_role="admin",
+            access_type="upload",
+            ip_address=request.client.host if request.client else None
+        )
+        
+        return format_document_response(document, participant_id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error uploading document version: {str(e)}")
+        try:
+            if 'storage_key' in locals():
+                get_storage().delete(storage_key)
+        except:
+            pass
+        raise HTTPException(status_code=500, detail=f"Failed to upload document version: {str(e)}")
+
+@router.get("/participants/{participant_id}/documents/{document_id}/versions")
+def get_document_versions(
+    participant_id: int,
+    document_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get the full version history of a document, newest first"""
+    try:
+        versions = DocumentService.get_version_history(db, document_id, participant_id)
+        if not versions:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        return [format_document_response(doc, participant_id) for doc in versions]
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching document versions: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/participants/{participant_id}/documents/{document_id}/download")
 def download_document(
     participant_id: int,
@@ -363,13 +833,13 @@ def download_document(
         logger.info(f"Attempting to {'preview' if inline else 'download'} document {document_id}")
         logger.info(f"File path from database: {document.file_path}")
         
-        # Check if file exists and normalize path
-        file_path = DocumentService.resolve_file_path(document.file_path)
+        # Check if file exists in storage
+        storage = get_storage()
+        file_exists = storage.exists(document.file_path)
 
-        logger.info(f"Resolved file path: {file_path}")
-        logger.info(f"File exists: {file_path.exists()}")
+        logger.info(f"File exists in {storage.name} storage: {file_exists}")
 
-        if not file_path.exists():
+        if not file_exists:
             raise HTTPException(
                 status_code=404,
                 detail=f"Document file not found. Original path: {document.file_path}"
@@ -389,45 +859,16 @@ def download_document(
         except Exception as e:
             logger.warning(f"Failed to log document access: {e}")
         
-        # THIS IS THE KEY PART - Set appropriate headers based on whether it's for preview or download
-        headers = {}
-        
-        if inline:
-            # For preview - display inline in browser (THIS FIXES THE DOWNLOAD ISSUE)
-            headers["Content-Disposition"] = f"inline; filename=\"{document.original_filename}\""
-            
-            # Add specific headers for different file types
-            if document.mime_type == "application/pdf":
-                headers.update({
-                    "Content-Type": "application/pdf",
-                    "X-Content-Type-Options": "nosniff",
-                    "Cache-Control": "no-cache, no-store, must-revalidate",
-                    "Pragma": "no-cache",
-                    "Expires": "0"
-                })
-            elif document.mime_type.startswith("image/"):
-                headers.update({
-                    "Content-Type": document.mime_type,
-                    "Cache-Control": "max-age=3600"  # Cache images for 1 hour
-                })
-            elif document.mime_type == "text/plain":
-                headers.update({
-                    "Content-Type": "text/plain; charset=utf-8",
-                    "X-Content-Type-Options": "nosniff"
-                })
-            
-            logger.info(f"Setting inline headers for preview: {headers}")
-        else:
-            # For download - force download
-            headers["Content-Disposition"] = f"attachment; filename=\"{document.original_filename}\""
-            logger.info(f"Setting attachment headers for download: {headers}")
-        
-        # Return the file
-        return FileResponse(
-            path=str(file_path),
+        return build_file_response(
+            request,
+            storage,
+            key=document.file_path,
+            mime_type=document.mime_type,
             filename=document.original_filename,
-            media_type=document.mime_type,
-            headers=headers
+            file_size=document.file_size,
+            codec=document.storage_codec,
+            stored_size=document.stored_size,
+            inline=inline,
         )
         
     except HTTPException:
@@ -436,19 +877,67 @@ def download_document(
         logger.error(f"Error {'previewing' if inline else 'downloading'} document: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error {'previewing' if inline else 'downloading'} document: {str(e)}")
 
+@router.get("/documents/files/{token}")
+def download_signed_document(
+    token: str,
+    request: Request,
+    inline: bool = False,
+    access_log: AccessLogBuffer = Depends(get_access_log_buffer)
+):
+    """Serve a document from a signed URL issued by the document listing.
+
+    The token carries the storage key and metadata, so no database session is
+    opened; the access event is queued and written in a batch.
+    """
+    try:
+        grant = verify_download(token)
+    except InvalidDownloadToken as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+    access_type = PERMISSION_PREVIEW if inline else PERMISSION_DOWNLOAD
+    if not grant.allows(access_type):
+        raise HTTPException(status_code=403, detail=f"Token does not allow {access_type}")
+
+    storage = get_storage()
+    if not storage.exists(grant.key):
+        raise HTTPException(status_code=404, detail="Document file not found")
+
+    access_log.record(
+        document_id=grant.document_id,
+        user_id=grant.user_id,
+        user_role=grant.user_role,
+        access_type=access_type,
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent")
+    )
+
+    return build_file_response(
+        request,
+        storage,
+        key=grant.key,
+        mime_type=grant.mime_type,
+        filename=grant.filename,
+        file_size=grant.file_size,
+        codec=grant.codec,
+        stored_size=grant.stored_size,
+        inline=inline,
+    )
+
 @router.delete("/participants/{participant_id}/documents/{document_id}")
 def delete_document(
     participant_id: int,
     document_id: int,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    """Delete a document"""
+    """Delete a document and its later versions; files are removed in the background"""
     try:
         success = DocumentService.delete_document(
             db=db,
             document_id=document_id,
-            participant_id=participant_id
+            participant_id=participant_id,
+            background_tasks=background_tasks
         )
         
         if not success:
@@ -485,6 +974,166 @@ def get_organization_document_stats(db: Session = Depends(get_db)):
         logger.error(f"Error fetching organization document stats: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/documents/audit/rollups")
+def get_document_access_rollups(
+    start_date: date,
+    end_date: date,
+    group_by: str = Query("document", pattern="^(document|user)$"),
+    participant_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Get daily document access rollups for reporting"""
+    try:
+        return AuditLogService.get_rollups(
+            db,
+            start_date=start_date,
+            end_date=end_date,
+            group_by=group_by,
+            participant_id=participant_id,
+            user_id=user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching document access rollups: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def format_audit_pack_response(export: AuditPackExport) -> Dict[str, Any]:
+    """Format an audit pack export as response dictionary"""
+    return {
+        "id": export.id,
+        "participant_ids": export.participant_ids or [],
+        "categories": export.categories or [],
+        "current_only": export.current_only,
+        "status": export.status,
+        "document_count": export.document_count,
+        "documents_written": export.documents_written,
+        "bytes_written": export.bytes_written,
+        "part": export.part,
+        "checkpoint": (
+            {"participant_id": export.last_participant_id, "document_id": export.last_document_id}
+            if export.last_document_id is not None else None
+        ),
+        "created_at": export.created_at.isoformat() if export.created_at else None,
+        "completed_at": export.completed_at.isoformat() if export.completed_at else None,
+        "download_url": f"/api/v1/documents/audit-packs/{export.id}/download",
+    }
+
+@router.post("/documents/audit-packs")
+def create_audit_pack(
+    participant_ids: Optional[List[int]] = Query(None),
+    categories: Optional[List[str]] = Query(None),
+    include_versions: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Register an audit pack export for a sample of participants and categories.
+    
+    Download it from ``download_url``; an interrupted download can be
+    requested again and continues from the last checkpoint as a new part.
+    """
+    try:
+        export = AuditPackService.create_export(
+            db,
+            participant_ids=participant_ids,
+            categories=categories,
+            current_only=not include_versions,
+            requested_by="System User"  # Replace with actual user from auth
+        )
+        return format_audit_pack_response(export)
+    except Exception as e:
+        logger.error(f"Error creating audit pack: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/documents/audit-packs/{export_id}")
+def get_audit_pack(export_id: int, db: Session = Depends(get_db)):
+    """Get the progress and checkpoint of an audit pack export"""
+    export = db.get(AuditPackExport, export_id)
+    if not export:
+        raise HTTPException(status_code=404, detail="Audit pack not found")
+    return format_audit_pack_response(export)
+
+@router.get("/documents/audit-packs/{export_id}/download")
+def download_audit_pack(
+    export_id: int,
+    restart: bool = False,
+    db: Session = Depends(get_db),
+    session_factory=Depends(get_session_factory)
+):
+    """Stream the audit pack zip, resuming after the last checkpoint.
+    
+    ``restart=true`` ignores the checkpoint and streams the whole pack again.
+    """
+    export = db.get(AuditPackExport, export_id)
+    if not export:
+        raise HTTPException(status_code=404, detail="Audit pack not found")
+    if export.status == "completed" and not restart:
+        raise HTTPException(status_code=409, detail="Audit pack already downloaded; pass restart=true to download it again")
+    
+    if restart:
+        export.last_participant_id = None
+        export.last_document_id = None
+        export.documents_written = 0
+        export.bytes_written = 0
+    part, resume_after = AuditPackService.start_part(db, export)
+    
+    filename = f"audit-pack-{export_id}" + (f"-part{part}" if resume_after else "") + ".zip"
+    return StreamingResponse(
+        AuditPackService.stream(session_factory, export_id, resume_after=resume_after),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename=\"{filename}\"",
+            "X-Audit-Pack-Part": str(part),
+        }
+    )
+
+@router.post("/documents/imports")
+def import_documents(
+    archive: Optional[UploadFile] = File(None),
+    directory: Optional[str] = Form(None),
+    manifest: Optional[UploadFile] = File(None),
+    dry_run: bool = Form(False),
+    db: Session = Depends(get_db)
+):
+    """Bulk import legacy documents from a zip upload or a server-side directory.
+    
+    Pass either ``archive`` (a zip) or ``directory`` (relative to
+    ``DOCUMENT_IMPORT_ROOT``).  The manifest is taken from ``manifest`` or
+    from ``manifest.csv``/``manifest.json`` at the root of the source.
+    Returns a result for every manifest row; ``dry_run`` only validates.
+    For very large imports use ``scripts/import_documents.py``.
+    """
+    if bool(archive) == bool(directory):
+        raise HTTPException(status_code=400, detail="Provide either an archive or a directory")
+    
+    try:
+        rows = load_manifest(manifest.file, manifest.filename or "manifest.csv") if manifest else None
+        if archive:
+            source = ZipImportSource(archive.file)
+        else:
+            source = DirectoryImportSource(resolve_import_directory(directory))
+        
+        with source:
+            report = DocumentImportService.run(db, source, rows=rows, dry_run=dry_run)
+        return report.to_dict()
+        
+    except DocumentImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing documents: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/documents/notifications/process")
+def process_document_notifications(db: Session = Depends(get_db)):
+    """Schedule expiry notifications and deliver those that are due"""
+    try:
+        return DocumentNotificationService.run_once(db)
+    except Exception as e:
+        logger.error(f"Error processing document notifications: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/documents/expiring")
 def get_expiring_documents(
     days_ahead: int = 30,
@@ -4,7 +4,7 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.participant import Participant
-from app.services.document_generation_service import DocumentGenerationService
+from app.services.document_generation_service import DocumentGenerationService, BULK_ZIP_TEMP_PREFIX
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 import logging
@@ -230,7 +230,7 @@ def bulk_generate_documents(
         service = DocumentGenerationService()
         
         # Create temporary zip file
-        temp_dir = tempfile.mkdtemp()
+        temp_dir = tempfile.mkdtemp(prefix=BULK_ZIP_TEMP_PREFIX)
         zip_path = os.path.join(temp_dir, 'documents.zip')
         
         try:
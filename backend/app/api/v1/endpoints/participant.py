@@ -1,12 +1,40 @@
 # backend/app/api/v1/endpoints/participant.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Response
+from fastapi import File, Form, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.participant import ParticipantCreate, ParticipantUpdate, ParticipantResponse, ParticipantListResponse
+from app.database import get_db, get_session_factory
+from app.models.audit import ParticipantDataExport
+from app.core.storage import get_storage
+from app.schemas.participant import (
+    ParticipantCreate,
+    ParticipantUpdate,
+    ParticipantResponse,
+    ParticipantListResponse,
+    ReferralConversionRequest,
+)
 from app.services.participant_service import ParticipantService
+from app.api.v1.endpoints.document import format_document_response
+from app.services.participant_export_service import ParticipantExportService
+from app.services.participant_overview import (
+    ParticipantOverviewService,
+    resolve_participant_fields,
+    resolve_sections,
+)
+from app.services.participant_list_export import (
+    EXPORT_FORMATS,
+    ParticipantListExportService,
+    format_available,
+    resolve_columns,
+)
+from app.services.participant_import_service import ParticipantImportService, RecordImportError, iter_rows
+from app.services.duplicate_detection import REVIEW_STATUSES, DuplicateDetectionService
+from app.core.pagination import TOTAL_MODE_PATTERN
 from typing import List, Optional
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.post("/create-from-referral/{referral_id}", response_model=ParticipantResponse, status_code=status.HTTP_201_CREATED)
 def create_participant_from_referral(
@@ -51,6 +79,28 @@ def create_participant_from_referral(
             detail=f"Failed to create participant: {str(e)}"
         )
 
+@router.post("/create-from-referrals")
+def create_participants_from_referrals(
+    request: ReferralConversionRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Convert a batch of referrals to participants in one transaction
+    """
+    try:
+        results = ParticipantService.convert_referrals(db, request.referral_ids)
+    except Exception as e:
+        logger.error(f"Error converting referrals: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to convert referrals: {str(e)}"
+        )
+    
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"total": len(results), "counts": counts, "results": results}
+
 @router.post("/", response_model=ParticipantResponse, status_code=status.HTTP_201_CREATED)
 def create_participant(
     participant_data: ParticipantCreate,
@@ -91,19 +141,42 @@ def create_participant(
 
 @router.get("/", response_model=List[ParticipantListResponse])
 def get_participants(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     support_category: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    sort_by: str = Query("id", pattern="^(id|created_at|last_name)$"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+    total: str = Query("none", pattern=TOTAL_MODE_PATTERN),
     db: Session = Depends(get_db)
 ):
     """
-    Get participants with filtering and pagination
+    Get participants with filtering and keyset pagination.
+
+    The ``X-Next-Cursor`` response header holds the cursor for the next page.
+    ``total=exact|estimate`` adds an ``X-Total-Count`` header.
     """
-    participants = ParticipantService.get_participants(
-        db, skip=skip, limit=limit, search=search, status=status, support_category=support_category
-    )
+    try:
+        page = ParticipantService.get_participants(
+            db,
+            skip=skip,
+            limit=limit,
+            search=search,
+            status=status,
+            support_category=support_category,
+            cursor=cursor,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            total=total
+        )
+    except ValueError as e:
+        # ``status`` is shadowed by the query parameter here
+        raise HTTPException(status_code=400, detail=str(e))
+    page.apply_headers(response)
+    participants = page.items
     return [
         ParticipantListResponse(
             id=p.id,
@@ -123,11 +196,161 @@ def get_participants(
     ]
 
 @router.get("/stats")
-def get_participant_stats(db: Session = Depends(get_db)):
+def get_participant_stats(
+    refresh: bool = Query(False, description="Bypass the short-lived stats cache"),
+    db: Session = Depends(get_db)
+):
     """
     Get participant statistics for dashboard
     """
-    return ParticipantService.get_participant_stats(db)
+    return ParticipantService.get_participant_stats(db, refresh=refresh)
+
+@router.get("/export")
+def export_participants(
+    format: str = Query("csv", pattern="^(csv|xlsx|parquet)$"),
+    columns: Optional[List[str]] = Query(None, description="Columns to include (repeat or comma separate)"),
+    search: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    support_category: Optional[str] = None,
+    session_factory=Depends(get_session_factory)
+):
+    """
+    Stream every participant matching the listing filters as CSV, XLSX or Parquet
+    """
+    try:
+        selected = resolve_columns(columns)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not format_available(format):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{format} export is not available on this server"
+        )
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        ParticipantListExportService.stream(
+            session_factory,
+            format,
+            selected,
+            search=search,
+            status=status_filter,
+            support_category=support_category,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=\"participants.{extension}\""}
+    )
+
+@router.post("/imports")
+def import_participants(
+    file: UploadFile = File(...),
+    kind: str = Form("participants", pattern="^(participants|referrals)$"),
+    dry_run: bool = Form(False),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk create or update participants (or referrals) from a CSV/XLSX file
+    
+    Rows are upserted on ``ndis_number``.  The response holds the counts
+    and the first failed rows; the full row-level error report can be
+    downloaded from ``report_url``.  For very large files use
+    ``scripts/import_participants.py``.
+    """
+    try:
+        report = ParticipantImportService.run(db, kind, iter_rows(file.file, file.filename or ""), dry_run=dry_run)
+        result = report.to_dict(error_limit=100)
+        result["import_id"] = None
+        result["report_url"] = None
+        if report.errors:
+            import_id = ParticipantImportService.save_report(report)
+            result["import_id"] = import_id
+            result["report_url"] = f"/api/v1/participants/imports/{import_id}/report"
+        return result
+    except RecordImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error importing {kind}: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import {kind}: {str(e)}"
+        )
+
+@router.get("/imports/{import_id}/report")
+def download_import_report(import_id: str):
+    """
+    Download the row-level error report of a bulk import
+    """
+    storage = get_storage()
+    try:
+        key = ParticipantImportService.report_key(import_id)
+    except RecordImportError:
+        key = None
+    if key is None or not storage.exists(key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import report not found"
+        )
+    
+    return StreamingResponse(
+        storage.iter_chunks(key),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=\"import-{import_id}-errors.csv\""}
+    )
+
+@router.get("/duplicates")
+def list_duplicate_candidates(
+    status_filter: str = Query("open", alias="status", pattern="^(open|dismissed|confirmed)$"),
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    record_type: Optional[str] = Query(None, pattern="^(referral|participant)$"),
+    record_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    List likely duplicate referrals/participants for review, best matches first
+    """
+    return DuplicateDetectionService.list_candidates(
+        db,
+        status=status_filter,
+        min_score=min_score,
+        record_type=record_type,
+        record_id=record_id,
+        skip=skip,
+        limit=limit,
+    )
+
+@router.patch("/duplicates/{candidate_id}")
+def review_duplicate_candidate(
+    candidate_id: int,
+    status_value: str = Query(..., alias="status", description=f"One of: {', '.join(REVIEW_STATUSES)}"),
+    reviewed_by: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Confirm or dismiss a duplicate candidate (dismissed pairs are not raised again)
+    """
+    try:
+        candidate = DuplicateDetectionService.review(db, candidate_id, status_value, reviewed_by)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Duplicate candidate not found"
+        )
+    
+    return {"message": "Duplicate candidate updated", "candidate_id": candidate_id, "status": candidate.status}
 
 @router.get("/{participant_id}", response_model=ParticipantResponse)
 def get_participant(
@@ -167,6 +390,43 @@ def get_participant(
         rep_relationship=participant.rep_relationship
     )
 
+@router.get("/{participant_id}/overview")
+def get_participant_overview(
+    participant_id: int,
+    include: Optional[List[str]] = Query(None, description="Sections to return (repeat or comma separate)"),
+    fields: Optional[List[str]] = Query(None, description="Participant columns to return"),
+    document_limit: int = Query(20, ge=0, le=200),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the participant page in one call: participant, referral, latest care plan
+    and risk assessment, workflow, recent documents and document stats
+    """
+    try:
+        sections = resolve_sections(include)
+        participant_fields = resolve_participant_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    overview = ParticipantOverviewService.build(
+        db,
+        participant_id,
+        sections=sections,
+        participant_fields=participant_fields,
+        document_limit=document_limit,
+    )
+    if overview is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Participant not found"
+        )
+    if "documents" in overview:
+        overview["documents"] = [format_document_response(doc, participant_id) for doc in overview["documents"]]
+    return overview
+
 @router.put("/{participant_id}", response_model=ParticipantResponse)
 def update_participant(
     participant_id: int,
@@ -227,16 +487,126 @@ def update_participant_status(
 @router.delete("/{participant_id}")
 def delete_participant(
     participant_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
-    Delete a participant
+    Delete a participant and all of their records; stored files are removed in the background
     """
-    deleted = ParticipantService.delete_participant(db, participant_id)
+    deleted = ParticipantService.delete_participant(db, participant_id, background_tasks)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Participant not found"
         )
     
-    return {"message": "Participant deleted successfully"}
\ No newline at end of file
+    return {"message": "Participant deleted successfully"}
+
+def format_data_export_response(job: ParticipantDataExport) -> dict:
+    return {
+        "id": job.id,
+        "participant_id": job.participant_id,
+        "status": job.status,
+        "size": job.size,
+        "error": job.error,
+        "requested_by": job.requested_by,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "download_url": f"/api/v1/participants/{job.participant_id}/exports/{job.id}/download"
+        if job.status == "completed" else None,
+    }
+
+@router.get("/{participant_id}/export")
+def export_participant_data(
+    participant_id: int,
+    db: Session = Depends(get_db),
+    session_factory=Depends(get_session_factory)
+):
+    """
+    Stream a zip with every record and stored file belonging to the participant
+    """
+    if not ParticipantService.get_participant(db, participant_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Participant not found"
+        )
+    
+    return StreamingResponse(
+        ParticipantExportService.stream(session_factory, participant_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=\"participant-{participant_id}-export.zip\""}
+    )
+
+@router.post("/{participant_id}/exports", status_code=status.HTTP_202_ACCEPTED)
+def create_participant_data_export(
+    participant_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    session_factory=Depends(get_session_factory)
+):
+    """
+    Build the participant's export in the background; poll it and download when completed
+    """
+    if not ParticipantService.get_participant(db, participant_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Participant not found"
+        )
+    
+    job = ParticipantExportService.create_job(db, participant_id, requested_by="System User")  # Replace with actual user from auth
+    background_tasks.add_task(ParticipantExportService.run_job, session_factory, job.id)
+    return format_data_export_response(job)
+
+@router.get("/{participant_id}/exports/{export_id}")
+def get_participant_data_export(
+    participant_id: int,
+    export_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the status of a background participant export
+    """
+    job = db.get(ParticipantDataExport, export_id)
+    if not job or job.participant_id != participant_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    return format_data_export_response(job)
+
+@router.get("/{participant_id}/exports/{export_id}/download")
+def download_participant_data_export(
+    participant_id: int,
+    export_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Download a completed background participant export
+    """
+    job = db.get(ParticipantDataExport, export_id)
+    if not job or job.participant_id != participant_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is {job.status}"
+        )
+    
+    storage = get_storage()
+    if not storage.exists(job.storage_key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export file not found"
+        )
+    
+    return StreamingResponse(
+        storage.iter_chunks(job.storage_key),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename=\"participant-{participant_id}-export-{export_id}.zip\"",
+            "Content-Length": str(job.size or storage.size(job.storage_key)),
+        }
+    )
@@ -1,10 +1,14 @@
 # backend/app/api/v1/endpoints/referral.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.referral import ReferralCreate, ReferralResponse
 from app.services.referral_service import ReferralService
-from typing import List, Dict, Any
+from app.services.referral_ingest_service import ReferralBatchError, ReferralIngestService, parse_batch
+from app.services.referral_triage import TRIAGE_LEASE_SECONDS, TRIAGE_MAX_CLAIM, TRIAGE_QUEUE_STATUS, ReferralTriageService
+from app.core.pagination import TOTAL_MODE_PATTERN
+from typing import List, Dict, Any, Optional
 import logging
 
 router = APIRouter()
@@ -99,16 +103,52 @@ def create_referral(
             detail=f"Failed to create referral: {str(e)}"
         )
 
+@router.post("/referrals/batch")
+async def ingest_referral_batch(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Create referrals in bulk from a JSON array or NDJSON (``application/x-ndjson``).
+
+    Every item needs an ``idempotencyKey``; resending an item returns the
+    referral created the first time. Results are reported per item.
+    """
+    body = await request.body()
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    try:
+        items = parse_batch(body, ndjson=ndjson)
+    except ReferralBatchError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        report = await run_in_threadpool(ReferralIngestService.ingest, db, items)
+    except Exception as e:
+        logger.exception("Error ingesting referral batch")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to ingest referrals: {str(e)}"
+        )
+    return report.to_dict()
+
 @router.get("/referrals", response_model=List[ReferralResponse])
 def get_referrals(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    total: str = Query("none", pattern=TOTAL_MODE_PATTERN),
     db: Session = Depends(get_db)
 ):
     """
-    Get all referrals with pagination
+    Get all referrals with keyset pagination (see the ``X-Next-Cursor`` header)
     """
-    referrals = ReferralService.get_referrals(db, skip=skip, limit=limit)
+    try:
+        page = ReferralService.get_referrals(db, skip=skip, limit=limit, cursor=cursor, total=total)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    page.apply_headers(response)
+    referrals = page.items
     return [
         ReferralResponse(
             id=ref.id,
@@ -122,6 +162,78 @@ def get_referrals(
         for ref in referrals
     ]
 
+@router.get("/referrals/triage")
+def get_triage_queue(
+    status_filter: str = Query(TRIAGE_QUEUE_STATUS, alias="status"),
+    urgency: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+    include_claimed: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Next referrals to triage (most urgent, then oldest) with counts per urgency and status
+    """
+    return ReferralTriageService.queue(
+        db, status=status_filter, urgency=urgency, limit=limit, include_claimed=include_claimed
+    )
+
+@router.post("/referrals/triage/claim")
+def claim_triage_referrals(
+    claimed_by: str = Query(..., min_length=1),
+    count: int = Query(1, ge=1, le=TRIAGE_MAX_CLAIM),
+    lease_seconds: int = Query(TRIAGE_LEASE_SECONDS, ge=30, le=86400),
+    urgency: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Lease the next unclaimed referrals so no one else picks them up
+    """
+    try:
+        claimed = ReferralTriageService.claim(
+            db, claimed_by, count=count, lease_seconds=lease_seconds, urgency=urgency
+        )
+    except Exception as e:
+        logger.exception("Error claiming referrals")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to claim referrals: {str(e)}"
+        )
+    return {"claimed": claimed}
+
+@router.post("/referrals/{referral_id}/claim/renew")
+def renew_referral_claim(
+    referral_id: int,
+    claimed_by: str = Query(..., min_length=1),
+    lease_seconds: int = Query(TRIAGE_LEASE_SECONDS, ge=30, le=86400),
+    db: Session = Depends(get_db)
+):
+    """
+    Extend a triage lease you still hold
+    """
+    referral = ReferralTriageService.renew(db, referral_id, claimed_by, lease_seconds)
+    if not referral:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Referral is not claimed by you"
+        )
+    return referral
+
+@router.delete("/referrals/{referral_id}/claim")
+def release_referral_claim(
+    referral_id: int,
+    claimed_by: str = Query(..., min_length=1),
+    db: Session = Depends(get_db)
+):
+    """
+    Return a claimed referral to the triage queue
+    """
+    if not ReferralTriageService.release(db, referral_id, claimed_by):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Referral is not claimed by you"
+        )
+    return {"message": "Claim released", "referral_id": referral_id}
+
 @router.get("/referrals/{referral_id}", response_model=ReferralResponse)
 def get_referral(
     referral_id: int,
@@ -0,0 +1,144 @@
+"""Short-lived signed download tokens.
+
+A token carries everything needed to serve a stored document (storage key,
+MIME type, codec, sizes, filename) plus the permissions it grants and an
+expiry, signed with HMAC-SHA256.  The handler for signed URLs only verifies
+the signature and streams from storage, so repeated previews never hit the
+database.
+
+Tokens are ``<payload>.<signature>`` where both parts are URL-safe base64
+without padding.  ``DOWNLOAD_TOKEN_SECRET`` must be shared by every API node;
+when it is unset a random per-process secret is used, which only works for a
+single process.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_TOKEN_TTL_SECONDS = int(os.getenv("DOWNLOAD_TOKEN_TTL_SECONDS", "300"))
+
+PERMISSION_PREVIEW = "preview"
+PERMISSION_DOWNLOAD = "download"
+
+_SECRET: Optional[bytes] = None
+
+
+class InvalidDownloadToken(ValueError):
+    """Raised for tokens that are malformed, tampered with or expired."""
+
+
+@dataclass(frozen=True)
+class DownloadGrant:
+    """The claims carried by a signed download token."""
+
+    document_id: int
+    participant_id: int
+    key: str
+    mime_type: str
+    filename: str
+    file_size: int
+    codec: Optional[str] = None
+    stored_size: Optional[int] = None
+    permissions: Tuple[str, ...] = (PERMISSION_PREVIEW, PERMISSION_DOWNLOAD)
+    user_id: int = 1
+    user_role: str = "admin"
+    expires_at: int = 0
+
+    def allows(self, permission: str) -> bool:
+        return permission in self.permissions
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _secret() -> bytes:
+    global _SECRET
+    if _SECRET is None:
+        configured = os.getenv("DOWNLOAD_TOKEN_SECRET")
+        if configured:
+            _SECRET = configured.encode()
+        else:
+            logger.warning("DOWNLOAD_TOKEN_SECRET not set: signed download URLs only work on this process")
+            _SECRET = secrets.token_bytes(32)
+    return _SECRET
+
+
+def _sign(payload: str, secret: bytes) -> str:
+    return _b64encode(hmac.new(secret, payload.encode(), hashlib.sha256).digest())
+
+
+def sign_download(grant: DownloadGrant, ttl: Optional[int] = None, secret: Optional[bytes] = None) -> str:
+    """Return a token for ``grant`` valid for ``ttl`` seconds."""
+
+    expires_at = int(time.time()) + (DOWNLOAD_TOKEN_TTL_SECONDS if ttl is None else ttl)
+    claims = {
+        "d": grant.document_id,
+        "p": grant.participant_id,
+        "k": grant.key,
+        "m": grant.mime_type,
+        "n": grant.filename,
+        "s": grant.file_size,
+        "c": grant.codec,
+        "z": grant.stored_size,
+        "a": list(grant.permissions),
+        "u": grant.user_id,
+        "r": grant.user_role,
+        "e": expires_at,
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload, secret or _secret())}"
+
+
+def verify_download(token: str, secret: Optional[bytes] = None, now: Optional[float] = None) -> DownloadGrant:
+    """Return the grant carried by ``token``.
+
+    Raises ``InvalidDownloadToken`` if the signature does not match or the
+    token has expired.
+    """
+
+    payload, _, signature = token.partition(".")
+    if not payload or not signature:
+        raise InvalidDownloadToken("Malformed download token")
+    if not hmac.compare_digest(signature, _sign(payload, secret or _secret())):
+        raise InvalidDownloadToken("Invalid download token signature")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+        grant = DownloadGrant(
+            document_id=int(claims["d"]),
+            participant_id=int(claims["p"]),
+            key=claims["k"],
+            mime_type=claims["m"],
+            filename=claims["n"],
+            file_size=int(claims["s"]),
+            codec=claims.get("c"),
+            stored_size=claims.get("z"),
+            permissions=tuple(claims.get("a", ())),
+            user_id=int(claims.get("u", 1)),
+            user_role=claims.get("r", "admin"),
+            expires_at=int(claims["e"]),
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidDownloadToken("Malformed download token") from e
+
+    if grant.expires_at < (time.time() if now is None else now):
+        raise InvalidDownloadToken("Download token has expired")
+    return grant
@@ -0,0 +1,203 @@
+"""Keyset (cursor) pagination shared by the list endpoints.
+
+Offset paging makes the database walk and discard every row before the
+requested page, so deep pages get slower and walking a full table degrades
+quadratically.  Keyset paging instead remembers the sort key and id of the
+last row returned and asks for rows strictly after it, which an index on
+``(sort_key, id)`` answers directly no matter how deep the page is.
+
+Cursors are opaque to clients: a URL-safe base64 blob holding the sort field
+name, the last sort value and the last id.
+
+SQLite keeps datetimes as text in whatever form they were written:
+``server_default=func.now()`` stores ``YYYY-MM-DD HH:MM:SS`` while SQLAlchemy
+binds ``YYYY-MM-DD HH:MM:SS.ffffff``, so a bound datetime never equals a
+stored one and rows sharing a timestamp fall on the wrong side of the cursor.
+There the cursor carries the raw stored text instead and is compared as text,
+which is exactly the order ``ORDER BY`` uses (``keyset_value``/``keyset_bound``).
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+from fastapi import Response
+from sqlalchemy import DateTime, String, literal, tuple_, type_coerce
+from sqlalchemy.orm import Query
+
+T = TypeVar("T")
+
+TOTAL_MODES = ("none", "exact", "estimate")
+TOTAL_MODE_PATTERN = "^(none|exact|estimate)$"
+
+
+@dataclass(slots=True)
+class KeysetPage(Generic[T]):
+    """A page of results plus the cursor for the next page."""
+
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+    def apply_headers(self, response: Response) -> None:
+        """Expose pagination metadata as headers so list bodies stay unchanged."""
+
+        if self.next_cursor:
+            response.headers["X-Next-Cursor"] = self.next_cursor
+        if self.total is not None:
+            response.headers["X-Total-Count"] = str(self.total)
+            response.headers["X-Total-Count-Estimated"] = "true" if self.total_is_estimate else "false"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def encode_cursor(sort_key: str, value: Any, last_id: int) -> str:
+    """Return an opaque cursor pointing just after ``(value, last_id)``."""
+
+    payload = json.dumps({"k": sort_key, "v": _encode_value(value), "id": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> Tuple[Any, int]:
+    """Decode ``cursor`` and return ``(value, last_id)``.
+
+    Raises ``ValueError`` for malformed cursors or cursors produced for a
+    different sort order.
+    """
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if not isinstance(payload, dict) or payload.get("k") != sort_key or not isinstance(payload.get("id"), int):
+        raise ValueError("Cursor does not match the requested sort order")
+
+    return _decode_value(payload.get("v")), payload["id"]
+
+
+def _compares_as_text(column, dialect_name: str) -> bool:
+    return dialect_name == "sqlite" and isinstance(column.type, DateTime)
+
+
+def keyset_value(column, dialect_name: str):
+    """``column`` as selected for a cursor: raw stored text where it is compared as text."""
+
+    if _compares_as_text(column, dialect_name):
+        return type_coerce(column, String)
+    return column
+
+
+def keyset_bound(value: Any, column, dialect_name: str):
+    """Bind a cursor value so it compares against ``column`` the way ``ORDER BY`` sorts it."""
+
+    if _compares_as_text(column, dialect_name) and isinstance(value, str):
+        return literal(value, type_=String)
+    return literal(value, type_=column.type)
+
+
+def estimate_count(query: Query) -> Tuple[int, bool]:
+    """Return ``(count, is_estimate)`` for ``query``.
+
+    On PostgreSQL the planner's row estimate is used, which costs a single
+    ``EXPLAIN`` instead of a full scan.  Other databases fall back to an
+    exact ``COUNT``.
+    """
+
+    session = query.session
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return query.order_by(None).count(), False
+
+    compiled = query.order_by(None).statement.compile(dialect=bind.dialect)
+    plan = session.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"]), True
+
+
+def paginate(
+    query: Query,
+    *,
+    sort_key: str,
+    sort_column,
+    id_column,
+    descending: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    offset: Optional[int] = None,
+    total: str = "none",
+) -> KeysetPage:
+    """Return one page of ``query`` ordered by ``(sort_column, id_column)``.
+
+    ``cursor`` continues from a previous page.  ``offset`` is only honoured
+    when no cursor is supplied and exists for legacy ``skip``/``page``
+    callers; the returned ``next_cursor`` lets them switch to keyset paging.
+    ``total`` selects whether a total is computed: ``none`` (default),
+    ``exact`` or ``estimate``.
+    """
+
+    if total not in TOTAL_MODES:
+        raise ValueError(f"total must be one of {', '.join(TOTAL_MODES)}")
+
+    base_query = query
+    dialect_name = query.session.get_bind().dialect.name
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_key)
+        key = tuple_(sort_column, id_column)
+        bound = tuple_(keyset_bound(value, sort_column, dialect_name), literal(last_id, type_=id_column.type))
+        query = query.filter(key < bound if descending else key > bound)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    query = query.add_columns(
+        keyset_value(sort_column, dialect_name).label("_keyset_sort"), id_column.label("_keyset_id")
+    )
+    if offset and not cursor:
+        query = query.offset(offset)
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_key, last._keyset_sort, last._keyset_id)
+
+    page = KeysetPage(items=[row[0] for row in rows], next_cursor=next_cursor)
+
+    if total == "exact":
+        page.total = base_query.order_by(None).count()
+    elif total == "estimate":
+        page.total, page.total_is_estimate = estimate_count(base_query)
+
+    return page
@@ -0,0 +1,350 @@
+"""Pluggable storage for uploaded files.
+
+Every stored file is addressed by a *key*: the same backend-relative path the
+database already records (``uploads/documents/12/12_ab34.pdf``,
+``uploads/7/resume.pdf``).  Two backends implement the interface:
+
+* ``LocalStorageBackend`` keeps files under the backend directory, exactly
+  where they lived before, so existing rows need no changes.
+* ``S3StorageBackend`` stores objects in an S3-compatible bucket (AWS S3,
+  MinIO, ...).  One boto3 client with a pooled HTTP connection manager is
+  shared by the process, large uploads are sent as multipart uploads, and
+  reads stream the response body instead of buffering it.
+
+``get_storage()`` returns the backend selected by ``STORAGE_BACKEND``
+(``local`` by default, or ``s3``).  With S3 every API node is stateless and
+can sit behind a load balancer.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+
+    BOTO3_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    BOTO3_AVAILABLE = False
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    modified: Optional[datetime] = None
+
+
+class StorageBackend(ABC):
+    """Interface shared by all storage backends."""
+
+    name = "abstract"
+
+    @abstractmethod
+    def save(self, key: str, source: BinaryIO, content_type: Optional[str] = None) -> int:
+        """Store everything readable from ``source`` under ``key``; returns bytes written."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Return a readable stream of the object (caller closes it)."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key``; missing objects are ignored."""
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        """Yield objects whose key starts with ``prefix``."""
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path for ``key`` when the backend is local, else ``None``."""
+
+        return None
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open(key) as stream:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files on the local disk, keyed relative to ``root`` (the backend dir)."""
+
+    name = "local"
+
+    def __init__(self, root: Path = BASE_DIR):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        path = Path(key)
+        # Older rows stored absolute paths; keep honouring them.
+        return path if path.is_absolute() else self.root / key
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
+
+    def save(self, key: str, source: BinaryIO, content_type: Optional[str] = None) -> int:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = 0
+        with open(path, "wb") as out:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                out.write(chunk)
+                size += len(chunk)
+        return size
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def size(self, key: str) -> int:
+        return self._path(key).stat().st_size
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        base = self._path(prefix) if prefix else self.root
+        directory = base if base.is_dir() else base.parent
+        if not directory.is_dir():
+            return
+        for dirpath, _dirs, files in os.walk(directory):
+            for name in files:
+                path = Path(dirpath) / name
+                try:
+                    key = str(path.relative_to(self.root))
+                except ValueError:
+                    key = str(path)
+                if not key.startswith(prefix):
+                    continue
+                stat = path.stat()
+                yield StoredObject(
+                    key=key,
+                    size=stat.st_size,
+                    modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+                )
+
+
+class S3StorageBackend(StorageBackend):
+    """Objects in an S3-compatible bucket."""
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        prefix: str = "",
+        max_pool_connections: int = 50,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunksize: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        client=None,
+    ):
+        if not BOTO3_AVAILABLE and client is None:
+            raise RuntimeError("boto3 is required for the S3 storage backend")
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        # A single client is thread-safe and keeps a pool of keep-alive
+        # connections, so requests do not pay a TLS handshake each time.
+        self.client = client or boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region_name,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            config=BotoConfig(
+                max_pool_connections=max_pool_connections,
+                retries={"max_attempts": 5, "mode": "standard"},
+                s3={"addressing_style": "path"} if endpoint_url else None,
+            ),
+        )
+        # upload_fileobj switches to a multipart upload above the threshold.
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency,
+        )
+
+    @classmethod
+    def from_env(cls) -> "S3StorageBackend":
+        bucket = os.getenv("S3_BUCKET")
+        if not bucket:
+            raise RuntimeError("S3_BUCKET must be set when STORAGE_BACKEND=s3")
+        mb = 1024 * 1024
+        return cls(
+            bucket=bucket,
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            region_name=os.getenv("S3_REGION") or None,
+            access_key_id=os.getenv("S3_ACCESS_KEY_ID") or None,
+            secret_access_key=os.getenv("S3_SECRET_ACCESS_KEY") or None,
+            prefix=os.getenv("S3_PREFIX", ""),
+            max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50")),
+            multipart_threshold=int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8")) * mb,
+            multipart_chunksize=int(os.getenv("S3_MULTIPART_CHUNK_MB", "8")) * mb,
+        )
+
+    def _key(self, key: str) -> str:
+        key = key.lstrip("/")
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _unprefix(self, key: str) -> str:
+        return key[len(self.prefix) + 1:] if self.prefix else key
+
+    def save(self, key: str, source: BinaryIO, content_type: Optional[str] = None) -> int:
+        counter = CountingReader(source)
+        extra_args = {"ContentType": content_type} if content_type else None
+        self.client.upload_fileobj(
+            counter, self.bucket, self._key(key), ExtraArgs=extra_args, Config=self.transfer_config
+        )
+        return counter.count
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise FileNotFoundError(key) from e
+            raise
+        return response["Body"]
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound"):
+                return False
+            raise
+
+    def size(self, key: str) -> int:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))["ContentLength"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound"):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            for item in page.get("Contents", []):
+                yield StoredObject(
+                    key=self._unprefix(item["Key"]),
+                    size=item["Size"],
+                    modified=item.get("LastModified"),
+                )
+
+
+class CountingReader:
+    """File-like wrapper that counts the bytes read through it."""
+
+    def __init__(self, source: BinaryIO):
+        self.source = source
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        self.count += len(data)
+        return data
+
+
+def storage_key(path: Path, root: Path = BASE_DIR) -> str:
+    """Key for a path under ``root`` (absolute paths outside it are kept as-is)."""
+
+    try:
+        return str(Path(path).relative_to(root))
+    except ValueError:
+        return str(path)
+
+
+@dataclass
+class CopyReport:
+    copied: int = 0
+    skipped: int = 0
+    missing: int = 0
+    copied_bytes: int = 0
+
+
+def copy_objects(
+    source: StorageBackend,
+    target: StorageBackend,
+    keys: Iterable[str],
+    workers: int = 8,
+    dry_run: bool = False,
+) -> CopyReport:
+    """Copy ``keys`` from ``source`` to ``target`` in parallel.
+
+    Objects already present in the target with the same size are skipped, so
+    an interrupted migration can simply be run again.
+    """
+
+    def copy(key: str):
+        if not source.exists(key):
+            return "missing", 0
+        size = source.size(key)
+        if target.exists(key) and target.size(key) == size:
+            return "skipped", 0
+        if not dry_run:
+            with source.open(key) as stream:
+                target.save(key, stream)
+        return "copied", size
+
+    report = CopyReport()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for outcome, size in pool.map(copy, keys):
+            setattr(report, outcome, getattr(report, outcome) + 1)
+            report.copied_bytes += size
+    return report
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    """Return the process-wide storage backend configured by ``STORAGE_BACKEND``."""
+
+    backend = os.getenv("STORAGE_BACKEND", "local").lower()
+    if backend == "s3":
+        logger.info("Using S3 storage backend")
+        return S3StorageBackend.from_env()
+    if backend != "local":
+        raise RuntimeError(f"Unknown STORAGE_BACKEND: {backend}")
+    return LocalStorageBackend(Path(os.getenv("STORAGE_LOCAL_ROOT", str(BASE_DIR))))
@@ -0,0 +1,43 @@
+"""Helpers for building archives on the fly.
+
+``ZipStream`` is the sink ``zipfile.ZipFile`` writes into when an export is
+streamed: it is write-only and non-seekable, so ``zipfile`` falls back to data
+descriptors, and whatever has been written so far is handed back by
+``drain`` and can be yielded to the client straight away.
+"""
+from __future__ import annotations
+
+import io
+from typing import List
+
+
+class ZipStream(io.RawIOBase):
+    """Write-only, non-seekable sink that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def safe_name(value: str) -> str:
+    """``value`` with anything but letters, digits, ``._-`` and spaces replaced, for archive paths."""
+
+    cleaned = "".join(ch if ch.isalnum() or ch in "._- " else "_" for ch in value or "")
+    return cleaned.strip() or "document"
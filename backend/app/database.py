@@ -55,4 +55,13 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_session_factory():
+    """Dependency for streaming responses that open their own sessions.
+
+    A ``get_db`` session is closed before a streamed body finishes, so
+    generators that query while streaming take the factory instead.
+    """
+    return SessionLocal
@@ -2,22 +2,25 @@
 # Imports
 # =========================
 from pathlib import Path
+import mimetypes
+import os
 import secrets, hashlib
 
 from fastapi import FastAPI, Request, Depends, Form
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, StreamingResponse
 from fastapi import HTTPException
 from starlette.middleware.sessions import SessionMiddleware
 from sqlalchemy.orm import Session
 from pydantic import EmailStr
 
 from app import models
-from app.database import Base, engine, get_db
+from app.database import Base, engine, get_db, SessionLocal
 from app.routers import candidates as candidates_router
 from app.routers import portal as portal_router
 from app.routers import auth as auth_router
 from app.routers import api as api_router
+from app.core.storage import LocalStorageBackend, get_storage
 from app.core.templates import get_templates
 from app.core.frontend import (
     FRONTEND_INDEX_FILE,
@@ -25,6 +28,8 @@ from app.core.frontend import (
 )
 from app.services import admin as admin_service
 from app.api.v1.api import api_router as ndis_api_router
+from app.services.notification_service import NotificationWorker
+from app.services.access_log_buffer import get_access_log_buffer
 
 
 # =========================
@@ -40,7 +45,21 @@ templates = get_templates()
 app.add_middleware(SessionMiddleware, secret_key="super-secret-key")
 
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
-app.mount("/uploads", StaticFiles(directory=str(BASE_DIR / "uploads")), name="uploads")
+
+# Uploads are served straight from disk with the local backend; any other
+# backend streams them through the app.
+storage = get_storage()
+if isinstance(storage, LocalStorageBackend):
+    (storage.root / "uploads").mkdir(parents=True, exist_ok=True)
+    app.mount("/uploads", StaticFiles(directory=str(storage.root / "uploads")), name="uploads")
+else:
+    @app.get("/uploads/{key:path}")
+    def serve_upload(key: str):
+        key = f"uploads/{key}"
+        if ".." in key.split("/") or not storage.exists(key):
+            raise HTTPException(status_code=404, detail="File not found")
+        media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        return StreamingResponse(storage.iter_chunks(key), media_type=media_type)
 
 # Status buckets used by Applicants/Workers views (shared with the API layer)
 WORKER_STATUSES = admin_service.WORKER_STATUSES
@@ -348,3 +367,34 @@ app.include_router(auth_router.router)
 app.include_router(portal_router.router)
 app.include_router(api_router.router)
 app.include_router(ndis_api_router, prefix="/api/v1")
+
+
+# =========================
+# Background Workers
+# =========================
+# Expiry notifications are processed in-process only when explicitly enabled;
+# deployments with several app workers should run
+# ``scripts/process_notifications.py --loop`` once instead.
+notification_worker = NotificationWorker(SessionLocal)
+
+
+@app.on_event("startup")
+def start_notification_worker():
+    if os.getenv("NOTIFICATION_WORKER_ENABLED", "false").lower() in ("1", "true", "yes"):
+        notification_worker.start()
+
+
+@app.on_event("shutdown")
+def stop_notification_worker():
+    notification_worker.stop(timeout=5)
+
+
+# Access events from signed document downloads are buffered and bulk inserted.
+@app.on_event("startup")
+def start_access_log_buffer():
+    get_access_log_buffer().start()
+
+
+@app.on_event("shutdown")
+def flush_access_log_buffer():
+    get_access_log_buffer().stop(timeout=5)
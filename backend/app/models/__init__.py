@@ -95,7 +95,7 @@ def _reexport_models(module: str, names: Iterable[str]) -> None:
 
 # Import the richer NDIS domain models so Alembic/Base can discover them while
 # gracefully handling optional models that are not part of this codebase yet.
-_reexport_models("participant", ("Participant",))
+_reexport_models("participant", ("Participant", "ParticipantStatusCount"))
 _reexport_models("referral", ("Referral",))
 _reexport_models(
     "care_plan",
@@ -117,8 +117,20 @@ _reexport_models(
         "DocumentAccess",
         "DocumentCategory",
         "DocumentNotification",
+        "DocumentTag",
     ),
 )
+_reexport_models(
+    "audit",
+    (
+        "AuditPartition",
+        "AuditPackExport",
+        "ParticipantDataExport",
+        "DocumentAccessDailyRollup",
+        "DocumentAccessUserDailyRollup",
+    ),
+)
+_reexport_models("duplicate", ("DuplicateBlockingKey", "DuplicateCandidate"))
 _reexport_models(
     "document_generation",
     (
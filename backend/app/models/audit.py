@@ -0,0 +1,127 @@
+# backend/app/models/audit.py
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Date, DateTime, ForeignKey, Index, JSON, Boolean
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class AuditPartition(Base):
+    """Registry of the monthly ``document_access`` partitions.
+
+    On PostgreSQL each row mirrors a native partition of ``document_access``.
+    On SQLite (and other engines without declarative partitioning) it tracks
+    the rotating ``document_access_YYYY_MM`` tables that closed months are
+    moved into.  Archived partitions keep their row so compliance staff can
+    find the compressed export that holds the history.
+    """
+    __tablename__ = "audit_partitions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(100), nullable=False, unique=True)
+    period_start = Column(DateTime, nullable=False)
+    period_end = Column(DateTime, nullable=False)
+
+    status = Column(String(50), default="active", nullable=False)  # active, archived
+    row_count = Column(Integer, default=0)
+    archive_path = Column(String(500))
+    archived_at = Column(DateTime(timezone=True))
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index('ix_audit_partitions_period', 'period_start', 'period_end'),
+        Index('ix_audit_partitions_status', 'status'),
+    )
+
+
+class DocumentAccessDailyRollup(Base):
+    """Per-document access counts for a single day."""
+    __tablename__ = "document_access_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    document_id = Column(Integer, nullable=False)
+    participant_id = Column(Integer, nullable=True)  # NULL once the document is gone
+    access_type = Column(String(50), nullable=False)
+    access_count = Column(Integer, default=0, nullable=False)
+    unique_users = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index('ux_document_access_daily_doc', 'day', 'document_id', 'access_type', unique=True),
+        Index('ix_document_access_daily_participant', 'participant_id', 'day'),
+    )
+
+
+class DocumentAccessUserDailyRollup(Base):
+    """Per-user access counts for a single day."""
+    __tablename__ = "document_access_user_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    user_role = Column(String(50))
+    access_type = Column(String(50), nullable=False)
+    access_count = Column(Integer, default=0, nullable=False)
+    distinct_documents = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index('ux_document_access_daily_user', 'day', 'user_id', 'access_type', unique=True),
+    )
+
+
+class AuditPackExport(Base):
+    """An audit pack export and how far its download has progressed.
+
+    The pack holds every document in ``categories`` for ``participant_ids``
+    (all participants when empty), ordered by ``(participant_id, document_id)``.
+    ``last_participant_id``/``last_document_id`` record the checkpoint a
+    resumed download continues after; each resumed download is a new ``part``.
+    """
+    __tablename__ = "audit_pack_exports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    participant_ids = Column(JSON, default=list)
+    categories = Column(JSON, default=list)
+    current_only = Column(Boolean, default=True, nullable=False)
+
+    status = Column(String(50), default="pending", nullable=False)  # pending, running, interrupted, completed
+    document_count = Column(Integer, default=0, nullable=False)
+    documents_written = Column(Integer, default=0, nullable=False)
+    bytes_written = Column(BigInteger, default=0, nullable=False)
+    part = Column(Integer, default=0, nullable=False)
+    last_participant_id = Column(Integer, nullable=True)
+    last_document_id = Column(Integer, nullable=True)
+
+    requested_by = Column(String(255))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index('ix_audit_pack_exports_status', 'status'),
+    )
+
+
+class ParticipantDataExport(Base):
+    """A background data portability export for one participant.
+
+    The finished zip is written to storage under ``storage_key`` so it can be
+    downloaded later without rebuilding it.
+    """
+    __tablename__ = "participant_data_exports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    participant_id = Column(Integer, ForeignKey("participants.id"), nullable=False)
+
+    status = Column(String(50), default="pending", nullable=False)  # pending, running, completed, failed
+    storage_key = Column(String(500))
+    size = Column(BigInteger)
+    error = Column(Text)
+
+    requested_by = Column(String(255))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index('ix_participant_data_exports_participant', 'participant_id', 'created_at'),
+    )
@@ -1,5 +1,5 @@
 # backend/app/models/care_plan.py - FIXED VERSION
-from sqlalchemy import Column, Integer, String, Text, Date, Boolean, DateTime, ForeignKey, DECIMAL, JSON
+from sqlalchemy import Column, Integer, String, Text, Date, Boolean, DateTime, ForeignKey, DECIMAL, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -50,6 +50,11 @@ class CarePlan(Base):
     # FIXED: Relationships with proper back_populates
     participant = relationship("Participant", back_populates="care_plans")
 
+    # Latest care plan per participant (workflow board and workflow sync)
+    __table_args__ = (
+        Index('ix_care_plans_participant_created', 'participant_id', 'created_at'),
+    )
+
 class RiskAssessment(Base):
     __tablename__ = "risk_assessments"
 
@@ -92,6 +97,11 @@ class RiskAssessment(Base):
     # FIXED: Relationships with proper back_populates
     participant = relationship("Participant", back_populates="risk_assessments")
 
+    # Latest risk assessment per participant (workflow board and workflow sync)
+    __table_args__ = (
+        Index('ix_risk_assessments_participant_created', 'participant_id', 'created_at'),
+    )
+
 class ProspectiveWorkflow(Base):
     __tablename__ = "prospective_workflows"
 
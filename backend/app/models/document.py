@@ -17,6 +17,9 @@ class Document(Base):
     file_path = Column(String(500), nullable=False)  # Storage path
     file_size = Column(Integer, nullable=False)  # Size in bytes
     mime_type = Column(String(100), nullable=False)
+    storage_codec = Column(String(20), nullable=True)  # None = stored raw, "zstd"
+    stored_size = Column(Integer, nullable=True)  # Bytes on disk when compressed
+    sha256 = Column(String(64), nullable=True)  # Hex digest of the original bytes
     
     # Document categorization
     category = Column(String(100), nullable=False, index=True)
@@ -59,6 +62,34 @@ class Document(Base):
         Index('ix_documents_participant_category', 'participant_id', 'category'),
         Index('ix_documents_status_expiry', 'status', 'expiry_date'),
         Index('ix_documents_created_at', 'created_at'),
+        Index('ix_documents_participant_created', 'participant_id', 'created_at', 'id'),
+        # Current versions only: serves the default document listing
+        Index(
+            'ix_documents_participant_current',
+            'participant_id', 'created_at', 'id',
+            postgresql_where=is_current_version == True,  # noqa: E712
+            sqlite_where=is_current_version == True,  # noqa: E712
+        ),
+        Index('ix_documents_parent_document_id', 'parent_document_id'),
+        # Duplicate upload detection
+        Index('ix_documents_participant_sha256', 'participant_id', 'sha256'),
+    )
+
+class DocumentTag(Base):
+    """One row per (document, tag), kept in sync with ``Document.tags``.
+    
+    Tags are stored normalised (trimmed, lower-case) so filters and facet
+    counts use an index instead of parsing the JSON column of every row.
+    """
+    __tablename__ = "document_tags"
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    tag = Column(String(100), primary_key=True)
+    participant_id = Column(Integer, ForeignKey("participants.id"), nullable=False)
+    
+    __table_args__ = (
+        Index('ix_document_tags_participant_tag', 'participant_id', 'tag', 'document_id'),
+        Index('ix_document_tags_tag', 'tag'),
     )
 
 class DocumentAccess(Base):
@@ -80,6 +111,9 @@ class DocumentAccess(Base):
     __table_args__ = (
         Index('ix_document_access_document_user', 'document_id', 'user_id'),
         Index('ix_document_access_accessed_at', 'accessed_at'),
+        Index('ix_document_access_document_accessed', 'document_id', 'accessed_at'),
+        # Never reuse ids once rows are rotated into monthly partitions
+        {'sqlite_autoincrement': True},
     )
 
 # REMOVED DocumentTemplate CLASS - IT CONFLICTS WITH DOCUMENT GENERATION
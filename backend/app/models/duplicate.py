@@ -0,0 +1,51 @@
+# backend/app/models/duplicate.py
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class DuplicateBlockingKey(Base):
+    """Blocking keys of each referral and participant.
+
+    Records are only compared with records that share at least one key, so
+    finding duplicates of a new record is an index lookup rather than a scan.
+    """
+    __tablename__ = "duplicate_blocking_keys"
+
+    record_type = Column(String(20), primary_key=True)  # referral, participant
+    record_id = Column(Integer, primary_key=True)
+    block_key = Column(String(150), primary_key=True)
+
+    __table_args__ = (
+        Index('ix_duplicate_blocking_keys_block', 'block_key'),
+    )
+
+
+class DuplicateCandidate(Base):
+    """A pair of records that probably describe the same person.
+
+    Pairs are stored in canonical order (``left`` sorts before ``right``) so
+    each pair has one row whichever record was checked first.
+    """
+    __tablename__ = "duplicate_candidates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    left_type = Column(String(20), nullable=False)
+    left_id = Column(Integer, nullable=False)
+    right_type = Column(String(20), nullable=False)
+    right_id = Column(Integer, nullable=False)
+
+    score = Column(Float, nullable=False)
+    field_scores = Column(JSON, default=dict)  # Similarity per compared field
+    status = Column(String(20), default="open", nullable=False)  # open, dismissed, confirmed
+    reviewed_by = Column(String(255))
+    reviewed_at = Column(DateTime(timezone=True))
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index('ux_duplicate_candidates_pair', 'left_type', 'left_id', 'right_type', 'right_id', unique=True),
+        Index('ix_duplicate_candidates_status_score', 'status', 'score'),
+        Index('ix_duplicate_candidates_right', 'right_type', 'right_id'),
+    )
@@ -1,5 +1,5 @@
 # backend/app/models/participant.py
-from sqlalchemy import Column, Integer, String, Text, Date, Boolean, DateTime, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, String, Text, Date, Boolean, DateTime, ForeignKey, DECIMAL, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -72,6 +72,23 @@ class Participant(Base):
     risk_assessments = relationship("RiskAssessment", back_populates="participant")
     prospective_workflow = relationship("ProspectiveWorkflow", back_populates="participant", uselist=False)
     documents = relationship("Document", back_populates="participant", cascade="all, delete-orphan")
+    
+    # Indexes backing the keyset-paginated listings
+    __table_args__ = (
+        Index('ix_participants_created_at_id', 'created_at', 'id'),
+        Index('ix_participants_last_name_id', 'last_name', 'id'),
+        Index('ix_participants_status', 'status'),
+    )
+
+class ParticipantStatusCount(Base):
+    """Participants per status, kept current by every participant write.
+
+    Backs the dashboard counters when ``PARTICIPANT_STATS_SOURCE=counters``.
+    """
+    __tablename__ = "participant_status_counts"
+
+    status = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
 # Add relationship to Referral model
 from app.models.referral import Referral
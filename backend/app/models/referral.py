@@ -1,9 +1,27 @@
 # backend/app/models/referral.py - FIXED VERSION
-from sqlalchemy import Column, Integer, String, Text, Date, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, Date, Boolean, DateTime, Index, case, literal_column
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+# Triage order of the free-text urgency level; anything else sorts last.
+URGENCY_RANKS = {"urgent": 0, "high": 1, "medium": 2, "low": 3}
+UNRANKED_URGENCY = len(URGENCY_RANKS)
+
+
+def urgency_rank(urgency_level):
+    """SQL expression ranking ``urgency_level`` (0 = most urgent).
+    
+    The constants are rendered inline rather than bound, so queries ordering
+    by it match the expression in ``ix_referrals_triage`` exactly.
+    """
+    return case(
+        {literal_column(f"'{level}'"): literal_column(str(rank)) for level, rank in URGENCY_RANKS.items()},
+        value=func.lower(urgency_level),
+        else_=literal_column(str(UNRANKED_URGENCY)),
+    )
+
+
 class Referral(Base):
     __tablename__ = "referrals"
 
@@ -70,5 +88,19 @@ class Referral(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Triage lease: who is working on the referral and until when
+    claimed_by = Column(String(255), nullable=True)
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Batch ingestion: partner-supplied key and a hash of the accepted payload
+    idempotency_key = Column(String(255), nullable=True)
+    ingest_fingerprint = Column(String(64), nullable=True)
+    
     # FIXED: Relationship with proper back_populates
-    participant = relationship("Participant", back_populates="referral", uselist=False)
\ No newline at end of file
+    participant = relationship("Participant", back_populates="referral", uselist=False)
+    
+    __table_args__ = (
+        Index('ix_referrals_idempotency_key', 'idempotency_key', unique=True),
+        # Triage queue: per status, most urgent then oldest first
+        Index('ix_referrals_triage', status, urgency_rank(urgency_level), created_at, id),
+    )
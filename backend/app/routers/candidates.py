@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from starlette.datastructures import UploadFile
 
+from app.core.storage import get_storage
 from app.database import get_db
 from app import models
 
@@ -27,11 +28,6 @@ class CandidateCreate(BaseModel):
 
 
 # --- JSON API used by the intake form ---
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-UPLOAD_DIR = BASE_DIR / "uploads"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-
 @router.post("/api/v1/hr/recruitment/candidates/", response_class=JSONResponse)
 async def api_create_candidate(
     request: Request,
@@ -116,20 +112,15 @@ async def api_create_candidate(
             {"detail": "Email already exists for a candidate."}, status_code=409
         )
 
-    saved_file_path: Path | None = None
+    saved_file_path: str | None = None
     resume_uploaded = False
     try:
         if resume_file and resume_file.filename:
             ext = Path(resume_file.filename).suffix or ".pdf"
-            folder = UPLOAD_DIR / str(cand.id)
-            folder.mkdir(parents=True, exist_ok=True)
-            dest = folder / f"resume{ext}"
-            saved_file_path = dest
-            contents = await resume_file.read()
-            with open(dest, "wb") as f:
-                f.write(contents)
-
-            relative_path = str(dest.relative_to(BASE_DIR))
+            relative_path = f"uploads/{cand.id}/resume{ext}"
+            get_storage().save(relative_path, resume_file.file, content_type=resume_file.content_type)
+            saved_file_path = relative_path
+
             profile = (
                 db.query(models.CandidateProfile)
                 .filter(models.CandidateProfile.candidate_id == cand.id)
@@ -145,8 +136,8 @@ async def api_create_candidate(
         db.refresh(cand)
     except Exception:
         db.rollback()
-        if saved_file_path and saved_file_path.exists():
-            saved_file_path.unlink(missing_ok=True)
+        if saved_file_path:
+            get_storage().delete(saved_file_path)
         raise
     finally:
         if resume_file:
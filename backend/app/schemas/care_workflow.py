@@ -111,7 +111,7 @@ class RiskAssessmentResponse(RiskAssessmentBase):
 
 # Prospective Workflow Schemas
 class ProspectiveWorkflowResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # None until a care plan or risk assessment is saved
     participant_id: int
     care_plan_completed: bool
     risk_assessment_completed: bool
@@ -1,7 +1,7 @@
 # backend/app/schemas/participant.py - FIXED VERSION
 from pydantic import BaseModel, validator
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 class ParticipantBase(BaseModel):
     first_name: str
@@ -172,4 +172,15 @@ class ParticipantListResponse(BaseModel):
     created_at: str
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ReferralConversionRequest(BaseModel):
+    referral_ids: List[int]
+    
+    @validator('referral_ids')
+    def referral_ids_within_limit(cls, v):
+        if not v:
+            raise ValueError('Select at least one referral')
+        if len(v) > 1000:
+            raise ValueError('At most 1000 referrals can be converted at once')
+        return v
@@ -0,0 +1,177 @@
+"""Batched writes for document access audit events.
+
+Signed download requests do not open a database session, so their audit
+events are queued in memory and written by a background thread with one
+multi-row ``INSERT`` per batch.  Requests only ever queue and wake the
+writer; they never write themselves.  The queue is capped at ``max_pending``:
+if the database is unreachable or the writer falls that far behind, the
+oldest events are dropped (and counted in ``dropped``, with an error logged)
+so memory stays bounded and downloads are never held up.
+
+Events for documents deleted before the flush are discarded rather than
+failing the whole batch.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal
+from app.models.document import Document, DocumentAccess
+
+logger = logging.getLogger(__name__)
+
+ACCESS_LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("ACCESS_LOG_FLUSH_INTERVAL_SECONDS", "2"))
+ACCESS_LOG_BATCH_SIZE = int(os.getenv("ACCESS_LOG_BATCH_SIZE", "500"))
+ACCESS_LOG_MAX_PENDING = int(os.getenv("ACCESS_LOG_MAX_PENDING", "10000"))
+
+
+class AccessLogBuffer:
+    """Thread-safe queue of ``document_access`` rows flushed in batches."""
+
+    def __init__(
+        self,
+        session_factory,
+        interval: float = ACCESS_LOG_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = ACCESS_LOG_BATCH_SIZE,
+        max_pending: int = ACCESS_LOG_MAX_PENDING,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(
+        self,
+        document_id: int,
+        user_id: int,
+        user_role: str,
+        access_type: str,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> None:
+        """Queue one access event; never touches the database."""
+
+        row = {
+            "document_id": document_id,
+            "user_id": user_id,
+            "user_role": user_role,
+            "access_type": access_type,
+            "accessed_at": datetime.now(timezone.utc),
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+        }
+        with self._lock:
+            self._pending.append(row)
+            dropped = self._trim()
+            pending = len(self._pending)
+
+        self._log_dropped(dropped)
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _trim(self) -> int:
+        """Drop the oldest events beyond ``max_pending``; call with ``_lock`` held."""
+
+        excess = len(self._pending) - self.max_pending
+        if excess <= 0:
+            return 0
+        del self._pending[:excess]
+        self.dropped += excess
+        return excess
+
+    def _log_dropped(self, dropped: int) -> None:
+        if dropped:
+            logger.error(
+                f"Document access log queue full ({self.max_pending} events): dropped {dropped} oldest events "
+                f"({self.dropped} dropped in total)"
+            )
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write every queued event; returns the number of rows inserted."""
+
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._pending[: self.batch_size]
+                    del self._pending[: self.batch_size]
+                if not batch:
+                    return written
+                count = self._write(batch)
+                if count is None:
+                    return written  # re-queued; retried on the next flush
+                written += count
+
+    def _write(self, rows: List[Dict[str, Any]]) -> Optional[int]:
+        db = self.session_factory()
+        try:
+            try:
+                db.execute(insert(DocumentAccess), rows)
+                db.commit()
+                return len(rows)
+            except IntegrityError:
+                # A document was deleted after its token was issued.
+                db.rollback()
+                ids = {row["document_id"] for row in rows}
+                existing = set(db.execute(select(Document.id).where(Document.id.in_(ids))).scalars())
+                rows = [row for row in rows if row["document_id"] in existing]
+                if rows:
+                    db.execute(insert(DocumentAccess), rows)
+                    db.commit()
+                return len(rows)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write {len(rows)} document access events: {str(e)}")
+            with self._lock:
+                self._pending[:0] = rows
+                dropped = self._trim()
+            self._log_dropped(dropped)
+            return None
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="document-access-log", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+@lru_cache(maxsize=1)
+def get_access_log_buffer() -> AccessLogBuffer:
+    """Process-wide buffer used by the signed download handler."""
+
+    return AccessLogBuffer(SessionLocal)
@@ -0,0 +1,357 @@
+"""Streaming audit pack exports.
+
+An audit pack is a zip of every document in the requested categories for a
+set of participants, plus ``manifest.csv`` and ``manifest.json`` describing
+each entry (with its SHA-256).  The zip is produced on the fly: entries are
+written to a non-seekable buffer that is drained after every chunk, so the
+archive never exists on disk or in memory as a whole.
+
+Files are fetched ahead of the writer by a small thread pool with a bounded
+window, which hides storage latency (S3 in particular) without letting memory
+grow with the size of the pack.  Documents are read in keyset batches, so no
+cursor stays open while the client is downloading.
+
+Progress is checkpointed on the ``AuditPackExport`` row.  The checkpoint lags
+``checkpoint_lag`` entries behind what has been yielded, because bytes handed
+to the server may never reach the client; a resumed download therefore starts
+a new part that can repeat the last few documents but never skips one.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.storage import CHUNK_SIZE, StorageBackend, get_storage
+from app.core.streams import ZipStream, safe_name
+from app.models.audit import AuditPackExport
+from app.models.document import Document
+from app.models.participant import Participant
+from app.services.document_compression import iter_decompressed
+
+logger = logging.getLogger(__name__)
+
+AUDIT_PACK_WORKERS = int(os.getenv("AUDIT_PACK_WORKERS", "4"))
+# Files up to this size are prefetched by the pool; larger ones are streamed inline.
+AUDIT_PACK_PREFETCH_MAX_BYTES = int(os.getenv("AUDIT_PACK_PREFETCH_MAX_MB", "16")) * 1024 * 1024
+
+DEFLATE_MIME_TYPES = {
+    "text/plain",
+    "application/msword",
+    "application/vnd.ms-excel",
+}
+
+MANIFEST_FIELDS = (
+    "participant_id",
+    "participant_name",
+    "ndis_number",
+    "document_id",
+    "title",
+    "category",
+    "version",
+    "original_filename",
+    "archive_path",
+    "file_size",
+    "sha256",
+    "mime_type",
+    "uploaded_by",
+    "created_at",
+    "expiry_date",
+    "status",
+)
+
+
+@dataclass
+class _PackEntry:
+    document: Document
+    participant: Participant
+    archive_path: str
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class AuditPackService:
+    """Create audit pack exports and stream them as zip files."""
+
+    @staticmethod
+    def _document_query(db: Session, export: AuditPackExport):
+        query = (
+            db.query(Document, Participant)
+            .join(Participant, Participant.id == Document.participant_id)
+            .filter(Document.status == "active")
+        )
+        if export.participant_ids:
+            query = query.filter(Document.participant_id.in_(export.participant_ids))
+        if export.categories:
+            query = query.filter(Document.category.in_(export.categories))
+        if export.current_only:
+            query = query.filter(Document.is_current_version == True)  # noqa: E712
+        return query
+
+    @staticmethod
+    def create_export(
+        db: Session,
+        participant_ids: Optional[List[int]] = None,
+        categories: Optional[List[str]] = None,
+        current_only: bool = True,
+        requested_by: Optional[str] = None,
+    ) -> AuditPackExport:
+        """Register an export and count the documents it will contain."""
+
+        export = AuditPackExport(
+            participant_ids=sorted(set(participant_ids or [])),
+            categories=sorted(set(categories or [])),
+            current_only=current_only,
+            requested_by=requested_by,
+            status="pending",
+        )
+        export.document_count = (
+            AuditPackService._document_query(db, export).with_entities(func.count(Document.id)).scalar() or 0
+        )
+        db.add(export)
+        db.commit()
+        db.refresh(export)
+        return export
+
+    @staticmethod
+    def iter_entries(
+        db: Session,
+        export: AuditPackExport,
+        after: Optional[Tuple[int, int]] = None,
+        batch_size: int = 200,
+    ) -> Iterator[_PackEntry]:
+        """Yield the export's documents after ``after`` in keyset batches."""
+
+        position = after
+        while True:
+            query = AuditPackService._document_query(db, export)
+            if position is not None:
+                query = query.filter(tuple_(Document.participant_id, Document.id) > tuple_(*position))
+            rows = query.order_by(Document.participant_id, Document.id).limit(batch_size).all()
+            if not rows:
+                return
+            for document, participant in rows:
+                folder = f"{participant.id}_{safe_name(f'{participant.last_name}_{participant.first_name}')}"
+                name = f"{document.id}_{safe_name(document.original_filename)}"
+                yield _PackEntry(document, participant, f"{folder}/{safe_name(document.category)}/{name}")
+            position = (rows[-1][0].participant_id, rows[-1][0].id)
+            # Rows are plain values from here on; keep the identity map small.
+            db.expunge_all()
+
+    @staticmethod
+    def _read_all(storage: StorageBackend, document: Document) -> Optional[bytes]:
+        if not storage.exists(document.file_path):
+            return None
+        return b"".join(iter_decompressed(document.file_path, document.storage_codec, storage))
+
+    @staticmethod
+    def _save_checkpoint(
+        session_factory,
+        export_id: int,
+        position: Optional[Tuple[int, int]],
+        written: int,
+        bytes_written: int,
+        status: Optional[str] = None,
+    ) -> None:
+        db = session_factory()
+        try:
+            values: Dict[str, Any] = {
+                AuditPackExport.documents_written: AuditPackExport.documents_written + written,
+                AuditPackExport.bytes_written: AuditPackExport.bytes_written + bytes_written,
+            }
+            if position is not None:
+                values[AuditPackExport.last_participant_id] = position[0]
+                values[AuditPackExport.last_document_id] = position[1]
+            if status:
+                values[AuditPackExport.status] = status
+                if status == "completed":
+                    values[AuditPackExport.completed_at] = datetime.now(timezone.utc)
+            db.query(AuditPackExport).filter(AuditPackExport.id == export_id).update(
+                values, synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to checkpoint audit pack {export_id}: {str(e)}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def start_part(db: Session, export: AuditPackExport) -> Tuple[int, Optional[Tuple[int, int]]]:
+        """Mark the export running and return ``(part, resume_after)`` for the next download."""
+
+        resume_after = None
+        if export.last_document_id is not None:
+            resume_after = (export.last_participant_id, export.last_document_id)
+        export.part = (export.part or 0) + 1
+        export.status = "running"
+        db.commit()
+        return export.part, resume_after
+
+    @staticmethod
+    def stream(
+        session_factory,
+        export_id: int,
+        resume_after: Optional[Tuple[int, int]] = None,
+        storage: Optional[StorageBackend] = None,
+        workers: int = AUDIT_PACK_WORKERS,
+        checkpoint_lag: int = 10,
+    ) -> Iterator[bytes]:
+        """Yield the zip for ``export_id``, continuing after ``resume_after``."""
+
+        storage = storage or get_storage()
+        sink = ZipStream()
+        manifest: List[Dict[str, Any]] = []
+        completed: Deque[Tuple[int, int]] = deque()
+        pending_written = pending_bytes = 0
+        finished = False
+
+        db = session_factory()
+        export = db.get(AuditPackExport, export_id)
+        if export is None:
+            db.close()
+            raise ValueError(f"Audit pack export {export_id} not found")
+
+        window = max(1, workers) * 2
+        pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="audit-pack")
+        try:
+            archive = zipfile.ZipFile(sink, mode="w", allowZip64=True)
+            entries = AuditPackService.iter_entries(db, export, after=resume_after)
+            in_flight: Deque[Tuple[_PackEntry, Any]] = deque()
+
+            def submit_next() -> bool:
+                entry = next(entries, None)
+                if entry is None:
+                    return False
+                future = None
+                if (entry.document.file_size or 0) <= AUDIT_PACK_PREFETCH_MAX_BYTES:
+                    future = pool.submit(AuditPackService._read_all, storage, entry.document)
+                in_flight.append((entry, future))
+                return True
+
+            while len(in_flight) < window and submit_next():
+                pass
+
+            while in_flight:
+                entry, future = in_flight.popleft()
+                submit_next()
+                document = entry.document
+                digest = hashlib.sha256()
+                size = 0
+                status = "included"
+
+                compress_type = (
+                    zipfile.ZIP_DEFLATED if document.mime_type in DEFLATE_MIME_TYPES else zipfile.ZIP_STORED
+                )
+                try:
+                    if future is not None:
+                        data = future.result()
+                        chunks = None if data is None else iter((data,))
+                    elif storage.exists(document.file_path):
+                        chunks = iter_decompressed(document.file_path, document.storage_codec, storage, CHUNK_SIZE)
+                    else:
+                        chunks = None
+
+                    if chunks is None:
+                        status = "missing"
+                    else:
+                        modified = (document.created_at or datetime.now()).timetuple()[:6]
+                        info = zipfile.ZipInfo(entry.archive_path, date_time=modified)
+                        info.compress_type = compress_type
+                        with archive.open(info, mode="w", force_zip64=(document.file_size or 0) > 2**31) as target:
+                            for chunk in chunks:
+                                digest.update(chunk)
+                                size += len(chunk)
+                                for offset in range(0, len(chunk), CHUNK_SIZE):
+                                    target.write(chunk[offset:offset + CHUNK_SIZE])
+                                    data_out = sink.drain()
+                                    if data_out:
+                                        yield data_out
+                except Exception as e:
+                    logger.error(f"Audit pack {export_id}: could not add document {document.id}: {str(e)}")
+                    status = "error"
+
+                data_out = sink.drain()
+                if data_out:
+                    yield data_out
+
+                participant = entry.participant
+                manifest.append({
+                    "participant_id": participant.id,
+                    "participant_name": f"{participant.first_name} {participant.last_name}",
+                    "ndis_number": participant.ndis_number,
+                    "document_id": document.id,
+                    "title": document.title,
+                    "category": document.category,
+                    "version": document.version,
+                    "original_filename": document.original_filename,
+                    "archive_path": entry.archive_path if status == "included" else None,
+                    "file_size": size if status == "included" else document.file_size,
+                    "sha256": digest.hexdigest() if status == "included" else None,
+                    "mime_type": document.mime_type,
+                    "uploaded_by": document.uploaded_by,
+                    "created_at": _isoformat(document.created_at),
+                    "expiry_date": _isoformat(document.expiry_date),
+                    "status": status,
+                })
+
+                completed.append((document.participant_id, document.id))
+                pending_written += 1
+                pending_bytes += size
+                if len(completed) > checkpoint_lag:
+                    position = completed.popleft()
+                    # Only checkpoint in steps to keep the write rate low.
+                    if pending_written >= checkpoint_lag:
+                        AuditPackService._save_checkpoint(
+                            session_factory, export_id, position, pending_written, pending_bytes
+                        )
+                        pending_written = pending_bytes = 0
+
+            csv_buffer = io.StringIO()
+            writer = csv.DictWriter(csv_buffer, fieldnames=MANIFEST_FIELDS)
+            writer.writeheader()
+            writer.writerows(manifest)
+            summary = {
+                "export_id": export_id,
+                "part": export.part,
+                "resumed_after": list(resume_after) if resume_after else None,
+                "participant_ids": export.participant_ids,
+                "categories": export.categories,
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "documents": manifest,
+            }
+            archive.writestr("manifest.csv", csv_buffer.getvalue(), compress_type=zipfile.ZIP_DEFLATED)
+            archive.writestr(
+                "manifest.json", json.dumps(summary, indent=2, default=str), compress_type=zipfile.ZIP_DEFLATED
+            )
+            archive.close()
+            yield sink.drain()
+            finished = True
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            db.close()
+            last = completed[-1] if completed else None
+            if finished:
+                AuditPackService._save_checkpoint(
+                    session_factory, export_id, last, pending_written, pending_bytes, status="completed"
+                )
+            else:
+                # Keep the lagging checkpoint: the client may not have received the tail.
+                position = completed[0] if completed else None
+                AuditPackService._save_checkpoint(
+                    session_factory, export_id, position, pending_written, pending_bytes, status="interrupted"
+                )
@@ -0,0 +1,643 @@
+"""Monthly partitioning, retention and rollups for the document audit log.
+
+``document_access`` receives a row for every view, preview, download and
+delete.  To keep compliance lookups cheap after years of history the table is
+split by month:
+
+* On PostgreSQL the table can be converted once (``convert_to_native_partitioning``)
+  into a ``PARTITION BY RANGE (accessed_at)`` parent.  New partitions are created
+  ahead of time and the planner prunes them for date-bounded lookups.
+* On SQLite (the default development database) ``document_access`` stays the
+  "hot" table for the current month and ``rotate_partitions`` moves closed
+  months into ``document_access_YYYY_MM`` tables.
+
+Partitions past the retention window are streamed into gzip-compressed JSON
+lines files and dropped.  Daily per-document and per-user rollups survive the
+archival so reporting never needs to touch the raw rows.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import shutil
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    and_,
+    delete,
+    distinct,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.orm import Session
+
+from app.models.audit import (
+    AuditPartition,
+    DocumentAccessDailyRollup,
+    DocumentAccessUserDailyRollup,
+)
+from app.models.document import Document, DocumentAccess
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+AUDIT_ARCHIVE_DIR = Path(os.getenv("AUDIT_ARCHIVE_DIR", str(BASE_DIR / "archives" / "audit")))
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "24"))
+
+PARTITION_PREFIX = "document_access_"
+ACCESS_COLUMNS = (
+    "id",
+    "document_id",
+    "user_id",
+    "user_role",
+    "access_type",
+    "accessed_at",
+    "ip_address",
+    "user_agent",
+)
+
+# Partition tables live outside ``Base.metadata`` so ``create_all`` never
+# creates them speculatively.
+_partition_metadata = MetaData()
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(value: datetime) -> datetime:
+    """Return midnight on the first day of ``value``'s month."""
+
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Return the first day of the month ``months`` away from ``value``."""
+
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_table_name(period_start: datetime) -> str:
+    """Return the table name used for the month starting at ``period_start``."""
+
+    return f"{PARTITION_PREFIX}{period_start.year:04d}_{period_start.month:02d}"
+
+
+def partition_table(name: str) -> Table:
+    """Return a Core ``Table`` with the ``document_access`` column layout."""
+
+    if name in _partition_metadata.tables:
+        return _partition_metadata.tables[name]
+
+    return Table(
+        name,
+        _partition_metadata,
+        Column("id", Integer, primary_key=True),
+        Column("document_id", Integer, nullable=False),
+        Column("user_id", Integer, nullable=False),
+        Column("user_role", String(50), nullable=False),
+        Column("access_type", String(50), nullable=False),
+        Column("accessed_at", DateTime(timezone=True)),
+        Column("ip_address", String(45)),
+        Column("user_agent", Text),
+        Index(f"ix_{name}_document_accessed", "document_id", "accessed_at"),
+        Index(f"ix_{name}_user_accessed", "user_id", "accessed_at"),
+    )
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class AuditLogService:
+
+    @staticmethod
+    def uses_native_partitions(db: Session) -> bool:
+        """Return ``True`` when ``document_access`` is a PostgreSQL partitioned table."""
+
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+
+        return bool(
+            db.execute(
+                text(
+                    "SELECT 1 FROM pg_partitioned_table pt "
+                    "JOIN pg_class c ON c.oid = pt.partrelid "
+                    "WHERE c.relname = 'document_access'"
+                )
+            ).scalar()
+        )
+
+    @staticmethod
+    def _ensure_partition(db: Session, period_start: datetime, native: bool) -> AuditPartition:
+        """Create the partition for ``period_start`` (if needed) and register it."""
+
+        period_start = month_start(period_start)
+        period_end = add_months(period_start, 1)
+        name = partition_table_name(period_start)
+
+        registry = db.query(AuditPartition).filter(AuditPartition.table_name == name).first()
+        if registry and registry.status == "archived":
+            return registry
+
+        if native:
+            db.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF document_access "
+                    f"FOR VALUES FROM ('{period_start.isoformat()}') TO ('{period_end.isoformat()}')"
+                )
+            )
+        else:
+            partition_table(name).create(bind=db.connection(), checkfirst=True)
+
+        if not registry:
+            registry = AuditPartition(
+                table_name=name,
+                period_start=period_start,
+                period_end=period_end,
+                status="active",
+                row_count=0,
+            )
+            db.add(registry)
+            db.flush()
+
+        return registry
+
+    @staticmethod
+    def rotate_partitions(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Prepare upcoming partitions and move closed months out of the hot table.
+
+        Returns a mapping of partition name to the number of rows moved into it.
+        Late rows for a month that has already been archived are appended to
+        that month's archive.  With native partitions PostgreSQL routes rows
+        itself, so only the current and next month's partitions are created.
+        """
+
+        now = now or datetime.now()
+        current = month_start(now)
+        native = AuditLogService.uses_native_partitions(db)
+
+        # Keep the current and upcoming month ready so inserts never miss a partition
+        for period in (current, add_months(current, 1)):
+            AuditLogService._ensure_partition(db, period, native)
+        db.commit()
+
+        moved: Dict[str, int] = {}
+        if native:
+            return moved
+
+        hot = DocumentAccess.__table__
+        oldest = db.execute(
+            select(func.min(hot.c.accessed_at)).where(hot.c.accessed_at < current)
+        ).scalar()
+        if oldest is None:
+            return moved
+
+        period = month_start(oldest)
+        while period < current:
+            period_end = add_months(period, 1)
+            registry = AuditLogService._ensure_partition(db, period, native)
+
+            window = and_(hot.c.accessed_at >= period, hot.c.accessed_at < period_end)
+
+            if registry.status == "archived":
+                # The month's table is gone; late rows join its archive instead
+                count = AuditLogService._archive_late_rows(db, registry, window)
+                if count:
+                    moved[registry.table_name] = count
+                period = period_end
+                continue
+
+            target = partition_table(registry.table_name)
+
+            # Copy and delete inside one transaction so rows are never lost or doubled
+            result = db.execute(
+                insert(target).from_select(
+                    list(ACCESS_COLUMNS),
+                    select(*[hot.c[name] for name in ACCESS_COLUMNS]).where(window),
+                )
+            )
+            count = result.rowcount or 0
+            if count:
+                db.execute(delete(hot).where(window))
+                registry.row_count = (registry.row_count or 0) + count
+                moved[registry.table_name] = count
+                logger.info(f"Moved {count} audit rows into {registry.table_name}")
+
+            db.commit()
+            period = period_end
+
+        return moved
+
+    @staticmethod
+    def _archive_late_rows(db: Session, registry: AuditPartition, window) -> int:
+        """Append hot rows for an already archived month to its archive and delete them.
+
+        The archive is copied, extended with one more gzip member and swapped
+        in before the rows are deleted, so a crash can repeat rows in the
+        archive but never lose them.  Returns the number of rows moved.
+        """
+
+        hot = DocumentAccess.__table__
+        archive_path = Path(registry.archive_path) if registry.archive_path else None
+        if archive_path is None or not archive_path.exists():
+            logger.error(
+                f"Archive for {registry.table_name} is missing; leaving its late audit rows in place"
+            )
+            return 0
+
+        temp_path = archive_path.with_name(archive_path.name + ".tmp")
+        shutil.copyfile(archive_path, temp_path)
+        count = 0
+        last_id = None
+        with gzip.open(temp_path, "at", encoding="utf-8") as handle:
+            rows = db.execute(
+                select(*[hot.c[name] for name in ACCESS_COLUMNS])
+                .where(window)
+                .order_by(hot.c.accessed_at, hot.c.id),
+                execution_options={"yield_per": 1000},
+            ).mappings()
+            for row in rows:
+                handle.write(json.dumps(dict(row), default=_json_default) + "\n")
+                count += 1
+                last_id = row["id"] if last_id is None else max(last_id, row["id"])
+        if not count:
+            temp_path.unlink()
+            return 0
+        temp_path.replace(archive_path)
+
+        # Ids only grow, so rows logged since the export are left for the next rotation
+        db.execute(delete(hot).where(window, hot.c.id <= last_id))
+        registry.row_count = (registry.row_count or 0) + count
+        db.commit()
+
+        logger.info(f"Appended {count} late audit rows to {archive_path}")
+        return count
+
+    @staticmethod
+    def _access_sources(
+        db: Session,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Table]:
+        """Return the tables that may hold audit rows between ``start`` and ``end``."""
+
+        hot = DocumentAccess.__table__
+        if AuditLogService.uses_native_partitions(db):
+            # The parent table prunes partitions by itself
+            return [hot]
+
+        query = db.query(AuditPartition.table_name).filter(AuditPartition.status == "active")
+        if start is not None:
+            query = query.filter(AuditPartition.period_end > start)
+        if end is not None:
+            query = query.filter(AuditPartition.period_start < end)
+
+        names = [name for (name,) in query.order_by(AuditPartition.period_start).all()]
+        return [hot] + [partition_table(name) for name in names]
+
+    @staticmethod
+    def _access_union(
+        db: Session,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        document_ids: Optional[Sequence[int]] = None,
+        user_id: Optional[int] = None,
+    ):
+        """Return a subquery over every source table with the filters pushed down."""
+
+        selects = []
+        for table in AuditLogService._access_sources(db, start, end):
+            conditions = []
+            if start is not None:
+                conditions.append(table.c.accessed_at >= start)
+            if end is not None:
+                conditions.append(table.c.accessed_at < end)
+            if document_ids is not None:
+                conditions.append(table.c.document_id.in_(document_ids))
+            if user_id is not None:
+                conditions.append(table.c.user_id == user_id)
+
+            selects.append(
+                select(*[table.c[name] for name in ACCESS_COLUMNS]).where(*conditions)
+            )
+
+        if len(selects) == 1:
+            return selects[0].subquery("access_log")
+        return union_all(*selects).subquery("access_log")
+
+    @staticmethod
+    def get_access_history(
+        db: Session,
+        participant_id: Optional[int] = None,
+        document_ids: Optional[Sequence[int]] = None,
+        user_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Return audit events newest first, searching only the relevant partitions."""
+
+        if participant_id is not None:
+            participant_documents = [
+                doc_id
+                for (doc_id,) in db.query(Document.id)
+                .filter(Document.participant_id == participant_id)
+                .all()
+            ]
+            if document_ids is not None:
+                wanted = set(document_ids)
+                participant_documents = [d for d in participant_documents if d in wanted]
+            document_ids = participant_documents
+            if not document_ids:
+                return []
+
+        source = AuditLogService._access_union(db, start, end, document_ids, user_id)
+        rows = db.execute(
+            select(source)
+            .order_by(source.c.accessed_at.desc(), source.c.id.desc())
+            .limit(limit)
+        ).mappings()
+
+        return [
+            {
+                "id": row["id"],
+                "document_id": row["document_id"],
+                "user_id": row["user_id"],
+                "user_role": row["user_role"],
+                "access_type": row["access_type"],
+                "accessed_at": row["accessed_at"].isoformat() if row["accessed_at"] else None,
+                "ip_address": row["ip_address"],
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def build_daily_rollups(db: Session, day: date) -> Dict[str, int]:
+        """(Re)build the per-document and per-user rollups for ``day``.
+
+        Existing rollups for the day are replaced so the job is safe to re-run.
+        """
+
+        start = datetime.combine(day, time.min)
+        end = start + timedelta(days=1)
+        source = AuditLogService._access_union(db, start, end)
+
+        db.execute(delete(DocumentAccessDailyRollup).where(DocumentAccessDailyRollup.day == day))
+        db.execute(
+            delete(DocumentAccessUserDailyRollup).where(DocumentAccessUserDailyRollup.day == day)
+        )
+
+        document_rollup = (
+            select(
+                literal(day, Date).label("day"),
+                source.c.document_id,
+                Document.participant_id,
+                source.c.access_type,
+                func.count().label("access_count"),
+                func.count(distinct(source.c.user_id)).label("unique_users"),
+            )
+            .select_from(source.outerjoin(Document, Document.id == source.c.document_id))
+            .group_by(source.c.document_id, Document.participant_id, source.c.access_type)
+        )
+        document_result = db.execute(
+            insert(DocumentAccessDailyRollup).from_select(
+                ["day", "document_id", "participant_id", "access_type", "access_count", "unique_users"],
+                document_rollup,
+            )
+        )
+
+        user_rollup = (
+            select(
+                literal(day, Date).label("day"),
+                source.c.user_id,
+                func.max(source.c.user_role).label("user_role"),
+                source.c.access_type,
+                func.count().label("access_count"),
+                func.count(distinct(source.c.document_id)).label("distinct_documents"),
+            )
+            .group_by(source.c.user_id, source.c.access_type)
+        )
+        user_result = db.execute(
+            insert(DocumentAccessUserDailyRollup).from_select(
+                ["day", "user_id", "user_role", "access_type", "access_count", "distinct_documents"],
+                user_rollup,
+            )
+        )
+
+        db.commit()
+
+        return {
+            "document_rollups": document_result.rowcount or 0,
+            "user_rollups": user_result.rowcount or 0,
+        }
+
+    @staticmethod
+    def get_rollups(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        group_by: str = "document",
+        participant_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return rollup rows between ``start_date`` and ``end_date`` inclusive."""
+
+        if group_by == "user":
+            query = db.query(DocumentAccessUserDailyRollup).filter(
+                DocumentAccessUserDailyRollup.day >= start_date,
+                DocumentAccessUserDailyRollup.day <= end_date,
+            )
+            if user_id is not None:
+                query = query.filter(DocumentAccessUserDailyRollup.user_id == user_id)
+            return [
+                {
+                    "day": row.day.isoformat(),
+                    "user_id": row.user_id,
+                    "user_role": row.user_role,
+                    "access_type": row.access_type,
+                    "access_count": row.access_count,
+                    "distinct_documents": row.distinct_documents,
+                }
+                for row in query.order_by(
+                    DocumentAccessUserDailyRollup.day, DocumentAccessUserDailyRollup.user_id
+                ).all()
+            ]
+
+        if group_by != "document":
+            raise ValueError("group_by must be 'document' or 'user'")
+
+        query = db.query(DocumentAccessDailyRollup).filter(
+            DocumentAccessDailyRollup.day >= start_date,
+            DocumentAccessDailyRollup.day <= end_date,
+        )
+        if participant_id is not None:
+            query = query.filter(DocumentAccessDailyRollup.participant_id == participant_id)
+        return [
+            {
+                "day": row.day.isoformat(),
+                "document_id": row.document_id,
+                "participant_id": row.participant_id,
+                "access_type": row.access_type,
+                "access_count": row.access_count,
+                "unique_users": row.unique_users,
+            }
+            for row in query.order_by(
+                DocumentAccessDailyRollup.day, DocumentAccessDailyRollup.document_id
+            ).all()
+        ]
+
+    @staticmethod
+    def archive_expired_partitions(
+        db: Session,
+        retention_months: Optional[int] = None,
+        now: Optional[datetime] = None,
+        archive_dir: Optional[Path] = None,
+    ) -> List[Dict[str, Any]]:
+        """Export partitions older than the retention window and drop them.
+
+        Each partition is streamed (``yield_per``) into
+        ``<archive_dir>/<table>.jsonl.gz`` before the table is detached and
+        dropped, so memory use stays flat regardless of partition size.
+        """
+
+        retention_months = AUDIT_RETENTION_MONTHS if retention_months is None else retention_months
+        archive_dir = Path(archive_dir or AUDIT_ARCHIVE_DIR)
+        cutoff = add_months(month_start(now or datetime.now()), -retention_months)
+        native = AuditLogService.uses_native_partitions(db)
+
+        expired = (
+            db.query(AuditPartition)
+            .filter(AuditPartition.status == "active", AuditPartition.period_end <= cutoff)
+            .order_by(AuditPartition.period_start)
+            .all()
+        )
+        if not expired:
+            return []
+
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archived: List[Dict[str, Any]] = []
+
+        for partition in expired:
+            table = partition_table(partition.table_name)
+            archive_path = archive_dir / f"{partition.table_name}.jsonl.gz"
+            temp_path = archive_path.with_name(archive_path.name + ".tmp")
+
+            count = 0
+            with gzip.open(temp_path, "wt", encoding="utf-8") as handle:
+                rows = db.execute(
+                    select(table).order_by(table.c.accessed_at, table.c.id),
+                    execution_options={"yield_per": 1000},
+                ).mappings()
+                for row in rows:
+                    handle.write(json.dumps(dict(row), default=_json_default) + "\n")
+                    count += 1
+            temp_path.replace(archive_path)
+
+            if native:
+                db.execute(text(f"ALTER TABLE document_access DETACH PARTITION {partition.table_name}"))
+            table.drop(bind=db.connection(), checkfirst=True)
+
+            partition.status = "archived"
+            partition.row_count = count
+            partition.archive_path = str(archive_path)
+            partition.archived_at = datetime.now()
+            db.commit()
+
+            logger.info(f"Archived {count} audit rows from {partition.table_name} to {archive_path}")
+            archived.append(
+                {"table_name": partition.table_name, "rows": count, "archive_path": str(archive_path)}
+            )
+
+        return archived
+
+    @staticmethod
+    def iter_archived_access(archive_path: Path) -> Iterator[Dict[str, Any]]:
+        """Yield the audit rows stored in an archive written by ``archive_expired_partitions``."""
+
+        with gzip.open(archive_path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+    @staticmethod
+    def convert_to_native_partitioning(db: Session, now: Optional[datetime] = None) -> bool:
+        """Convert ``document_access`` into a PostgreSQL range-partitioned table.
+
+        This is a one-off maintenance step.  The existing rows are copied into
+        monthly partitions and the old table is dropped.  Returns ``False`` if
+        the table is already partitioned.
+        """
+
+        if db.get_bind().dialect.name != "postgresql":
+            raise ValueError("Native audit partitioning is only available on PostgreSQL")
+        if AuditLogService.uses_native_partitions(db):
+            return False
+
+        sequence = db.execute(
+            text("SELECT pg_get_serial_sequence('document_access', 'id')")
+        ).scalar()
+        oldest = db.execute(text("SELECT min(accessed_at) FROM document_access")).scalar()
+
+        db.execute(text("ALTER TABLE document_access RENAME TO document_access_legacy"))
+        if sequence:
+            # Keep the id sequence alive once the legacy table is dropped
+            db.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+
+        id_default = f"DEFAULT nextval('{sequence}')" if sequence else ""
+        db.execute(
+            text(
+                "CREATE TABLE document_access ("
+                f"id INTEGER NOT NULL {id_default}, "
+                "document_id INTEGER NOT NULL, "
+                "user_id INTEGER NOT NULL, "
+                "user_role VARCHAR(50) NOT NULL, "
+                "access_type VARCHAR(50) NOT NULL, "
+                "accessed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+                "ip_address VARCHAR(45), "
+                "user_agent TEXT, "
+                "PRIMARY KEY (id, accessed_at)"
+                ") PARTITION BY RANGE (accessed_at)"
+            )
+        )
+
+        current = month_start(now or datetime.now())
+        period = month_start(oldest.replace(tzinfo=None)) if oldest else current
+        while period <= add_months(current, 1):
+            AuditLogService._ensure_partition(db, period, native=True)
+            period = add_months(period, 1)
+
+        columns = ", ".join(ACCESS_COLUMNS)
+        db.execute(
+            text(
+                f"INSERT INTO document_access ({columns}) "
+                f"SELECT {columns} FROM document_access_legacy"
+            )
+        )
+        db.execute(text("DROP TABLE document_access_legacy"))
+
+        db.execute(text("CREATE INDEX ix_document_access_document_user ON document_access (document_id, user_id)"))
+        db.execute(text("CREATE INDEX ix_document_access_accessed_at ON document_access (accessed_at)"))
+        db.execute(
+            text("CREATE INDEX ix_document_access_document_accessed ON document_access (document_id, accessed_at)")
+        )
+        db.commit()
+
+        logger.info("Converted document_access to native monthly partitions")
+        return True
@@ -0,0 +1,265 @@
+"""Set-based cascade deletion for documents and participants.
+
+Deleting a document removes its whole version tree (the document and every
+version whose ``parent_document_id`` chain leads back to it).  The tree is
+collected with one recursive CTE and every dependent table is cleared with a
+single ``DELETE ... WHERE document_id IN (<tree>)``, so the cost no longer
+grows with the number of versions.  Participant offboarding works the same
+way keyed on ``participant_id``.
+
+All statements run in one transaction.  Files are never touched inside it:
+the caller receives the stored paths and hands them to ``reap_files``
+(usually as a FastAPI background task) once the commit has succeeded.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.storage import get_storage
+from app.models.audit import ParticipantDataExport
+from app.models.care_plan import CarePlan, ProspectiveWorkflow, RiskAssessment
+from app.models.document import Document, DocumentAccess, DocumentNotification, DocumentTag
+from app.models.document_generation import DocumentSignature, GeneratedDocument
+from app.models.participant import Participant
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.participant_stats import ParticipantStatsService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeletionResult:
+    """What a cascade deletion removed and which files still need reaping."""
+
+    document_ids: List[int] = field(default_factory=list)
+    file_paths: List[str] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+def reap_files(file_paths: Iterable[str]) -> int:
+    """Remove stored files after their rows are gone; returns how many were removed.
+
+    Failures are logged rather than raised so a single stray path never stops
+    the rest of the batch.
+    """
+
+    storage = get_storage()
+    removed = 0
+    for file_path in file_paths:
+        if not file_path:
+            continue
+        try:
+            storage.delete(file_path)
+            removed += 1
+        except Exception as e:
+            logger.warning(f"Could not delete file {file_path}: {str(e)}")
+    return removed
+
+
+class CascadeDeletionService:
+    """Bulk deletion of document version trees and whole participants."""
+
+    @staticmethod
+    def version_tree(root_ids: Iterable[int]):
+        """Return a recursive CTE selecting ``root_ids`` and all their descendants."""
+
+        tree = (
+            select(Document.id.label("id"))
+            .where(Document.id.in_(list(root_ids)))
+            .cte("document_tree", recursive=True)
+        )
+        return tree.union_all(
+            select(Document.id).where(Document.parent_document_id == tree.c.id)
+        )
+
+    @staticmethod
+    def _bulk_delete(db: Session, counts: Dict[str, int], name: str, statement) -> None:
+        counts[name] = db.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+    @staticmethod
+    def _unreferenced(db: Session, file_paths: List[str]) -> List[str]:
+        """Drop paths that surviving documents still use.
+
+        Duplicate uploads linked as a new version share the stored file of the
+        original, so a file is only reaped once no row points at it.
+        """
+
+        file_paths = list(dict.fromkeys(path for path in file_paths if path))
+        if not file_paths:
+            return []
+        in_use = set(
+            db.execute(select(Document.file_path).where(Document.file_path.in_(file_paths))).scalars()
+        )
+        return [path for path in file_paths if path not in in_use]
+
+    @staticmethod
+    def _delete_document_rows(db: Session, document_ids, counts: Dict[str, int]) -> None:
+        """Delete documents selected by ``document_ids`` (a subquery) and their dependents."""
+
+        CascadeDeletionService._bulk_delete(
+            db, counts, "document_access",
+            delete(DocumentAccess).where(DocumentAccess.document_id.in_(document_ids)),
+        )
+        CascadeDeletionService._bulk_delete(
+            db, counts, "document_notifications",
+            delete(DocumentNotification).where(DocumentNotification.document_id.in_(document_ids)),
+        )
+        CascadeDeletionService._bulk_delete(
+            db, counts, "document_tags",
+            delete(DocumentTag).where(DocumentTag.document_id.in_(document_ids)),
+        )
+        CascadeDeletionService._bulk_delete(
+            db, counts, "documents",
+            delete(Document).where(Document.id.in_(document_ids)),
+        )
+
+    @staticmethod
+    def delete_document_tree(
+        db: Session,
+        document_id: int,
+        participant_id: int,
+        commit: bool = True,
+    ) -> Optional[DeletionResult]:
+        """Delete a document and every later version built on it.
+
+        If the deleted tree held the participant's current version, the
+        surviving parent version becomes current again.  Returns ``None`` when
+        the document does not exist for the participant.
+        """
+
+        root = (
+            db.query(Document.id, Document.parent_document_id)
+            .filter(Document.id == document_id, Document.participant_id == participant_id)
+            .first()
+        )
+        if root is None:
+            return None
+
+        tree = CascadeDeletionService.version_tree([document_id])
+        tree_ids = select(tree.c.id)
+        result = DeletionResult()
+
+        try:
+            rows = db.execute(
+                select(Document.id, Document.file_path, Document.is_current_version).where(
+                    Document.id.in_(tree_ids)
+                )
+            ).all()
+            result.document_ids = [row.id for row in rows]
+            result.file_paths = [row.file_path for row in rows if row.file_path]
+            held_current = any(row.is_current_version for row in rows)
+
+            CascadeDeletionService._delete_document_rows(db, tree_ids, result.counts)
+            result.file_paths = CascadeDeletionService._unreferenced(db, result.file_paths)
+
+            if held_current and root.parent_document_id is not None:
+                db.execute(
+                    update(Document)
+                    .where(Document.id == root.parent_document_id)
+                    .values(is_current_version=True)
+                    .execution_options(synchronize_session=False)
+                )
+
+            if commit:
+                db.commit()
+            db.expire_all()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(
+            f"Deleted document {document_id} with {len(result.document_ids) - 1} later versions "
+            f"for participant {participant_id}"
+        )
+        return result
+
+    @staticmethod
+    def delete_participant(
+        db: Session,
+        participant_id: int,
+        commit: bool = True,
+    ) -> Optional[DeletionResult]:
+        """Delete a participant and everything that belongs to them in one transaction."""
+
+        exists = db.query(Participant.id, Participant.status).filter(Participant.id == participant_id).first()
+        if exists is None:
+            return None
+
+        result = DeletionResult()
+        counts = result.counts
+        document_ids = select(Document.id).where(Document.participant_id == participant_id)
+        generated_ids = select(GeneratedDocument.id).where(GeneratedDocument.participant_id == participant_id)
+
+        try:
+            documents = db.execute(
+                select(Document.id, Document.file_path).where(Document.participant_id == participant_id)
+            ).all()
+            generated_paths = db.execute(
+                select(GeneratedDocument.file_path).where(
+                    GeneratedDocument.participant_id == participant_id,
+                    GeneratedDocument.file_path.isnot(None),
+                )
+            ).scalars().all()
+            export_keys = db.execute(
+                select(ParticipantDataExport.storage_key).where(
+                    ParticipantDataExport.participant_id == participant_id,
+                    ParticipantDataExport.storage_key.isnot(None),
+                )
+            ).scalars().all()
+            result.document_ids = [row.id for row in documents]
+            result.file_paths = (
+                [row.file_path for row in documents if row.file_path] + list(generated_paths) + list(export_keys)
+            )
+
+            CascadeDeletionService._bulk_delete(
+                db, counts, "document_notifications",
+                delete(DocumentNotification).where(DocumentNotification.participant_id == participant_id),
+            )
+            CascadeDeletionService._delete_document_rows(db, document_ids, counts)
+            result.file_paths = CascadeDeletionService._unreferenced(db, result.file_paths)
+            CascadeDeletionService._bulk_delete(
+                db, counts, "document_signatures",
+                delete(DocumentSignature).where(DocumentSignature.generated_document_id.in_(generated_ids)),
+            )
+            CascadeDeletionService._bulk_delete(
+                db, counts, "generated_documents",
+                delete(GeneratedDocument).where(GeneratedDocument.participant_id == participant_id),
+            )
+            # The workflow references care plans and risk assessments, so it goes first.
+            CascadeDeletionService._bulk_delete(
+                db, counts, "prospective_workflows",
+                delete(ProspectiveWorkflow).where(ProspectiveWorkflow.participant_id == participant_id),
+            )
+            CascadeDeletionService._bulk_delete(
+                db, counts, "care_plans",
+                delete(CarePlan).where(CarePlan.participant_id == participant_id),
+            )
+            CascadeDeletionService._bulk_delete(
+                db, counts, "risk_assessments",
+                delete(RiskAssessment).where(RiskAssessment.participant_id == participant_id),
+            )
+            CascadeDeletionService._bulk_delete(
+                db, counts, "participant_data_exports",
+                delete(ParticipantDataExport).where(ParticipantDataExport.participant_id == participant_id),
+            )
+            DuplicateDetectionService.forget(db, "participant", [participant_id], counts)
+            CascadeDeletionService._bulk_delete(
+                db, counts, "participants",
+                delete(Participant).where(Participant.id == participant_id),
+            )
+            ParticipantStatsService.record_transition(db, exists.status, None)
+
+            if commit:
+                db.commit()
+            db.expire_all()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"Deleted participant {participant_id}: {counts}")
+        return result
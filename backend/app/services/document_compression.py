@@ -0,0 +1,220 @@
+"""Transparent compression at rest for uploaded documents.
+
+Eligible uploads (text, Office documents, PDFs) are streamed through zstd on
+their way to the storage backend and stored under a ``.zst`` key;
+``Document.storage_codec`` records the codec and ``Document.stored_size`` the
+stored bytes while ``file_size`` keeps the original size.  Objects that do not
+shrink by at least ``MIN_SAVING_RATIO`` (already-compressed PDFs, most DOCX)
+are stored raw so downloads of those never pay for decompression.
+
+``zstandard`` is optional: without it new uploads are stored raw and only
+reading previously compressed objects fails.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from app.core.storage import CHUNK_SIZE, CountingReader, StorageBackend, get_storage
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+    ZSTD_AVAILABLE = False
+    logger.warning("zstandard not available: documents will be stored uncompressed")
+
+CODEC_ZSTD = "zstd"
+COMPRESSED_SUFFIX = ".zst"
+
+COMPRESSIBLE_MIME_TYPES = {
+    "text/plain",
+    "application/pdf",
+    "application/msword",
+    "application/vnd.ms-excel",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+COMPRESSION_ENABLED = os.getenv("DOCUMENT_COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_LEVEL = int(os.getenv("DOCUMENT_COMPRESSION_LEVEL", "10"))
+# Keep the compressed copy only if it saves at least this fraction of the original.
+MIN_SAVING_RATIO = float(os.getenv("DOCUMENT_COMPRESSION_MIN_SAVING", "0.1"))
+
+
+@dataclass
+class StoredFile:
+    """Result of writing an upload to storage."""
+
+    key: str
+    codec: Optional[str]  # None when stored raw
+    size: int  # original size in bytes
+    stored_size: int  # bytes in storage
+    sha256: Optional[str] = None  # hex digest of the original bytes
+
+    @property
+    def name(self) -> str:
+        return Path(self.key).name
+
+
+def should_compress(mime_type: Optional[str]) -> bool:
+    return COMPRESSION_ENABLED and ZSTD_AVAILABLE and (mime_type or "") in COMPRESSIBLE_MIME_TYPES
+
+
+def _store_compressed(storage: StorageBackend, key: str, source: BinaryIO, mime_type: Optional[str]):
+    """Stream ``source`` through zstd into ``key``; returns ``(size, stored_size)``."""
+
+    counter = CountingReader(source)
+    compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+    reader = compressor.stream_reader(counter, closefd=False)
+    stored_size = storage.save(key, reader, content_type=mime_type)
+    return counter.count, stored_size
+
+
+class HashingReader:
+    """File-like wrapper that hashes what is read through it.
+
+    Rewinding to the start restarts the digest, so a source that is read a
+    second time (raw fallback after a poor compression ratio) is hashed once.
+    """
+
+    def __init__(self, source: BinaryIO):
+        self.source = source
+        self.digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        self.digest.update(data)
+        return data
+
+    def seekable(self) -> bool:
+        return self.source.seekable()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        position = self.source.seek(offset, whence)
+        if position == 0:
+            self.digest = hashlib.sha256()
+        return position
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+
+def store_file(
+    source: BinaryIO,
+    key: str,
+    mime_type: Optional[str],
+    storage: Optional[StorageBackend] = None,
+) -> StoredFile:
+    """Write ``source`` to storage under ``key`` (plus ``.zst`` when compressed).
+
+    Compression streams chunk by chunk into the storage backend, so memory
+    use does not depend on the upload size.  If the result does not save
+    enough space and ``source`` is seekable, the raw bytes are stored instead.
+    The SHA-256 of the original bytes is computed on the same pass.
+    """
+
+    storage = storage or get_storage()
+    reader = HashingReader(source)
+
+    if should_compress(mime_type):
+        compressed_key = key + COMPRESSED_SUFFIX
+        size, stored_size = _store_compressed(storage, compressed_key, reader, mime_type)
+
+        worthwhile = size and stored_size <= size * (1 - MIN_SAVING_RATIO)
+        if worthwhile or not source.seekable():
+            return StoredFile(
+                key=compressed_key,
+                codec=CODEC_ZSTD,
+                size=size,
+                stored_size=stored_size,
+                sha256=reader.hexdigest(),
+            )
+
+        storage.delete(compressed_key)
+        reader.seek(0)
+
+    size = storage.save(key, reader, content_type=mime_type)
+    return StoredFile(key=key, codec=None, size=size, stored_size=size, sha256=reader.hexdigest())
+
+
+def open_decompressed(key: str, codec: Optional[str], storage: Optional[StorageBackend] = None) -> BinaryIO:
+    """Return a readable binary stream of the original bytes (caller closes it)."""
+
+    storage = storage or get_storage()
+    if codec not in (None, CODEC_ZSTD):
+        raise ValueError(f"Unknown storage codec: {codec}")
+    if codec == CODEC_ZSTD and not ZSTD_AVAILABLE:
+        raise RuntimeError("zstandard is required to read compressed documents")
+
+    handle = storage.open(key)
+    if codec is None:
+        return handle
+    return zstandard.ZstdDecompressor().stream_reader(handle, closefd=True)
+
+
+def iter_decompressed(
+    key: str,
+    codec: Optional[str],
+    storage: Optional[StorageBackend] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield the original bytes of a stored file without loading it whole."""
+
+    with open_decompressed(key, codec, storage) as reader:
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def accepts_encoding(accept_encoding: Optional[str], codec: str) -> bool:
+    """True if an ``Accept-Encoding`` header allows ``codec`` with a non-zero q-value."""
+
+    for part in (accept_encoding or "").split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        if name.lower() != codec:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def compress_existing(
+    key: str,
+    mime_type: Optional[str],
+    storage: Optional[StorageBackend] = None,
+) -> Optional[StoredFile]:
+    """Write a compressed copy next to an existing raw object.
+
+    Returns ``None`` when the object is not eligible or would not shrink
+    enough.  The caller points the row at the new key and then deletes the
+    original.
+    """
+
+    storage = storage or get_storage()
+    if not should_compress(mime_type) or not storage.exists(key):
+        return None
+
+    compressed_key = key + COMPRESSED_SUFFIX
+    with storage.open(key) as source:
+        size, stored_size = _store_compressed(storage, compressed_key, source, mime_type)
+    if not size or stored_size > size * (1 - MIN_SAVING_RATIO):
+        storage.delete(compressed_key)
+        return None
+    return StoredFile(key=compressed_key, codec=CODEC_ZSTD, size=size, stored_size=stored_size)
@@ -17,6 +17,10 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Prefix for the temporary directories used to build bulk-generation zips so
+# the upload reconciliation job can find ones left behind by failed requests.
+BULK_ZIP_TEMP_PREFIX = "ndis-bulk-zip-"
+
 # Try to import WeasyPrint, but make it optional
 try:
     from weasyprint import HTML, CSS
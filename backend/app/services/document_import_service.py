@@ -0,0 +1,576 @@
+"""Bulk import of legacy documents from a zip file or a server-side directory.
+
+A manifest (``manifest.csv`` or ``manifest.json``) maps every file to a
+participant and a category.  Recognised columns:
+
+``path`` (required, relative to the zip/directory root), ``participant_id``
+or ``ndis_number``, ``category`` (required), ``title``, ``description``,
+``tags`` (comma or semicolon separated), ``expiry_date`` (YYYY-MM-DD),
+``visible_to_support_worker``, ``uploaded_by`` and ``mime_type`` (guessed
+from the file name when missing).
+
+Rows are validated up front against one participant lookup and the cached
+category registry.  Valid files are then hashed and copied into storage by a
+thread pool (hashing happens while the file streams into storage, so every
+file is read once), and ``Document`` rows, their tag rows and an ``import``
+access event are inserted in batched transactions.  If a batch fails, its
+stored files are removed and every row in it is reported as failed; earlier
+batches stay committed.
+
+Files with the same content for the same participant, either within one
+import or already current in the database, are stored once; later rows are
+reported as ``duplicate`` with the id of the document they match.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import mimetypes
+import os
+import uuid
+import zipfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.storage import StorageBackend, get_storage
+from app.models.document import Document, DocumentAccess, DocumentTag
+from app.models.participant import Participant
+from app.schemas.document import ALLOWED_MIME_TYPES, MAX_FILE_SIZE
+from app.services.document_compression import StoredFile, store_file
+from app.services.document_service import DocumentService, get_category_registry
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_IMPORT_WORKERS = int(os.getenv("DOCUMENT_IMPORT_WORKERS", "8"))
+DOCUMENT_IMPORT_BATCH_SIZE = int(os.getenv("DOCUMENT_IMPORT_BATCH_SIZE", "500"))
+# Server-side directories can only be imported from below this root.
+DOCUMENT_IMPORT_ROOT = os.getenv("DOCUMENT_IMPORT_ROOT")
+
+MANIFEST_NAMES = ("manifest.csv", "manifest.json")
+
+STATUS_IMPORTED = "imported"
+STATUS_VALID = "valid"  # dry run
+STATUS_DUPLICATE = "duplicate"
+STATUS_INVALID = "invalid"
+STATUS_FAILED = "failed"
+
+_TRUE_VALUES = {"1", "true", "yes", "y"}
+
+
+class DocumentImportError(ValueError):
+    """Raised when an import cannot start (bad source or manifest)."""
+
+
+@dataclass
+class ImportResult:
+    """Outcome of one manifest row."""
+
+    row: int
+    path: str
+    status: str
+    participant_id: Optional[int] = None
+    document_id: Optional[int] = None
+    sha256: Optional[str] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ImportReport:
+    results: List[ImportResult] = field(default_factory=list)
+    dry_run: bool = False
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        return counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "total": len(self.results),
+            "counts": self.counts,
+            "results": [asdict(result) for result in self.results],
+        }
+
+
+@dataclass
+class _Planned:
+    """A validated manifest row waiting to be copied."""
+
+    result: ImportResult
+    participant_id: int
+    category: str
+    title: str
+    original_filename: str
+    mime_type: str
+    description: Optional[str]
+    tags: List[str]
+    expiry_date: Optional[datetime]
+    visible_to_support_worker: bool
+    uploaded_by: str
+
+
+def _safe_relative(path: str) -> str:
+    """Normalise a manifest path; reject absolute paths and ``..`` components."""
+
+    cleaned = PurePosixPath(str(path).strip().replace("\\", "/"))
+    if not str(cleaned) or cleaned.is_absolute() or ".." in cleaned.parts:
+        raise ValueError(f"Invalid path: {path}")
+    return str(cleaned)
+
+
+class ImportSource(ABC):
+    """Files to import, addressed by manifest path."""
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        """Whether ``path`` is a file in the source."""
+
+    @abstractmethod
+    def size(self, path: str) -> int:
+        """Size of the file at ``path`` in bytes."""
+
+    @abstractmethod
+    def open(self, path: str) -> BinaryIO:
+        """Open the file at ``path`` for binary reading."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DirectoryImportSource(ImportSource):
+    def __init__(self, root: Path):
+        self.root = Path(root).resolve()
+        if not self.root.is_dir():
+            raise DocumentImportError(f"Import directory not found: {root}")
+
+    def _path(self, path: str) -> Path:
+        return self.root / _safe_relative(path)
+
+    def exists(self, path: str) -> bool:
+        return self._path(path).is_file()
+
+    def size(self, path: str) -> int:
+        return self._path(path).stat().st_size
+
+    def open(self, path: str) -> BinaryIO:
+        return open(self._path(path), "rb")
+
+
+class ZipImportSource(ImportSource):
+    """Members of a zip file; ``zipfile`` serialises reads, so workers may share it."""
+
+    def __init__(self, source):
+        try:
+            self.archive = zipfile.ZipFile(source)
+        except zipfile.BadZipFile as e:
+            raise DocumentImportError("Import file is not a valid zip archive") from e
+        self.members = {
+            info.filename.rstrip("/"): info for info in self.archive.infolist() if not info.is_dir()
+        }
+
+    def exists(self, path: str) -> bool:
+        return _safe_relative(path) in self.members
+
+    def size(self, path: str) -> int:
+        return self.members[_safe_relative(path)].file_size
+
+    def open(self, path: str) -> BinaryIO:
+        return self.archive.open(self.members[_safe_relative(path)])
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+def resolve_import_directory(directory: str, root: Optional[str] = None) -> Path:
+    """Resolve ``directory`` below ``root`` (``DOCUMENT_IMPORT_ROOT`` by default)."""
+
+    root = root or DOCUMENT_IMPORT_ROOT
+    if not root:
+        raise DocumentImportError("DOCUMENT_IMPORT_ROOT is not configured; directory imports are disabled")
+    base = Path(root).resolve()
+    path = (base / directory).resolve()
+    if path != base and base not in path.parents:
+        raise DocumentImportError("Import directory must be inside DOCUMENT_IMPORT_ROOT")
+    return path
+
+
+def load_manifest(stream: BinaryIO, name: str) -> List[Dict[str, Any]]:
+    """Parse a CSV or JSON manifest into a list of rows."""
+
+    text = stream.read().decode("utf-8-sig")
+    if name.lower().endswith(".json"):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise DocumentImportError(f"Invalid manifest JSON: {e}") from e
+        rows = data.get("documents") if isinstance(data, dict) else data
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise DocumentImportError("Manifest JSON must be a list of objects or {\"documents\": [...]}")
+        return rows
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or "path" not in reader.fieldnames:
+        raise DocumentImportError("Manifest CSV needs a 'path' column")
+    return [dict(row) for row in reader]
+
+
+def find_manifest(source: ImportSource) -> List[Dict[str, Any]]:
+    """Load the manifest stored at the root of ``source``."""
+
+    for name in MANIFEST_NAMES:
+        if source.exists(name):
+            with source.open(name) as stream:
+                return load_manifest(stream, name)
+    raise DocumentImportError("No manifest provided and none found (manifest.csv or manifest.json)")
+
+
+def _text(row: Dict[str, Any], key: str) -> Optional[str]:
+    value = row.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+class DocumentImportService:
+    """Validate a manifest, copy files in parallel and insert documents in batches."""
+
+    @staticmethod
+    def _resolve_participants(db: Session, rows: List[Dict[str, Any]]) -> Tuple[set, Dict[str, int]]:
+        ids, ndis_numbers = set(), set()
+        for row in rows:
+            participant_id = _text(row, "participant_id")
+            if participant_id and participant_id.isdigit():
+                ids.add(int(participant_id))
+            ndis_number = _text(row, "ndis_number")
+            if ndis_number:
+                ndis_numbers.add(ndis_number)
+
+        known_ids, by_ndis = set(), {}
+        ids, ndis_numbers = sorted(ids), sorted(ndis_numbers)
+        for offset in range(0, len(ids), 500):
+            known_ids.update(
+                db.execute(select(Participant.id).where(Participant.id.in_(ids[offset:offset + 500]))).scalars()
+            )
+        for offset in range(0, len(ndis_numbers), 500):
+            by_ndis.update(
+                db.execute(
+                    select(Participant.ndis_number, Participant.id).where(
+                        Participant.ndis_number.in_(ndis_numbers[offset:offset + 500])
+                    )
+                ).all()
+            )
+        return known_ids, by_ndis
+
+    @staticmethod
+    def plan(
+        db: Session,
+        source: ImportSource,
+        rows: List[Dict[str, Any]],
+        max_file_size: int = MAX_FILE_SIZE,
+    ) -> Tuple[List[_Planned], List[ImportResult]]:
+        """Validate every manifest row; returns ``(valid rows, invalid results)``."""
+
+        known_ids, by_ndis = DocumentImportService._resolve_participants(db, rows)
+        categories = get_category_registry().active_ids(db)
+        planned: List[_Planned] = []
+        invalid: List[ImportResult] = []
+        seen_paths = set()
+
+        for index, row in enumerate(rows, start=1):
+            raw_path = _text(row, "path") or ""
+            result = ImportResult(row=index, path=raw_path, status=STATUS_INVALID)
+            try:
+                path = _safe_relative(raw_path)
+                result.path = path
+
+                participant_id = _text(row, "participant_id")
+                ndis_number = _text(row, "ndis_number")
+                if participant_id:
+                    if not participant_id.isdigit() or int(participant_id) not in known_ids:
+                        raise ValueError(f"Participant not found: {participant_id}")
+                    result.participant_id = int(participant_id)
+                elif ndis_number:
+                    if ndis_number not in by_ndis:
+                        raise ValueError(f"Participant not found for NDIS number {ndis_number}")
+                    result.participant_id = by_ndis[ndis_number]
+                else:
+                    raise ValueError("participant_id or ndis_number is required")
+
+                category = _text(row, "category")
+                if category not in categories:
+                    raise ValueError(f"Invalid category: {category}")
+
+                if path in seen_paths:
+                    raise ValueError("Path listed more than once")
+                if not source.exists(path):
+                    raise ValueError("File not found in import source")
+                size = source.size(path)
+                if size > max_file_size:
+                    raise ValueError(f"File size exceeds {max_file_size // (1024 * 1024)}MB limit")
+
+                original_filename = PurePosixPath(path).name
+                mime_type = _text(row, "mime_type") or mimetypes.guess_type(original_filename)[0]
+                if mime_type not in ALLOWED_MIME_TYPES:
+                    raise ValueError(f"File type {mime_type} not supported")
+
+                expiry_date = None
+                if _text(row, "expiry_date"):
+                    try:
+                        expiry_date = datetime.strptime(_text(row, "expiry_date").split("T")[0], "%Y-%m-%d")
+                    except ValueError:
+                        raise ValueError("Invalid expiry date format. Expected YYYY-MM-DD")
+
+                tags = row.get("tags") or []
+                if isinstance(tags, str):
+                    tags = tags.replace(";", ",").split(",")
+                visible = row.get("visible_to_support_worker")
+                if not isinstance(visible, bool):
+                    visible = str(visible or "").strip().lower() in _TRUE_VALUES
+            except (ValueError, KeyError) as e:
+                result.error = str(e)
+                invalid.append(result)
+                continue
+
+            seen_paths.add(path)
+            result.size = size
+            planned.append(_Planned(
+                result=result,
+                participant_id=result.participant_id,
+                category=category,
+                title=_text(row, "title") or original_filename,
+                original_filename=original_filename,
+                mime_type=mime_type,
+                description=_text(row, "description"),
+                tags=DocumentService.normalize_tags(tags),
+                expiry_date=expiry_date,
+                visible_to_support_worker=visible,
+                uploaded_by=_text(row, "uploaded_by") or "Legacy import",
+            ))
+
+        return planned, invalid
+
+    @staticmethod
+    def _copy(source: ImportSource, storage: StorageBackend, item: _Planned) -> StoredFile:
+        """Stream one file into storage, hashing it on the way."""
+
+        suffix = PurePosixPath(item.original_filename).suffix
+        key = f"uploads/documents/{item.participant_id}/{item.participant_id}_{uuid.uuid4().hex}{suffix}"
+        with source.open(item.result.path) as stream:
+            return store_file(stream, key, item.mime_type, storage)
+
+    @staticmethod
+    def _existing_documents(db: Session, batch: List[Tuple[_Planned, StoredFile]]) -> Dict[Tuple[int, str], int]:
+        """Map ``(participant_id, sha256)`` of the batch to matching current documents in one query."""
+
+        participant_ids = {item.participant_id for item, _stored in batch}
+        hashes = {stored.sha256 for _item, stored in batch}
+        rows = db.execute(
+            select(Document.participant_id, Document.sha256, Document.id)
+            .where(
+                Document.participant_id.in_(participant_ids),
+                Document.sha256.in_(hashes),
+                Document.is_current_version == True,
+                Document.status == "active",
+            )
+            .order_by(Document.id.desc())
+        ).all()
+        # Descending order leaves the oldest match in the dict, as find_duplicate does.
+        return {(row.participant_id, row.sha256): row.id for row in rows}
+
+    @staticmethod
+    def _insert_batch(
+        db: Session,
+        batch: List[Tuple[_Planned, StoredFile]],
+        user_id: int,
+        user_role: str,
+    ) -> None:
+        """Insert one batch of documents with their tags and audit events in one transaction."""
+
+        documents = [
+            Document(
+                participant_id=item.participant_id,
+                title=item.title,
+                filename=stored.name,
+                original_filename=item.original_filename,
+                file_path=stored.key,
+                file_size=stored.size,
+                mime_type=item.mime_type,
+                storage_codec=stored.codec,
+                stored_size=stored.stored_size,
+                sha256=stored.sha256,
+                category=item.category,
+                description=item.description,
+                tags=item.tags,
+                visible_to_support_worker=item.visible_to_support_worker,
+                expiry_date=item.expiry_date,
+                uploaded_by=item.uploaded_by,
+                status="active",
+            )
+            for item, stored in batch
+        ]
+        try:
+            db.add_all(documents)
+            db.flush()
+
+            tag_rows = [
+                {"document_id": document.id, "participant_id": document.participant_id, "tag": tag}
+                for document in documents
+                for tag in document.tags
+            ]
+            if tag_rows:
+                db.execute(insert(DocumentTag), tag_rows)
+
+            now = datetime.now(timezone.utc)
+            db.execute(insert(DocumentAccess), [
+                {
+                    "document_id": document.id,
+                    "user_id": user_id,
+                    "user_role": user_role,
+                    "access_type": "import",
+                    "accessed_at": now,
+                }
+                for document in documents
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for (item, _stored), document in zip(batch, documents):
+            item.result.document_id = document.id
+            item.result.status = STATUS_IMPORTED
+        db.expunge_all()
+
+    @staticmethod
+    def _fail_batch(storage: StorageBackend, batch: List[Tuple[_Planned, StoredFile]], error: str) -> None:
+        for item, stored in batch:
+            item.result.status = STATUS_FAILED
+            item.result.error = error
+            try:
+                storage.delete(stored.key)
+            except Exception as e:
+                logger.warning(f"Could not remove imported file {stored.key}: {str(e)}")
+
+    @staticmethod
+    def run(
+        db: Session,
+        source: ImportSource,
+        rows: Optional[List[Dict[str, Any]]] = None,
+        storage: Optional[StorageBackend] = None,
+        workers: int = DOCUMENT_IMPORT_WORKERS,
+        batch_size: int = DOCUMENT_IMPORT_BATCH_SIZE,
+        max_file_size: int = MAX_FILE_SIZE,
+        dry_run: bool = False,
+        user_id: int = 1,
+        user_role: str = "admin",
+    ) -> ImportReport:
+        """Import every file listed in ``rows`` (or the manifest inside ``source``)."""
+
+        storage = storage or get_storage()
+        if rows is None:
+            rows = find_manifest(source)
+
+        report = ImportReport(dry_run=dry_run)
+        planned, invalid = DocumentImportService.plan(db, source, rows, max_file_size)
+
+        if dry_run:
+            for item in planned:
+                item.result.status = STATUS_VALID
+            report.results = sorted(invalid + [item.result for item in planned], key=lambda r: r.row)
+            return report
+
+        first_by_hash: Dict[Tuple[int, str], _Planned] = {}
+        batch: List[Tuple[_Planned, StoredFile]] = []
+        duplicates: List[Tuple[_Planned, StoredFile]] = []
+
+        def flush() -> None:
+            if not batch:
+                return
+            existing = DocumentImportService._existing_documents(db, batch)
+            for item, stored in list(batch):
+                document_id = existing.get((item.participant_id, stored.sha256))
+                if document_id is None:
+                    continue
+                batch.remove((item, stored))
+                storage.delete(stored.key)
+                item.result.status = STATUS_DUPLICATE
+                item.result.document_id = document_id
+                item.result.error = f"Same content as document {document_id}"
+            if not batch:
+                return
+            try:
+                DocumentImportService._insert_batch(db, batch, user_id, user_role)
+            except Exception as e:
+                logger.error(f"Document import batch of {len(batch)} failed: {str(e)}")
+                DocumentImportService._fail_batch(storage, batch, str(e))
+            batch.clear()
+
+        def copy(item: _Planned):
+            try:
+                return DocumentImportService._copy(source, storage, item), None
+            except Exception as e:
+                return None, str(e)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="document-import") as pool:
+            # ``map`` keeps manifest order, so batches and the report are deterministic.
+            for item, (copied, error) in zip(planned, pool.map(copy, planned)):
+                if copied is None:
+                    item.result.status = STATUS_FAILED
+                    item.result.error = error
+                    continue
+                stored = copied
+                item.result.sha256 = stored.sha256
+                key = (item.participant_id, stored.sha256)
+                if key in first_by_hash:
+                    duplicates.append((item, stored))
+                    continue
+                first_by_hash[key] = item
+                batch.append((item, stored))
+                if len(batch) >= batch_size:
+                    flush()
+            flush()
+
+        for item, stored in duplicates:
+            storage.delete(stored.key)
+            original = first_by_hash[(item.participant_id, item.result.sha256)].result
+            item.result.status = STATUS_DUPLICATE
+            if original.document_id is not None:
+                item.result.document_id = original.document_id
+                item.result.error = f"Same content as row {original.row}"
+            else:
+                item.result.error = "Same content as a failed row"
+
+        report.results = sorted(invalid + [item.result for item in planned], key=lambda r: r.row)
+        logger.info(f"Document import finished: {report.counts}")
+        return report
+
+    @staticmethod
+    def write_report(report: ImportReport, stream, fmt: str = "csv") -> None:
+        """Write the per-file results as CSV or JSON to a text stream."""
+
+        if fmt == "json":
+            json.dump(report.to_dict(), stream, indent=2)
+            return
+        writer = csv.DictWriter(stream, fieldnames=list(ImportResult.__dataclass_fields__))
+        writer.writeheader()
+        writer.writerows(asdict(result) for result in report.results)
@@ -1,16 +1,25 @@
 # backend/app/services/document_service.py - FIXED DELETE METHOD
+from fastapi import BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_, func
+from sqlalchemy import desc, and_, or_, func, select, update, delete, insert, case, literal, union_all
 from app.models.document import (
     Document,
     DocumentAccess,
     DocumentCategory,
-    DocumentNotification,
+    DocumentTag,
 )
-from typing import List, Optional, Dict, Any, Tuple
+from app.core.pagination import KeysetPage, paginate
+from app.services.notification_service import DocumentNotificationService
+from app.services.deletion_service import CascadeDeletionService, reap_files
+from typing import List, Optional, Dict, Any, FrozenSet
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 import logging
+import os
+import threading
+import time
+import weakref
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 DOCUMENTS_ROOT = BASE_DIR / "uploads" / "documents"
@@ -18,6 +27,53 @@ DOCUMENTS_ROOT.mkdir(parents=True, exist_ok=True)
 
 logger = logging.getLogger(__name__)
 
+CATEGORY_CACHE_TTL_SECONDS = int(os.getenv("CATEGORY_CACHE_TTL_SECONDS", "300"))
+
+
+class CategoryRegistry:
+    """Active document category ids, cached per database for ``ttl`` seconds.
+
+    Uploads and bulk imports validate categories against this set instead of
+    querying ``document_categories`` for every file.
+    """
+
+    def __init__(self, ttl: int = CATEGORY_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._cache = weakref.WeakKeyDictionary()
+
+    def active_ids(self, db: Session) -> FrozenSet[str]:
+        bind = db.get_bind()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(bind)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        ids = frozenset(
+            db.execute(
+                select(DocumentCategory.category_id).where(DocumentCategory.is_active == True)
+            ).scalars()
+        )
+        with self._lock:
+            self._cache[bind] = (now + self.ttl, ids)
+        return ids
+
+    def is_valid(self, db: Session, category: str) -> bool:
+        return category in self.active_ids(db)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+@lru_cache(maxsize=1)
+def get_category_registry() -> CategoryRegistry:
+    """Process-wide category registry."""
+
+    return CategoryRegistry()
+
+
 class DocumentService:
 
     @staticmethod
@@ -112,24 +168,104 @@ class DocumentService:
                 db.add(category)
         
         db.commit()
+        get_category_registry().invalidate()
     
+    # Sortable columns for document listings.  ``expiry_date`` is nullable so
+    # it is coalesced to keep keyset comparisons away from NULLs.
+    DOCUMENT_SORT_COLUMNS = {
+        "created_at": Document.created_at,
+        "title": Document.title,
+        "category": Document.category,
+        "expiry_date": func.coalesce(Document.expiry_date, datetime(9999, 12, 31)),
+    }
+
     @staticmethod
-    def get_documents_for_participant(
+    def normalize_tags(tags: Optional[List[str]]) -> List[str]:
+        """Trim, lower-case and de-duplicate tags (order preserved)"""
+        
+        normalized = []
+        for tag in tags or []:
+            value = str(tag).strip().lower()[:100]
+            if value and value not in normalized:
+                normalized.append(value)
+        return normalized
+    
+    @staticmethod
+    def sync_tags(db: Session, document: Document) -> None:
+        """Rewrite the ``document_tags`` rows for ``document``; the caller commits"""
+        
+        db.execute(delete(DocumentTag).where(DocumentTag.document_id == document.id))
+        rows = [
+            {"document_id": document.id, "participant_id": document.participant_id, "tag": tag}
+            for tag in DocumentService.normalize_tags(document.tags)
+        ]
+        if rows:
+            db.execute(insert(DocumentTag), rows)
+    
+    @staticmethod
+    def get_document_facets(
+        db: Session,
+        participant_id: int,
+        expiring_within_days: int = 30,
+        **filters
+    ) -> Dict[str, Any]:
+        """Count documents matching ``filters`` by category, tag and expiry state.
+        
+        ``filters`` are the ``build_document_query`` keyword arguments.  All
+        three facets come from a single ``UNION ALL`` statement over one CTE of
+        the filtered documents.
+        """
+        
+        now = datetime.now()
+        matching = (
+            DocumentService.build_document_query(db, participant_id, **filters)
+            .with_entities(Document.id, Document.category, Document.expiry_date)
+            .cte("matching_documents")
+        )
+        expiry_state = case(
+            (matching.c.expiry_date.is_(None), "none"),
+            (matching.c.expiry_date < now, "expired"),
+            (matching.c.expiry_date <= now + timedelta(days=expiring_within_days), "expiring_soon"),
+            else_="valid",
+        )
+        statement = union_all(
+            select(literal("category").label("facet"), matching.c.category.label("value"), func.count().label("count"))
+            .group_by(matching.c.category),
+            select(literal("tag"), DocumentTag.tag, func.count())
+            .join(matching, DocumentTag.document_id == matching.c.id)
+            .group_by(DocumentTag.tag),
+            select(literal("expiry"), expiry_state, func.count())
+            .group_by(expiry_state),
+        )
+        
+        facets: Dict[str, Any] = {"category": {}, "tag": {}, "expiry": {}}
+        for facet, value, count in db.execute(statement):
+            facets[facet][value] = count
+        facets["total"] = sum(facets["category"].values())
+        facets["tag"] = dict(sorted(facets["tag"].items(), key=lambda item: (-item[1], item[0])))
+        return facets
+    
+    @staticmethod
+    def build_document_query(
         db: Session,
         participant_id: int,
         search: Optional[str] = None,
         category: Optional[str] = None,
         is_expired: Optional[bool] = None,
         visible_to_support_worker: Optional[bool] = None,
-        sort_by: str = "created_at",
-        sort_order: str = "desc",
-        page: int = 1,
-        page_size: int = 20
-    ) -> Tuple[List[Document], int]:
-        """Get documents for a participant with filtering and pagination"""
+        current_only: bool = True,
+        tags: Optional[List[str]] = None,
+    ):
+        """Return the filtered (unordered) document query for a participant.
+        
+        Superseded versions are left out unless ``current_only`` is False;
+        they stay reachable through the version history.  ``tags`` keeps
+        documents carrying every listed tag, answered from ``document_tags``.
+        """
         
-        # Build query
         query = db.query(Document).filter(Document.participant_id == participant_id)
+        if current_only:
+            query = query.filter(Document.is_current_version == True)
         
         # Apply filters
         if search:
@@ -143,6 +279,16 @@ class DocumentService:
         if category:
             query = query.filter(Document.category == category)
         
+        tag_list = DocumentService.normalize_tags(tags)
+        if tag_list:
+            tagged = (
+                select(DocumentTag.document_id)
+                .where(DocumentTag.participant_id == participant_id, DocumentTag.tag.in_(tag_list))
+                .group_by(DocumentTag.document_id)
+                .having(func.count() == len(tag_list))
+            )
+            query = query.filter(Document.id.in_(tagged))
+        
         if visible_to_support_worker is not None:
             query = query.filter(Document.visible_to_support_worker == visible_to_support_worker)
         
@@ -156,77 +302,103 @@ class DocumentService:
                     or_(Document.expiry_date.is_(None), Document.expiry_date >= datetime.now())
                 )
         
-        # Apply sorting
-        if sort_order.lower() == "desc":
-            if sort_by == "created_at":
-                query = query.order_by(desc(Document.created_at))
-            elif sort_by == "title":
-                query = query.order_by(desc(Document.title))
-            elif sort_by == "category":
-                query = query.order_by(desc(Document.category))
-            elif sort_by == "expiry_date":
-                query = query.order_by(desc(Document.expiry_date))
-        else:
-            if sort_by == "created_at":
-                query = query.order_by(Document.created_at)
-            elif sort_by == "title":
-                query = query.order_by(Document.title)
-            elif sort_by == "category":
-                query = query.order_by(Document.category)
-            elif sort_by == "expiry_date":
-                query = query.order_by(Document.expiry_date)
-        
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination
-        documents = query.offset((page - 1) * page_size).limit(page_size).all()
-        
-        return documents, total
+        return query
+
+    @staticmethod
+    def get_documents_for_participant(
+        db: Session,
+        participant_id: int,
+        search: Optional[str] = None,
+        category: Optional[str] = None,
+        is_expired: Optional[bool] = None,
+        visible_to_support_worker: Optional[bool] = None,
+        sort_by: str = "created_at",
+        sort_order: str = "desc",
+        page: int = 1,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        total: str = "none",
+        current_only: bool = True,
+        tags: Optional[List[str]] = None
+    ) -> KeysetPage:
+        """Get documents for a participant with filtering and keyset pagination.
+
+        ``cursor`` continues from a previous page; ``page`` is only used by
+        legacy callers that have no cursor yet.  ``total`` is ``none``,
+        ``exact`` or ``estimate``.
+        """
+        
+        query = DocumentService.build_document_query(
+            db,
+            participant_id,
+            search=search,
+            category=category,
+            is_expired=is_expired,
+            visible_to_support_worker=visible_to_support_worker,
+            current_only=current_only,
+            tags=tags,
+        )
+        
+        if sort_by not in DocumentService.DOCUMENT_SORT_COLUMNS:
+            sort_by = "created_at"
+        descending = sort_order.lower() == "desc"
+        
+        return paginate(
+            query,
+            sort_key=f"{sort_by}:{'desc' if descending else 'asc'}",
+            sort_column=DocumentService.DOCUMENT_SORT_COLUMNS[sort_by],
+            id_column=Document.id,
+            descending=descending,
+            cursor=cursor,
+            limit=page_size,
+            offset=(page - 1) * page_size if page > 1 else None,
+            total=total,
+        )
     
     @staticmethod
     def get_document_stats(db: Session, participant_id: int) -> Dict[str, Any]:
-        """Get document statistics for a participant"""
-        
-        # Get base query
-        base_query = db.query(Document).filter(Document.participant_id == participant_id)
-        
-        # Total documents
-        total_documents = base_query.count()
-        
-        # Documents by category - get from database dynamically
-        categories = db.query(DocumentCategory).filter(DocumentCategory.is_active == True).all()
-        by_category = {}
-        for category in categories:
-            count = base_query.filter(Document.category == category.category_id).count()
-            if count > 0:
-                by_category[category.name] = count
-        
-        # Expired documents
-        expired_documents = base_query.filter(
-            and_(Document.expiry_date.isnot(None), Document.expiry_date < datetime.now())
-        ).count()
-        
-        # Expiring soon (within 30 days)
-        thirty_days_from_now = datetime.now() + timedelta(days=30)
-        expiring_soon = base_query.filter(
-            and_(
+        """Get document statistics for a participant.
+        
+        Everything comes from one query grouped by category with
+        conditional counts; category names are joined in, and only active
+        categories are listed under ``by_category``.
+        """
+        now = datetime.now()
+        thirty_days_from_now = now + timedelta(days=30)
+        seven_days_ago = now - timedelta(days=7)
+        
+        def count_where(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+        
+        rows = db.query(
+            DocumentCategory.name,
+            DocumentCategory.is_active,
+            func.count(Document.id),
+            count_where(and_(Document.expiry_date.isnot(None), Document.expiry_date < now)),
+            count_where(and_(
                 Document.expiry_date.isnot(None),
-                Document.expiry_date >= datetime.now(),
+                Document.expiry_date >= now,
                 Document.expiry_date <= thirty_days_from_now
-            )
-        ).count()
+            )),
+            count_where(Document.created_at >= seven_days_ago),
+        ).select_from(Document).outerjoin(
+            DocumentCategory, DocumentCategory.category_id == Document.category
+        ).filter(
+            Document.participant_id == participant_id,
+            Document.is_current_version == True
+        ).group_by(Document.category, DocumentCategory.name, DocumentCategory.is_active).all()
         
-        # Recent uploads (last 7 days)
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        recent_uploads = base_query.filter(Document.created_at >= seven_days_ago).count()
+        by_category = {}
+        for name, is_active, count, _expired, _expiring, _recent in rows:
+            if name and is_active:
+                by_category[name] = by_category.get(name, 0) + count
         
         return {
-            "total_documents": total_documents,
+            "total_documents": sum(row[2] for row in rows),
             "by_category": by_category,
-            "expired_documents": expired_documents,
-            "expiring_soon": expiring_soon,
-            "recent_uploads": recent_uploads
+            "expired_documents": sum(int(row[3]) for row in rows),
+            "expiring_soon": sum(int(row[4]) for row in rows),
+            "recent_uploads": sum(int(row[5]) for row in rows)
         }
     
     @staticmethod
@@ -244,17 +416,15 @@ class DocumentService:
         tags: Optional[List[str]] = None,
         visible_to_support_worker: bool = False,
         expiry_date: Optional[datetime] = None,
-        uploaded_by: str = "System User"
+        uploaded_by: str = "System User",
+        storage_codec: Optional[str] = None,
+        stored_size: Optional[int] = None,
+        sha256: Optional[str] = None
     ) -> Document:
         """Create a new document record"""
         
         # Validate category exists
-        category_exists = db.query(DocumentCategory).filter(
-            DocumentCategory.category_id == category,
-            DocumentCategory.is_active == True
-        ).first()
-        
-        if not category_exists:
+        if not get_category_registry().is_valid(db, category):
             raise ValueError(f"Invalid category: {category}")
         
         document = Document(
@@ -265,6 +435,9 @@ class DocumentService:
             file_path=file_path,
             file_size=file_size,
             mime_type=mime_type,
+            storage_codec=storage_codec,
+            stored_size=stored_size,
+            sha256=sha256,
             category=category,
             description=description,
             tags=tags or [],
@@ -275,11 +448,140 @@ class DocumentService:
         )
         
         db.add(document)
+        db.flush()
+        DocumentService.sync_tags(db, document)
         db.commit()
         db.refresh(document)
         
         return document
     
+    @staticmethod
+    def find_duplicate(db: Session, participant_id: int, sha256: Optional[str]) -> Optional[Document]:
+        """Return the participant's current active document with the same content, if any"""
+        
+        if not sha256:
+            return None
+        return db.query(Document).filter(
+            Document.participant_id == participant_id,
+            Document.sha256 == sha256,
+            Document.is_current_version == True,
+            Document.status == "active"
+        ).order_by(Document.id).first()
+    
+    @staticmethod
+    def create_version(
+        db: Session,
+        document_id: int,
+        participant_id: int,
+        filename: str,
+        original_filename: str,
+        file_path: str,
+        file_size: int,
+        mime_type: str,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        expiry_date: Optional[datetime] = None,
+        uploaded_by: str = "System User",
+        storage_codec: Optional[str] = None,
+        stored_size: Optional[int] = None,
+        sha256: Optional[str] = None
+    ) -> Optional[Document]:
+        """Upload a new version of a document.
+        
+        ``document_id`` may be any version in the chain; the new version is
+        linked to the chain's current version, which stops being current in
+        the same transaction.  Category, tags and visibility carry over.
+        Returns ``None`` when the document does not exist for the participant
+        and raises ``ValueError`` if another version was added concurrently.
+        """
+        
+        tree = CascadeDeletionService.version_tree([document_id])
+        current = db.query(Document).filter(
+            Document.id.in_(select(tree.c.id)),
+            Document.participant_id == participant_id,
+            Document.is_current_version == True
+        ).first()
+        
+        if not current:
+            return None
+        
+        try:
+            # Conditional flip: only one concurrent upload can supersede it
+            superseded = db.execute(
+                update(Document)
+                .where(Document.id == current.id, Document.is_current_version == True)
+                .values(is_current_version=False, updated_at=datetime.now())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not superseded:
+                raise ValueError("Document was superseded by another upload")
+            
+            document = Document(
+                participant_id=participant_id,
+                title=title or current.title,
+                filename=filename,
+                original_filename=original_filename,
+                file_path=file_path,
+                file_size=file_size,
+                mime_type=mime_type,
+                storage_codec=storage_codec,
+                stored_size=stored_size,
+                sha256=sha256,
+                category=current.category,
+                description=description if description is not None else current.description,
+                tags=list(current.tags or []),
+                version=current.version + 1,
+                is_current_version=True,
+                parent_document_id=current.id,
+                visible_to_support_worker=current.visible_to_support_worker,
+                expiry_date=expiry_date if expiry_date is not None else current.expiry_date,
+                uploaded_by=uploaded_by,
+                status="active"
+            )
+            db.add(document)
+            db.flush()
+            DocumentService.sync_tags(db, document)
+            
+            if document.expiry_date == current.expiry_date:
+                # Same expiry: the reminder already sent (or pending) covers this version
+                DocumentNotificationService.carry_over(db, current, document)
+            else:
+                # The superseded version no longer needs expiry reminders
+                DocumentNotificationService.reset_for_document(db, current)
+            
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        db.refresh(document)
+        return document
+    
+    @staticmethod
+    def get_version_history(db: Session, document_id: int, participant_id: int) -> List[Document]:
+        """Return every version in a document's chain, newest first"""
+        
+        # Walk up to the first version, then down through all later ones
+        ancestors = (
+            select(Document.id.label("id"), Document.parent_document_id.label("parent_id"))
+            .where(Document.id == document_id, Document.participant_id == participant_id)
+            .cte("document_ancestors", recursive=True)
+        )
+        ancestors = ancestors.union_all(
+            select(Document.id, Document.parent_document_id).where(Document.id == ancestors.c.parent_id)
+        )
+        root_id = db.execute(
+            select(ancestors.c.id).where(ancestors.c.parent_id.is_(None))
+        ).scalar()
+        
+        if root_id is None:
+            return []
+        
+        tree = CascadeDeletionService.version_tree([root_id])
+        return db.query(Document).filter(
+            Document.id.in_(select(tree.c.id))
+        ).order_by(desc(Document.version), desc(Document.id)).all()
+    
     @staticmethod
     def update_document(
         db: Session,
@@ -309,11 +611,18 @@ class DocumentService:
             if not category_exists:
                 raise ValueError(f"Invalid category: {update_data['category']}")
         
+        # A new expiry date needs a fresh expiry warning
+        if 'expiry_date' in update_data and update_data['expiry_date'] != document.expiry_date:
+            DocumentNotificationService.reset_for_document(db, document)
+        
         # Update fields
         for field, value in update_data.items():
             if hasattr(document, field):
                 setattr(document, field, value)
         
+        if 'tags' in update_data:
+            DocumentService.sync_tags(db, document)
+        
         document.updated_at = datetime.now()
         db.commit()
         db.refresh(document)
@@ -324,87 +633,26 @@ class DocumentService:
     def delete_document(
         db: Session,
         document_id: int,
-        participant_id: int
+        participant_id: int,
+        background_tasks: Optional[BackgroundTasks] = None
     ) -> bool:
-        """Delete a document - FIXED VERSION WITH PROPER CASCADE HANDLING"""
+        """Delete a document together with all later versions built on it.
         
-        try:
-            document = db.query(Document).filter(
-                and_(
-                    Document.id == document_id,
-                    Document.participant_id == participant_id
-                )
-            ).first()
-            
-            if not document:
-                logger.warning(f"Document {document_id} not found for participant {participant_id}")
-                return False
-            
-            # Store file path before deleting record
-            file_path = document.file_path
-            
-            # Step 1: Delete all related document access records first
-            logger.info(f"Deleting document access records for document {document_id}")
-            access_count = db.query(DocumentAccess).filter(
-                DocumentAccess.document_id == document_id
-            ).count()
-            
-            if access_count > 0:
-                logger.info(f"Found {access_count} access records to delete")
-                db.query(DocumentAccess).filter(
-                    DocumentAccess.document_id == document_id
-                ).delete(synchronize_session='fetch')
-                logger.info(f"Deleted {access_count} document access records")
-            
-            # Step 2: Delete all related document notifications
-            logger.info(f"Deleting document notifications for document {document_id}")
-            notification_count = db.query(DocumentNotification).filter(
-                DocumentNotification.document_id == document_id
-            ).count()
-            
-            if notification_count > 0:
-                logger.info(f"Found {notification_count} notification records to delete")
-                db.query(DocumentNotification).filter(
-                    DocumentNotification.document_id == document_id
-                ).delete(synchronize_session='fetch')
-                logger.info(f"Deleted {notification_count} document notification records")
-            
-            # Step 3: Delete any child document versions (if they exist)
-            child_docs = db.query(Document).filter(
-                Document.parent_document_id == document_id
-            ).all()
-            
-            if child_docs:
-                logger.info(f"Found {len(child_docs)} child document versions to delete")
-                for child_doc in child_docs:
-                    # Recursively delete child documents and their dependencies
-                    DocumentService.delete_document(db, child_doc.id, child_doc.participant_id)
-            
-            # Step 4: Now delete the main document record
-            logger.info(f"Deleting main document record {document_id}")
-            db.delete(document)
-            db.commit()
-            logger.info(f"Successfully deleted document {document_id} from database")
-            
-            # Step 5: Delete file from disk (do this last, after successful DB deletion)
-            try:
-                if file_path:
-                    resolved_path = DocumentService.resolve_file_path(file_path)
-                    if resolved_path.exists():
-                        resolved_path.unlink()
-                        logger.info(f"Successfully deleted file: {resolved_path}")
-                    else:
-                        logger.warning(f"File not found on disk: {resolved_path}")
-            except Exception as e:
-                logger.warning(f"Could not delete file {file_path}: {str(e)}")
-                # Don't fail the operation if file can't be deleted
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error deleting document {document_id}: {str(e)}")
-            db.rollback()
-            raise e
+        Rows are removed in bulk in one transaction; files are removed after
+        the commit, as a background task when ``background_tasks`` is given.
+        """
+        
+        result = CascadeDeletionService.delete_document_tree(db, document_id, participant_id)
+        if result is None:
+            logger.warning(f"Document {document_id} not found for participant {participant_id}")
+            return False
+        
+        if background_tasks is not None:
+            background_tasks.add_task(reap_files, result.file_paths)
+        else:
+            reap_files(result.file_paths)
+        
+        return True
     
     @staticmethod
     def log_document_access(
@@ -453,7 +701,8 @@ class DocumentService:
                 Document.expiry_date.isnot(None),
                 Document.expiry_date >= datetime.now(),
                 Document.expiry_date <= cutoff_date,
-                Document.status == "active"
+                Document.status == "active",
+                Document.is_current_version == True
             )
         )
         
@@ -473,7 +722,8 @@ class DocumentService:
             and_(
                 Document.expiry_date.isnot(None),
                 Document.expiry_date < datetime.now(),
-                Document.status == "active"
+                Document.status == "active",
+                Document.is_current_version == True
             )
         )
         
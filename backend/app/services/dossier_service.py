@@ -0,0 +1,362 @@
+"""Merged participant dossier PDFs for case reviews.
+
+A dossier is one PDF holding the participant's cached generated PDFs (the
+latest of each document type, e.g. the current service agreement and care
+plan) followed by their current uploaded PDF documents.  Source files are
+concatenated at the object level with pypdf: their pages, fonts and images
+are copied as-is and never re-rendered.  A generated cover page and a table of
+contents with clickable entries come first, and every source also gets an
+outline (bookmark) entry.
+
+Sources are read from storage without loading them into memory when the
+backend is local and the file is stored raw; compressed or remote files are
+spooled to a temporary file first because PDF parsing needs random access.
+The merged output is written to a spooled temporary file and streamed from
+there, so large dossiers spill to disk instead of growing the process.
+
+``pypdf`` is optional: without it ``PYPDF_AVAILABLE`` is ``False`` and the
+dossier endpoint reports the feature as unavailable.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.core.storage import CHUNK_SIZE, StorageBackend, get_storage
+from app.models.document import Document, DocumentAccess
+from app.models.document_generation import GeneratedDocument
+from app.models.participant import Participant
+from app.services.document_compression import iter_decompressed
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.annotations import Link
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    PYPDF_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    PYPDF_AVAILABLE = False
+
+# Sources and output up to this size stay in memory; larger ones spill to disk.
+DOSSIER_SPOOL_MAX_BYTES = int(os.getenv("DOSSIER_SPOOL_MAX_MB", "16")) * 1024 * 1024
+
+PDF_MIME_TYPE = "application/pdf"
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 56
+TOC_LINE_HEIGHT = 18
+TOC_FIRST_LINE = PAGE_HEIGHT - MARGIN - 60
+TOC_ENTRIES_PER_PAGE = (TOC_FIRST_LINE - MARGIN) // TOC_LINE_HEIGHT
+
+
+@dataclass
+class DossierSource:
+    """One PDF that goes into the dossier."""
+
+    kind: str  # generated, document
+    id: int
+    title: str
+    category: str
+    key: str
+    codec: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+@dataclass
+class DossierEntry:
+    source: DossierSource
+    start_page: int = 0
+    page_count: int = 0
+
+
+@dataclass
+class DossierReport:
+    entries: List[DossierEntry] = field(default_factory=list)
+    skipped: List[Dict[str, Any]] = field(default_factory=list)
+    page_count: int = 0
+    size: int = 0
+
+
+def _pdf_string(value: str) -> bytes:
+    """A PDF literal string for the standard Helvetica (WinAnsi) fonts."""
+
+    data = str(value).encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _truncate(value: str, limit: int) -> str:
+    return value if len(value) <= limit else value[: limit - 3] + "..."
+
+
+class DossierService:
+    """Collect a participant's PDFs and merge them into one dossier."""
+
+    @staticmethod
+    def collect_sources(
+        db: Session,
+        participant_id: int,
+        document_ids: Optional[Sequence[int]] = None,
+        categories: Optional[Sequence[str]] = None,
+    ) -> List[DossierSource]:
+        """Latest generated PDF per document type, then current uploaded PDFs."""
+
+        latest = (
+            db.query(func.max(GeneratedDocument.id))
+            .filter(
+                GeneratedDocument.participant_id == participant_id,
+                GeneratedDocument.file_format == "pdf",
+                GeneratedDocument.file_path.isnot(None),
+            )
+            .group_by(GeneratedDocument.document_type)
+        )
+        generated = (
+            db.query(GeneratedDocument)
+            .filter(GeneratedDocument.id.in_(latest.scalar_subquery()))
+            .order_by(GeneratedDocument.document_type, GeneratedDocument.id)
+            .all()
+        )
+
+        uploads = db.query(Document).filter(
+            Document.participant_id == participant_id,
+            Document.status == "active",
+            Document.is_current_version == True,  # noqa: E712
+            Document.mime_type == PDF_MIME_TYPE,
+        )
+        if document_ids:
+            uploads = uploads.filter(Document.id.in_(document_ids))
+        if categories:
+            uploads = uploads.filter(Document.category.in_(categories))
+        uploads = uploads.order_by(Document.category, Document.created_at, Document.id).all()
+
+        sources = [
+            DossierSource(
+                kind="generated",
+                id=doc.id,
+                title=doc.document_name,
+                category=doc.document_type,
+                key=doc.file_path,
+                created_at=doc.created_at,
+            )
+            for doc in generated
+            if not document_ids
+        ]
+        sources.extend(
+            DossierSource(
+                kind="document",
+                id=doc.id,
+                title=doc.title or doc.original_filename,
+                category=doc.category,
+                key=doc.file_path,
+                codec=doc.storage_codec,
+                created_at=doc.created_at,
+            )
+            for doc in uploads
+        )
+        return sources
+
+    @staticmethod
+    def _open_source(storage: StorageBackend, source: DossierSource, stack: ExitStack) -> BinaryIO:
+        """A seekable stream of the source's original bytes."""
+
+        path = storage.local_path(source.key)
+        if source.codec is None and path is not None:
+            return stack.enter_context(open(path, "rb"))
+
+        spool = stack.enter_context(tempfile.SpooledTemporaryFile(max_size=DOSSIER_SPOOL_MAX_BYTES))
+        for chunk in iter_decompressed(source.key, source.codec, storage, CHUNK_SIZE):
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+
+    @staticmethod
+    def _text_page(writer, commands: List[Tuple[str, int, float, float, str]]):
+        """Append a page drawing ``(font, size, x, y, text)`` commands with Helvetica."""
+
+        page = writer.add_blank_page(PAGE_WIDTH, PAGE_HEIGHT)
+        fonts = DictionaryObject()
+        for name, base_font in (("/F1", "/Helvetica"), ("/F2", "/Helvetica-Bold")):
+            fonts[NameObject(name)] = DictionaryObject({
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject(base_font),
+                NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+            })
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/Font"): fonts})
+
+        content = b"".join(
+            b"BT /%s %d Tf %.1f %.1f Td %s Tj ET\n" % (font.encode(), size, x, y, _pdf_string(text))
+            for font, size, x, y, text in commands
+        )
+        stream = DecodedStreamObject()
+        stream.set_data(content)
+        page.replace_contents(stream)
+        return page
+
+    @staticmethod
+    def _cover_page(writer, participant: Participant, report: DossierReport, generated_at: datetime) -> None:
+        lines = [
+            ("F2", 26, MARGIN, PAGE_HEIGHT - 200, "Participant Dossier"),
+            ("F1", 16, MARGIN, PAGE_HEIGHT - 240, f"{participant.first_name} {participant.last_name}"),
+        ]
+        details = [
+            f"NDIS number: {participant.ndis_number or 'Not recorded'}",
+            f"Date of birth: {participant.date_of_birth.isoformat() if participant.date_of_birth else 'Not recorded'}",
+            f"Status: {participant.status or 'Not recorded'}",
+            f"Documents: {len(report.entries)}",
+            f"Generated: {generated_at.strftime('%d %B %Y %H:%M UTC')}",
+        ]
+        for index, text in enumerate(details):
+            lines.append(("F1", 12, MARGIN, PAGE_HEIGHT - 290 - index * 20, text))
+        if report.skipped:
+            lines.append((
+                "F1", 10, MARGIN, MARGIN,
+                f"{len(report.skipped)} document(s) could not be included; see the download response for details.",
+            ))
+        DossierService._text_page(writer, lines)
+
+    @staticmethod
+    def _toc_pages(writer, entries: List[DossierEntry], first_page: int) -> None:
+        page_total = max(1, math.ceil(len(entries) / TOC_ENTRIES_PER_PAGE))
+        for toc_index in range(page_total):
+            chunk = entries[toc_index * TOC_ENTRIES_PER_PAGE:(toc_index + 1) * TOC_ENTRIES_PER_PAGE]
+            lines = [("F2", 18, MARGIN, PAGE_HEIGHT - MARGIN - 20, "Contents")]
+            if not entries:
+                lines.append(("F1", 11, MARGIN, TOC_FIRST_LINE, "No PDF documents were found for this participant."))
+
+            links = []
+            for row, entry in enumerate(chunk):
+                number = toc_index * TOC_ENTRIES_PER_PAGE + row + 1
+                y = TOC_FIRST_LINE - row * TOC_LINE_HEIGHT
+                label = _truncate(f"{number}. {entry.source.title} ({entry.source.category})", 80)
+                lines.append(("F1", 11, MARGIN, y, label))
+                lines.append(("F1", 11, PAGE_WIDTH - MARGIN - 30, y, str(entry.start_page + 1)))
+                links.append((y, entry.start_page))
+
+            DossierService._text_page(writer, lines)
+            for y, target in links:
+                writer.add_annotation(
+                    page_number=first_page + toc_index,
+                    annotation=Link(
+                        rect=(MARGIN, y - 4, PAGE_WIDTH - MARGIN, y + TOC_LINE_HEIGHT - 6),
+                        target_page_index=target,
+                    ),
+                )
+
+    @staticmethod
+    def build(
+        participant: Participant,
+        sources: Sequence[DossierSource],
+        storage: Optional[StorageBackend] = None,
+    ) -> Tuple[BinaryIO, DossierReport]:
+        """Merge ``sources`` into a dossier; returns the spooled PDF (at offset 0) and a report.
+
+        Sources that are missing, unreadable or encrypted are skipped and
+        listed in ``report.skipped``.
+        """
+
+        if not PYPDF_AVAILABLE:
+            raise RuntimeError("pypdf is required to build dossiers")
+
+        storage = storage or get_storage()
+        report = DossierReport()
+        generated_at = datetime.now(timezone.utc)
+        output = tempfile.SpooledTemporaryFile(max_size=DOSSIER_SPOOL_MAX_BYTES)
+
+        with ExitStack() as stack:
+            readers = []
+            for source in sources:
+                reason = None
+                try:
+                    if not source.key or not storage.exists(source.key):
+                        reason = "missing"
+                    else:
+                        reader = PdfReader(DossierService._open_source(storage, source, stack))
+                        if reader.is_encrypted and not reader.decrypt(""):
+                            reason = "encrypted"
+                        else:
+                            page_count = len(reader.pages)
+                except Exception as e:
+                    logger.warning(f"Dossier: could not read {source.kind} {source.id}: {str(e)}")
+                    reason = "unreadable"
+
+                if reason:
+                    report.skipped.append({"kind": source.kind, "id": source.id, "reason": reason})
+                elif page_count:
+                    readers.append(reader)
+                    report.entries.append(DossierEntry(source=source, page_count=page_count))
+
+            toc_page_count = max(1, math.ceil(len(report.entries) / TOC_ENTRIES_PER_PAGE))
+            next_page = 1 + toc_page_count
+            for entry in report.entries:
+                entry.start_page = next_page
+                next_page += entry.page_count
+
+            writer = PdfWriter()
+            DossierService._cover_page(writer, participant, report, generated_at)
+            DossierService._toc_pages(writer, report.entries, first_page=1)
+            for entry, reader in zip(report.entries, readers):
+                # Object-level copy: page trees, fonts and images are reused as-is.
+                writer.append(reader, import_outline=False)
+                writer.add_outline_item(entry.source.title, entry.start_page)
+
+            writer.add_metadata({
+                "/Title": f"Participant dossier - {participant.first_name} {participant.last_name}",
+                "/Producer": "NDIS participant management",
+            })
+            writer.write(output)
+            report.page_count = next_page
+
+        report.size = output.tell()
+        output.seek(0)
+        return output, report
+
+    @staticmethod
+    def iter_output(output: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream a built dossier and close it afterwards."""
+
+        try:
+            while True:
+                chunk = output.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            output.close()
+
+    @staticmethod
+    def log_access(
+        db: Session,
+        report: DossierReport,
+        user_id: int = 1,
+        user_role: str = "admin",
+        ip_address: Optional[str] = None,
+    ) -> None:
+        """Record one ``dossier`` access per uploaded document included, in a single insert."""
+
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "document_id": entry.source.id,
+                "user_id": user_id,
+                "user_role": user_role,
+                "access_type": "dossier",
+                "accessed_at": now,
+                "ip_address": ip_address,
+            }
+            for entry in report.entries
+            if entry.source.kind == "document"
+        ]
+        if rows:
+            db.execute(insert(DocumentAccess), rows)
+            db.commit()
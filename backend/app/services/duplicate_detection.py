@@ -0,0 +1,587 @@
+"""Duplicate candidates across referrals and participants.
+
+The same person is often referred more than once, by different agencies and
+with small spelling differences.  Comparing every record with every other
+does not scale, so records are grouped by blocking keys and only compared
+within a block:
+
+* ``dob:`` date of birth
+* ``ndis:`` NDIS number with everything but digits removed
+* ``name:`` postcode plus the Soundex code of the surname
+
+Keys live in ``duplicate_blocking_keys``.  Checking a new record is an index
+lookup for the records sharing one of its keys, followed by one scoring
+pass over them.  Names and addresses are scored against the whole block in a
+single call to rapidfuzz (optional; difflib is the fallback).  Date of birth,
+NDIS number, phone and email must match exactly.  Fields missing on either
+side are left out of the weighted score.
+
+``check`` runs on insert (referral intake, batch ingestion, participant
+creation and imports).  ``sweep`` rebuilds every key and rescores every
+block, for a first run or after bulk changes.  Pairs at or above
+``DUPLICATE_SCORE_THRESHOLD`` become ``DuplicateCandidate`` rows for the
+intake team to confirm or dismiss; a dismissed pair is never reopened.  A
+participant and the referral it was converted from are not candidates.
+"""
+from __future__ import annotations
+
+import difflib
+import logging
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.duplicate import DuplicateBlockingKey, DuplicateCandidate
+from app.models.participant import Participant
+from app.models.referral import Referral
+
+try:
+    from rapidfuzz import fuzz, process, utils as fuzz_utils
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    RAPIDFUZZ_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_SCORE_THRESHOLD = float(os.getenv("DUPLICATE_SCORE_THRESHOLD", "0.75"))
+# Blocks bigger than this (a very common surname in one postcode, say) are skipped.
+DUPLICATE_MAX_BLOCK_SIZE = int(os.getenv("DUPLICATE_MAX_BLOCK_SIZE", "500"))
+DUPLICATE_CHECK_ON_INSERT = os.getenv("DUPLICATE_CHECK_ON_INSERT", "true").lower() in ("1", "true", "yes")
+
+RECORD_MODELS = {
+    "referral": Referral,
+    "participant": Participant,
+}
+
+REVIEW_STATUSES = ("open", "dismissed", "confirmed")
+
+FIELD_WEIGHTS = {
+    "name": 0.35,
+    "date_of_birth": 0.2,
+    "ndis_number": 0.2,
+    "phone": 0.1,
+    "address": 0.1,
+    "email": 0.05,
+}
+
+_PROFILE_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "date_of_birth",
+    "phone_number",
+    "email_address",
+    "street_address",
+    "postcode",
+    "ndis_number",
+)
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+Ref = Tuple[str, int]
+Pair = Tuple[str, int, str, int]
+
+
+def soundex(name: Optional[str]) -> Optional[str]:
+    """American Soundex, so "Smith" and "Smyth" share a block."""
+
+    letters = re.sub(r"[^a-z]", "", (name or "").lower())
+    if not letters:
+        return None
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0])
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter)
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def normalize_ndis(value: Optional[str]) -> Optional[str]:
+    digits = re.sub(r"\D", "", value or "")
+    return digits if len(digits) >= 6 else None
+
+
+def normalize_phone(value: Optional[str]) -> Optional[str]:
+    digits = re.sub(r"\D", "", value or "")
+    if digits.startswith("61") and len(digits) == 11:
+        digits = "0" + digits[2:]
+    return digits or None
+
+
+def _text(value: Optional[str]) -> Optional[str]:
+    text = " ".join(re.sub(r"[^0-9a-z]+", " ", (value or "").lower()).split())
+    return text or None
+
+
+@dataclass(frozen=True)
+class RecordProfile:
+    """The normalised fields of one referral or participant that are compared."""
+
+    record_type: str
+    record_id: int
+    name: Optional[str]
+    surname_code: Optional[str]
+    date_of_birth: Optional[date]
+    ndis_number: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    address: Optional[str]
+    postcode: Optional[str]
+    referral_id: Optional[int] = None  # participants: the referral they were converted from
+
+    @property
+    def ref(self) -> Ref:
+        return (self.record_type, self.record_id)
+
+
+def _profile_query(record_type: str):
+    model = RECORD_MODELS[record_type]
+    columns = [getattr(model, name) for name in _PROFILE_COLUMNS]
+    if model is Participant:
+        columns.append(Participant.referral_id)
+    return select(*columns)
+
+
+def _profile(record_type: str, row) -> RecordProfile:
+    return RecordProfile(
+        record_type=record_type,
+        record_id=row.id,
+        name=_text(f"{row.first_name or ''} {row.last_name or ''}"),
+        surname_code=soundex(row.last_name),
+        date_of_birth=row.date_of_birth,
+        ndis_number=normalize_ndis(row.ndis_number),
+        phone=normalize_phone(row.phone_number),
+        email=(row.email_address or "").strip().lower() or None,
+        address=_text(row.street_address),
+        postcode=(row.postcode or "").strip() or None,
+        referral_id=getattr(row, "referral_id", None),
+    )
+
+
+def blocking_keys(profile: RecordProfile) -> List[str]:
+    keys = []
+    if profile.date_of_birth:
+        keys.append(f"dob:{profile.date_of_birth.isoformat()}")
+    if profile.ndis_number:
+        keys.append(f"ndis:{profile.ndis_number}")
+    if profile.postcode and profile.surname_code:
+        keys.append(f"name:{profile.postcode}:{profile.surname_code}")
+    return keys
+
+
+def similarities(query: Optional[str], choices: Sequence[Optional[str]]) -> List[float]:
+    """Similarity (0-1) of ``query`` to each choice, word order ignored."""
+
+    scores = [0.0] * len(choices)
+    if not query:
+        return scores
+    if RAPIDFUZZ_AVAILABLE:
+        matches = process.extract(
+            query, choices, scorer=fuzz.token_sort_ratio, processor=fuzz_utils.default_process, limit=None
+        )
+        for _choice, score, index in matches:
+            scores[index] = score / 100
+        return scores
+
+    query = " ".join(sorted(query.split()))
+    for index, choice in enumerate(choices):
+        if choice:
+            choice = " ".join(sorted(choice.split()))
+            scores[index] = difflib.SequenceMatcher(None, query, choice).ratio()
+    return scores
+
+
+def score_block(profile: RecordProfile, others: Sequence[RecordProfile]) -> Iterator[Tuple[RecordProfile, float, Dict[str, float]]]:
+    """Score ``profile`` against every record in ``others``."""
+
+    names = similarities(profile.name, [other.name for other in others])
+    addresses = similarities(profile.address, [other.address for other in others])
+    for index, other in enumerate(others):
+        fields = {"name": names[index]}
+        if profile.address and other.address:
+            fields["address"] = addresses[index]
+        for name, mine, theirs in (
+            ("date_of_birth", profile.date_of_birth, other.date_of_birth),
+            ("ndis_number", profile.ndis_number, other.ndis_number),
+            ("phone", profile.phone, other.phone),
+            ("email", profile.email, other.email),
+        ):
+            if mine and theirs:
+                fields[name] = 1.0 if mine == theirs else 0.0
+        weight = sum(FIELD_WEIGHTS[name] for name in fields)
+        score = sum(FIELD_WEIGHTS[name] * value for name, value in fields.items()) / weight
+        yield other, round(score, 4), {name: round(value, 4) for name, value in fields.items()}
+
+
+def _linked(a: RecordProfile, b: RecordProfile) -> bool:
+    """A participant and the referral it came from are the same record, not duplicates."""
+
+    for participant, referral in ((a, b), (b, a)):
+        if (
+            participant.record_type == "participant"
+            and referral.record_type == "referral"
+            and participant.referral_id == referral.record_id
+        ):
+            return True
+    return False
+
+
+def _pair(a: Ref, b: Ref) -> Pair:
+    left, right = sorted((a, b))
+    return (*left, *right)
+
+
+def _partitions(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class DuplicateDetectionService:
+    """Find, store and review likely duplicate referrals and participants."""
+
+    @staticmethod
+    def load_profiles(db: Session, refs: Iterable[Ref]) -> Dict[Ref, RecordProfile]:
+        """Load profiles for ``refs`` with one query per record type (per 500 ids)."""
+
+        ids_by_type: Dict[str, List[int]] = defaultdict(list)
+        for record_type, record_id in set(refs):
+            ids_by_type[record_type].append(record_id)
+        profiles = {}
+        for record_type, ids in ids_by_type.items():
+            model = RECORD_MODELS[record_type]
+            for chunk in _partitions(sorted(ids), 500):
+                for row in db.execute(_profile_query(record_type).where(model.id.in_(chunk))):
+                    profile = _profile(record_type, row)
+                    profiles[profile.ref] = profile
+        return profiles
+
+    @staticmethod
+    def _write_keys(db: Session, profiles: Iterable[RecordProfile]) -> None:
+        profiles = list(profiles)
+        refs = [profile.ref for profile in profiles]
+        for chunk in _partitions(refs, 500):
+            db.execute(
+                delete(DuplicateBlockingKey)
+                .where(tuple_(DuplicateBlockingKey.record_type, DuplicateBlockingKey.record_id).in_(chunk))
+                .execution_options(synchronize_session=False)
+            )
+        rows = [
+            {"record_type": profile.record_type, "record_id": profile.record_id, "block_key": key}
+            for profile in profiles
+            for key in blocking_keys(profile)
+        ]
+        if rows:
+            db.execute(insert(DuplicateBlockingKey), rows)
+
+    @staticmethod
+    def _store(
+        db: Session,
+        matches: Dict[Pair, Tuple[float, Dict[str, float]]],
+        existing: Dict[Pair, Tuple[int, str]],
+    ) -> None:
+        """Insert new pairs and rescore open ones; reviewed pairs are left alone."""
+
+        updates, inserts = [], []
+        for pair, (score, field_scores) in matches.items():
+            if pair in existing:
+                candidate_id, status = existing[pair]
+                if status == "open":
+                    updates.append({"id": candidate_id, "score": score, "field_scores": field_scores})
+            else:
+                left_type, left_id, right_type, right_id = pair
+                inserts.append({
+                    "left_type": left_type, "left_id": left_id,
+                    "right_type": right_type, "right_id": right_id,
+                    "score": score, "field_scores": field_scores, "status": "open",
+                })
+        if updates:
+            db.execute(update(DuplicateCandidate), updates)
+        if inserts:
+            db.execute(insert(DuplicateCandidate), inserts)
+
+    @staticmethod
+    def _existing(db: Session, pairs: Optional[Iterable[Pair]] = None) -> Dict[Pair, Tuple[int, str]]:
+        columns = (
+            DuplicateCandidate.left_type, DuplicateCandidate.left_id,
+            DuplicateCandidate.right_type, DuplicateCandidate.right_id,
+        )
+        query = select(*columns, DuplicateCandidate.id, DuplicateCandidate.status)
+        if pairs is None:
+            return {tuple(row[:4]): (row.id, row.status) for row in db.execute(query)}
+        existing = {}
+        for chunk in _partitions(list(pairs), 500):
+            for row in db.execute(query.where(tuple_(*columns).in_(chunk))):
+                existing[tuple(row[:4])] = (row.id, row.status)
+        return existing
+
+    @staticmethod
+    def check(
+        db: Session,
+        record_type: str,
+        record_ids: Iterable[int],
+        threshold: float = DUPLICATE_SCORE_THRESHOLD,
+        max_block_size: int = DUPLICATE_MAX_BLOCK_SIZE,
+    ) -> Dict[Pair, float]:
+        """Key the given records, compare them with their blocks and store candidates.
+
+        Returns the matching pairs with their scores.  Commits.
+        """
+
+        profiles = DuplicateDetectionService.load_profiles(db, [(record_type, record_id) for record_id in record_ids])
+        if not profiles:
+            return {}
+        try:
+            DuplicateDetectionService._write_keys(db, profiles.values())
+            keys = {key for profile in profiles.values() for key in blocking_keys(profile)}
+            usable = set()
+            for chunk in _partitions(sorted(keys), 500):
+                usable.update(
+                    block_key for block_key, size in db.execute(
+                        select(DuplicateBlockingKey.block_key, func.count())
+                        .where(DuplicateBlockingKey.block_key.in_(chunk))
+                        .group_by(DuplicateBlockingKey.block_key)
+                    )
+                    if 1 < size <= max_block_size
+                )
+            members: Dict[str, List[Ref]] = defaultdict(list)
+            for chunk in _partitions(sorted(usable), 500):
+                for row in db.execute(
+                    select(DuplicateBlockingKey.block_key, DuplicateBlockingKey.record_type, DuplicateBlockingKey.record_id)
+                    .where(DuplicateBlockingKey.block_key.in_(chunk))
+                ):
+                    members[row.block_key].append((row.record_type, row.record_id))
+
+            neighbours: Dict[Ref, set] = {}
+            for ref, profile in profiles.items():
+                neighbours[ref] = {
+                    other for key in blocking_keys(profile) for other in members.get(key, ()) if other != ref
+                }
+            others = DuplicateDetectionService.load_profiles(
+                db, {other for refs in neighbours.values() for other in refs if other not in profiles}
+            )
+            others.update(profiles)
+
+            matches: Dict[Pair, Tuple[float, Dict[str, float]]] = {}
+            for ref, profile in profiles.items():
+                block = [others[other] for other in neighbours[ref] if other in others]
+                for other, score, field_scores in score_block(profile, block):
+                    if score >= threshold and not _linked(profile, other):
+                        matches[_pair(ref, other.ref)] = (score, field_scores)
+
+            DuplicateDetectionService._store(db, matches, DuplicateDetectionService._existing(db, matches))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return {pair: score for pair, (score, _fields) in matches.items()}
+
+    @staticmethod
+    def check_new(db: Session, record_type: str, record_ids: Iterable[int]) -> None:
+        """Run ``check`` after an insert without ever failing the insert itself."""
+
+        record_ids = list(record_ids)
+        if not DUPLICATE_CHECK_ON_INSERT or not record_ids:
+            return
+        try:
+            DuplicateDetectionService.check(db, record_type, record_ids)
+        except Exception as e:
+            logger.warning(f"Duplicate check for {len(record_ids)} {record_type}(s) failed: {str(e)}")
+
+    @staticmethod
+    def sweep(
+        db: Session,
+        threshold: float = DUPLICATE_SCORE_THRESHOLD,
+        max_block_size: int = DUPLICATE_MAX_BLOCK_SIZE,
+        batch_size: int = 2000,
+    ) -> Dict[str, int]:
+        """Rebuild every blocking key and rescore every block.
+
+        Open candidates that no longer score above the threshold are removed;
+        reviewed ones are kept.  Commits.
+        """
+
+        profiles: Dict[Ref, RecordProfile] = {}
+        blocks: Dict[str, List[Ref]] = defaultdict(list)
+        for record_type in RECORD_MODELS:
+            rows = db.execute(_profile_query(record_type).execution_options(yield_per=batch_size))
+            for row in rows:
+                profile = _profile(record_type, row)
+                profiles[profile.ref] = profile
+                for key in blocking_keys(profile):
+                    blocks[key].append(profile.ref)
+
+        stats = {"records": len(profiles), "blocks": 0, "skipped_blocks": 0, "comparisons": 0}
+        matches: Dict[Pair, Tuple[float, Dict[str, float]]] = {}
+        compared = set()
+        for refs in blocks.values():
+            if len(refs) < 2:
+                continue
+            if len(refs) > max_block_size:
+                stats["skipped_blocks"] += 1
+                continue
+            stats["blocks"] += 1
+            for index, ref in enumerate(refs):
+                block = []
+                for other in refs[index + 1:]:
+                    pair = _pair(ref, other)
+                    if pair not in compared:
+                        compared.add(pair)
+                        block.append(profiles[other])
+                stats["comparisons"] += len(block)
+                for other, score, field_scores in score_block(profiles[ref], block):
+                    if score >= threshold and not _linked(profiles[ref], other):
+                        matches[_pair(ref, other.ref)] = (score, field_scores)
+
+        try:
+            db.execute(delete(DuplicateBlockingKey))
+            rows = [
+                {"record_type": record_type, "record_id": record_id, "block_key": key}
+                for key, refs in blocks.items()
+                for record_type, record_id in refs
+            ]
+            for chunk in _partitions(rows, batch_size):
+                db.execute(insert(DuplicateBlockingKey), chunk)
+
+            existing = DuplicateDetectionService._existing(db)
+            stale = [
+                candidate_id for pair, (candidate_id, status) in existing.items()
+                if status == "open" and pair not in matches
+            ]
+            for chunk in _partitions(stale, 500):
+                db.execute(delete(DuplicateCandidate).where(DuplicateCandidate.id.in_(chunk)))
+            DuplicateDetectionService._store(db, matches, existing)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        stats["candidates"] = len(matches)
+        logger.info(f"Duplicate sweep finished: {stats}")
+        return stats
+
+    @staticmethod
+    def list_candidates(
+        db: Session,
+        status: str = "open",
+        min_score: float = 0.0,
+        record_type: Optional[str] = None,
+        record_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Candidates with both records' details, best matches first."""
+
+        query = db.query(DuplicateCandidate).filter(
+            DuplicateCandidate.status == status,
+            DuplicateCandidate.score >= min_score,
+        )
+        if record_type and record_id is not None:
+            query = query.filter(or_(
+                and_(DuplicateCandidate.left_type == record_type, DuplicateCandidate.left_id == record_id),
+                and_(DuplicateCandidate.right_type == record_type, DuplicateCandidate.right_id == record_id),
+            ))
+        candidates = (
+            query.order_by(DuplicateCandidate.score.desc(), DuplicateCandidate.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        refs = [(c.left_type, c.left_id) for c in candidates] + [(c.right_type, c.right_id) for c in candidates]
+        records = DuplicateDetectionService._summaries(db, refs)
+        return [
+            {
+                "id": candidate.id,
+                "score": candidate.score,
+                "field_scores": candidate.field_scores or {},
+                "status": candidate.status,
+                "left": records.get((candidate.left_type, candidate.left_id)),
+                "right": records.get((candidate.right_type, candidate.right_id)),
+                "reviewed_by": candidate.reviewed_by,
+                "reviewed_at": candidate.reviewed_at.isoformat() if candidate.reviewed_at else None,
+            }
+            for candidate in candidates
+        ]
+
+    @staticmethod
+    def _summaries(db: Session, refs: Iterable[Ref]) -> Dict[Ref, Dict[str, Any]]:
+        ids_by_type: Dict[str, set] = defaultdict(set)
+        for record_type, record_id in refs:
+            ids_by_type[record_type].add(record_id)
+        summaries = {}
+        for record_type, ids in ids_by_type.items():
+            model = RECORD_MODELS[record_type]
+            rows = db.execute(
+                select(
+                    model.id, model.first_name, model.last_name, model.date_of_birth,
+                    model.ndis_number, model.postcode, model.status, model.created_at,
+                ).where(model.id.in_(ids))
+            )
+            for row in rows:
+                summaries[(record_type, row.id)] = {
+                    "type": record_type,
+                    "id": row.id,
+                    "first_name": row.first_name,
+                    "last_name": row.last_name,
+                    "date_of_birth": row.date_of_birth.isoformat() if row.date_of_birth else None,
+                    "ndis_number": row.ndis_number,
+                    "postcode": row.postcode,
+                    "status": row.status,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                }
+        return summaries
+
+    @staticmethod
+    def review(db: Session, candidate_id: int, status: str, reviewed_by: Optional[str] = None) -> Optional[DuplicateCandidate]:
+        """Mark a candidate confirmed or dismissed (or reopen it)."""
+
+        if status not in REVIEW_STATUSES:
+            raise ValueError(f"Status must be one of: {', '.join(REVIEW_STATUSES)}")
+        candidate = db.query(DuplicateCandidate).filter(DuplicateCandidate.id == candidate_id).first()
+        if candidate is None:
+            return None
+        candidate.status = status
+        candidate.reviewed_by = reviewed_by if status != "open" else None
+        candidate.reviewed_at = datetime.now(timezone.utc) if status != "open" else None
+        db.commit()
+        db.refresh(candidate)
+        return candidate
+
+    @staticmethod
+    def forget(db: Session, record_type: str, record_ids: Iterable[int], counts: Optional[Dict[str, int]] = None) -> None:
+        """Remove the keys and candidate pairs of deleted records (no commit)."""
+
+        record_ids = list(record_ids)
+        if not record_ids:
+            return
+        statements = {
+            "duplicate_blocking_keys": delete(DuplicateBlockingKey).where(
+                DuplicateBlockingKey.record_type == record_type,
+                DuplicateBlockingKey.record_id.in_(record_ids),
+            ),
+            "duplicate_candidates": delete(DuplicateCandidate).where(or_(
+                and_(DuplicateCandidate.left_type == record_type, DuplicateCandidate.left_id.in_(record_ids)),
+                and_(DuplicateCandidate.right_type == record_type, DuplicateCandidate.right_id.in_(record_ids)),
+            )),
+        }
+        for name, statement in statements.items():
+            rowcount = db.execute(statement.execution_options(synchronize_session=False)).rowcount
+            if counts is not None:
+                counts[name] = rowcount
@@ -0,0 +1,400 @@
+"""Scheduling and delivery of document expiry notifications.
+
+The processor runs in two phases, both in bounded batches:
+
+* ``schedule_expiry_notifications`` walks documents whose ``expiry_date``
+  falls inside the warning window and that have not been notified yet, writes
+  one ``DocumentNotification`` per recipient and flips
+  ``Document.expiry_notification_sent`` so the document is never rescanned.
+* ``process_due_notifications`` drains unsent notifications whose
+  ``scheduled_for`` has passed through ``ix_document_notifications_scheduled``
+  and hands them to a sender.  Failures bump ``retry_count`` and push
+  ``scheduled_for`` back with exponential backoff until ``max_retries`` is hit.
+
+Senders are pluggable: ``LoggingSender`` (the default, for development) and
+``SMTPSender``.  ``NOTIFICATION_SENDER=smtp`` together with ``SMTP_HOST`` and
+``SMTP_PORT`` points delivery at a real relay or a local SMTP stand-in.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import smtplib
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Protocol, Tuple
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.document import Document, DocumentNotification
+from app.models.participant import Participant
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_WARNING_DAYS = int(os.getenv("EXPIRY_WARNING_DAYS", "30"))
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "100"))
+NOTIFICATION_MAX_RETRIES = int(os.getenv("NOTIFICATION_MAX_RETRIES", "5"))
+NOTIFICATION_RETRY_BASE_SECONDS = int(os.getenv("NOTIFICATION_RETRY_BASE_SECONDS", "300"))
+NOTIFICATION_RETRY_MAX_SECONDS = int(os.getenv("NOTIFICATION_RETRY_MAX_SECONDS", str(24 * 60 * 60)))
+NOTIFICATION_WORKER_INTERVAL_SECONDS = int(os.getenv("NOTIFICATION_WORKER_INTERVAL_SECONDS", "300"))
+# Comma separated list of addresses that receive every expiry notification.
+NOTIFICATION_ADMIN_EMAILS = [
+    address.strip()
+    for address in os.getenv("NOTIFICATION_ADMIN_EMAILS", "").split(",")
+    if address.strip()
+]
+
+
+@dataclass
+class NotificationMessage:
+    """A rendered notification ready to hand to a sender."""
+
+    recipient: Optional[str]
+    subject: str
+    body: str
+
+
+class NotificationSender(Protocol):
+    """Anything that can deliver a ``NotificationMessage``.
+
+    ``send`` should raise on failure; the processor records the error and
+    schedules a retry.
+    """
+
+    def send(self, message: NotificationMessage) -> None: ...
+
+
+class LoggingSender:
+    """Development sender that writes notifications to the log."""
+
+    def send(self, message: NotificationMessage) -> None:
+        logger.info("Notification to %s: %s", message.recipient or "<no recipient>", message.subject)
+
+
+class SMTPSender:
+    """Deliver notifications through an SMTP relay."""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 25,
+        sender: str = "noreply@localhost",
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        timeout: float = 10.0,
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> "SMTPSender":
+        return cls(
+            host=os.getenv("SMTP_HOST", "localhost"),
+            port=int(os.getenv("SMTP_PORT", "25")),
+            sender=os.getenv("SMTP_FROM", "noreply@localhost"),
+            username=os.getenv("SMTP_USERNAME") or None,
+            password=os.getenv("SMTP_PASSWORD") or None,
+            use_tls=os.getenv("SMTP_USE_TLS", "false").lower() in ("1", "true", "yes"),
+        )
+
+    def send(self, message: NotificationMessage) -> None:
+        if not message.recipient:
+            raise ValueError("Notification has no recipient email")
+
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email.set_content(message.body)
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(email)
+
+
+def get_notification_sender() -> NotificationSender:
+    """Return the sender configured by ``NOTIFICATION_SENDER`` (``log`` or ``smtp``)."""
+
+    if os.getenv("NOTIFICATION_SENDER", "log").lower() == "smtp":
+        return SMTPSender.from_env()
+    return LoggingSender()
+
+
+class DocumentNotificationService:
+    """Create and deliver document expiry notifications."""
+
+    @staticmethod
+    def _recipients_for(participant: Optional[Participant]) -> List[Tuple[str, str]]:
+        recipients = [(address, "admin") for address in NOTIFICATION_ADMIN_EMAILS]
+        if participant is not None and participant.email_address:
+            recipients.append((participant.email_address, "participant"))
+        return recipients
+
+    @staticmethod
+    def schedule_expiry_notifications(
+        db: Session,
+        now: Optional[datetime] = None,
+        days_ahead: int = EXPIRY_WARNING_DAYS,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+    ) -> int:
+        """Create notifications for documents entering the expiry window.
+
+        Documents are walked by id in batches of ``batch_size`` and each batch
+        is committed on its own, so a large backlog never holds one long
+        transaction.  Returns the number of notifications created.
+        """
+
+        now = now or datetime.now()
+        cutoff = now + timedelta(days=days_ahead)
+        created = 0
+        last_id = 0
+
+        while True:
+            documents = (
+                db.query(Document)
+                .options(joinedload(Document.participant))
+                .filter(
+                    and_(
+                        Document.id > last_id,
+                        Document.expiry_date.isnot(None),
+                        Document.expiry_date <= cutoff,
+                        Document.expiry_notification_sent == False,  # noqa: E712
+                        Document.is_current_version == True,  # noqa: E712
+                        Document.status == "active",
+                    )
+                )
+                .order_by(Document.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not documents:
+                break
+
+            notifications = []
+            for document in documents:
+                notification_type = "expired" if document.expiry_date < now else "expiry_warning"
+                recipients = DocumentNotificationService._recipients_for(document.participant)
+                if not recipients:
+                    # Left unflagged so it is picked up once a recipient is configured
+                    logger.warning(f"No recipients configured for expiry notification of document {document.id}")
+                    continue
+                for email, role in recipients:
+                    notifications.append(
+                        DocumentNotification(
+                            document_id=document.id,
+                            participant_id=document.participant_id,
+                            notification_type=notification_type,
+                            recipient_email=email,
+                            recipient_role=role,
+                            is_sent=False,
+                            retry_count=0,
+                            scheduled_for=now,
+                        )
+                    )
+                document.expiry_notification_sent = True
+
+            db.add_all(notifications)
+            db.commit()
+            created += len(notifications)
+            last_id = documents[-1].id
+
+            if len(documents) < batch_size:
+                break
+
+        return created
+
+    @staticmethod
+    def retry_delay(retry_count: int) -> timedelta:
+        """Backoff before attempt ``retry_count + 1``: base * 2^(n-1), capped."""
+
+        seconds = NOTIFICATION_RETRY_BASE_SECONDS * (2 ** max(retry_count - 1, 0))
+        return timedelta(seconds=min(seconds, NOTIFICATION_RETRY_MAX_SECONDS))
+
+    @staticmethod
+    def build_message(notification: DocumentNotification) -> NotificationMessage:
+        document = notification.document
+        participant = notification.participant
+        participant_name = (
+            f"{participant.first_name} {participant.last_name}" if participant else "Unknown participant"
+        )
+        title = document.title if document else f"Document {notification.document_id}"
+        expiry = document.expiry_date.strftime("%d/%m/%Y") if document and document.expiry_date else "unknown"
+
+        if notification.notification_type == "expired":
+            subject = f"Document expired: {title}"
+            body = f"The document \"{title}\" for {participant_name} expired on {expiry}."
+        else:
+            subject = f"Document expiring soon: {title}"
+            body = f"The document \"{title}\" for {participant_name} expires on {expiry}."
+
+        body += "\n\nPlease upload a current version in the participant's documents."
+        return NotificationMessage(recipient=notification.recipient_email, subject=subject, body=body)
+
+    @staticmethod
+    def process_due_notifications(
+        db: Session,
+        sender: Optional[NotificationSender] = None,
+        now: Optional[datetime] = None,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+        max_batches: Optional[int] = None,
+        max_retries: int = NOTIFICATION_MAX_RETRIES,
+    ) -> Dict[str, int]:
+        """Deliver due notifications in batches and return delivery counts."""
+
+        sender = sender or get_notification_sender()
+        now = now or datetime.now()
+        stats = {"sent": 0, "failed": 0, "abandoned": 0}
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            query = (
+                db.query(DocumentNotification)
+                .options(
+                    joinedload(DocumentNotification.document),
+                    joinedload(DocumentNotification.participant),
+                )
+                .filter(
+                    and_(
+                        DocumentNotification.scheduled_for <= now,
+                        DocumentNotification.is_sent == False,  # noqa: E712
+                        DocumentNotification.retry_count < max_retries,
+                    )
+                )
+                .order_by(DocumentNotification.scheduled_for, DocumentNotification.id)
+                .limit(batch_size)
+            )
+            if db.get_bind().dialect.name == "postgresql":
+                # Let several workers drain the queue without double sending.
+                query = query.with_for_update(skip_locked=True, of=DocumentNotification)
+
+            notifications = query.all()
+            if not notifications:
+                break
+
+            for notification in notifications:
+                try:
+                    sender.send(DocumentNotificationService.build_message(notification))
+                except Exception as e:
+                    notification.retry_count = (notification.retry_count or 0) + 1
+                    notification.error_message = str(e)[:1000]
+                    if notification.retry_count >= max_retries:
+                        stats["abandoned"] += 1
+                        logger.error(
+                            f"Giving up on notification {notification.id} after "
+                            f"{notification.retry_count} attempts: {e}"
+                        )
+                    else:
+                        stats["failed"] += 1
+                        notification.scheduled_for = now + DocumentNotificationService.retry_delay(
+                            notification.retry_count
+                        )
+                else:
+                    notification.is_sent = True
+                    notification.sent_at = datetime.now()
+                    notification.error_message = None
+                    stats["sent"] += 1
+
+            db.commit()
+            batches += 1
+
+            if len(notifications) < batch_size:
+                break
+
+        return stats
+
+    @staticmethod
+    def reset_for_document(db: Session, document: Document) -> None:
+        """Re-arm expiry notifications after a document's expiry date changes.
+
+        Pending (unsent) expiry notifications are dropped; the caller commits.
+        """
+
+        document.expiry_notification_sent = False
+        db.query(DocumentNotification).filter(
+            and_(
+                DocumentNotification.document_id == document.id,
+                DocumentNotification.is_sent == False,  # noqa: E712
+                DocumentNotification.notification_type.in_(("expiry_warning", "expired")),
+            )
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def carry_over(db: Session, previous: Document, document: Document) -> None:
+        """Hand ``previous``'s expiry notification state to its new version ``document``.
+
+        Used when a new version keeps the same expiry date: the flag is copied
+        and pending (unsent) expiry notifications are moved over, so the
+        reminder is neither repeated nor lost.  The caller commits.
+        """
+
+        document.expiry_notification_sent = bool(previous.expiry_notification_sent)
+        previous.expiry_notification_sent = False
+        db.query(DocumentNotification).filter(
+            and_(
+                DocumentNotification.document_id == previous.id,
+                DocumentNotification.is_sent == False,  # noqa: E712
+                DocumentNotification.notification_type.in_(("expiry_warning", "expired")),
+            )
+        ).update({DocumentNotification.document_id: document.id}, synchronize_session=False)
+
+    @staticmethod
+    def run_once(
+        db: Session,
+        sender: Optional[NotificationSender] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """Schedule new expiry notifications and deliver everything that is due."""
+
+        scheduled = DocumentNotificationService.schedule_expiry_notifications(db, now=now)
+        stats = DocumentNotificationService.process_due_notifications(db, sender=sender, now=now)
+        stats["scheduled"] = scheduled
+        return stats
+
+
+class NotificationWorker:
+    """Background thread that calls ``run_once`` every ``interval`` seconds."""
+
+    def __init__(self, session_factory, interval: int = NOTIFICATION_WORKER_INTERVAL_SECONDS, sender=None):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.sender = sender
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="document-notifications", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                stats = DocumentNotificationService.run_once(db, sender=self.sender)
+                if any(stats.values()):
+                    logger.info(f"Document notification run: {stats}")
+            except Exception as e:
+                logger.error(f"Document notification run failed: {str(e)}")
+                db.rollback()
+            finally:
+                db.close()
+            self._stop.wait(self.interval)
@@ -0,0 +1,356 @@
+"""Data portability exports for a single participant.
+
+The export is a zip holding one JSON file per related table (the participant,
+their referral, care plans, risk assessments, workflow, documents, generated
+documents, signatures, notifications and the full document access history)
+plus every stored file.  Tables are read with ``yield_per`` and written as
+JSON arrays one row at a time into a non-seekable zip stream that is drained
+after each row or file chunk, so neither the rows nor the archive are ever
+held in memory as a whole.
+
+``stream`` feeds a ``StreamingResponse`` directly.  For very large records the
+same stream can be written to storage by a background job (``run_job``) and
+downloaded once it has finished.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import zipfile
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import inspect as sa_inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.storage import CHUNK_SIZE, StorageBackend, get_storage
+from app.core.streams import ZipStream, safe_name
+from app.models.audit import ParticipantDataExport
+from app.models.care_plan import CarePlan, ProspectiveWorkflow, RiskAssessment
+from app.models.document import Document, DocumentNotification, DocumentTag
+from app.models.document_generation import DocumentSignature, GeneratedDocument
+from app.models.participant import Participant
+from app.models.referral import Referral
+from app.services.audit_service import AuditLogService
+from app.services.document_compression import iter_decompressed
+
+logger = logging.getLogger(__name__)
+
+PARTICIPANT_EXPORT_BATCH_SIZE = int(os.getenv("PARTICIPANT_EXPORT_BATCH_SIZE", "500"))
+
+EXPORT_FORMAT_VERSION = 1
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    return str(value)
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_json_default, ensure_ascii=False).encode()
+
+
+def _row_to_dict(obj) -> Dict[str, Any]:
+    """Every mapped column of ``obj``, keyed by attribute name."""
+
+    return {attr.key: getattr(obj, attr.key) for attr in sa_inspect(obj).mapper.column_attrs}
+
+
+class _IterReader:
+    """Minimal file-like reader over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        # bytearray appends and front deletes are amortised O(1), so large
+        # reads over many chunks stay linear.
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+
+class ParticipantExportService:
+    """Build participant data portability archives."""
+
+    @staticmethod
+    def _record_queries(db: Session, participant_id: int, batch_size: int):
+        """``(archive name, iterator of row dicts)`` for every related table."""
+
+        document_ids = select(Document.id).where(Document.participant_id == participant_id)
+        generated_ids = select(GeneratedDocument.id).where(GeneratedDocument.participant_id == participant_id)
+
+        def orm_rows(model, *criteria):
+            query = db.query(model).filter(*criteria).order_by(model.id).yield_per(batch_size)
+            for obj in query:
+                yield _row_to_dict(obj)
+
+        def access_rows():
+            source = AuditLogService._access_union(db, document_ids=document_ids)
+            result = db.execute(
+                select(source)
+                .order_by(source.c.accessed_at, source.c.id)
+                .execution_options(yield_per=batch_size)
+            ).mappings()
+            for row in result:
+                yield dict(row)
+
+        def tag_rows():
+            query = (
+                db.query(DocumentTag.document_id, DocumentTag.tag)
+                .filter(DocumentTag.participant_id == participant_id)
+                .order_by(DocumentTag.document_id, DocumentTag.tag)
+                .yield_per(batch_size)
+            )
+            for document_id, tag in query:
+                yield {"document_id": document_id, "tag": tag}
+
+        return [
+            ("records/care_plans.json", orm_rows(CarePlan, CarePlan.participant_id == participant_id)),
+            ("records/risk_assessments.json", orm_rows(RiskAssessment, RiskAssessment.participant_id == participant_id)),
+            (
+                "records/prospective_workflows.json",
+                orm_rows(ProspectiveWorkflow, ProspectiveWorkflow.participant_id == participant_id),
+            ),
+            ("records/documents.json", orm_rows(Document, Document.participant_id == participant_id)),
+            ("records/document_tags.json", tag_rows()),
+            (
+                "records/document_notifications.json",
+                orm_rows(DocumentNotification, DocumentNotification.participant_id == participant_id),
+            ),
+            ("records/document_access.json", access_rows()),
+            (
+                "records/generated_documents.json",
+                orm_rows(GeneratedDocument, GeneratedDocument.participant_id == participant_id),
+            ),
+            (
+                "records/document_signatures.json",
+                orm_rows(DocumentSignature, DocumentSignature.generated_document_id.in_(generated_ids)),
+            ),
+        ]
+
+    @staticmethod
+    def _file_entries(db: Session, participant_id: int, batch_size: int) -> Iterator[Dict[str, Any]]:
+        """Stored files of the participant: every document version, then generated documents."""
+
+        documents = (
+            db.query(
+                Document.id,
+                Document.file_path,
+                Document.storage_codec,
+                Document.original_filename,
+                Document.created_at,
+            )
+            .filter(Document.participant_id == participant_id)
+            .order_by(Document.id)
+            .yield_per(batch_size)
+        )
+        for row in documents:
+            yield {
+                "source": "document",
+                "id": row.id,
+                "key": row.file_path,
+                "codec": row.storage_codec,
+                "archive_path": f"files/documents/{row.id}_{safe_name(row.original_filename)}",
+                "modified": row.created_at,
+            }
+
+        generated = (
+            db.query(GeneratedDocument.id, GeneratedDocument.file_path, GeneratedDocument.created_at)
+            .filter(
+                GeneratedDocument.participant_id == participant_id,
+                GeneratedDocument.file_path.isnot(None),
+            )
+            .order_by(GeneratedDocument.id)
+            .yield_per(batch_size)
+        )
+        for row in generated:
+            yield {
+                "source": "generated_document",
+                "id": row.id,
+                "key": row.file_path,
+                "codec": None,
+                "archive_path": f"files/generated/{row.id}_{safe_name(os.path.basename(row.file_path))}",
+                "modified": row.created_at,
+            }
+
+    @staticmethod
+    def _json_array_entry(archive: zipfile.ZipFile, sink: ZipStream, name: str, rows: Iterable[Dict[str, Any]]):
+        """Write ``rows`` as a JSON array entry, yielding output as it is produced.
+
+        Returns the number of rows written (via ``yield from``).
+        """
+
+        count = 0
+        info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with archive.open(info, mode="w", force_zip64=True) as target:
+            target.write(b"[")
+            for row in rows:
+                target.write((b",\n" if count else b"\n") + _dumps(row))
+                count += 1
+                data = sink.drain()
+                if data:
+                    yield data
+            target.write(b"\n]\n")
+        data = sink.drain()
+        if data:
+            yield data
+        return count
+
+    @staticmethod
+    def stream(
+        session_factory,
+        participant_id: int,
+        storage: Optional[StorageBackend] = None,
+        batch_size: int = PARTICIPANT_EXPORT_BATCH_SIZE,
+    ) -> Iterator[bytes]:
+        """Yield the portability zip for ``participant_id``.
+
+        Raises ``ValueError`` on the first iteration if the participant does
+        not exist.
+        """
+
+        storage = storage or get_storage()
+        sink = ZipStream()
+        db = session_factory()
+        try:
+            participant = db.get(Participant, participant_id)
+            if participant is None:
+                raise ValueError(f"Participant {participant_id} not found")
+
+            archive = zipfile.ZipFile(sink, mode="w", allowZip64=True)
+            records: Dict[str, int] = {}
+
+            archive.writestr("records/participant.json", _dumps(_row_to_dict(participant)), zipfile.ZIP_DEFLATED)
+            referral = db.get(Referral, participant.referral_id) if participant.referral_id else None
+            archive.writestr(
+                "records/referral.json",
+                _dumps(_row_to_dict(referral) if referral else None),
+                zipfile.ZIP_DEFLATED,
+            )
+            records["records/participant.json"] = 1
+            records["records/referral.json"] = 1 if referral else 0
+            yield sink.drain()
+            db.expunge_all()
+
+            for name, rows in ParticipantExportService._record_queries(db, participant_id, batch_size):
+                records[name] = yield from ParticipantExportService._json_array_entry(archive, sink, name, rows)
+                db.expunge_all()
+
+            files: List[Dict[str, Any]] = []
+            for entry in ParticipantExportService._file_entries(db, participant_id, batch_size):
+                digest = hashlib.sha256()
+                size = 0
+                status = "included"
+                try:
+                    if not entry["key"] or not storage.exists(entry["key"]):
+                        status = "missing"
+                    else:
+                        modified = (entry["modified"] or datetime.now()).timetuple()[:6]
+                        info = zipfile.ZipInfo(entry["archive_path"], date_time=modified)
+                        info.compress_type = zipfile.ZIP_STORED
+                        with archive.open(info, mode="w", force_zip64=True) as target:
+                            for chunk in iter_decompressed(entry["key"], entry["codec"], storage, CHUNK_SIZE):
+                                digest.update(chunk)
+                                size += len(chunk)
+                                target.write(chunk)
+                                data = sink.drain()
+                                if data:
+                                    yield data
+                except Exception as e:
+                    logger.error(
+                        f"Participant export {participant_id}: could not add {entry['source']} {entry['id']}: {str(e)}"
+                    )
+                    status = "error"
+
+                data = sink.drain()
+                if data:
+                    yield data
+                files.append({
+                    "source": entry["source"],
+                    "id": entry["id"],
+                    "archive_path": entry["archive_path"] if status == "included" else None,
+                    "size": size if status == "included" else None,
+                    "sha256": digest.hexdigest() if status == "included" else None,
+                    "status": status,
+                })
+
+            manifest = {
+                "format_version": EXPORT_FORMAT_VERSION,
+                "participant_id": participant_id,
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "records": records,
+                "files": files,
+            }
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2), zipfile.ZIP_DEFLATED)
+            archive.close()
+            yield sink.drain()
+        finally:
+            db.close()
+
+    @staticmethod
+    def create_job(db: Session, participant_id: int, requested_by: Optional[str] = None) -> ParticipantDataExport:
+        """Register a background export for ``participant_id``."""
+
+        job = ParticipantDataExport(participant_id=participant_id, status="pending", requested_by=requested_by)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def run_job(session_factory, job_id: int, storage: Optional[StorageBackend] = None) -> None:
+        """Build the archive for job ``job_id`` and write it to storage."""
+
+        storage = storage or get_storage()
+        db = session_factory()
+        try:
+            job = db.get(ParticipantDataExport, job_id)
+            if job is None:
+                logger.error(f"Participant export job {job_id} not found")
+                return
+            job.status = "running"
+            job.storage_key = f"exports/participants/{job.participant_id}/participant-{job.participant_id}-export-{job.id}.zip"
+            db.commit()
+
+            try:
+                size = storage.save(
+                    job.storage_key,
+                    _IterReader(ParticipantExportService.stream(session_factory, job.participant_id, storage)),
+                    "application/zip",
+                )
+            except Exception as e:
+                logger.error(f"Participant export job {job_id} failed: {str(e)}")
+                job.status = "failed"
+                job.error = str(e)
+                try:
+                    storage.delete(job.storage_key)
+                except Exception:
+                    pass
+            else:
+                job.status = "completed"
+                job.size = size
+            job.completed_at = datetime.now(timezone.utc)
+            db.commit()
+        finally:
+            db.close()
@@ -0,0 +1,381 @@
+"""Bulk import of participants or referrals from CSV or XLSX files.
+
+Rows are streamed from the file (XLSX through openpyxl's read-only mode), so
+memory use depends on the batch size rather than the file size.  Column
+headers may use the API's snake_case names, the frontend's camelCase names
+or plain words ("First Name").
+
+Each batch of rows is validated with ``ParticipantCreate``/``ReferralCreate``
+in a process pool while the previous batch is being written.  Valid rows are
+upserted on ``ndis_number`` in one transaction per batch: one query finds
+the existing records, then new rows are inserted and existing ones updated
+with one ``executemany`` each.  For referrals, which may share an NDIS
+number, the most recent matching referral is updated.  Rows without an NDIS
+number are always inserted.
+
+Only failed rows are kept in memory; they make up the row-level error
+report, which can be written as CSV or JSON.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import os
+import re
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.storage import StorageBackend, get_storage
+from app.models.participant import Participant
+from app.models.referral import Referral
+from app.schemas.participant import ParticipantCreate
+from app.schemas.referral import ReferralCreate
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.participant_stats import ParticipantStatsService, get_participant_stats_cache
+
+try:
+    from openpyxl import load_workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    OPENPYXL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+RECORD_IMPORT_WORKERS = int(os.getenv("RECORD_IMPORT_WORKERS", "4"))
+RECORD_IMPORT_BATCH_SIZE = int(os.getenv("RECORD_IMPORT_BATCH_SIZE", "1000"))
+
+# Error reports are kept in storage under this prefix for download.
+REPORT_PREFIX = "imports/records"
+_IMPORT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+STATUS_CREATED = "created"
+STATUS_UPDATED = "updated"
+STATUS_VALID = "valid"  # dry run
+STATUS_INVALID = "invalid"
+STATUS_FAILED = "failed"
+
+IMPORT_KINDS = {
+    "participants": (ParticipantCreate, Participant),
+    "referrals": (ReferralCreate, Referral),
+}
+
+
+class RecordImportError(ValueError):
+    """Raised when an import cannot start (unknown kind or unreadable file)."""
+
+
+@dataclass
+class RecordImportResult:
+    """Outcome of one data row (row 2 is the first row after the header)."""
+
+    row: int
+    status: str
+    ndis_number: Optional[str] = None
+    record_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class RecordImportReport:
+    kind: str
+    dry_run: bool = False
+    counts: Dict[str, int] = field(default_factory=dict)
+    errors: List[RecordImportResult] = field(default_factory=list)
+
+    def add(self, result: RecordImportResult) -> None:
+        self.counts[result.status] = self.counts.get(result.status, 0) + 1
+        if result.status in (STATUS_INVALID, STATUS_FAILED):
+            self.errors.append(result)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def to_dict(self, error_limit: Optional[int] = None) -> Dict[str, Any]:
+        errors = self.errors if error_limit is None else self.errors[:error_limit]
+        return {
+            "kind": self.kind,
+            "dry_run": self.dry_run,
+            "total": self.total,
+            "counts": self.counts,
+            "errors": [asdict(result) for result in errors],
+        }
+
+
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def normalize_header(name: Any) -> str:
+    """``firstName``, ``First Name`` and ``first_name`` all become ``first_name``."""
+
+    text = _CAMEL_BOUNDARY.sub("_", str(name or "").strip())
+    return re.sub(r"[^0-9a-z]+", "_", text.lower()).strip("_")
+
+
+def _clean(value: Any) -> Any:
+    """Turn spreadsheet cell values into what the API schemas accept."""
+
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date() if value.time() == datetime.min.time() else value
+    if isinstance(value, date) or isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return str(value)
+    value = str(value).strip()
+    return value or None
+
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = [normalize_header(name) for name in next(reader, [])]
+        for values in reader:
+            yield dict(zip(header, values))
+    finally:
+        text.detach()
+
+
+def iter_xlsx_rows(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    if not OPENPYXL_AVAILABLE:
+        raise RecordImportError("openpyxl is required to import XLSX files")
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise RecordImportError(f"Could not read the workbook: {str(e)}")
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [normalize_header(name) for name in next(rows, ())]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(stream: BinaryIO, filename: str) -> Iterator[Dict[str, Any]]:
+    """Stream rows from a CSV or XLSX file (chosen by extension)."""
+
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        return iter_xlsx_rows(stream)
+    if filename.lower().endswith(".csv"):
+        return iter_csv_rows(stream)
+    raise RecordImportError("Upload a .csv or .xlsx file")
+
+
+def validate_rows(kind: str, rows: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Validate one batch; runs in a worker process, so it only takes and returns plain data."""
+
+    schema = IMPORT_KINDS[kind][0]
+    validated = []
+    for row_number, raw in rows:
+        values = {key: _clean(value) for key, value in raw.items() if key}
+        values = {key: value for key, value in values.items() if value is not None}
+        try:
+            # Blank cells are left out, so an update never clears a stored value.
+            validated.append((row_number, schema(**values).dict(exclude_unset=True), None))
+        except ValidationError as e:
+            error = "; ".join(
+                f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in e.errors()
+            )
+            validated.append((row_number, None, error))
+    return validated
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    chunk = []
+    for row_number, row in enumerate(rows, start=2):
+        if not any(value not in (None, "") for value in row.values()):
+            continue  # blank line
+        chunk.append((row_number, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ParticipantImportService:
+    """Validate and upsert participant or referral rows in batches."""
+
+    @staticmethod
+    def _validated_batches(kind: str, rows: Iterable[Dict[str, Any]], workers: int, batch_size: int):
+        """Yield validated batches in file order, keeping at most ``2 * workers`` in flight."""
+
+        chunks = _chunks(rows, batch_size)
+        if workers <= 1:
+            for chunk in chunks:
+                yield validate_rows(kind, chunk)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(validate_rows, kind, chunk))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    @staticmethod
+    def _existing_ids(db: Session, model, ndis_numbers: List[str]) -> Dict[str, int]:
+        """Map NDIS numbers to the id of the (latest) record holding them, in one query."""
+
+        if not ndis_numbers:
+            return {}
+        rows = db.execute(
+            select(model.ndis_number, func.max(model.id))
+            .where(model.ndis_number.in_(ndis_numbers))
+            .group_by(model.ndis_number)
+        ).all()
+        return dict(rows)
+
+    @staticmethod
+    def _upsert_batch(db: Session, kind: str, batch: List[Tuple[int, Dict[str, Any]]]) -> List[RecordImportResult]:
+        """Insert or update one batch of validated rows in a single transaction."""
+
+        model = IMPORT_KINDS[kind][1]
+        # A later row for the same NDIS number wins within the batch.
+        by_ndis: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        unkeyed = []
+        superseded = []
+        for row_number, values in batch:
+            ndis_number = values.get("ndis_number")
+            if ndis_number is None:
+                unkeyed.append((row_number, values))
+                continue
+            if ndis_number in by_ndis:
+                superseded.append((by_ndis[ndis_number][0], ndis_number))
+            by_ndis[ndis_number] = (row_number, values)
+
+        results = {}
+        try:
+            existing = ParticipantImportService._existing_ids(db, model, list(by_ndis))
+            inserts, updates = list(unkeyed), []
+            for ndis_number, (row_number, values) in by_ndis.items():
+                if ndis_number in existing:
+                    updates.append((row_number, {"id": existing[ndis_number], **values}))
+                else:
+                    inserts.append((row_number, values))
+
+            if updates:
+                # ORM bulk UPDATE by primary key: one executemany
+                db.execute(update(model), [values for _row, values in updates])
+                for row_number, values in updates:
+                    results[row_number] = RecordImportResult(
+                        row_number, STATUS_UPDATED, values.get("ndis_number"), values["id"]
+                    )
+            if inserts:
+                ids = db.scalars(
+                    insert(model).returning(model.id, sort_by_parameter_order=True),
+                    [values for _row, values in inserts],
+                ).all()
+                for (row_number, values), record_id in zip(inserts, ids):
+                    results[row_number] = RecordImportResult(
+                        row_number, STATUS_CREATED, values.get("ndis_number"), record_id
+                    )
+                if model is Participant:
+                    # New participants take the column default status.
+                    ParticipantStatsService.adjust(db, {Participant.status.default.arg: len(inserts)})
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for row_number, ndis_number in superseded:
+            winner = results[by_ndis[ndis_number][0]]
+            results[row_number] = RecordImportResult(row_number, winner.status, ndis_number, winner.record_id)
+        return [results[row_number] for row_number, _values in batch]
+
+    @staticmethod
+    def run(
+        db: Session,
+        kind: str,
+        rows: Iterable[Dict[str, Any]],
+        workers: int = RECORD_IMPORT_WORKERS,
+        batch_size: int = RECORD_IMPORT_BATCH_SIZE,
+        dry_run: bool = False,
+    ) -> RecordImportReport:
+        """Validate and upsert ``rows`` (dicts keyed by column header)."""
+
+        if kind not in IMPORT_KINDS:
+            raise RecordImportError(f"Unknown import kind: {kind}")
+
+        report = RecordImportReport(kind=kind, dry_run=dry_run)
+        for validated in ParticipantImportService._validated_batches(kind, rows, workers, batch_size):
+            batch = []
+            for row_number, values, error in validated:
+                if error is not None:
+                    report.add(RecordImportResult(row_number, STATUS_INVALID, error=error))
+                elif dry_run:
+                    report.add(RecordImportResult(row_number, STATUS_VALID, values.get("ndis_number")))
+                else:
+                    batch.append((row_number, values))
+            if not batch:
+                continue
+
+            try:
+                results = ParticipantImportService._upsert_batch(db, kind, batch)
+            except Exception as e:
+                logger.error(f"{kind.capitalize()} import batch of {len(batch)} failed: {str(e)}")
+                results = [
+                    RecordImportResult(row_number, STATUS_FAILED, values.get("ndis_number"), error=str(e))
+                    for row_number, values in batch
+                ]
+            for result in results:
+                report.add(result)
+            DuplicateDetectionService.check_new(
+                db,
+                "participant" if kind == "participants" else "referral",
+                [result.record_id for result in results if result.status in (STATUS_CREATED, STATUS_UPDATED)],
+            )
+
+        if kind == "participants" and not dry_run:
+            get_participant_stats_cache().invalidate()
+        logger.info(f"{kind.capitalize()} import finished: {report.counts}")
+        return report
+
+    @staticmethod
+    def write_report(report: RecordImportReport, stream, fmt: str = "csv") -> None:
+        """Write the row-level error report as CSV or JSON to a text stream."""
+
+        if fmt == "json":
+            json.dump(report.to_dict(), stream, indent=2)
+            return
+        writer = csv.DictWriter(stream, fieldnames=list(RecordImportResult.__dataclass_fields__))
+        writer.writeheader()
+        writer.writerows(asdict(result) for result in report.errors)
+
+    @staticmethod
+    def report_key(import_id: str) -> str:
+        if not _IMPORT_ID.match(import_id or ""):
+            raise RecordImportError("Unknown import id")
+        return f"{REPORT_PREFIX}/{import_id}-errors.csv"
+
+    @staticmethod
+    def save_report(report: RecordImportReport, storage: Optional[StorageBackend] = None) -> str:
+        """Store the CSV error report and return the import id it is filed under."""
+
+        storage = storage or get_storage()
+        import_id = uuid.uuid4().hex
+        buffer = io.StringIO()
+        ParticipantImportService.write_report(report, buffer)
+        storage.save(
+            ParticipantImportService.report_key(import_id),
+            io.BytesIO(buffer.getvalue().encode("utf-8")),
+            content_type="text/csv",
+        )
+        return import_id
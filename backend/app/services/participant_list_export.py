@@ -0,0 +1,211 @@
+"""Streaming exports of the participant list as CSV, XLSX or Parquet.
+
+Only the requested columns are selected and rows are read with
+``yield_per`` (a server-side cursor where the driver supports one), using the
+same filters as the participant listing.  Each format writes into a
+drainable sink as rows arrive:
+
+* CSV is flushed every batch.
+* Parquet (pyarrow, optional) writes one row group per batch.
+* XLSX (openpyxl, optional) uses a write-only workbook, which spools rows to
+  disk.  An XLSX file is a zip whose parts can only be assembled once the last
+  row is in, so nothing is sent until the workbook is complete; it is then
+  saved to a spooled temporary file and sent in ``CHUNK_SIZE`` pieces rather
+  than as one buffer.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, inspect as sa_inspect
+
+from app.core.storage import CHUNK_SIZE
+from app.core.streams import ZipStream
+from app.models.participant import Participant
+from app.services.participant_service import ParticipantService
+
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    OPENPYXL_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    PYARROW_AVAILABLE = False
+
+PARTICIPANT_LIST_EXPORT_BATCH_SIZE = int(os.getenv("PARTICIPANT_LIST_EXPORT_BATCH_SIZE", "2000"))
+# Finished XLSX workbooks larger than this are written to disk before they are sent.
+PARTICIPANT_LIST_EXPORT_SPOOL_BYTES = int(os.getenv("PARTICIPANT_LIST_EXPORT_SPOOL_MB", "8")) * 1024 * 1024
+
+# Columns exported when none are requested (the listing's fields)
+DEFAULT_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "ndis_number",
+    "phone_number",
+    "email_address",
+    "status",
+    "support_category",
+    "plan_start_date",
+    "plan_review_date",
+    "risk_level",
+    "created_at",
+)
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def exportable_columns() -> Dict[str, Any]:
+    """Every mapped participant column, keyed by attribute name."""
+
+    return {attr.key: attr.columns[0] for attr in sa_inspect(Participant).column_attrs}
+
+
+def resolve_columns(requested: Optional[Sequence[str]]) -> List[str]:
+    """Validate requested column names (comma separated values are split)."""
+
+    if not requested:
+        return list(DEFAULT_COLUMNS)
+    names = [name.strip() for value in requested for name in value.split(",") if name.strip()]
+    available = exportable_columns()
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def format_available(fmt: str) -> bool:
+    if fmt == "xlsx":
+        return OPENPYXL_AVAILABLE
+    if fmt == "parquet":
+        return PYARROW_AVAILABLE
+    return fmt in EXPORT_FORMATS
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def _cell(value: Any) -> Any:
+    """XLSX cells cannot hold timezone-aware datetimes."""
+
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def _text(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class ParticipantListExportService:
+    """Write filtered participant rows in tabular formats."""
+
+    @staticmethod
+    def _batches(session_factory, columns: List[str], batch_size: int, filters: Dict[str, Any]) -> Iterator[List[tuple]]:
+        available = exportable_columns()
+        db = session_factory()
+        try:
+            query = (
+                ParticipantService.build_participant_query(db, **filters)
+                .with_entities(*(available[name] for name in columns))
+                .order_by(Participant.id)
+                .yield_per(batch_size)
+            )
+            batch = []
+            for row in query:
+                batch.append(tuple(row))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            db.close()
+
+    @staticmethod
+    def stream(
+        session_factory,
+        fmt: str,
+        columns: List[str],
+        batch_size: int = PARTICIPANT_LIST_EXPORT_BATCH_SIZE,
+        **filters: Any,
+    ) -> Iterator[bytes]:
+        """Yield the export of every participant matching ``filters`` in ``fmt``."""
+
+        batches = ParticipantListExportService._batches(session_factory, columns, batch_size, filters)
+        writer = getattr(ParticipantListExportService, f"_write_{fmt}")
+        yield from writer(batches, columns)
+
+    @staticmethod
+    def _write_csv(batches, columns: List[str]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows([_text(value) for value in row] for row in batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _write_xlsx(batches, columns: List[str]) -> Iterator[bytes]:
+        """Yield the workbook in ``CHUNK_SIZE`` pieces once every row is written.
+
+        Not streamed row by row: the archive can only be saved when the
+        workbook is complete, so the first byte goes out after the last row
+        has been read.
+        """
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Participants")
+        sheet.append(columns)
+        for batch in batches:
+            for row in batch:
+                sheet.append([_cell(value) for value in row])
+        with tempfile.SpooledTemporaryFile(max_size=PARTICIPANT_LIST_EXPORT_SPOOL_BYTES) as spool:
+            workbook.save(spool)
+            spool.seek(0)
+            while True:
+                chunk = spool.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    @staticmethod
+    def _write_parquet(batches, columns: List[str]) -> Iterator[bytes]:
+        available = exportable_columns()
+        schema = pa.schema([(name, _arrow_type(available[name])) for name in columns])
+        sink = ZipStream()
+        with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+            for batch in batches:
+                arrays = {name: [row[index] for row in batch] for index, name in enumerate(columns)}
+                writer.write_table(pa.Table.from_pydict(arrays, schema=schema))
+                yield sink.drain()
+        yield sink.drain()
@@ -0,0 +1,149 @@
+"""Everything the participant page needs, in a fixed number of queries.
+
+The overview replaces separate calls for the participant, their latest care
+plan and risk assessment, the prospective workflow, the document list and
+the document stats.  Each requested section costs at most one query
+whatever the size of the record:
+
+* participant (with the referral joined in): 1
+* latest care plan: 1
+* latest risk assessment: 1
+* prospective workflow: 1
+* recent current documents: 1
+* document stats: 1 (one grouped aggregate)
+
+Unlike ``GET /care/participants/{id}/prospective-workflow`` the overview
+never creates a missing workflow; it reports ``None`` instead.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import desc, inspect as sa_inspect
+from sqlalchemy.orm import Session, joinedload, load_only
+
+from app.models.care_plan import CarePlan, ProspectiveWorkflow, RiskAssessment
+from app.models.document import Document
+from app.models.participant import Participant
+from app.models.referral import Referral
+from app.services.document_service import DocumentService
+
+OVERVIEW_SECTIONS = (
+    "participant",
+    "referral",
+    "care_plan",
+    "risk_assessment",
+    "workflow",
+    "documents",
+    "document_stats",
+)
+
+# Referral columns shown on the participant page
+REFERRAL_FIELDS = (
+    "id",
+    "status",
+    "urgency_level",
+    "referred_for",
+    "referrer_first_name",
+    "referrer_last_name",
+    "referrer_agency",
+    "created_at",
+)
+
+
+def _columns(obj, names: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+    if obj is None:
+        return None
+    if names is None:
+        names = [attr.key for attr in sa_inspect(type(obj)).column_attrs]
+    return {name: getattr(obj, name) for name in names}
+
+
+def resolve_sections(requested: Optional[Sequence[str]]) -> List[str]:
+    """Validate requested sections (comma separated values are split); default is all."""
+
+    if not requested:
+        return list(OVERVIEW_SECTIONS)
+    names = [name.strip() for value in requested for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in OVERVIEW_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def resolve_participant_fields(requested: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """Validate requested participant columns; ``None`` means every column."""
+
+    if not requested:
+        return None
+    names = [name.strip() for value in requested for name in value.split(",") if name.strip()]
+    available = {attr.key for attr in sa_inspect(Participant).column_attrs}
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown participant fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id", *names]))
+
+
+class ParticipantOverviewService:
+
+    @staticmethod
+    def _latest(db: Session, model, participant_id: int):
+        return (
+            db.query(model)
+            .filter(model.participant_id == participant_id)
+            .order_by(desc(model.created_at), desc(model.id))
+            .first()
+        )
+
+    @staticmethod
+    def build(
+        db: Session,
+        participant_id: int,
+        sections: Sequence[str] = OVERVIEW_SECTIONS,
+        participant_fields: Optional[List[str]] = None,
+        document_limit: int = 20,
+    ) -> Optional[Dict[str, Any]]:
+        """Return the requested sections, or ``None`` if the participant does not exist.
+
+        Documents are returned as ORM objects so the endpoint can format them
+        like the document list does.
+        """
+
+        query = db.query(Participant).filter(Participant.id == participant_id)
+        if participant_fields is not None:
+            query = query.options(load_only(*(getattr(Participant, name) for name in participant_fields)))
+        if "referral" in sections:
+            query = query.options(
+                joinedload(Participant.referral).load_only(
+                    *(getattr(Referral, name) for name in REFERRAL_FIELDS)
+                )
+            )
+        participant = query.first()
+        if participant is None:
+            return None
+
+        overview: Dict[str, Any] = {"participant_id": participant_id}
+        if "participant" in sections:
+            overview["participant"] = _columns(participant, participant_fields)
+        if "referral" in sections:
+            overview["referral"] = _columns(participant.referral, REFERRAL_FIELDS)
+        if "care_plan" in sections:
+            overview["care_plan"] = _columns(ParticipantOverviewService._latest(db, CarePlan, participant_id))
+        if "risk_assessment" in sections:
+            overview["risk_assessment"] = _columns(
+                ParticipantOverviewService._latest(db, RiskAssessment, participant_id)
+            )
+        if "workflow" in sections:
+            overview["workflow"] = _columns(
+                db.query(ProspectiveWorkflow).filter(ProspectiveWorkflow.participant_id == participant_id).first()
+            )
+        if "documents" in sections:
+            overview["documents"] = (
+                DocumentService.build_document_query(db, participant_id)
+                .order_by(desc(Document.created_at), desc(Document.id))
+                .limit(document_limit)
+                .all()
+            )
+        if "document_stats" in sections:
+            overview["document_stats"] = DocumentService.get_document_stats(db, participant_id)
+        return overview
@@ -1,12 +1,56 @@
 # backend/app/services/participant_service.py
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from fastapi import BackgroundTasks
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import or_, and_, func, insert, select, update
 from app.models.participant import Participant
 from app.models.referral import Referral
 from app.schemas.participant import ParticipantCreate, ParticipantUpdate
+from app.core.pagination import KeysetPage, paginate
+from app.services.deletion_service import CascadeDeletionService, reap_files
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.participant_stats import ParticipantStatsService, get_participant_stats_cache
 from typing import List, Optional
 from datetime import datetime
 
+REFERRAL_CONVERTED_STATUS = "converted_to_participant"
+
+# Referral columns copied onto the participant created from it
+REFERRAL_TO_PARTICIPANT_FIELDS = (
+    "first_name",
+    "last_name",
+    "date_of_birth",
+    "phone_number",
+    "email_address",
+    "street_address",
+    "city",
+    "state",
+    "postcode",
+    "preferred_contact",
+    "disability_type",
+    "rep_first_name",
+    "rep_last_name",
+    "rep_phone_number",
+    "rep_email_address",
+    "rep_street_address",
+    "rep_city",
+    "rep_state",
+    "rep_postcode",
+    "rep_relationship",
+    "ndis_number",
+    "plan_type",
+    "plan_manager_name",
+    "plan_manager_agency",
+    "available_funding",
+    "plan_start_date",
+    "plan_review_date",
+    "support_category",
+    "client_goals",
+    "support_goals",
+    "current_supports",
+    "accessibility_needs",
+    "cultural_considerations",
+)
+
 class ParticipantService:
     
     @staticmethod
@@ -22,62 +66,149 @@ class ParticipantService:
             raise ValueError("Participant already exists for this referral")
         
         # Create participant from referral data
-        participant_data = {
-            "referral_id": referral.id,
-            "first_name": referral.first_name,
-            "last_name": referral.last_name,
-            "date_of_birth": referral.date_of_birth,
-            "phone_number": referral.phone_number,
-            "email_address": referral.email_address,
-            "street_address": referral.street_address,
-            "city": referral.city,
-            "state": referral.state,
-            "postcode": referral.postcode,
-            "preferred_contact": referral.preferred_contact,
-            "disability_type": referral.disability_type,
-            "rep_first_name": referral.rep_first_name,
-            "rep_last_name": referral.rep_last_name,
-            "rep_phone_number": referral.rep_phone_number,
-            "rep_email_address": referral.rep_email_address,
-            "rep_street_address": referral.rep_street_address,
-            "rep_city": referral.rep_city,
-            "rep_state": referral.rep_state,
-            "rep_postcode": referral.rep_postcode,
-            "rep_relationship": referral.rep_relationship,
-            "ndis_number": referral.ndis_number,
-            "plan_type": referral.plan_type,
-            "plan_manager_name": referral.plan_manager_name,
-            "plan_manager_agency": referral.plan_manager_agency,
-            "available_funding": referral.available_funding,
-            "plan_start_date": referral.plan_start_date,
-            "plan_review_date": referral.plan_review_date,
-            "support_category": referral.support_category,
-            "client_goals": referral.client_goals,
-            "support_goals": referral.support_goals,
-            "current_supports": referral.current_supports,
-            "accessibility_needs": referral.accessibility_needs,
-            "cultural_considerations": referral.cultural_considerations,
-            "status": "prospective"
-        }
-        
-        db_participant = Participant(**participant_data)
+        db_participant = Participant(**ParticipantService._participant_values(referral))
         db.add(db_participant)
-        db.commit()
-        db.refresh(db_participant)
+        ParticipantStatsService.record_transition(db, None, db_participant.status)
         
-        # Update referral status
-        referral.status = "converted_to_participant"
+        # Update referral status; triage is done with it, so drop any claim
+        referral.status = REFERRAL_CONVERTED_STATUS
+        referral.claimed_by = None
+        referral.claim_expires_at = None
         db.commit()
+        db.refresh(db_participant)
+        get_participant_stats_cache().invalidate()
+        DuplicateDetectionService.check_new(db, "participant", [db_participant.id])
         
         return db_participant
     
+    @staticmethod
+    def _participant_values(referral) -> dict:
+        """Participant column values for a referral (an ORM object or a result row)"""
+        values = {field: getattr(referral, field) for field in REFERRAL_TO_PARTICIPANT_FIELDS}
+        values["referral_id"] = referral.id
+        values["status"] = "prospective"
+        return values
+    
+    @staticmethod
+    def convert_referrals(db: Session, referral_ids: List[int]) -> List[dict]:
+        """Convert many referrals to participants in one transaction.
+        
+        The referrals, any participants already made from them and any
+        participants already holding their NDIS numbers are loaded with one
+        query; new participants are inserted and the referral statuses
+        updated with one ``executemany`` each, and one more query reads back
+        the new ids.  ``participants.ndis_number`` is unique, so a referral
+        whose NDIS number is taken (by an existing participant or an earlier
+        referral in the batch) is reported as ``ndis_conflict`` and the rest
+        are still converted.  Returns one outcome per requested referral, in
+        request order.
+        """
+        referral_ids = list(dict.fromkeys(referral_ids))
+        if not referral_ids:
+            return []
+        
+        columns = [getattr(Referral, field) for field in REFERRAL_TO_PARTICIPANT_FIELDS]
+        ndis_holder = aliased(Participant)
+        rows = db.execute(
+            select(
+                Referral.id,
+                *columns,
+                func.min(Participant.id).label("participant_id"),
+                func.min(ndis_holder.id).label("ndis_participant_id"),
+            )
+            .outerjoin(Participant, Participant.referral_id == Referral.id)
+            .outerjoin(ndis_holder, ndis_holder.ndis_number == Referral.ndis_number)
+            .where(Referral.id.in_(referral_ids))
+            .group_by(Referral.id)
+        ).all()
+        found = {row.id: row for row in rows}
+        
+        outcomes = {}
+        to_convert = []
+        ndis_claimed = {}
+        for referral_id in referral_ids:
+            row = found.get(referral_id)
+            if row is None:
+                outcomes[referral_id] = {
+                    "referral_id": referral_id, "status": "not_found",
+                    "participant_id": None, "error": "Referral not found",
+                }
+            elif row.participant_id is not None:
+                outcomes[referral_id] = {
+                    "referral_id": referral_id, "status": "already_converted",
+                    "participant_id": row.participant_id,
+                    "error": "Participant already exists for this referral",
+                }
+            elif row.ndis_participant_id is not None:
+                outcomes[referral_id] = {
+                    "referral_id": referral_id, "status": "ndis_conflict",
+                    "participant_id": row.ndis_participant_id,
+                    "error": f"NDIS number {row.ndis_number} already belongs to participant {row.ndis_participant_id}",
+                }
+            elif row.ndis_number is not None and row.ndis_number in ndis_claimed:
+                outcomes[referral_id] = {
+                    "referral_id": referral_id, "status": "ndis_conflict",
+                    "participant_id": None,
+                    "error": (
+                        f"NDIS number {row.ndis_number} is also on referral "
+                        f"{ndis_claimed[row.ndis_number]} in this batch"
+                    ),
+                }
+            else:
+                if row.ndis_number is not None:
+                    ndis_claimed[row.ndis_number] = row.id
+                to_convert.append(row)
+        
+        if to_convert:
+            try:
+                db.execute(
+                    insert(Participant),
+                    [ParticipantService._participant_values(row) for row in to_convert],
+                )
+                # Each new participant is the only one for its referral.
+                participant_ids = dict(db.execute(
+                    select(Participant.referral_id, Participant.id)
+                    .where(Participant.referral_id.in_([row.id for row in to_convert]))
+                ).all())
+                # ORM bulk UPDATE by primary key: one executemany
+                db.execute(
+                    update(Referral),
+                    [
+                        {
+                            "id": row.id,
+                            "status": REFERRAL_CONVERTED_STATUS,
+                            "claimed_by": None,
+                            "claim_expires_at": None,
+                        }
+                        for row in to_convert
+                    ],
+                )
+                ParticipantStatsService.adjust(db, {"prospective": len(to_convert)})
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            for row in to_convert:
+                outcomes[row.id] = {
+                    "referral_id": row.id, "status": "converted",
+                    "participant_id": participant_ids[row.id], "error": None,
+                }
+            get_participant_stats_cache().invalidate()
+            DuplicateDetectionService.check_new(db, "participant", participant_ids.values())
+        
+        return [outcomes[referral_id] for referral_id in referral_ids]
+    
     @staticmethod
     def create_participant(db: Session, participant_data: ParticipantCreate) -> Participant:
         """Create a new participant directly"""
         db_participant = Participant(**participant_data.dict())
         db.add(db_participant)
+        db.flush()
+        ParticipantStatsService.record_transition(db, None, db_participant.status)
         db.commit()
         db.refresh(db_participant)
+        get_participant_stats_cache().invalidate()
+        DuplicateDetectionService.check_new(db, "participant", [db_participant.id])
         return db_participant
     
     @staticmethod
@@ -85,6 +216,13 @@ class ParticipantService:
         """Get a participant by ID"""
         return db.query(Participant).filter(Participant.id == participant_id).first()
     
+    # Sortable columns for participant listings (always tie-broken by id)
+    PARTICIPANT_SORT_COLUMNS = {
+        "id": Participant.id,
+        "created_at": Participant.created_at,
+        "last_name": Participant.last_name,
+    }
+    
     @staticmethod
     def get_participants(
         db: Session, 
@@ -92,9 +230,45 @@ class ParticipantService:
         limit: int = 100,
         search: Optional[str] = None,
         status: Optional[str] = None,
+        support_category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        sort_by: str = "id",
+        sort_order: str = "asc",
+        total: str = "none"
+    ) -> KeysetPage:
+        """Get participants with filtering and keyset pagination.
+
+        ``skip`` is only honoured when no ``cursor`` is given so existing
+        offset callers keep working while they migrate to cursors.
+        """
+        query = ParticipantService.build_participant_query(
+            db, search=search, status=status, support_category=support_category
+        )
+        
+        if sort_by not in ParticipantService.PARTICIPANT_SORT_COLUMNS:
+            sort_by = "id"
+        descending = sort_order.lower() == "desc"
+        
+        return paginate(
+            query,
+            sort_key=f"{sort_by}:{'desc' if descending else 'asc'}",
+            sort_column=ParticipantService.PARTICIPANT_SORT_COLUMNS[sort_by],
+            id_column=Participant.id,
+            descending=descending,
+            cursor=cursor,
+            limit=limit,
+            offset=skip or None,
+            total=total,
+        )
+    
+    @staticmethod
+    def build_participant_query(
+        db: Session,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
         support_category: Optional[str] = None
-    ) -> List[Participant]:
-        """Get participants with filtering"""
+    ):
+        """Return the filtered (unordered) participant query"""
         query = db.query(Participant)
         
         # Apply search filter
@@ -115,7 +289,7 @@ class ParticipantService:
         if support_category and support_category != "all":
             query = query.filter(Participant.support_category == support_category)
         
-        return query.offset(skip).limit(limit).all()
+        return query
     
     @staticmethod
     def update_participant(
@@ -130,11 +304,16 @@ class ParticipantService:
         
         # Update only provided fields
         update_data = participant_data.dict(exclude_unset=True)
+        status_changed = "status" in update_data and update_data["status"] != db_participant.status
+        if status_changed:
+            ParticipantStatsService.record_transition(db, db_participant.status, update_data["status"])
         for field, value in update_data.items():
             setattr(db_participant, field, value)
         
         db.commit()
         db.refresh(db_participant)
+        if status_changed:
+            get_participant_stats_cache().invalidate()
         return db_participant
     
     @staticmethod
@@ -148,6 +327,7 @@ class ParticipantService:
         if not db_participant:
             return None
         
+        ParticipantStatsService.record_transition(db, db_participant.status, status)
         db_participant.status = status
         
         # Auto-update onboarding flags based on status
@@ -159,36 +339,32 @@ class ParticipantService:
         
         db.commit()
         db.refresh(db_participant)
+        get_participant_stats_cache().invalidate()
         return db_participant
     
     @staticmethod
-    def delete_participant(db: Session, participant_id: int) -> bool:
-        """Delete a participant"""
-        db_participant = db.query(Participant).filter(Participant.id == participant_id).first()
-        if not db_participant:
+    def delete_participant(
+        db: Session,
+        participant_id: int,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> bool:
+        """Delete a participant with their documents, plans and generated documents
+        
+        Everything is removed in one transaction of bulk statements; stored files
+        are reaped afterwards (in the background when ``background_tasks`` is given).
+        """
+        result = CascadeDeletionService.delete_participant(db, participant_id)
+        if result is None:
             return False
+        get_participant_stats_cache().invalidate()
         
-        db.delete(db_participant)
-        db.commit()
+        if background_tasks is not None:
+            background_tasks.add_task(reap_files, result.file_paths)
+        else:
+            reap_files(result.file_paths)
         return True
     
     @staticmethod
-    def get_participant_stats(db: Session) -> dict:
-        """Get participant statistics"""
-        total = db.query(Participant).count()
-        active = db.query(Participant).filter(Participant.status == "active").count()
-        prospective = db.query(Participant).filter(Participant.status == "prospective").count()
-        onboarded = db.query(Participant).filter(Participant.status == "onboarded").count()
-        
-        # Get new participants this week
-        from datetime import datetime, timedelta
-        week_ago = datetime.now() - timedelta(days=7)
-        new_this_week = db.query(Participant).filter(Participant.created_at >= week_ago).count()
-        
-        return {
-            "total": total,
-            "active": active,
-            "prospective": prospective,
-            "onboarded": onboarded,
-            "new_this_week": new_this_week
-        }
\ No newline at end of file
+    def get_participant_stats(db: Session, refresh: bool = False) -> dict:
+        """Get participant statistics (cached briefly; ``refresh`` bypasses the cache)"""
+        return get_participant_stats_cache().get(db, refresh=refresh)
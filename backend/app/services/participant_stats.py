@@ -0,0 +1,161 @@
+"""Participant dashboard statistics.
+
+``compute`` answers the whole widget with one grouped conditional-aggregate
+query.  ``participant_status_counts`` additionally keeps one row per status
+that every create, status change and delete adjusts inside its own
+transaction; with ``PARTICIPANT_STATS_SOURCE=counters`` the totals are read
+from that table instead of scanning ``participants`` (only "new this week"
+still touches the participants table, through the ``created_at`` index).
+
+Results are cached per database for ``PARTICIPANT_STATS_CACHE_TTL_SECONDS``.
+Writers call ``invalidate`` after committing, so the process that made a
+change sees it at once; other worker processes catch up within the TTL.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.participant import Participant, ParticipantStatusCount
+
+PARTICIPANT_STATS_CACHE_TTL_SECONDS = int(os.getenv("PARTICIPANT_STATS_CACHE_TTL_SECONDS", "30"))
+PARTICIPANT_STATS_SOURCE = os.getenv("PARTICIPANT_STATS_SOURCE", "aggregate")  # aggregate | counters
+
+# Statuses reported individually by the dashboard widget
+DASHBOARD_STATUSES = ("active", "prospective", "onboarded")
+
+
+def _week_ago() -> datetime:
+    return datetime.now() - timedelta(days=7)
+
+
+class ParticipantStatsService:
+    """Dashboard counts for participants."""
+
+    @staticmethod
+    def compute(db: Session) -> dict:
+        """Every dashboard count from a single conditional-aggregate query."""
+
+        columns = [func.count(Participant.id).label("total")]
+        columns += [
+            func.coalesce(func.sum(case((Participant.status == status, 1), else_=0)), 0).label(status)
+            for status in DASHBOARD_STATUSES
+        ]
+        columns.append(
+            func.coalesce(func.sum(case((Participant.created_at >= _week_ago(), 1), else_=0)), 0)
+            .label("new_this_week")
+        )
+        row = db.execute(select(*columns)).one()
+        return {name: int(value) for name, value in row._mapping.items()}
+
+    @staticmethod
+    def from_counters(db: Session) -> dict:
+        """Dashboard counts from the maintained ``participant_status_counts`` rows."""
+
+        counts = dict(db.execute(select(ParticipantStatusCount.status, ParticipantStatusCount.count)).all())
+        new_this_week = db.execute(
+            select(func.count(Participant.id)).where(Participant.created_at >= _week_ago())
+        ).scalar()
+        stats = {"total": sum(counts.values())}
+        stats.update({status: counts.get(status, 0) for status in DASHBOARD_STATUSES})
+        stats["new_this_week"] = new_this_week
+        return stats
+
+    @staticmethod
+    def adjust(db: Session, deltas: Dict[Optional[str], int]) -> None:
+        """Apply per-status count changes in the caller's transaction (no commit)."""
+
+        for status, delta in deltas.items():
+            if not status or not delta:
+                continue
+            updated = db.execute(
+                update(ParticipantStatusCount)
+                .where(ParticipantStatusCount.status == status)
+                .values(count=ParticipantStatusCount.count + delta)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not updated:
+                db.execute(insert(ParticipantStatusCount).values(status=status, count=max(delta, 0)))
+
+    @staticmethod
+    def record_transition(db: Session, old_status: Optional[str], new_status: Optional[str]) -> None:
+        """Move one participant between statuses; ``None`` means created or deleted."""
+
+        if old_status == new_status:
+            return
+        ParticipantStatsService.adjust(db, {old_status: -1, new_status: 1})
+
+    @staticmethod
+    def rebuild_counters(db: Session) -> Dict[str, int]:
+        """Recount ``participant_status_counts`` from the participants table and commit."""
+
+        counts = dict(
+            db.execute(
+                select(Participant.status, func.count(Participant.id))
+                .where(Participant.status.isnot(None))
+                .group_by(Participant.status)
+            ).all()
+        )
+        try:
+            db.execute(delete(ParticipantStatusCount))
+            if counts:
+                db.execute(
+                    insert(ParticipantStatusCount),
+                    [{"status": status, "count": count} for status, count in counts.items()],
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        get_participant_stats_cache().invalidate()
+        return counts
+
+
+class ParticipantStatsCache:
+    """Dashboard stats cached per database for ``ttl`` seconds."""
+
+    def __init__(self, ttl: int = PARTICIPANT_STATS_CACHE_TTL_SECONDS, source: str = PARTICIPANT_STATS_SOURCE):
+        self.ttl = ttl
+        self.source = source
+        self._lock = threading.Lock()
+        self._cache = weakref.WeakKeyDictionary()
+        self._generation = 0
+
+    def get(self, db: Session, refresh: bool = False) -> dict:
+        bind = db.get_bind()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(bind)
+            generation = self._generation
+        if cached and cached[0] > now and not refresh:
+            return dict(cached[1])
+
+        if self.source == "counters":
+            stats = ParticipantStatsService.from_counters(db)
+        else:
+            stats = ParticipantStatsService.compute(db)
+        with self._lock:
+            # A write committed while we were counting makes this result stale.
+            if generation == self._generation:
+                self._cache[bind] = (now + self.ttl, stats)
+        return dict(stats)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+
+@lru_cache(maxsize=1)
+def get_participant_stats_cache() -> ParticipantStatsCache:
+    """Process-wide participant stats cache."""
+
+    return ParticipantStatsCache()
@@ -1,18 +1,15 @@
 """Profile related helpers shared between the HTML and JSON routes."""
 from __future__ import annotations
 
+import io
 import os
-from pathlib import Path
 
 from fastapi import HTTPException
 from starlette.datastructures import UploadFile
 from sqlalchemy.orm import Session
 
 from app import crud, models
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-UPLOAD_DIR = BASE_DIR / "uploads"
-UPLOAD_DIR.mkdir(exist_ok=True)
+from app.core.storage import get_storage
 
 
 async def save_profile_upload(
@@ -32,17 +29,13 @@ async def save_profile_upload(
     default_ext = ".png" if normalized_kind == "photo" else ".pdf"
     ext = os.path.splitext(filename)[1] or default_ext
 
-    folder = UPLOAD_DIR / str(candidate.id)
-    folder.mkdir(parents=True, exist_ok=True)
-    dest = folder / f"{normalized_kind}{ext}"
+    relative_path = f"uploads/{candidate.id}/{normalized_kind}{ext}"
 
     contents = await file.read()
     if not contents:
         raise HTTPException(status_code=400, detail="Uploaded file was empty")
 
-    with open(dest, "wb") as buffer:
-        buffer.write(contents)
+    get_storage().save(relative_path, io.BytesIO(contents), content_type=file.content_type)
 
-    relative_path = str(dest.relative_to(BASE_DIR))
     crud.set_profile_file(db, candidate.id, normalized_kind, relative_path)
     return relative_path
@@ -0,0 +1,267 @@
+"""Batched referral ingestion for partner agencies.
+
+Partners send their referrals as a JSON array or an NDJSON stream, each
+item carrying an ``idempotency_key`` (``idempotencyKey`` also works; keys are
+normalised like import headers).  Resending an item, for example after a
+timeout, returns the referral created the first time instead of adding a
+duplicate.  Reusing a key for a different referral is reported as a
+conflict.
+
+Items are validated with ``ReferralCreate`` in a process pool for large
+batches, then inserted in chunks: one query finds the keys already stored,
+the new referrals are inserted with one ``executemany`` and the chunk is
+committed as a single transaction.  The unique index on
+``referrals.idempotency_key`` settles races between concurrent requests; a
+chunk that hits it is retried once against the fresh state.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.referral import Referral
+from app.services.duplicate_detection import DuplicateDetectionService
+from app.services.participant_import_service import normalize_header, validate_rows
+
+logger = logging.getLogger(__name__)
+
+REFERRAL_INGEST_WORKERS = int(os.getenv("REFERRAL_INGEST_WORKERS", "4"))
+REFERRAL_INGEST_CHUNK_SIZE = int(os.getenv("REFERRAL_INGEST_CHUNK_SIZE", "500"))
+# Batches smaller than this are validated in-process; a pool costs more than it saves.
+REFERRAL_INGEST_PARALLEL_THRESHOLD = int(os.getenv("REFERRAL_INGEST_PARALLEL_THRESHOLD", "200"))
+REFERRAL_BATCH_MAX_ITEMS = int(os.getenv("REFERRAL_BATCH_MAX_ITEMS", "5000"))
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+STATUS_CREATED = "created"
+STATUS_DUPLICATE = "duplicate"  # key seen before with the same referral
+STATUS_CONFLICT = "conflict"  # key seen before with a different referral
+STATUS_INVALID = "invalid"
+STATUS_FAILED = "failed"
+
+
+class ReferralBatchError(ValueError):
+    """Raised when a batch cannot be read at all (bad JSON, too many items)."""
+
+
+@dataclass
+class ReferralIngestResult:
+    """Outcome of one item (``index`` is its position in the batch)."""
+
+    index: int
+    status: str
+    idempotency_key: Optional[str] = None
+    referral_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ReferralIngestReport:
+    counts: Dict[str, int] = field(default_factory=dict)
+    results: List[ReferralIngestResult] = field(default_factory=list)
+
+    def add(self, result: ReferralIngestResult) -> None:
+        self.counts[result.status] = self.counts.get(result.status, 0) + 1
+        self.results.append(result)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": len(self.results),
+            "counts": self.counts,
+            "results": [asdict(result) for result in sorted(self.results, key=lambda result: result.index)],
+        }
+
+
+def parse_batch(body: bytes, ndjson: bool = False, max_items: int = REFERRAL_BATCH_MAX_ITEMS) -> List[Any]:
+    """Read a JSON array, or one JSON object per line for NDJSON."""
+
+    try:
+        if ndjson:
+            items = []
+            for number, line in enumerate(body.decode("utf-8").splitlines(), start=1):
+                if line.strip():
+                    try:
+                        items.append(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        raise ReferralBatchError(f"Line {number} is not valid JSON: {e.msg}")
+        else:
+            items = json.loads(body or b"null")
+    except UnicodeDecodeError:
+        raise ReferralBatchError("The batch must be UTF-8 encoded")
+    except json.JSONDecodeError as e:
+        raise ReferralBatchError(f"The batch is not valid JSON: {e.msg}")
+
+    if not isinstance(items, list):
+        raise ReferralBatchError("Send a JSON array of referrals")
+    if len(items) > max_items:
+        raise ReferralBatchError(f"A batch may hold at most {max_items} referrals")
+    return items
+
+
+def fingerprint(values: Dict[str, Any]) -> str:
+    """Stable hash of a validated referral, used to tell retries from key reuse."""
+
+    payload = json.dumps(values, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ReferralIngestService:
+    """Validate and insert batches of referrals exactly once per idempotency key."""
+
+    @staticmethod
+    def _split(items: List[Any]) -> Tuple[List[Tuple[int, str, Dict[str, Any]]], List[ReferralIngestResult]]:
+        """Normalise keys and pull out each item's idempotency key."""
+
+        keyed, rejected = [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                rejected.append(ReferralIngestResult(index, STATUS_INVALID, error="Each item must be a JSON object"))
+                continue
+            values = {normalize_header(key): value for key, value in item.items()}
+            key = values.pop("idempotency_key", None)
+            key = str(key).strip() if key is not None else ""
+            if not key:
+                rejected.append(ReferralIngestResult(index, STATUS_INVALID, error="idempotency_key is required"))
+            elif len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+                rejected.append(ReferralIngestResult(
+                    index, STATUS_INVALID, key[:IDEMPOTENCY_KEY_MAX_LENGTH],
+                    error=f"idempotency_key is longer than {IDEMPOTENCY_KEY_MAX_LENGTH} characters",
+                ))
+            else:
+                keyed.append((index, key, values))
+        return keyed, rejected
+
+    @staticmethod
+    def _validate(
+        keyed: List[Tuple[int, str, Dict[str, Any]]], workers: int, chunk_size: int
+    ) -> List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+        rows = [(index, values) for index, _key, values in keyed]
+        if workers <= 1 or len(rows) < REFERRAL_INGEST_PARALLEL_THRESHOLD:
+            return validate_rows("referrals", rows)
+
+        validated = []
+        size = max(1, min(chunk_size, -(-len(rows) // workers)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(validate_rows, "referrals", chunk) for chunk in _chunks(rows, size)]
+            for future in futures:
+                validated.extend(future.result())
+        return validated
+
+    @staticmethod
+    def _existing(db: Session, keys: Iterable[str]) -> Dict[str, Tuple[int, Optional[str]]]:
+        """Map stored idempotency keys to (referral id, fingerprint) in one query."""
+
+        keys = list(keys)
+        if not keys:
+            return {}
+        rows = db.execute(
+            select(Referral.idempotency_key, Referral.id, Referral.ingest_fingerprint)
+            .where(Referral.idempotency_key.in_(keys))
+        ).all()
+        return {key: (referral_id, stored) for key, referral_id, stored in rows}
+
+    @staticmethod
+    def _insert_chunk(db: Session, chunk: List[Tuple[int, str, Dict[str, Any]]]) -> List[ReferralIngestResult]:
+        """Insert one chunk of validated items in a single transaction."""
+
+        results = []
+        inserts = []
+        first: Dict[str, str] = {}  # key -> fingerprint of its first item in this chunk
+        repeats = []
+        try:
+            existing = ReferralIngestService._existing(db, {key for _index, key, _values in chunk})
+            for index, key, values in chunk:
+                digest = fingerprint(values)
+                if key in existing:
+                    referral_id, stored = existing[key]
+                    results.append(ReferralIngestService._replay(index, key, referral_id, stored, digest))
+                elif key in first:
+                    repeats.append((index, key, digest))
+                else:
+                    first[key] = digest
+                    inserts.append((index, key, {**values, "idempotency_key": key, "ingest_fingerprint": digest}))
+
+            ids = {}
+            if inserts:
+                created = db.scalars(
+                    insert(Referral).returning(Referral.id, sort_by_parameter_order=True),
+                    [values for _index, _key, values in inserts],
+                ).all()
+                ids = {key: referral_id for (_index, key, _values), referral_id in zip(inserts, created)}
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for index, key, _values in inserts:
+            results.append(ReferralIngestResult(index, STATUS_CREATED, key, ids[key]))
+        for index, key, digest in repeats:
+            results.append(ReferralIngestService._replay(index, key, ids[key], first[key], digest))
+        return results
+
+    @staticmethod
+    def _replay(index: int, key: str, referral_id: int, stored: Optional[str], digest: str) -> ReferralIngestResult:
+        if stored == digest:
+            return ReferralIngestResult(index, STATUS_DUPLICATE, key, referral_id)
+        return ReferralIngestResult(
+            index, STATUS_CONFLICT, key, referral_id,
+            error="idempotency_key was already used for a different referral",
+        )
+
+    @staticmethod
+    def ingest(
+        db: Session,
+        items: List[Any],
+        workers: int = REFERRAL_INGEST_WORKERS,
+        chunk_size: int = REFERRAL_INGEST_CHUNK_SIZE,
+    ) -> ReferralIngestReport:
+        """Validate ``items`` and create a referral for each new idempotency key."""
+
+        report = ReferralIngestReport()
+        keyed, rejected = ReferralIngestService._split(items)
+        for result in rejected:
+            report.add(result)
+
+        keys = {index: key for index, key, _values in keyed}
+        valid = []
+        for index, values, error in ReferralIngestService._validate(keyed, workers, chunk_size):
+            if error is not None:
+                report.add(ReferralIngestResult(index, STATUS_INVALID, keys[index], error=error))
+            else:
+                valid.append((index, keys[index], values))
+
+        for chunk in _chunks(valid, chunk_size):
+            try:
+                try:
+                    results = ReferralIngestService._insert_chunk(db, chunk)
+                except IntegrityError:
+                    # Another request stored one of these keys first; the retry sees it.
+                    results = ReferralIngestService._insert_chunk(db, chunk)
+            except Exception as e:
+                logger.error(f"Referral batch chunk of {len(chunk)} failed: {str(e)}")
+                results = [
+                    ReferralIngestResult(index, STATUS_FAILED, key, error=str(e))
+                    for index, key, _values in chunk
+                ]
+            for result in results:
+                report.add(result)
+            DuplicateDetectionService.check_new(
+                db, "referral", [result.referral_id for result in results if result.status == STATUS_CREATED]
+            )
+
+        logger.info(f"Referral batch ingested: {report.counts}")
+        return report
@@ -2,7 +2,9 @@
 from sqlalchemy.orm import Session
 from app.models.referral import Referral
 from app.schemas.referral import ReferralCreate
-from typing import List
+from typing import Optional
+from app.core.pagination import KeysetPage, paginate
+from app.services.duplicate_detection import DuplicateDetectionService
 
 class ReferralService:
     @staticmethod
@@ -12,6 +14,7 @@ class ReferralService:
         db.add(db_referral)
         db.commit()
         db.refresh(db_referral)
+        DuplicateDetectionService.check_new(db, "referral", [db_referral.id])
         return db_referral
     
     @staticmethod
@@ -20,9 +23,24 @@ class ReferralService:
         return db.query(Referral).filter(Referral.id == referral_id).first()
     
     @staticmethod
-    def get_referrals(db: Session, skip: int = 0, limit: int = 100) -> List[Referral]:
-        """Get all referrals with pagination"""
-        return db.query(Referral).offset(skip).limit(limit).all()
+    def get_referrals(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        total: str = "none"
+    ) -> KeysetPage:
+        """Get referrals in id order with keyset pagination"""
+        return paginate(
+            db.query(Referral),
+            sort_key="id:asc",
+            sort_column=Referral.id,
+            id_column=Referral.id,
+            cursor=cursor,
+            limit=limit,
+            offset=skip or None,
+            total=total,
+        )
     
     @staticmethod
     def update_referral_status(db: Session, referral_id: int, status: str) -> Referral:
@@ -30,6 +48,9 @@ class ReferralService:
         db_referral = db.query(Referral).filter(Referral.id == referral_id).first()
         if db_referral:
             db_referral.status = status
+            # Triage is done with it; drop any claim
+            db_referral.claimed_by = None
+            db_referral.claim_expires_at = None
             db.commit()
             db.refresh(db_referral)
         return db_referral
\ No newline at end of file
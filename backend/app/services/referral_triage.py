@@ -0,0 +1,193 @@
+"""Triage queue for incoming referrals.
+
+The queue holds referrals in one status (``submitted`` by default), most
+urgent first and oldest first within an urgency level.  It is read straight
+from ``ix_referrals_triage`` on ``(status, urgency rank, created_at, id)``,
+so the next referrals cost an index range scan instead of a sort.
+
+Staff take work by claiming it.  A claim is a lease: the referral is hidden
+from other claimers until ``claim_expires_at``, after which it returns to the
+queue unless renewed.  Each claim is a conditional ``UPDATE`` that only
+succeeds while the referral is still unclaimed (or its lease has lapsed), so
+two people claiming at once never get the same referral.  On PostgreSQL the
+candidate rows are also read with ``FOR UPDATE SKIP LOCKED`` so concurrent
+claimers pass over each other's rows instead of contending for them.
+Changing a referral's status clears its claim.
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.referral import URGENCY_RANKS, Referral, urgency_rank
+
+TRIAGE_QUEUE_STATUS = "submitted"
+TRIAGE_LEASE_SECONDS = int(os.getenv("TRIAGE_LEASE_SECONDS", "900"))
+TRIAGE_MAX_CLAIM = 20
+
+_QUEUE_COLUMNS = (
+    Referral.id,
+    Referral.first_name,
+    Referral.last_name,
+    Referral.urgency_level,
+    Referral.status,
+    Referral.referred_for,
+    Referral.referrer_agency,
+    Referral.created_at,
+    Referral.claimed_by,
+    Referral.claim_expires_at,
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _unclaimed(now: datetime):
+    return or_(Referral.claim_expires_at.is_(None), Referral.claim_expires_at <= now)
+
+
+def _item(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "first_name": row.first_name,
+        "last_name": row.last_name,
+        "urgency_level": row.urgency_level,
+        "status": row.status,
+        "referred_for": row.referred_for,
+        "referrer_agency": row.referrer_agency,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "claimed_by": row.claimed_by,
+        "claim_expires_at": row.claim_expires_at.isoformat() if row.claim_expires_at else None,
+    }
+
+
+class ReferralTriageService:
+    """Read, claim and release referrals in triage order."""
+
+    @staticmethod
+    def _queue_query(status: str, urgency: Optional[str], now: Optional[datetime]):
+        query = select(*_QUEUE_COLUMNS).where(Referral.status == status)
+        if urgency:
+            query = query.where(func.lower(Referral.urgency_level) == urgency.lower())
+        if now is not None:
+            query = query.where(_unclaimed(now))
+        return query.order_by(urgency_rank(Referral.urgency_level), Referral.created_at, Referral.id)
+
+    @staticmethod
+    def counts(db: Session) -> Dict[str, Dict[str, int]]:
+        """Referral counts by urgency level and status, most urgent level first."""
+
+        level = func.lower(Referral.urgency_level)
+        rows = db.execute(
+            select(level, Referral.status, func.count()).group_by(level, Referral.status)
+        ).all()
+        counts: Dict[str, Dict[str, int]] = {}
+        ordered = sorted(rows, key=lambda row: (URGENCY_RANKS.get(row[0], len(URGENCY_RANKS)), row[0] or ""))
+        for urgency, status, count in ordered:
+            counts.setdefault(urgency, {})[status] = count
+        return counts
+
+    @staticmethod
+    def queue(
+        db: Session,
+        status: str = TRIAGE_QUEUE_STATUS,
+        urgency: Optional[str] = None,
+        limit: int = 20,
+        include_claimed: bool = False,
+    ) -> Dict[str, Any]:
+        """The head of the queue plus counts per urgency level and status."""
+
+        now = None if include_claimed else _now()
+        rows = db.execute(ReferralTriageService._queue_query(status, urgency, now).limit(limit)).all()
+        return {
+            "items": [_item(row) for row in rows],
+            "counts": ReferralTriageService.counts(db),
+        }
+
+    @staticmethod
+    def claim(
+        db: Session,
+        claimed_by: str,
+        count: int = 1,
+        lease_seconds: int = TRIAGE_LEASE_SECONDS,
+        status: str = TRIAGE_QUEUE_STATUS,
+        urgency: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Lease up to ``count`` of the next unclaimed referrals to ``claimed_by``."""
+
+        count = max(1, min(count, TRIAGE_MAX_CLAIM))
+        claimed: List[int] = []
+        try:
+            # A few rounds in case other claimers win some of the candidates.
+            for _attempt in range(3):
+                now = _now()
+                expires = now + timedelta(seconds=lease_seconds)
+                candidates = db.execute(
+                    ReferralTriageService._queue_query(status, urgency, now)
+                    .with_only_columns(Referral.id)
+                    .limit(count - len(claimed))
+                    .with_for_update(skip_locked=True)
+                ).scalars().all()
+                if not candidates:
+                    break
+                for referral_id in candidates:
+                    won = db.execute(
+                        update(Referral)
+                        .where(Referral.id == referral_id, Referral.status == status, _unclaimed(now))
+                        .values(claimed_by=claimed_by, claim_expires_at=expires)
+                        .execution_options(synchronize_session=False)
+                    ).rowcount
+                    if won:
+                        claimed.append(referral_id)
+                db.commit()
+                if len(claimed) >= count:
+                    break
+        except Exception:
+            db.rollback()
+            raise
+
+        if not claimed:
+            return []
+        rows = db.execute(
+            select(*_QUEUE_COLUMNS)
+            .where(Referral.id.in_(claimed))
+            .order_by(urgency_rank(Referral.urgency_level), Referral.created_at, Referral.id)
+        ).all()
+        return [_item(row) for row in rows]
+
+    @staticmethod
+    def renew(
+        db: Session, referral_id: int, claimed_by: str, lease_seconds: int = TRIAGE_LEASE_SECONDS
+    ) -> Optional[Dict[str, Any]]:
+        """Extend a lease still held by ``claimed_by``; ``None`` if it is not theirs."""
+
+        expires = _now() + timedelta(seconds=lease_seconds)
+        renewed = db.execute(
+            update(Referral)
+            .where(Referral.id == referral_id, Referral.claimed_by == claimed_by)
+            .values(claim_expires_at=expires)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if not renewed:
+            return None
+        row = db.execute(select(*_QUEUE_COLUMNS).where(Referral.id == referral_id)).first()
+        return _item(row)
+
+    @staticmethod
+    def release(db: Session, referral_id: int, claimed_by: str) -> bool:
+        """Put a claimed referral back in the queue."""
+
+        released = db.execute(
+            update(Referral)
+            .where(Referral.id == referral_id, Referral.claimed_by == claimed_by)
+            .values(claimed_by=None, claim_expires_at=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return bool(released)
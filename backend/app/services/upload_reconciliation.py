@@ -0,0 +1,363 @@
+"""Reconcile the upload tree against the rows that reference it.
+
+Three kinds of drift are reported:
+
+* orphaned files - files under ``uploads/documents/{participant_id}/`` or
+  ``uploads/{candidate_id}/`` that no ``documents.file_path`` or
+  ``candidate_profiles.resume_path``/``photo_path`` points at (failed commits,
+  deletes whose file removal only logged a warning);
+* stale temp dirs - bulk generation zip directories left in the system temp
+  directory by crashed requests;
+* dangling rows - rows whose stored path no longer exists on disk.
+
+Directories are scanned by a small thread pool that streams entries through a
+bounded queue, and the main thread looks them up in the database one batch at
+a time, so neither side ever materialises the whole tree or table.  Rows are
+streamed the same way and their files checked in parallel.
+
+Reclaiming is opt-in (``dry_run=False``), limited to orphaned files and stale
+temp dirs, and rate limited.  Dangling rows are only reported: deciding what
+to do with a record whose file is gone is left to an administrator.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models import CandidateProfile
+from app.models.document import Document
+from app.services.document_generation_service import BULK_ZIP_TEMP_PREFIX
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+_SENTINEL = object()
+
+
+@dataclass
+class OrphanedFile:
+    path: str
+    size: int
+    kind: str  # document, candidate
+
+
+@dataclass
+class DanglingRow:
+    table: str
+    row_id: int
+    column: str
+    path: str
+
+
+@dataclass
+class ReconciliationReport:
+    dry_run: bool = True
+    scanned_files: int = 0
+    scanned_rows: int = 0
+    orphaned_files: List[OrphanedFile] = field(default_factory=list)
+    stale_temp_dirs: List[OrphanedFile] = field(default_factory=list)
+    dangling_rows: List[DanglingRow] = field(default_factory=list)
+    reclaimed_files: int = 0
+    reclaimed_bytes: int = 0
+
+    @property
+    def orphaned_bytes(self) -> int:
+        return sum(item.size for item in self.orphaned_files) + sum(
+            item.size for item in self.stale_temp_dirs
+        )
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["orphaned_bytes"] = self.orphaned_bytes
+        return data
+
+
+class RateLimiter:
+    """Allow at most ``per_second`` operations per second (0 disables the limit)."""
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = time.monotonic()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next) + self.interval
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class UploadReconciler:
+    """Walk uploads and the referencing tables and report (or reclaim) drift."""
+
+    def __init__(
+        self,
+        db: Session,
+        base_dir: Path = BASE_DIR,
+        temp_dir: Optional[Path] = None,
+        batch_size: int = 500,
+        workers: int = 4,
+        grace_period: timedelta = timedelta(hours=1),
+        max_deletes_per_second: float = 20.0,
+    ):
+        self.db = db
+        self.base_dir = Path(base_dir)
+        self.upload_dir = self.base_dir / "uploads"
+        self.temp_dir = Path(temp_dir or tempfile.gettempdir())
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        # Files younger than this may belong to an upload that has not committed yet.
+        self.grace_period = grace_period
+        self.rate_limiter = RateLimiter(max_deletes_per_second)
+
+    # ------------------------------------------------------------------
+    # Upload tree -> rows
+    # ------------------------------------------------------------------
+    def _scan_roots(self) -> List[Tuple[Path, str]]:
+        roots: List[Tuple[Path, str]] = []
+        documents_dir = self.upload_dir / "documents"
+        if documents_dir.is_dir():
+            roots.extend((entry, "document") for entry in documents_dir.iterdir() if entry.is_dir())
+        if self.upload_dir.is_dir():
+            roots.extend(
+                (entry, "candidate")
+                for entry in self.upload_dir.iterdir()
+                if entry.is_dir() and entry.name.isdigit()
+            )
+        return roots
+
+    @staticmethod
+    def _put(out: "queue.Queue", item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _scan_into(self, root: Path, kind: str, out: "queue.Queue", stop: threading.Event) -> None:
+        cutoff = time.time() - self.grace_period.total_seconds()
+        try:
+            for dirpath, _dirs, files in os.walk(root):
+                for name in files:
+                    path = Path(dirpath) / name
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    if stat.st_mtime > cutoff:
+                        continue
+                    if not self._put(out, (path, stat.st_size, kind), stop):
+                        return
+        finally:
+            self._put(out, _SENTINEL, stop)
+
+    def _iter_upload_files(self) -> Iterator[Tuple[Path, int, str]]:
+        roots = self._scan_roots()
+        if not roots:
+            return
+        entries: "queue.Queue" = queue.Queue(maxsize=self.batch_size * 2)
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="upload-scan") as pool:
+            for root, kind in roots:
+                pool.submit(self._scan_into, root, kind, entries, stop)
+            try:
+                remaining = len(roots)
+                while remaining:
+                    item = entries.get()
+                    if item is _SENTINEL:
+                        remaining -= 1
+                        continue
+                    yield item
+            finally:
+                # Unblock scanners if the consumer stopped early.
+                stop.set()
+
+    def _stored_forms(self, path: Path) -> Tuple[str, str]:
+        """Stored paths are normally relative to the backend dir; legacy rows may be absolute."""
+
+        return str(path.relative_to(self.base_dir)), str(path)
+
+    def _referenced(self, batch: Sequence[Tuple[Path, int, str]]) -> set:
+        forms = {form for path, _size, _kind in batch for form in self._stored_forms(path)}
+        referenced = set(
+            self.db.execute(select(Document.file_path).where(Document.file_path.in_(forms))).scalars()
+        )
+        if any(kind == "candidate" for _path, _size, kind in batch):
+            for resume_path, photo_path in self.db.execute(
+                select(CandidateProfile.resume_path, CandidateProfile.photo_path).where(
+                    or_(CandidateProfile.resume_path.in_(forms), CandidateProfile.photo_path.in_(forms))
+                )
+            ):
+                referenced.update(p for p in (resume_path, photo_path) if p)
+        return referenced
+
+    def _find_orphaned_files(self, report: ReconciliationReport) -> None:
+        batch: List[Tuple[Path, int, str]] = []
+
+        def flush() -> None:
+            referenced = self._referenced(batch)
+            for path, size, kind in batch:
+                if not any(form in referenced for form in self._stored_forms(path)):
+                    report.orphaned_files.append(
+                        OrphanedFile(path=self._stored_forms(path)[0], size=size, kind=kind)
+                    )
+            batch.clear()
+
+        for entry in self._iter_upload_files():
+            report.scanned_files += 1
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                flush()
+        if batch:
+            flush()
+
+    def _find_stale_temp_dirs(self, report: ReconciliationReport) -> None:
+        if not self.temp_dir.is_dir():
+            return
+        cutoff = time.time() - self.grace_period.total_seconds()
+        for entry in self.temp_dir.iterdir():
+            if not entry.name.startswith(BULK_ZIP_TEMP_PREFIX) or not entry.is_dir():
+                continue
+            try:
+                if entry.stat().st_mtime > cutoff:
+                    continue
+            except OSError:
+                continue
+            report.stale_temp_dirs.append(OrphanedFile(path=str(entry), size=_tree_size(entry), kind="temp"))
+
+    # ------------------------------------------------------------------
+    # Rows -> upload tree
+    # ------------------------------------------------------------------
+    def _resolve(self, stored: str) -> Path:
+        path = Path(stored)
+        return path if path.is_absolute() else self.base_dir / stored
+
+    def _check_rows(
+        self,
+        rows: Iterator[Tuple[str, int, str, str]],
+        report: ReconciliationReport,
+        pool: ThreadPoolExecutor,
+    ) -> None:
+        batch: List[Tuple[str, int, str, str]] = []
+
+        def flush() -> None:
+            exists = pool.map(lambda row: self._resolve(row[3]).exists(), batch)
+            for row, found in zip(batch, exists):
+                if not found:
+                    report.dangling_rows.append(
+                        DanglingRow(table=row[0], row_id=row[1], column=row[2], path=row[3])
+                    )
+            batch.clear()
+
+        for row in rows:
+            report.scanned_rows += 1
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                flush()
+        if batch:
+            flush()
+
+    def _iter_document_rows(self) -> Iterator[Tuple[str, int, str, str]]:
+        query = (
+            self.db.query(Document.id, Document.file_path)
+            .filter(Document.file_path.isnot(None))
+            .order_by(Document.id)
+            .yield_per(self.batch_size)
+        )
+        for row_id, file_path in query:
+            yield ("documents", row_id, "file_path", file_path)
+
+    def _iter_candidate_rows(self) -> Iterator[Tuple[str, int, str, str]]:
+        query = (
+            self.db.query(CandidateProfile.id, CandidateProfile.resume_path, CandidateProfile.photo_path)
+            .filter(or_(CandidateProfile.resume_path.isnot(None), CandidateProfile.photo_path.isnot(None)))
+            .order_by(CandidateProfile.id)
+            .yield_per(self.batch_size)
+        )
+        for row_id, resume_path, photo_path in query:
+            if resume_path:
+                yield ("candidate_profiles", row_id, "resume_path", resume_path)
+            if photo_path:
+                yield ("candidate_profiles", row_id, "photo_path", photo_path)
+
+    # ------------------------------------------------------------------
+    # Reclaiming
+    # ------------------------------------------------------------------
+    def _reclaim(self, report: ReconciliationReport, max_bytes: Optional[int]) -> None:
+        upload_root = self.upload_dir.resolve()
+        for item in report.orphaned_files:
+            if max_bytes is not None and report.reclaimed_bytes >= max_bytes:
+                break
+            path = self._resolve(item.path).resolve()
+            if upload_root not in path.parents:
+                logger.warning(f"Refusing to delete {path}: outside {upload_root}")
+                continue
+            self.rate_limiter.wait()
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"Could not delete orphaned file {path}: {str(e)}")
+                continue
+            report.reclaimed_files += 1
+            report.reclaimed_bytes += item.size
+
+        for item in report.stale_temp_dirs:
+            if max_bytes is not None and report.reclaimed_bytes >= max_bytes:
+                break
+            self.rate_limiter.wait()
+            shutil.rmtree(item.path, ignore_errors=True)
+            report.reclaimed_files += 1
+            report.reclaimed_bytes += item.size
+
+    def run(self, dry_run: bool = True, max_bytes: Optional[int] = None) -> ReconciliationReport:
+        """Reconcile uploads with the database; delete orphans only when ``dry_run`` is False."""
+
+        started = datetime.now()
+        report = ReconciliationReport(dry_run=dry_run)
+
+        self._find_orphaned_files(report)
+        self._find_stale_temp_dirs(report)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="upload-check") as pool:
+            self._check_rows(self._iter_document_rows(), report, pool)
+            self._check_rows(self._iter_candidate_rows(), report, pool)
+
+        if not dry_run:
+            self._reclaim(report, max_bytes)
+
+        logger.info(
+            f"Upload reconciliation ({'dry run' if dry_run else 'reclaim'}) finished in "
+            f"{(datetime.now() - started).total_seconds():.1f}s: {len(report.orphaned_files)} orphaned files, "
+            f"{len(report.stale_temp_dirs)} stale temp dirs, {len(report.dangling_rows)} dangling rows, "
+            f"{report.orphaned_bytes} bytes reclaimable"
+        )
+        return report
@@ -0,0 +1,150 @@
+"""Board of prospective participants and where each one is in the workflow.
+
+The board used to be assembled card by card from
+``GET /care/participants/{id}/prospective-workflow``, one request per
+participant.
+Here the whole page is one statement: prospective participants outer-joined
+to their workflow row, which ``WorkflowStateService.record`` keeps current as
+care plans and risk assessments are saved, with the per-stage counts computed
+over the same rows and joined on.  Nothing is written; participants without a
+workflow row have nothing recorded yet and show every step outstanding.
+
+A participant's stage is the first step still outstanding: ``care_plan``,
+then ``risk_assessment``, then ``ready_for_onboarding``.  Pages are keyset
+paginated oldest first, so the participants waiting longest lead the board.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import case, false, func, literal, select, true, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.pagination import decode_cursor, encode_cursor, keyset_bound, keyset_value
+from app.models.care_plan import ProspectiveWorkflow
+from app.models.participant import Participant
+
+BOARD_STATUS = "prospective"
+BOARD_STAGES = ("care_plan", "risk_assessment", "ready_for_onboarding")
+BOARD_SORT_KEY = "workflow_board"
+
+
+def _board():
+    """Every prospective participant with its workflow flags and stage."""
+
+    care_plan = func.coalesce(ProspectiveWorkflow.care_plan_completed, false())
+    risk_assessment = func.coalesce(ProspectiveWorkflow.risk_assessment_completed, false())
+    return (
+        select(
+            Participant.id.label("participant_id"),
+            Participant.first_name,
+            Participant.last_name,
+            Participant.status,
+            Participant.created_at,
+            ProspectiveWorkflow.id.label("workflow_id"),
+            care_plan.label("care_plan_completed"),
+            risk_assessment.label("risk_assessment_completed"),
+            func.coalesce(ProspectiveWorkflow.ai_review_completed, false()).label("ai_review_completed"),
+            func.coalesce(ProspectiveWorkflow.quotation_generated, false()).label("quotation_generated"),
+            ProspectiveWorkflow.care_plan_id,
+            ProspectiveWorkflow.risk_assessment_id,
+            ProspectiveWorkflow.updated_at,
+            case(
+                (~care_plan, literal(BOARD_STAGES[0])),
+                (~risk_assessment, literal(BOARD_STAGES[1])),
+                else_=literal(BOARD_STAGES[2]),
+            ).label("stage"),
+        )
+        .select_from(Participant)
+        .outerjoin(ProspectiveWorkflow, ProspectiveWorkflow.participant_id == Participant.id)
+        .where(Participant.status == BOARD_STATUS)
+        .cte("board")
+    )
+
+
+def _item(row) -> Dict[str, Any]:
+    return {
+        "participant_id": row.participant_id,
+        "participant_name": f"{row.first_name} {row.last_name}",
+        "participant_status": row.status,
+        "workflow_id": row.workflow_id,
+        "stage": row.stage,
+        "care_plan_completed": bool(row.care_plan_completed),
+        "risk_assessment_completed": bool(row.risk_assessment_completed),
+        "ai_review_completed": bool(row.ai_review_completed),
+        "quotation_generated": bool(row.quotation_generated),
+        "ready_for_onboarding": row.stage == BOARD_STAGES[2],
+        "care_plan_id": row.care_plan_id,
+        "risk_assessment_id": row.risk_assessment_id,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+    }
+
+
+class WorkflowBoardService:
+    """Read the prospective-participant board in a single query."""
+
+    @staticmethod
+    def board(
+        db: Session,
+        stages: Optional[Sequence[str]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """One page of the board plus participant counts per stage.
+
+        ``stages`` restricts the page (not the counts) to those stages.
+        Raises ``ValueError`` for unknown stages or a malformed cursor.
+        """
+
+        stages = list(dict.fromkeys(stages or ()))
+        unknown = [stage for stage in stages if stage not in BOARD_STAGES]
+        if unknown:
+            raise ValueError(f"Unknown stage: {', '.join(unknown)}. Expected one of {', '.join(BOARD_STAGES)}")
+
+        board = _board()
+        counts = select(
+            func.count().label("total"),
+            *[
+                func.coalesce(func.sum(case((board.c.stage == stage, 1), else_=0)), 0).label(f"count_{stage}")
+                for stage in BOARD_STAGES
+            ],
+        ).subquery("counts")
+
+        dialect_name = db.get_bind().dialect.name
+        page = select(board, keyset_value(board.c.created_at, dialect_name).label("keyset_created_at"))
+        if stages:
+            page = page.where(board.c.stage.in_(stages))
+        if cursor:
+            created_at, last_id = decode_cursor(cursor, BOARD_SORT_KEY)
+            page = page.where(
+                tuple_(board.c.created_at, board.c.participant_id)
+                > tuple_(
+                    keyset_bound(created_at, board.c.created_at, dialect_name),
+                    literal(last_id, type_=Participant.id.type),
+                )
+            )
+        page = page.order_by(board.c.created_at, board.c.participant_id).limit(limit + 1).subquery("page")
+
+        # Counts left join page: the counts row comes back even when the page is empty.
+        rows = db.execute(
+            select(counts, page)
+            .select_from(counts.outerjoin(page, true()))
+            .order_by(page.c.created_at, page.c.participant_id)
+        ).all()
+
+        first = rows[0]
+        stage_counts = {stage: int(getattr(first, f"count_{stage}")) for stage in BOARD_STAGES}
+        items = [_item(row) for row in rows if row.participant_id is not None]
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor(BOARD_SORT_KEY, rows[limit - 1].keyset_created_at, last["participant_id"])
+
+        return {
+            "items": items,
+            "counts": {"total": int(first.total), **stage_counts},
+            "next_cursor": next_cursor,
+        }
@@ -0,0 +1,228 @@
+"""Prospective workflow state, maintained when care plans and risk assessments are saved.
+
+``prospective_workflows`` used to be created and "repaired" on read: the
+workflow GET re-queried the latest care plan and risk assessment for the
+participant and wrote the row back whenever it was missing or stale, so one
+of the busiest reads was also a write transaction.  Now every care plan and
+risk assessment save calls ``record`` in its own transaction, which keeps the
+workflow row (and ``participants.care_plan_completed``) current, and reads
+are a single lookup by participant id.
+
+``backfill`` brings rows written before this existed into line once; see
+``scripts/backfill_workflow_state.py``.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.care_plan import CarePlan, ProspectiveWorkflow, RiskAssessment
+from app.models.participant import Participant
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _latest(model, column):
+    return (
+        select(column)
+        .where(model.participant_id == Participant.id)
+        .order_by(model.created_at.desc(), model.id.desc())
+        .limit(1)
+        .correlate(Participant)
+        .scalar_subquery()
+    )
+
+
+class WorkflowStateService:
+    """Keep ``prospective_workflows`` in step with care plans and risk assessments."""
+
+    @staticmethod
+    def get(db: Session, participant_id: int):
+        """``(first_name, last_name, status, workflow)`` for a participant, or ``None``.
+
+        ``workflow`` is ``None`` when nothing has been recorded yet.
+        """
+
+        return (
+            db.query(Participant.first_name, Participant.last_name, Participant.status, ProspectiveWorkflow)
+            .outerjoin(ProspectiveWorkflow, ProspectiveWorkflow.participant_id == Participant.id)
+            .filter(Participant.id == participant_id)
+            .first()
+        )
+
+    @staticmethod
+    def _workflow_for_update(db: Session, participant_id: int) -> ProspectiveWorkflow:
+        workflow = (
+            db.query(ProspectiveWorkflow)
+            .filter(ProspectiveWorkflow.participant_id == participant_id)
+            .with_for_update()
+            .first()
+        )
+        if workflow:
+            return workflow
+        try:
+            # A concurrent save may create the row first; the savepoint keeps our transaction usable.
+            with db.begin_nested():
+                workflow = ProspectiveWorkflow(
+                    participant_id=participant_id,
+                    care_plan_completed=False,
+                    risk_assessment_completed=False,
+                    ai_review_completed=False,
+                    quotation_generated=False,
+                    ready_for_onboarding=False,
+                )
+                db.add(workflow)
+            return workflow
+        except IntegrityError:
+            return (
+                db.query(ProspectiveWorkflow)
+                .filter(ProspectiveWorkflow.participant_id == participant_id)
+                .with_for_update()
+                .one()
+            )
+
+    @staticmethod
+    def record(
+        db: Session,
+        participant_id: int,
+        care_plan: Optional[CarePlan] = None,
+        risk_assessment: Optional[RiskAssessment] = None,
+    ) -> ProspectiveWorkflow:
+        """Mark the saved care plan and/or risk assessment on the participant's workflow.
+
+        Runs in the caller's transaction (no commit), so the workflow changes
+        with the record that caused it or not at all.
+        """
+
+        db.flush()
+        now = _now()
+        workflow = WorkflowStateService._workflow_for_update(db, participant_id)
+        if care_plan is not None:
+            if not workflow.care_plan_completed or not workflow.care_plan_completed_date:
+                workflow.care_plan_completed_date = now
+            workflow.care_plan_completed = True
+            workflow.care_plan_id = care_plan.id
+            db.execute(
+                update(Participant)
+                .where(
+                    Participant.id == participant_id,
+                    or_(Participant.care_plan_completed.is_(None), Participant.care_plan_completed.is_(False)),
+                )
+                .values(care_plan_completed=True)
+                .execution_options(synchronize_session=False)
+            )
+        if risk_assessment is not None:
+            if not workflow.risk_assessment_completed or not workflow.risk_assessment_completed_date:
+                workflow.risk_assessment_completed_date = now
+            workflow.risk_assessment_completed = True
+            workflow.risk_assessment_id = risk_assessment.id
+        # Derived the same way as the workflow-status PATCH, never carried over.
+        workflow.ready_for_onboarding = bool(workflow.care_plan_completed and workflow.risk_assessment_completed)
+        workflow.updated_at = now
+        return workflow
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 1000) -> Dict[str, int]:
+        """Create or repair workflow rows for participants with care plans or risk assessments.
+
+        Applies the same rules the read path used to apply on every GET.
+        Walks participants in id order and commits per batch; running it again
+        changes nothing.
+        """
+
+        stats = {"participants": 0, "created": 0, "updated": 0}
+        has_records = or_(
+            select(CarePlan.id).where(CarePlan.participant_id == Participant.id).exists(),
+            select(RiskAssessment.id).where(RiskAssessment.participant_id == Participant.id).exists(),
+        )
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(
+                    Participant.id,
+                    Participant.care_plan_completed,
+                    ProspectiveWorkflow,
+                    _latest(CarePlan, CarePlan.id).label("care_plan_id"),
+                    _latest(CarePlan, CarePlan.created_at).label("care_plan_created_at"),
+                    _latest(RiskAssessment, RiskAssessment.id).label("risk_assessment_id"),
+                    _latest(RiskAssessment, RiskAssessment.created_at).label("risk_assessment_created_at"),
+                )
+                .outerjoin(ProspectiveWorkflow, ProspectiveWorkflow.participant_id == Participant.id)
+                .where(Participant.id > last_id, has_records)
+                .order_by(Participant.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            now = _now()
+            created: List[dict] = []
+            updated: List[dict] = []
+            participants: List[dict] = []
+            for row in rows:
+                workflow = row.ProspectiveWorkflow
+                care_plan = bool(workflow and workflow.care_plan_completed)
+                risk_assessment = bool(workflow and workflow.risk_assessment_completed)
+                values = {}
+                if row.care_plan_id is not None and not care_plan:
+                    care_plan = True
+                    values.update(
+                        care_plan_completed=True,
+                        care_plan_id=row.care_plan_id,
+                        care_plan_completed_date=row.care_plan_created_at,
+                    )
+                if row.risk_assessment_id is not None and not risk_assessment:
+                    risk_assessment = True
+                    values.update(
+                        risk_assessment_completed=True,
+                        risk_assessment_id=row.risk_assessment_id,
+                        risk_assessment_completed_date=row.risk_assessment_created_at,
+                    )
+                ready = care_plan and risk_assessment
+                if ready != bool(workflow and workflow.ready_for_onboarding):
+                    values["ready_for_onboarding"] = ready
+                if row.care_plan_id is not None and not row.care_plan_completed:
+                    participants.append({"id": row.id, "care_plan_completed": True})
+
+                if workflow is None:
+                    created.append({
+                        "participant_id": row.id,
+                        "care_plan_completed": False,
+                        "risk_assessment_completed": False,
+                        "ai_review_completed": False,
+                        "quotation_generated": False,
+                        "ready_for_onboarding": False,
+                        "care_plan_id": None,
+                        "care_plan_completed_date": None,
+                        "risk_assessment_id": None,
+                        "risk_assessment_completed_date": None,
+                        **values,
+                        "updated_at": now,
+                    })
+                elif values:
+                    updated.append({"id": workflow.id, **values, "updated_at": now})
+
+            try:
+                if created:
+                    db.execute(insert(ProspectiveWorkflow), created)
+                if updated:
+                    db.execute(update(ProspectiveWorkflow), updated)
+                if participants:
+                    db.execute(update(Participant), participants)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            db.expunge_all()
+
+            stats["participants"] += len(rows)
+            stats["created"] += len(created)
+            stats["updated"] += len(updated)
+        return stats
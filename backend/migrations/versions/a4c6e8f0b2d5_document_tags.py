@@ -0,0 +1,63 @@
+"""Normalised document tag table
+
+Revision ID: a4c6e8f0b2d5
+Revises: f2b8d4e6a1c3
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c6e8f0b2d5'
+down_revision: Union[str, Sequence[str], None] = 'f2b8d4e6a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    document_tags = op.create_table(
+        'document_tags',
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('tag', sa.String(length=100), nullable=False),
+        sa.Column('participant_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id']),
+        sa.ForeignKeyConstraint(['participant_id'], ['participants.id']),
+        sa.PrimaryKeyConstraint('document_id', 'tag'),
+    )
+    op.create_index('ix_document_tags_participant_tag', 'document_tags', ['participant_id', 'tag', 'document_id'])
+    op.create_index('ix_document_tags_tag', 'document_tags', ['tag'])
+
+    # Backfill from the JSON column, normalised the same way as DocumentService.normalize_tags
+    connection = op.get_bind()
+    rows = []
+    result = connection.execute(sa.text("SELECT id, participant_id, tags FROM documents WHERE tags IS NOT NULL"))
+    for document_id, participant_id, tags in result:
+        if isinstance(tags, str):
+            try:
+                tags = json.loads(tags)
+            except ValueError:
+                continue
+        seen = set()
+        for tag in tags or []:
+            value = str(tag).strip().lower()[:100]
+            if value and value not in seen:
+                seen.add(value)
+                rows.append({'document_id': document_id, 'participant_id': participant_id, 'tag': value})
+        if len(rows) >= 1000:
+            op.bulk_insert(document_tags, rows)
+            rows = []
+    if rows:
+        op.bulk_insert(document_tags, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_tags_tag', table_name='document_tags')
+    op.drop_index('ix_document_tags_participant_tag', table_name='document_tags')
+    op.drop_table('document_tags')
@@ -0,0 +1,66 @@
+"""Blocking keys and candidate pairs for duplicate detection
+
+Revision ID: a7c9e1b3d5f8
+Revises: f6b8d0a2c4e7
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c9e1b3d5f8'
+down_revision: Union[str, Sequence[str], None] = 'f6b8d0a2c4e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'duplicate_blocking_keys',
+        sa.Column('record_type', sa.String(length=20), nullable=False),
+        sa.Column('record_id', sa.Integer(), nullable=False),
+        sa.Column('block_key', sa.String(length=150), nullable=False),
+        sa.PrimaryKeyConstraint('record_type', 'record_id', 'block_key'),
+    )
+    op.create_index('ix_duplicate_blocking_keys_block', 'duplicate_blocking_keys', ['block_key'], unique=False)
+
+    op.create_table(
+        'duplicate_candidates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('left_type', sa.String(length=20), nullable=False),
+        sa.Column('left_id', sa.Integer(), nullable=False),
+        sa.Column('right_type', sa.String(length=20), nullable=False),
+        sa.Column('right_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('field_scores', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('reviewed_by', sa.String(length=255), nullable=True),
+        sa.Column('reviewed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_duplicate_candidates_id'), 'duplicate_candidates', ['id'], unique=False)
+    op.create_index(
+        'ux_duplicate_candidates_pair', 'duplicate_candidates',
+        ['left_type', 'left_id', 'right_type', 'right_id'], unique=True,
+    )
+    op.create_index('ix_duplicate_candidates_status_score', 'duplicate_candidates', ['status', 'score'], unique=False)
+    op.create_index('ix_duplicate_candidates_right', 'duplicate_candidates', ['right_type', 'right_id'], unique=False)
+    # Existing records are keyed and compared by scripts/sweep_duplicates.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_duplicate_candidates_right', table_name='duplicate_candidates')
+    op.drop_index('ix_duplicate_candidates_status_score', table_name='duplicate_candidates')
+    op.drop_index('ux_duplicate_candidates_pair', table_name='duplicate_candidates')
+    op.drop_index(op.f('ix_duplicate_candidates_id'), table_name='duplicate_candidates')
+    op.drop_table('duplicate_candidates')
+    op.drop_index('ix_duplicate_blocking_keys_block', table_name='duplicate_blocking_keys')
+    op.drop_table('duplicate_blocking_keys')
@@ -0,0 +1,50 @@
+"""Audit pack export checkpoints
+
+Revision ID: b7d9f1a3c5e2
+Revises: a4c6e8f0b2d5
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d9f1a3c5e2'
+down_revision: Union[str, Sequence[str], None] = 'a4c6e8f0b2d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'audit_pack_exports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('participant_ids', sa.JSON(), nullable=True),
+        sa.Column('categories', sa.JSON(), nullable=True),
+        sa.Column('current_only', sa.Boolean(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('document_count', sa.Integer(), nullable=False),
+        sa.Column('documents_written', sa.Integer(), nullable=False),
+        sa.Column('bytes_written', sa.BigInteger(), nullable=False),
+        sa.Column('part', sa.Integer(), nullable=False),
+        sa.Column('last_participant_id', sa.Integer(), nullable=True),
+        sa.Column('last_document_id', sa.Integer(), nullable=True),
+        sa.Column('requested_by', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_audit_pack_exports_id'), 'audit_pack_exports', ['id'], unique=False)
+    op.create_index('ix_audit_pack_exports_status', 'audit_pack_exports', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_audit_pack_exports_status', table_name='audit_pack_exports')
+    op.drop_index(op.f('ix_audit_pack_exports_id'), table_name='audit_pack_exports')
+    op.drop_table('audit_pack_exports')
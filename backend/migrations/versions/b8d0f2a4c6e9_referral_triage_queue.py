@@ -0,0 +1,41 @@
+"""Referral triage queue: claim leases and the urgency-ordered index
+
+Revision ID: b8d0f2a4c6e9
+Revises: a7c9e1b3d5f8
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d0f2a4c6e9'
+down_revision: Union[str, Sequence[str], None] = 'a7c9e1b3d5f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match app.models.referral.urgency_rank so the queue query can use the index
+URGENCY_RANK = (
+    "CASE lower(urgency_level) WHEN 'urgent' THEN 0 WHEN 'high' THEN 1 "
+    "WHEN 'medium' THEN 2 WHEN 'low' THEN 3 ELSE 4 END"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('referrals', sa.Column('claimed_by', sa.String(length=255), nullable=True))
+    op.add_column('referrals', sa.Column('claim_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_referrals_triage', 'referrals',
+        ['status', sa.text(URGENCY_RANK), 'created_at', 'id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_referrals_triage', table_name='referrals')
+    op.drop_column('referrals', 'claim_expires_at')
+    op.drop_column('referrals', 'claimed_by')
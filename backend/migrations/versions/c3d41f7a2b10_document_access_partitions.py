@@ -0,0 +1,89 @@
+"""Audit log partition bookkeeping and rollup tables
+
+Revision ID: c3d41f7a2b10
+Revises: abac9a9cdcb8
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d41f7a2b10'
+down_revision: Union[str, Sequence[str], None] = 'abac9a9cdcb8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'audit_partitions',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('table_name', sa.String(length=100), nullable=False, unique=True),
+        sa.Column('period_start', sa.DateTime(), nullable=False),
+        sa.Column('period_end', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=True),
+        sa.Column('archive_path', sa.String(length=500), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_audit_partitions_period', 'audit_partitions', ['period_start', 'period_end'])
+    op.create_index('ix_audit_partitions_status', 'audit_partitions', ['status'])
+
+    op.create_table(
+        'document_access_daily_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('participant_id', sa.Integer(), nullable=True),
+        sa.Column('access_type', sa.String(length=50), nullable=False),
+        sa.Column('access_count', sa.Integer(), nullable=False),
+        sa.Column('unique_users', sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        'ux_document_access_daily_doc', 'document_access_daily_rollups',
+        ['day', 'document_id', 'access_type'], unique=True
+    )
+    op.create_index(
+        'ix_document_access_daily_participant', 'document_access_daily_rollups', ['participant_id', 'day']
+    )
+
+    op.create_table(
+        'document_access_user_daily_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('user_role', sa.String(length=50), nullable=True),
+        sa.Column('access_type', sa.String(length=50), nullable=False),
+        sa.Column('access_count', sa.Integer(), nullable=False),
+        sa.Column('distinct_documents', sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        'ux_document_access_daily_user', 'document_access_user_daily_rollups',
+        ['day', 'user_id', 'access_type'], unique=True
+    )
+
+    op.create_index('ix_document_access_document_accessed', 'document_access', ['document_id', 'accessed_at'])
+
+    if op.get_bind().dialect.name == 'sqlite':
+        # Rows rotate out into document_access_YYYY_MM tables, so ids must never
+        # be reused.  The model's sqlite_autoincrement only reaches new
+        # databases; rebuild existing tables with AUTOINCREMENT.
+        with op.batch_alter_table(
+            'document_access', recreate='always', table_kwargs={'sqlite_autoincrement': True}
+        ):
+            pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_document_access_document_accessed', table_name='document_access')
+    op.drop_table('document_access_user_daily_rollups')
+    op.drop_table('document_access_daily_rollups')
+    op.drop_table('audit_partitions')
@@ -0,0 +1,33 @@
+"""Workflow board: latest care plan and risk assessment lookups
+
+Revision ID: c9e1a3b5d7f0
+Revises: b8d0f2a4c6e9
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e1a3b5d7f0'
+down_revision: Union[str, Sequence[str], None] = 'b8d0f2a4c6e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_care_plans_participant_created', 'care_plans', ['participant_id', 'created_at'], unique=False
+    )
+    op.create_index(
+        'ix_risk_assessments_participant_created', 'risk_assessments', ['participant_id', 'created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_risk_assessments_participant_created', table_name='risk_assessments')
+    op.drop_index('ix_care_plans_participant_created', table_name='care_plans')
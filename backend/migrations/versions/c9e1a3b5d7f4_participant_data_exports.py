@@ -0,0 +1,50 @@
+"""Participant data portability exports
+
+Revision ID: c9e1a3b5d7f4
+Revises: b7d9f1a3c5e2
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e1a3b5d7f4'
+down_revision: Union[str, Sequence[str], None] = 'b7d9f1a3c5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'participant_data_exports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('participant_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('storage_key', sa.String(length=500), nullable=True),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('requested_by', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['participant_id'], ['participants.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_participant_data_exports_id'), 'participant_data_exports', ['id'], unique=False)
+    op.create_index(
+        'ix_participant_data_exports_participant',
+        'participant_data_exports',
+        ['participant_id', 'created_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_participant_data_exports_participant', table_name='participant_data_exports')
+    op.drop_index(op.f('ix_participant_data_exports_id'), table_name='participant_data_exports')
+    op.drop_table('participant_data_exports')
@@ -0,0 +1,31 @@
+"""Document content hashes for duplicate detection
+
+Revision ID: d3f5a7b9c1e4
+Revises: c9e1a3b5d7f4
+Create Date: 2026-10-19 14:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f5a7b9c1e4'
+down_revision: Union[str, Sequence[str], None] = 'c9e1a3b5d7f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('sha256', sa.String(length=64), nullable=True))
+    op.create_index('ix_documents_participant_sha256', 'documents', ['participant_id', 'sha256'], unique=False)
+    # Existing rows are hashed by scripts/backfill_document_hashes.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_participant_sha256', table_name='documents')
+    op.drop_column('documents', 'sha256')
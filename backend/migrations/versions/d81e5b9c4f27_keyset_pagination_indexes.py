@@ -0,0 +1,33 @@
+"""Composite indexes for keyset-paginated listings
+
+Revision ID: d81e5b9c4f27
+Revises: c3d41f7a2b10
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81e5b9c4f27'
+down_revision: Union[str, Sequence[str], None] = 'c3d41f7a2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_documents_participant_created', 'documents', ['participant_id', 'created_at', 'id'])
+    op.create_index('ix_participants_created_at_id', 'participants', ['created_at', 'id'])
+    op.create_index('ix_participants_last_name_id', 'participants', ['last_name', 'id'])
+    op.create_index('ix_participants_status', 'participants', ['status'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_participants_status', table_name='participants')
+    op.drop_index('ix_participants_last_name_id', table_name='participants')
+    op.drop_index('ix_participants_created_at_id', table_name='participants')
+    op.drop_index('ix_documents_participant_created', table_name='documents')
@@ -0,0 +1,38 @@
+"""Participant status counters for the dashboard
+
+Revision ID: e4a6c8b0d2f5
+Revises: d3f5a7b9c1e4
+Create Date: 2026-10-19 15:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a6c8b0d2f5'
+down_revision: Union[str, Sequence[str], None] = 'd3f5a7b9c1e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'participant_status_counts',
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('status'),
+    )
+    # Seed from the current participants; writers keep it in step from here on.
+    op.execute(
+        "INSERT INTO participant_status_counts (status, count) "
+        "SELECT status, COUNT(*) FROM participants WHERE status IS NOT NULL GROUP BY status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('participant_status_counts')
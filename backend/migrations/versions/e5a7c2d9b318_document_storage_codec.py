@@ -0,0 +1,30 @@
+"""Record compression codec and on-disk size for documents
+
+Revision ID: e5a7c2d9b318
+Revises: d81e5b9c4f27
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c2d9b318'
+down_revision: Union[str, Sequence[str], None] = 'd81e5b9c4f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('storage_codec', sa.String(length=20), nullable=True))
+    op.add_column('documents', sa.Column('stored_size', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'stored_size')
+    op.drop_column('documents', 'storage_codec')
@@ -0,0 +1,36 @@
+"""Partial index for current document versions and version chain lookups
+
+Revision ID: f2b8d4e6a1c3
+Revises: e5a7c2d9b318
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d4e6a1c3'
+down_revision: Union[str, Sequence[str], None] = 'e5a7c2d9b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_documents_participant_current',
+        'documents',
+        ['participant_id', 'created_at', 'id'],
+        postgresql_where=sa.text('is_current_version = true'),
+        sqlite_where=sa.text('is_current_version = 1'),
+    )
+    op.create_index('ix_documents_parent_document_id', 'documents', ['parent_document_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_parent_document_id', table_name='documents')
+    op.drop_index('ix_documents_participant_current', table_name='documents')
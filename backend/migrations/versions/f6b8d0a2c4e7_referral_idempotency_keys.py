@@ -0,0 +1,32 @@
+"""Idempotency keys for batched referral ingestion
+
+Revision ID: f6b8d0a2c4e7
+Revises: e4a6c8b0d2f5
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b8d0a2c4e7'
+down_revision: Union[str, Sequence[str], None] = 'e4a6c8b0d2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('referrals', sa.Column('idempotency_key', sa.String(length=255), nullable=True))
+    op.add_column('referrals', sa.Column('ingest_fingerprint', sa.String(length=64), nullable=True))
+    op.create_index('ix_referrals_idempotency_key', 'referrals', ['idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_referrals_idempotency_key', table_name='referrals')
+    op.drop_column('referrals', 'ingest_fingerprint')
+    op.drop_column('referrals', 'idempotency_key')
@@ -0,0 +1,101 @@
+# backend/scripts/backfill_document_hashes.py
+"""
+Compute content hashes for documents stored before duplicate detection.
+
+    python scripts/backfill_document_hashes.py --dry-run
+    python scripts/backfill_document_hashes.py --batch-size 500 --workers 8
+
+Hashes are taken over the original bytes, so compressed files are read
+through the decompressor.  Documents whose file is missing are skipped and
+reported; they keep a NULL hash and are simply never matched as duplicates.
+"""
+
+import argparse
+import hashlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import update
+
+from app.database import SessionLocal
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.models.document import Document
+from app.services.document_compression import iter_decompressed
+from app.core.storage import get_storage
+
+
+def _hash(storage, file_path, codec):
+    digest = hashlib.sha256()
+    for chunk in iter_decompressed(file_path, codec, storage):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill document content hashes")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4, help="Files hashed in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="Only count documents without a hash")
+    args = parser.parse_args(argv)
+
+    storage = get_storage()
+    db = SessionLocal()
+    processed = hashed = 0
+    missing = []
+    last_id = 0
+    try:
+        if args.dry_run:
+            count = db.query(Document.id).filter(Document.sha256.is_(None)).count()
+            print(f"{count} documents without a content hash")
+            return
+
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            while True:
+                rows = (
+                    db.query(Document.id, Document.file_path, Document.storage_codec)
+                    .filter(Document.id > last_id, Document.sha256.is_(None))
+                    .order_by(Document.id)
+                    .limit(args.batch_size)
+                    .all()
+                )
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                def hash_row(row):
+                    try:
+                        return row.id, _hash(storage, row.file_path, row.storage_codec)
+                    except FileNotFoundError:
+                        return row.id, None
+
+                values = []
+                for document_id, digest in pool.map(hash_row, rows):
+                    processed += 1
+                    if digest is None:
+                        missing.append(document_id)
+                    else:
+                        values.append({"id": document_id, "sha256": digest})
+
+                if values:
+                    # ORM bulk UPDATE by primary key: one executemany per batch
+                    db.execute(update(Document), values)
+                    db.commit()
+                hashed += len(values)
+    except Exception as e:
+        print(f"Error hashing documents: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(f"Hashed {hashed} of {processed} documents")
+    if missing:
+        print(f"{len(missing)} documents have no stored file: {missing[:20]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# backend/scripts/backfill_workflow_state.py
+"""
+Create or repair prospective workflow rows from existing care plans and risk assessments.
+
+    python scripts/backfill_workflow_state.py
+    python scripts/backfill_workflow_state.py --batch-size 500
+
+Run once after upgrading.  Workflow state is now kept current whenever a care
+plan or risk assessment is saved, and the workflow GET no longer repairs rows
+on read, so rows written before the upgrade need this pass.  Running it again
+changes nothing.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.services.workflow_state import WorkflowStateService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill prospective workflow state")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        stats = WorkflowStateService.backfill(db, batch_size=args.batch_size)
+    except Exception as e:
+        print(f"Error backfilling workflow state: {e}")
+        raise
+    finally:
+        db.close()
+
+    print(
+        f"Checked {stats['participants']} participants with care plans or risk assessments: "
+        f"{stats['created']} workflows created, {stats['updated']} repaired"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# backend/scripts/compress_documents.py
+"""
+Compress documents that were stored before compression at rest was enabled.
+
+    python scripts/compress_documents.py --dry-run
+    python scripts/compress_documents.py --batch-size 200 --limit 5000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.models.document import Document
+from app.services.document_compression import COMPRESSIBLE_MIME_TYPES, compress_existing
+from app.core.storage import get_storage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compress stored documents in place")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many documents")
+    parser.add_argument("--dry-run", action="store_true", help="Only count eligible documents")
+    args = parser.parse_args(argv)
+
+    storage = get_storage()
+    db = SessionLocal()
+    processed = compressed = saved = 0
+    last_id = 0
+    try:
+        while args.limit is None or processed < args.limit:
+            documents = (
+                db.query(Document)
+                .filter(
+                    Document.id > last_id,
+                    Document.storage_codec.is_(None),
+                    Document.mime_type.in_(COMPRESSIBLE_MIME_TYPES),
+                )
+                .order_by(Document.id)
+                .limit(args.batch_size)
+                .all()
+            )
+            if not documents:
+                break
+
+            originals = []
+            for document in documents:
+                last_id = document.id
+                processed += 1
+                if args.dry_run:
+                    continue
+                source = document.file_path
+                stored = compress_existing(source, document.mime_type, storage)
+                if stored is None:
+                    continue
+                document.file_path = stored.key
+                document.filename = stored.name
+                document.storage_codec = stored.codec
+                document.stored_size = stored.stored_size
+                # Duplicate uploads linked as versions share the same file.
+                db.query(Document).filter(
+                    Document.file_path == source, Document.id != document.id
+                ).update(
+                    {
+                        Document.file_path: stored.key,
+                        Document.filename: stored.name,
+                        Document.storage_codec: stored.codec,
+                        Document.stored_size: stored.stored_size,
+                    },
+                    synchronize_session=False,
+                )
+                originals.append(source)
+                compressed += 1
+                saved += stored.size - stored.stored_size
+
+            db.commit()
+            # Originals are only removed once the rows point at the new files.
+            for source in originals:
+                storage.delete(source)
+    except Exception as e:
+        print(f"Error compressing documents: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if args.dry_run:
+        print(f"{processed} documents eligible for compression")
+    else:
+        print(f"Compressed {compressed} of {processed} documents, saved {saved / (1024 * 1024):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# backend/scripts/export_audit_pack.py
+"""
+Export an NDIS audit pack (documents + manifest) to a zip file.
+
+    python scripts/export_audit_pack.py --participant 12 --participant 40 \
+        --category service_agreements --category medical_consent --output packs/
+    python scripts/export_audit_pack.py --resume 7 --output packs/   # continue an interrupted export
+
+Each run writes one part; a resumed export continues after the last
+checkpoint in a new ``-partN`` file.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.models.audit import AuditPackExport
+from app.services.audit_pack_service import AUDIT_PACK_WORKERS, AuditPackService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export documents and a manifest for an audit")
+    parser.add_argument("--participant", type=int, action="append", default=[], help="Participant id (repeatable)")
+    parser.add_argument("--category", action="append", default=[], help="Document category (repeatable)")
+    parser.add_argument("--include-versions", action="store_true", help="Also export superseded versions")
+    parser.add_argument("--resume", type=int, default=None, help="Continue an existing export by id")
+    parser.add_argument("--workers", type=int, default=AUDIT_PACK_WORKERS, help="Parallel file reads")
+    parser.add_argument("--output", type=Path, default=Path("."), help="Directory for the zip file")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.resume is not None:
+            export = db.get(AuditPackExport, args.resume)
+            if export is None:
+                parser.error(f"audit pack {args.resume} not found")
+            if export.status == "completed":
+                print(f"Audit pack {export.id} is already complete")
+                return
+        else:
+            export = AuditPackService.create_export(
+                db,
+                participant_ids=args.participant,
+                categories=args.category,
+                current_only=not args.include_versions,
+                requested_by="cli",
+            )
+            print(f"Created audit pack {export.id} with {export.document_count} documents")
+
+        part, resume_after = AuditPackService.start_part(db, export)
+        export_id = export.id
+    finally:
+        db.close()
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    suffix = f"-part{part}" if resume_after else ""
+    target = args.output / f"audit-pack-{export_id}{suffix}.zip"
+    with open(target, "wb") as out:
+        for chunk in AuditPackService.stream(SessionLocal, export_id, resume_after=resume_after, workers=args.workers):
+            out.write(chunk)
+
+    db = SessionLocal()
+    try:
+        export = db.get(AuditPackExport, export_id)
+        print(
+            f"Wrote {target} ({export.documents_written} of {export.document_count} documents, "
+            f"{export.bytes_written / (1024 * 1024):.1f} MB)"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# backend/scripts/import_documents.py
+"""
+Bulk import legacy documents from a zip file or a directory plus a manifest.
+
+    python scripts/import_documents.py legacy_export.zip --dry-run
+    python scripts/import_documents.py /mnt/legacy/docs --manifest mapping.csv \
+        --workers 16 --report import_report.csv
+
+The manifest maps each file (``path``) to a participant (``participant_id``
+or ``ndis_number``) and a ``category``; see
+``app/services/document_import_service.py`` for every column.  Without
+``--manifest`` the ``manifest.csv``/``manifest.json`` at the root of the
+source is used.  The report lists the outcome of every row.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.services.document_import_service import (
+    DOCUMENT_IMPORT_BATCH_SIZE,
+    DOCUMENT_IMPORT_WORKERS,
+    DirectoryImportSource,
+    DocumentImportError,
+    DocumentImportService,
+    ZipImportSource,
+    load_manifest,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import documents from a zip file or directory")
+    parser.add_argument("source", type=Path, help="Zip file or directory holding the files")
+    parser.add_argument("--manifest", type=Path, default=None, help="CSV or JSON manifest (default: inside source)")
+    parser.add_argument("--workers", type=int, default=DOCUMENT_IMPORT_WORKERS, help="Parallel hash/copy workers")
+    parser.add_argument("--batch-size", type=int, default=DOCUMENT_IMPORT_BATCH_SIZE, help="Documents per transaction")
+    parser.add_argument("--max-file-mb", type=int, default=None, help="Largest accepted file (default: upload limit)")
+    parser.add_argument("--dry-run", action="store_true", help="Only validate the manifest")
+    parser.add_argument("--report", type=Path, default=None, help="Write per-file results (.csv or .json)")
+    args = parser.parse_args(argv)
+
+    options = {"workers": args.workers, "batch_size": args.batch_size, "dry_run": args.dry_run}
+    if args.max_file_mb:
+        options["max_file_size"] = args.max_file_mb * 1024 * 1024
+
+    db = SessionLocal()
+    try:
+        rows = None
+        if args.manifest:
+            with open(args.manifest, "rb") as stream:
+                rows = load_manifest(stream, args.manifest.name)
+        source = DirectoryImportSource(args.source) if args.source.is_dir() else ZipImportSource(args.source)
+        with source:
+            report = DocumentImportService.run(db, source, rows=rows, **options)
+    except DocumentImportError as e:
+        parser.error(str(e))
+    finally:
+        db.close()
+
+    if args.report:
+        fmt = "json" if args.report.suffix.lower() == ".json" else "csv"
+        with open(args.report, "w", newline="", encoding="utf-8") as stream:
+            DocumentImportService.write_report(report, stream, fmt)
+
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(report.counts.items())) or "nothing to do"
+    print(f"{'Validated' if args.dry_run else 'Imported'} {len(report.results)} manifest rows: {counts}")
+    if args.report:
+        print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
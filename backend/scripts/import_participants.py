@@ -0,0 +1,71 @@
+# backend/scripts/import_participants.py
+"""
+Bulk create or update participants or referrals from a CSV or XLSX file.
+
+    python scripts/import_participants.py region_participants.xlsx --dry-run
+    python scripts/import_participants.py referrals.csv --kind referrals \
+        --workers 8 --report referral_errors.csv
+
+Rows are upserted on ``ndis_number``; see
+``app/services/participant_import_service.py`` for how columns are matched.
+The report lists every row that could not be imported.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.services.participant_import_service import (
+    IMPORT_KINDS,
+    RECORD_IMPORT_BATCH_SIZE,
+    RECORD_IMPORT_WORKERS,
+    ParticipantImportService,
+    RecordImportError,
+    iter_rows,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import participants or referrals from CSV/XLSX")
+    parser.add_argument("source", type=Path, help="CSV or XLSX file")
+    parser.add_argument("--kind", choices=sorted(IMPORT_KINDS), default="participants")
+    parser.add_argument("--workers", type=int, default=RECORD_IMPORT_WORKERS, help="Validation processes")
+    parser.add_argument("--batch-size", type=int, default=RECORD_IMPORT_BATCH_SIZE, help="Rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Only validate the rows")
+    parser.add_argument("--report", type=Path, default=None, help="Write failed rows (.csv or .json)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        with open(args.source, "rb") as stream:
+            report = ParticipantImportService.run(
+                db,
+                args.kind,
+                iter_rows(stream, args.source.name),
+                workers=args.workers,
+                batch_size=args.batch_size,
+                dry_run=args.dry_run,
+            )
+    except RecordImportError as e:
+        parser.error(str(e))
+    finally:
+        db.close()
+
+    if args.report:
+        fmt = "json" if args.report.suffix.lower() == ".json" else "csv"
+        with open(args.report, "w", newline="", encoding="utf-8") as stream:
+            ParticipantImportService.write_report(report, stream, fmt)
+
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(report.counts.items())) or "nothing to do"
+    print(f"{'Validated' if args.dry_run else 'Imported'} {report.total} {args.kind} rows: {counts}")
+    if args.report:
+        print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# backend/scripts/manage_audit_log.py
+"""
+Maintenance job for the document audit log.
+
+Run daily (e.g. from cron) with ``run`` to rotate monthly partitions, build
+yesterday's rollups and archive partitions that fell out of retention:
+
+    python scripts/manage_audit_log.py run
+    python scripts/manage_audit_log.py rollup --day 2025-01-31
+    python scripts/manage_audit_log.py archive --retention-months 36
+    python scripts/manage_audit_log.py convert-postgres   # one-off, PostgreSQL only
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal, engine, Base
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.services.audit_service import AuditLogService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage document audit log partitions")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("rotate", help="Create upcoming partitions and move closed months")
+
+    rollup = subparsers.add_parser("rollup", help="Build daily rollups")
+    rollup.add_argument("--day", type=date.fromisoformat, default=None, help="Day to roll up (default: yesterday)")
+
+    archive = subparsers.add_parser("archive", help="Archive partitions past retention")
+    archive.add_argument("--retention-months", type=int, default=None)
+    archive.add_argument("--archive-dir", type=Path, default=None)
+
+    subparsers.add_parser("convert-postgres", help="Convert document_access to native partitions")
+
+    run = subparsers.add_parser("run", help="Rotate, roll up yesterday and archive")
+    run.add_argument("--retention-months", type=int, default=None)
+
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    try:
+        if args.command in ("rotate", "run"):
+            moved = AuditLogService.rotate_partitions(db)
+            for table_name, count in moved.items():
+                print(f"Moved {count} rows into {table_name}")
+
+        if args.command in ("rollup", "run"):
+            day = getattr(args, "day", None) or date.today() - timedelta(days=1)
+            result = AuditLogService.build_daily_rollups(db, day)
+            print(
+                f"Rolled up {day}: {result['document_rollups']} document rows, "
+                f"{result['user_rollups']} user rows"
+            )
+
+        if args.command in ("archive", "run"):
+            archived = AuditLogService.archive_expired_partitions(
+                db,
+                retention_months=args.retention_months,
+                archive_dir=getattr(args, "archive_dir", None),
+            )
+            for item in archived:
+                print(f"Archived {item['rows']} rows from {item['table_name']} to {item['archive_path']}")
+
+        if args.command == "convert-postgres":
+            if AuditLogService.convert_to_native_partitioning(db):
+                print("document_access converted to native monthly partitions")
+            else:
+                print("document_access is already partitioned")
+
+    except Exception as e:
+        print(f"Error managing audit log: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
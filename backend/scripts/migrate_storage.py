@@ -0,0 +1,107 @@
+# backend/scripts/migrate_storage.py
+"""
+Copy every stored upload from the local uploads directory into the configured
+storage backend (usually S3) and normalise stored paths to backend-relative keys.
+
+    STORAGE_BACKEND=s3 S3_BUCKET=ndis-uploads python scripts/migrate_storage.py --dry-run
+    STORAGE_BACKEND=s3 S3_BUCKET=ndis-uploads python scripts/migrate_storage.py --workers 16
+
+Objects that already exist in the target with the same size are skipped, so
+the script can be re-run after an interruption.  Local files are left in
+place; remove them once the new backend is serving traffic.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.storage import BASE_DIR, LocalStorageBackend, copy_objects, get_storage, storage_key
+from app.database import SessionLocal
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.models import CandidateProfile
+from app.models.document import Document
+
+STORED_PATH_COLUMNS = (
+    (Document, "file_path"),
+    (CandidateProfile, "resume_path"),
+    (CandidateProfile, "photo_path"),
+)
+
+
+def migrate(db, source, target, batch_size=500, workers=8, dry_run=False):
+    """Copy the files referenced by every stored path column; returns the totals."""
+
+    totals = {"copied": 0, "skipped": 0, "missing": 0, "copied_bytes": 0, "normalised": 0}
+    for model, column_name in STORED_PATH_COLUMNS:
+        column = getattr(model, column_name)
+        last_id = 0
+        while True:
+            rows = (
+                db.query(model)
+                .filter(model.id > last_id, column.isnot(None))
+                .order_by(model.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+
+            keys = []
+            for row in rows:
+                last_id = row.id
+                stored = getattr(row, column_name)
+                key = storage_key(Path(stored), source.root) if Path(stored).is_absolute() else stored
+                if key != stored:
+                    totals["normalised"] += 1
+                    if not dry_run:
+                        setattr(row, column_name, key)
+                keys.append(key)
+
+            report = copy_objects(source, target, keys, workers=workers, dry_run=dry_run)
+            for name in ("copied", "skipped", "missing", "copied_bytes"):
+                totals[name] += getattr(report, name)
+
+            # Rows are only rewritten once their objects are in the target.
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Copy local uploads into the configured storage backend")
+    parser.add_argument("--source", type=Path, default=BASE_DIR, help="Directory holding uploads/")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be copied")
+    args = parser.parse_args(argv)
+
+    source = LocalStorageBackend(args.source)
+    target = get_storage()
+    if isinstance(target, LocalStorageBackend) and target.root.resolve() == source.root.resolve():
+        parser.error("source and target are the same directory; set STORAGE_BACKEND=s3")
+
+    db = SessionLocal()
+    try:
+        totals = migrate(db, source, target, args.batch_size, args.workers, args.dry_run)
+    except Exception as e:
+        print(f"Error migrating storage: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    verb = "Would copy" if args.dry_run else "Copied"
+    print(
+        f"{verb} {totals['copied']} objects ({totals['copied_bytes'] / (1024 * 1024):.1f} MB), "
+        f"{totals['skipped']} already present, {totals['missing']} missing locally, "
+        f"{totals['normalised']} paths normalised"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# backend/scripts/process_notifications.py
+"""
+Schedule and deliver document expiry notifications.
+
+Run once from cron, or keep it running as a single background worker:
+
+    python scripts/process_notifications.py
+    python scripts/process_notifications.py --loop --interval 300
+
+Delivery uses ``NOTIFICATION_SENDER`` (``log`` by default, ``smtp`` with
+``SMTP_HOST``/``SMTP_PORT``/``SMTP_FROM``).
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal, engine, Base
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.services.notification_service import (
+    DocumentNotificationService,
+    NOTIFICATION_WORKER_INTERVAL_SECONDS,
+)
+
+
+def run_once():
+    db = SessionLocal()
+    try:
+        stats = DocumentNotificationService.run_once(db)
+        print(
+            f"Scheduled {stats['scheduled']}, sent {stats['sent']}, "
+            f"failed {stats['failed']}, abandoned {stats['abandoned']}"
+        )
+    except Exception as e:
+        print(f"Error processing notifications: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process document expiry notifications")
+    parser.add_argument("--loop", action="store_true", help="Keep running and process every interval")
+    parser.add_argument("--interval", type=int, default=NOTIFICATION_WORKER_INTERVAL_SECONDS)
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+
+    run_once()
+    while args.loop:
+        time.sleep(args.interval)
+        run_once()
+
+
+if __name__ == "__main__":
+    main()
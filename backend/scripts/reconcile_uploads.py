@@ -0,0 +1,85 @@
+# backend/scripts/reconcile_uploads.py
+"""
+Report (and optionally reclaim) files in uploads/ that no database row
+references, stale bulk-generation temp dirs, and rows whose file is missing.
+
+    python scripts/reconcile_uploads.py                      # dry run, summary only
+    python scripts/reconcile_uploads.py --verbose            # list every finding
+    python scripts/reconcile_uploads.py --json report.json   # full report as JSON
+    python scripts/reconcile_uploads.py --apply --rate 10 --max-mb 500
+"""
+
+import argparse
+import json
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.storage import LocalStorageBackend, get_storage
+from app.database import SessionLocal
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.services.upload_reconciliation import UploadReconciler
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconcile uploaded files with the database")
+    parser.add_argument("--apply", action="store_true", help="Delete orphans (default is a dry run)")
+    parser.add_argument("--rate", type=float, default=20.0, help="Maximum deletions per second")
+    parser.add_argument("--max-mb", type=float, default=None, help="Stop reclaiming after this many MB")
+    parser.add_argument("--grace-minutes", type=int, default=60, help="Ignore files newer than this")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--json", type=Path, default=None, help="Write the full report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Print every orphan and dangling row")
+    args = parser.parse_args(argv)
+
+    storage = get_storage()
+    if not isinstance(storage, LocalStorageBackend):
+        parser.error(f"reconciliation scans the local uploads directory; STORAGE_BACKEND is {storage.name}")
+
+    db = SessionLocal()
+    try:
+        reconciler = UploadReconciler(
+            db,
+            base_dir=storage.root,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            grace_period=timedelta(minutes=args.grace_minutes),
+            max_deletes_per_second=args.rate,
+        )
+        max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        report = reconciler.run(dry_run=not args.apply, max_bytes=max_bytes)
+    finally:
+        db.close()
+
+    if args.verbose:
+        for item in report.orphaned_files + report.stale_temp_dirs:
+            print(f"orphan   {item.kind:<9} {_mb(item.size):>10}  {item.path}")
+        for row in report.dangling_rows:
+            print(f"dangling {row.table}.{row.column} id={row.row_id}  {row.path}")
+
+    print(f"Scanned {report.scanned_files} files and {report.scanned_rows} stored paths")
+    print(
+        f"Orphaned files: {len(report.orphaned_files)}, stale temp dirs: {len(report.stale_temp_dirs)} "
+        f"({_mb(report.orphaned_bytes)} reclaimable)"
+    )
+    print(f"Rows pointing at missing files: {len(report.dangling_rows)}")
+    if args.apply:
+        print(f"Reclaimed {report.reclaimed_files} items, {_mb(report.reclaimed_bytes)}")
+    else:
+        print("Dry run: nothing deleted (use --apply to reclaim)")
+
+    if args.json:
+        args.json.write_text(json.dumps(report.to_dict(), indent=2))
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# backend/scripts/sweep_duplicates.py
+"""
+Rebuild duplicate blocking keys and rescore every referral and participant.
+
+    python scripts/sweep_duplicates.py
+    python scripts/sweep_duplicates.py --threshold 0.8 --max-block-size 1000
+
+Run once after upgrading, and after bulk changes made outside the API.  New
+records are checked as they are created, so a nightly or weekly sweep is
+enough to pick up edits.  Open candidates that no longer match are removed;
+confirmed and dismissed ones are kept.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the parent directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+import app.models  # noqa: F401 (registers every table with Base.metadata)
+from app.services.duplicate_detection import (
+    DUPLICATE_MAX_BLOCK_SIZE,
+    DUPLICATE_SCORE_THRESHOLD,
+    DuplicateDetectionService,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find duplicate referrals and participants")
+    parser.add_argument("--threshold", type=float, default=DUPLICATE_SCORE_THRESHOLD, help="Minimum score (0-1)")
+    parser.add_argument("--max-block-size", type=int, default=DUPLICATE_MAX_BLOCK_SIZE, help="Skip larger blocks")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        stats = DuplicateDetectionService.sweep(
+            db,
+            threshold=args.threshold,
+            max_block_size=args.max_block_size,
+            batch_size=args.batch_size,
+        )
+    except Exception as e:
+        print(f"Error sweeping duplicates: {e}")
+        raise
+    finally:
+        db.close()
+
+    print(
+        f"Compared {stats['records']} records in {stats['blocks']} blocks "
+        f"({stats['comparisons']} comparisons, {stats['skipped_blocks']} oversized blocks skipped): "
+        f"{stats['candidates']} duplicate candidates"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Tests for audit log partition rotation, rollups and archival."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.database import Base  # noqa: E402
+from app.models.audit import AuditPartition, DocumentAccessDailyRollup  # noqa: E402
+from app.models.document import Document, DocumentAccess  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.audit_service import AuditLogService  # noqa: E402
+
+
+@pytest.fixture(name="db")
+def _db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _seed(db) -> Document:
+    participant = Participant(
+        first_name="Ada",
+        last_name="Lovelace",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+    )
+    db.add(participant)
+    db.flush()
+
+    document = Document(
+        participant_id=participant.id,
+        title="Consent",
+        filename="consent.pdf",
+        original_filename="consent.pdf",
+        file_path="uploads/documents/1/consent.pdf",
+        file_size=10,
+        mime_type="application/pdf",
+        category="medical_consent",
+        uploaded_by="tester",
+    )
+    db.add(document)
+    db.flush()
+
+    for accessed_at, user_id in (
+        (datetime(2024, 1, 5, 9), 1),
+        (datetime(2024, 1, 5, 10), 2),
+        (datetime(2024, 2, 10, 9), 1),
+        (datetime(2024, 3, 2, 9), 1),
+    ):
+        db.add(
+            DocumentAccess(
+                document_id=document.id,
+                user_id=user_id,
+                user_role="admin",
+                access_type="view",
+                accessed_at=accessed_at,
+            )
+        )
+    db.commit()
+    return document
+
+
+def test_rotate_moves_closed_months_out_of_hot_table(db):
+    _seed(db)
+
+    moved = AuditLogService.rotate_partitions(db, now=datetime(2024, 3, 15))
+
+    assert moved == {"document_access_2024_01": 2, "document_access_2024_02": 1}
+    assert db.query(DocumentAccess).count() == 1
+
+    tables = set(inspect(db.get_bind()).get_table_names())
+    assert {"document_access_2024_03", "document_access_2024_04"} <= tables
+
+
+def test_history_spans_hot_table_and_partitions(db):
+    document = _seed(db)
+    AuditLogService.rotate_partitions(db, now=datetime(2024, 3, 15))
+
+    history = AuditLogService.get_access_history(db, participant_id=document.participant_id)
+    assert [row["accessed_at"][:10] for row in history] == [
+        "2024-03-02",
+        "2024-02-10",
+        "2024-01-05",
+        "2024-01-05",
+    ]
+
+    february = AuditLogService.get_access_history(
+        db,
+        document_ids=[document.id],
+        start=datetime(2024, 2, 1),
+        end=datetime(2024, 3, 1),
+    )
+    assert len(february) == 1
+
+
+def test_daily_rollups_are_rebuilt_idempotently(db):
+    document = _seed(db)
+    AuditLogService.rotate_partitions(db, now=datetime(2024, 3, 15))
+
+    AuditLogService.build_daily_rollups(db, date(2024, 1, 5))
+    AuditLogService.build_daily_rollups(db, date(2024, 1, 5))
+
+    rollups = db.query(DocumentAccessDailyRollup).all()
+    assert len(rollups) == 1
+    assert rollups[0].participant_id == document.participant_id
+    assert rollups[0].access_count == 2
+    assert rollups[0].unique_users == 2
+
+    by_user = AuditLogService.get_rollups(db, date(2024, 1, 1), date(2024, 1, 31), group_by="user")
+    assert {row["user_id"] for row in by_user} == {1, 2}
+
+
+def test_archive_exports_and_drops_expired_partitions(db, tmp_path):
+    _seed(db)
+    AuditLogService.rotate_partitions(db, now=datetime(2024, 3, 15))
+
+    archived = AuditLogService.archive_expired_partitions(
+        db, retention_months=1, now=datetime(2024, 3, 15), archive_dir=tmp_path
+    )
+
+    assert [item["table_name"] for item in archived] == ["document_access_2024_01"]
+    assert "document_access_2024_01" not in inspect(db.get_bind()).get_table_names()
+
+    partition = db.query(AuditPartition).filter_by(table_name="document_access_2024_01").one()
+    assert partition.status == "archived"
+
+    rows = list(AuditLogService.iter_archived_access(Path(archived[0]["archive_path"])))
+    assert len(rows) == 2
+    assert rows[0]["accessed_at"].startswith("2024-01-05")
+
+
+def test_late_rows_for_archived_months_join_the_archive(db, tmp_path):
+    document = _seed(db)
+    AuditLogService.rotate_partitions(db, now=datetime(2024, 3, 15))
+    archived = AuditLogService.archive_expired_partitions(
+        db, retention_months=1, now=datetime(2024, 3, 15), archive_dir=tmp_path
+    )
+    archive_path = Path(archived[0]["archive_path"])
+
+    # Written late, e.g. by a node whose clock or queue lagged behind.
+    db.add(DocumentAccess(
+        document_id=document.id, user_id=3, user_role="admin",
+        access_type="download", accessed_at=datetime(2024, 1, 20, 8, 0),
+    ))
+    db.commit()
+
+    moved = AuditLogService.rotate_partitions(db, now=datetime(2024, 3, 16))
+    assert moved == {"document_access_2024_01": 1}
+    assert db.query(DocumentAccess).filter(DocumentAccess.accessed_at < datetime(2024, 2, 1)).count() == 0
+
+    rows = list(AuditLogService.iter_archived_access(archive_path))
+    assert len(rows) == 3 and rows[-1]["user_id"] == 3
+    partition = db.query(AuditPartition).filter_by(table_name="document_access_2024_01").one()
+    assert partition.row_count == 3
+    assert AuditLogService.rotate_partitions(db, now=datetime(2024, 3, 17)) == {}
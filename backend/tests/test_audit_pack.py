@@ -0,0 +1,185 @@
+"""Tests for streaming audit pack exports."""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import sys
+import zipfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db, get_session_factory  # noqa: E402
+from app.models.audit import AuditPackExport  # noqa: E402
+from app.models.document import Document  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.audit_pack_service import AuditPackService  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+
+TEXT = b"Progress note.\n" * 500
+
+
+def _participant(first_name: str) -> Participant:
+    return Participant(
+        first_name=first_name,
+        last_name="Tester",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+    )
+
+
+@pytest.fixture(name="client")
+def _client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        db.add_all([_participant("Ada"), _participant("Grace"), _participant("Alan")])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(document_endpoints.router)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    client = TestClient(app)
+    client.session_factory = TestingSessionLocal
+
+    def upload(participant_id, name, content, mime, category):
+        response = client.post(
+            f"/participants/{participant_id}/documents",
+            files={"file": (name, io.BytesIO(content), mime)},
+            data={"title": name, "category": category},
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    client.upload = upload
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def _read_pack(content: bytes):
+    archive = zipfile.ZipFile(io.BytesIO(content))
+    manifest = list(csv.DictReader(io.StringIO(archive.read("manifest.csv").decode())))
+    return archive, manifest
+
+
+def test_audit_pack_streams_documents_with_manifest(client):
+    notes = client.upload(1, "notes.txt", TEXT, "text/plain", "service_agreements")
+    scan = client.upload(2, "scan.png", b"\x89PNG scan", "image/png", "medical_consent")
+    client.upload(2, "other.png", b"other", "image/png", "general_documents")
+    client.upload(3, "excluded.png", b"not sampled", "image/png", "service_agreements")
+    gone = client.upload(2, "gone.png", b"gone", "image/png", "service_agreements")
+    with client.session_factory() as db:
+        get_storage().delete(db.get(Document, gone["id"]).file_path)
+
+    export = client.post(
+        "/documents/audit-packs",
+        params={"participant_ids": [1, 2], "categories": ["service_agreements", "medical_consent"]},
+    ).json()
+    assert export["document_count"] == 3
+
+    response = client.get(export["download_url"].replace("/api/v1", ""))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    archive, manifest = _read_pack(response.content)
+    assert [row["document_id"] for row in manifest] == [str(notes["id"]), str(scan["id"]), str(gone["id"])]
+    assert [row["status"] for row in manifest] == ["included", "included", "missing"]
+
+    notes_row = manifest[0]
+    assert archive.read(notes_row["archive_path"]) == TEXT  # stored compressed, exported decompressed
+    assert notes_row["sha256"] == hashlib.sha256(TEXT).hexdigest()
+    assert notes_row["archive_path"].startswith("1_Tester_Ada/service_agreements/")
+    assert json.loads(archive.read("manifest.json"))["documents"][1]["title"] == "scan.png"
+
+    status = client.get(f"/documents/audit-packs/{export['id']}").json()
+    assert status["status"] == "completed"
+    assert status["documents_written"] == 3
+    assert client.get(export["download_url"].replace("/api/v1", "")).status_code == 409
+
+
+def test_interrupted_download_resumes_from_checkpoint(client):
+    ids = [
+        client.upload(1, f"doc{i}.png", bytes([i]) * 2000, "image/png", "general_documents")["id"]
+        for i in range(6)
+    ]
+    with client.session_factory() as db:
+        export = AuditPackService.create_export(db, participant_ids=[1])
+        AuditPackService.start_part(db, export)
+        export_id = export.id
+
+    stream = AuditPackService.stream(client.session_factory, export_id, workers=2, checkpoint_lag=1)
+    received = 0
+    for chunk in stream:
+        received += len(chunk)
+        if received > 5 * 2000:
+            break
+    stream.close()
+
+    with client.session_factory() as db:
+        export = db.get(AuditPackExport, export_id)
+        assert export.status == "interrupted"
+        checkpoint = export.last_document_id
+        assert checkpoint in ids[:-1]
+        part, resume_after = AuditPackService.start_part(db, export)
+
+    assert part == 2
+    content = b"".join(AuditPackService.stream(client.session_factory, export_id, resume_after=resume_after))
+    _, manifest = _read_pack(content)
+
+    resumed = [int(row["document_id"]) for row in manifest]
+    assert resumed == [doc_id for doc_id in ids if doc_id > checkpoint]
+    with client.session_factory() as db:
+        assert db.get(AuditPackExport, export_id).status == "completed"
@@ -0,0 +1,171 @@
+"""Tests for set-based document and participant deletion."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.database import Base  # noqa: E402
+from app.models.care_plan import CarePlan, ProspectiveWorkflow  # noqa: E402
+from app.models.document import Document, DocumentAccess, DocumentNotification  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.deletion_service import CascadeDeletionService  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+from app.services.participant_service import ParticipantService  # noqa: E402
+
+
+@pytest.fixture(name="db")
+def _db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _participant(db) -> Participant:
+    participant = Participant(
+        first_name="Ada",
+        last_name="Lovelace",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+    )
+    db.add(participant)
+    db.flush()
+    return participant
+
+
+def _version_chain(db, participant, tmp_path, length: int):
+    """Create ``length`` versions, each pointing at the previous one."""
+
+    documents = []
+    parent_id = None
+    for version in range(1, length + 1):
+        stored = tmp_path / f"v{version}.pdf"
+        stored.write_bytes(b"%PDF")
+        document = Document(
+            participant_id=participant.id,
+            title="Plan",
+            filename=stored.name,
+            original_filename="plan.pdf",
+            file_path=str(stored),
+            file_size=4,
+            mime_type="application/pdf",
+            category="general_documents",
+            uploaded_by="tester",
+            version=version,
+            is_current_version=version == length,
+            parent_document_id=parent_id,
+        )
+        db.add(document)
+        db.flush()
+        db.add(DocumentAccess(document_id=document.id, user_id=1, user_role="admin", access_type="view"))
+        db.add(
+            DocumentNotification(
+                document_id=document.id,
+                participant_id=participant.id,
+                notification_type="expiry_warning",
+                scheduled_for=datetime(2025, 1, 1),
+            )
+        )
+        documents.append(document)
+        parent_id = document.id
+    db.commit()
+    return documents
+
+
+def test_version_tree_is_collected_with_one_query(db, tmp_path):
+    participant = _participant(db)
+    documents = _version_chain(db, participant, tmp_path, 4)
+
+    tree = CascadeDeletionService.version_tree([documents[1].id])
+    ids = sorted(db.execute(tree.select()).scalars())
+
+    assert ids == [doc.id for doc in documents[1:]]
+
+
+def test_deleting_a_version_removes_later_versions_and_promotes_parent(db, tmp_path):
+    participant = _participant(db)
+    documents = _version_chain(db, participant, tmp_path, 3)
+    first_id, second_id = documents[0].id, documents[1].id
+
+    assert DocumentService.delete_document(db, second_id, participant.id)
+
+    remaining = db.query(Document).all()
+    assert [doc.id for doc in remaining] == [first_id]
+    assert remaining[0].is_current_version is True
+    assert db.query(DocumentAccess).count() == 1
+    assert db.query(DocumentNotification).count() == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["v1.pdf"]
+
+    assert DocumentService.delete_document(db, second_id, participant.id) is False
+
+
+def test_participant_offboarding_is_one_transaction_and_reaps_files(db, tmp_path):
+    participant = _participant(db)
+    _version_chain(db, participant, tmp_path, 3)
+    care_plan = CarePlan(
+        participant_id=participant.id,
+        plan_name="Plan",
+        start_date=date(2024, 1, 1),
+        end_date=date(2025, 1, 1),
+        summary="Summary",
+    )
+    db.add(care_plan)
+    db.flush()
+    db.add(ProspectiveWorkflow(participant_id=participant.id, care_plan_id=care_plan.id))
+    db.commit()
+
+    participant_id = participant.id
+    result = CascadeDeletionService.delete_participant(db, participant_id)
+
+    assert result.counts["documents"] == 3
+    assert result.counts["care_plans"] == 1
+    assert result.counts["prospective_workflows"] == 1
+    assert db.query(Participant).count() == 0
+    assert db.query(DocumentAccess).count() == 0
+    # Files are left for the reaper until the caller schedules it.
+    assert len(list(tmp_path.iterdir())) == 3
+
+    second_dir = tmp_path / "second"
+    second_dir.mkdir()
+    participant = _participant(db)
+    participant_id = participant.id
+    _version_chain(db, participant, second_dir, 2)
+    assert ParticipantService.delete_participant(db, participant_id)
+    assert not list(second_dir.iterdir())
+    assert ParticipantService.delete_participant(db, participant_id) is False
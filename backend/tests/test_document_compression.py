@@ -0,0 +1,147 @@
+"""Tests for compression at rest of uploaded documents."""
+
+from __future__ import annotations
+
+import io
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.document import Document  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services import document_compression  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+
+pytestmark = pytest.mark.skipif(
+    not document_compression.ZSTD_AVAILABLE, reason="zstandard is not installed"
+)
+
+TEXT = b"Support plan review notes.\n" * 2000
+
+
+@pytest.fixture(name="client")
+def _client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        db.add(
+            Participant(
+                first_name="Ada",
+                last_name="Lovelace",
+                date_of_birth=date(1990, 1, 1),
+                phone_number="0400000000",
+                street_address="1 Test St",
+                city="Sydney",
+                state="NSW",
+                postcode="2000",
+                preferred_contact="phone",
+                disability_type="physical",
+                plan_type="self-managed",
+                plan_start_date=date(2024, 1, 1),
+                plan_review_date=date(2025, 1, 1),
+                support_category="core",
+                client_goals="Independence",
+            )
+        )
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(document_endpoints.router)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.session_factory = TestingSessionLocal
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def _upload(client, content: bytes, filename: str, mime_type: str):
+    response = client.post(
+        "/participants/1/documents",
+        files={"file": (filename, io.BytesIO(content), mime_type)},
+        data={"title": filename, "category": "general_documents"},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_text_upload_is_stored_compressed_and_streamed_back(client, tmp_path):
+    body = _upload(client, TEXT, "notes.txt", "text/plain")
+
+    with client.session_factory() as db:
+        document = db.get(Document, body["id"])
+        assert document.storage_codec == "zstd"
+        assert document.file_size == len(TEXT)
+        stored = tmp_path / document.file_path
+        assert stored.suffix == ".zst"
+        assert stored.stat().st_size == document.stored_size < len(TEXT) // 10
+
+    plain = client.get(
+        f"/participants/1/documents/{body['id']}/download", headers={"Accept-Encoding": "identity"}
+    )
+    assert plain.status_code == 200
+    assert "content-encoding" not in plain.headers
+    assert plain.content == TEXT
+
+    encoded = client.get(
+        f"/participants/1/documents/{body['id']}/download", headers={"Accept-Encoding": "zstd"}
+    )
+    assert encoded.headers["content-encoding"] == "zstd"
+    assert int(encoded.headers["content-length"]) == document.stored_size
+    assert encoded.content == TEXT  # decoded by the client
+
+
+def test_incompressible_and_ineligible_uploads_stay_raw(client):
+    random_pdf = _upload(client, os.urandom(16 * 1024), "scan.pdf", "application/pdf")
+    image = _upload(client, TEXT, "photo.png", "image/png")
+
+    with client.session_factory() as db:
+        assert db.get(Document, random_pdf["id"]).storage_codec is None
+        assert db.get(Document, image["id"]).storage_codec is None
+
+
+def test_accepts_encoding_honours_q_values():
+    assert document_compression.accepts_encoding("gzip, zstd", "zstd")
+    assert document_compression.accepts_encoding("zstd;q=0.5", "zstd")
+    assert not document_compression.accepts_encoding("zstd;q=0", "zstd")
+    assert not document_compression.accepts_encoding("gzip, br", "zstd")
@@ -0,0 +1,226 @@
+"""Tests for bulk document imports."""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import sys
+import zipfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.document import Document, DocumentAccess, DocumentTag  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services import document_import_service  # noqa: E402
+from app.services.document_import_service import (  # noqa: E402
+    DirectoryImportSource,
+    DocumentImportService,
+    ImportSource,
+    ZipImportSource,
+)
+from app.services.document_compression import iter_decompressed  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+
+LETTER = b"Referral letter.\n" * 200
+PLAN = b"%PDF-1.4 legacy plan"
+
+
+def _participant(first_name: str, ndis_number: str) -> Participant:
+    return Participant(
+        first_name=first_name,
+        last_name="Tester",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+        ndis_number=ndis_number,
+    )
+
+
+@pytest.fixture(name="session_factory")
+def _session_factory(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path / "storage"))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        db.add_all([_participant("Ada", "430000001"), _participant("Grace", "430000002")])
+        db.commit()
+    try:
+        yield TestingSessionLocal
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def _manifest_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["path", "participant_id", "ndis_number", "category", "title", "tags"])
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _zip(files) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+MANIFEST_ROWS = [
+    {"path": "ada/letter.txt", "participant_id": "1", "category": "intake_documents", "tags": "legacy;intake"},
+    {"path": "ada/plan.pdf", "ndis_number": "430000001", "category": "care_plans", "title": "Old plan"},
+    {"path": "ada/copy.txt", "participant_id": "1", "category": "intake_documents"},
+    {"path": "grace/letter.txt", "participant_id": "2", "category": "intake_documents"},
+    {"path": "grace/missing.pdf", "participant_id": "2", "category": "care_plans"},
+    {"path": "grace/bad.txt", "participant_id": "2", "category": "no_such_category"},
+    {"path": "../escape.txt", "participant_id": "2", "category": "intake_documents"},
+    {"path": "nobody.txt", "participant_id": "99", "category": "intake_documents"},
+]
+
+FILES = {
+    "ada/letter.txt": LETTER,
+    "ada/plan.pdf": PLAN,
+    "ada/copy.txt": LETTER,
+    "grace/letter.txt": LETTER,
+    "grace/bad.txt": b"x",
+    "nobody.txt": b"x",
+}
+
+
+def test_zip_import_batches_documents_and_reports_every_row(session_factory):
+    source = ZipImportSource(_zip({**FILES, "manifest.csv": _manifest_csv(MANIFEST_ROWS)}))
+    with session_factory() as db, source:
+        report = DocumentImportService.run(db, source, workers=4, batch_size=2)
+
+    statuses = [(result.path, result.status) for result in report.results]
+    assert statuses == [
+        ("ada/letter.txt", "imported"),
+        ("ada/plan.pdf", "imported"),
+        ("ada/copy.txt", "duplicate"),
+        ("grace/letter.txt", "imported"),
+        ("grace/missing.pdf", "invalid"),
+        ("grace/bad.txt", "invalid"),
+        ("../escape.txt", "invalid"),
+        ("nobody.txt", "invalid"),
+    ]
+    assert report.counts == {"imported": 3, "duplicate": 1, "invalid": 4}
+    letter, plan, copy = report.results[:3]
+    assert letter.sha256 == hashlib.sha256(LETTER).hexdigest()
+    assert copy.document_id == letter.document_id
+    assert "Invalid category" in report.results[5].error
+
+    with session_factory() as db:
+        documents = {doc.id: doc for doc in db.query(Document).all()}
+        assert len(documents) == 3
+        assert documents[plan.document_id].title == "Old plan"
+        assert documents[plan.document_id].mime_type == "application/pdf"
+        stored = documents[letter.document_id]
+        assert b"".join(iter_decompressed(stored.file_path, stored.storage_codec)) == LETTER
+        tags = db.query(DocumentTag.tag).filter(DocumentTag.document_id == letter.document_id).all()
+        assert sorted(tag for (tag,) in tags) == ["intake", "legacy"]
+        assert db.query(DocumentAccess).filter(DocumentAccess.access_type == "import").count() == 3
+
+    # The duplicate's copy was removed from storage.
+    keys = {obj.key for obj in get_storage().list("uploads/documents/1/")}
+    assert len(keys) == 2
+
+
+def test_directory_import_dry_run_and_endpoint(session_factory, tmp_path, monkeypatch):
+    root = tmp_path / "legacy"
+    for name, content in FILES.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_bytes(content)
+    manifest = json.dumps({"documents": MANIFEST_ROWS[:2]}).encode()
+
+    with session_factory() as db:
+        report = DocumentImportService.run(
+            db, DirectoryImportSource(root), rows=MANIFEST_ROWS[:2], dry_run=True
+        )
+        assert [result.status for result in report.results] == ["valid", "valid"]
+        assert db.query(Document).count() == 0
+
+    monkeypatch.setattr(document_import_service, "DOCUMENT_IMPORT_ROOT", str(tmp_path))
+    app = FastAPI()
+    app.include_router(document_endpoints.router)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    response = client.post(
+        "/documents/imports",
+        data={"directory": "legacy"},
+        files={"manifest": ("manifest.json", io.BytesIO(manifest), "application/json")},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["counts"] == {"imported": 2}
+
+    escaped = client.post("/documents/imports", data={"directory": "../"})
+    assert escaped.status_code == 400
+
+    uploaded = client.post(
+        "/documents/imports",
+        files={"archive": ("legacy.zip", _zip({"g.txt": b"grace notes", "manifest.csv": _manifest_csv([
+            {"path": "g.txt", "participant_id": "2", "category": "general_documents"},
+        ])}), "application/zip")},
+    )
+    assert uploaded.status_code == 200, uploaded.text
+    assert uploaded.json()["results"][0]["status"] == "imported"
+
+    assert client.post("/documents/imports").status_code == 400
+
+
+def test_import_sources_must_implement_the_interface():
+    class ExistsOnly(ImportSource):
+        def exists(self, path):
+            return True
+
+    with pytest.raises(TypeError):
+        ExistsOnly()
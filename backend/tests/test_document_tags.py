@@ -0,0 +1,163 @@
+"""Tests for the normalised document tag index and faceted search."""
+
+from __future__ import annotations
+
+import io
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.document import DocumentTag  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.deletion_service import CascadeDeletionService  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+
+
+@pytest.fixture(name="client")
+def _client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        db.add(
+            Participant(
+                first_name="Ada",
+                last_name="Lovelace",
+                date_of_birth=date(1990, 1, 1),
+                phone_number="0400000000",
+                street_address="1 Test St",
+                city="Sydney",
+                state="NSW",
+                postcode="2000",
+                preferred_contact="phone",
+                disability_type="physical",
+                plan_type="self-managed",
+                plan_start_date=date(2024, 1, 1),
+                plan_review_date=date(2025, 1, 1),
+                support_category="core",
+                client_goals="Independence",
+            )
+        )
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(document_endpoints.router)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.session_factory = TestingSessionLocal
+    client.engine = engine
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def _upload(client, title: str, tags: str, category: str = "general_documents", expiry: str = None):
+    data = {"title": title, "category": category, "tags": tags}
+    if expiry:
+        data["expiry_date"] = expiry
+    response = client.post(
+        "/participants/1/documents",
+        files={"file": (f"{title}.png", io.BytesIO(f"image {title}".encode()), "image/png")},
+        data=data,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_tag_filter_matches_every_requested_tag(client):
+    plan = _upload(client, "plan", "NDIS, Signed")
+    _upload(client, "draft", "ndis")
+    _upload(client, "other", "medical")
+
+    signed = client.get("/participants/1/documents", params={"tags": ["ndis", "signed"]}).json()
+    ndis = client.get("/participants/1/documents", params={"tags": "NDIS"}).json()
+
+    assert [doc["id"] for doc in signed] == [plan["id"]]
+    assert sorted(doc["title"] for doc in ndis) == ["draft", "plan"]
+
+
+def test_search_returns_page_with_facets(client):
+    _upload(client, "agreement", "ndis,signed", category="service_agreements", expiry="2000-01-01")
+    _upload(client, "consent", "ndis", category="medical_consent", expiry="2999-01-01")
+    _upload(client, "notes", "internal")
+
+    body = client.get("/participants/1/documents/search", params={"page_size": 1}).json()
+
+    assert len(body["items"]) == 1 and body["next_cursor"]
+    assert body["facets"]["total"] == 3
+    assert body["facets"]["category"] == {
+        "service_agreements": 1,
+        "medical_consent": 1,
+        "general_documents": 1,
+    }
+    assert body["facets"]["tag"] == {"ndis": 2, "internal": 1, "signed": 1}
+    assert body["facets"]["expiry"] == {"expired": 1, "valid": 1, "none": 1}
+
+    filtered = client.get("/participants/1/documents/search", params={"tags": "ndis"}).json()
+    assert filtered["facets"]["total"] == 2
+    assert filtered["facets"]["category"] == {"service_agreements": 1, "medical_consent": 1}
+
+
+def test_tag_rows_follow_updates_versions_and_deletes(client):
+    document = _upload(client, "plan", "ndis")
+
+    client.put(f"/participants/1/documents/{document['id']}", params={"tags": "review, urgent"})
+    version = client.post(
+        f"/participants/1/documents/{document['id']}/versions",
+        files={"file": ("plan.png", io.BytesIO(b"v2"), "image/png")},
+    ).json()
+
+    with client.session_factory() as db:
+        rows = sorted((row.document_id, row.tag) for row in db.query(DocumentTag))
+        assert rows == [
+            (document["id"], "review"),
+            (document["id"], "urgent"),
+            (version["id"], "review"),
+            (version["id"], "urgent"),
+        ]
+
+        CascadeDeletionService.delete_document_tree(db, document["id"], 1)
+        assert db.query(DocumentTag).count() == 0
+
+
+def test_normalize_tags():
+    assert DocumentService.normalize_tags([" NDIS ", "ndis", "", "Signed"]) == ["ndis", "signed"]
+    assert DocumentService.normalize_tags(None) == []
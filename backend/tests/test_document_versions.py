@@ -0,0 +1,183 @@
+"""Tests for document version uploads, history and current-version listings."""
+
+from __future__ import annotations
+
+import io
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.document import Document, DocumentNotification  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+
+
+@pytest.fixture(name="client")
+def _client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        db.add(
+            Participant(
+                first_name="Ada",
+                last_name="Lovelace",
+                date_of_birth=date(1990, 1, 1),
+                phone_number="0400000000",
+                street_address="1 Test St",
+                city="Sydney",
+                state="NSW",
+                postcode="2000",
+                preferred_contact="phone",
+                disability_type="physical",
+                plan_type="self-managed",
+                plan_start_date=date(2024, 1, 1),
+                plan_review_date=date(2025, 1, 1),
+                support_category="core",
+                client_goals="Independence",
+            )
+        )
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(document_endpoints.router)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.session_factory = TestingSessionLocal
+    client.engine = engine
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def _file(content: bytes):
+    return {"file": ("agreement.png", io.BytesIO(content), "image/png")}
+
+
+def test_new_versions_supersede_and_keep_history(client):
+    first = client.post(
+        "/participants/1/documents",
+        files=_file(b"v1"),
+        data={"title": "Service agreement", "category": "service_agreements", "tags": "ndis,signed"},
+    ).json()
+
+    second = client.post(f"/participants/1/documents/{first['id']}/versions", files=_file(b"v2"))
+    assert second.status_code == 200, second.text
+    # Any id in the chain can be used; the version links to the current one.
+    third = client.post(
+        f"/participants/1/documents/{first['id']}/versions",
+        files=_file(b"v3"),
+        data={"title": "Service agreement 2026"},
+    ).json()
+
+    assert third["version"] == 3 and third["is_current_version"]
+    assert third["category"] == "service_agreements" and third["tags"] == ["ndis", "signed"]
+    assert third["title"] == "Service agreement 2026"
+
+    listing = client.get("/participants/1/documents").json()
+    assert [doc["id"] for doc in listing] == [third["id"]]
+    assert len(client.get("/participants/1/documents", params={"include_versions": True}).json()) == 3
+    assert client.get("/participants/1/documents/stats").json()["total_documents"] == 1
+
+    history = client.get(f"/participants/1/documents/{second.json()['id']}/versions").json()
+    assert [doc["version"] for doc in history] == [3, 2, 1]
+    assert [doc["is_current_version"] for doc in history] == [True, False, False]
+
+    with client.session_factory() as db:
+        chain = {doc.version: doc for doc in db.query(Document)}
+        assert chain[3].parent_document_id == chain[2].id
+        assert chain[2].parent_document_id == chain[1].id
+
+
+def test_new_versions_keep_expiry_reminders_unless_the_date_changes(client):
+    first = client.post(
+        "/participants/1/documents",
+        files=_file(b"v1"),
+        data={"title": "First aid", "category": "service_agreements", "expiry_date": "2026-12-01"},
+    ).json()
+    with client.session_factory() as db:
+        # The reminder has been scheduled but not delivered yet.
+        db.get(Document, first["id"]).expiry_notification_sent = True
+        db.add(DocumentNotification(
+            document_id=first["id"], participant_id=1, notification_type="expiry_warning",
+            recipient_email="admin@example.com", recipient_role="admin", is_sent=False,
+            retry_count=0, scheduled_for=datetime(2026, 11, 1),
+        ))
+        db.commit()
+
+    same = client.post(f"/participants/1/documents/{first['id']}/versions", files=_file(b"v2")).json()
+    with client.session_factory() as db:
+        assert db.get(Document, same["id"]).expiry_notification_sent
+        assert not db.get(Document, first["id"]).expiry_notification_sent
+        assert [n.document_id for n in db.query(DocumentNotification)] == [same["id"]]
+
+    renewed = client.post(
+        f"/participants/1/documents/{same['id']}/versions", files=_file(b"v3"), data={"expiry_date": "2027-12-01"},
+    ).json()
+    with client.session_factory() as db:
+        assert not db.get(Document, renewed["id"]).expiry_notification_sent
+        assert not db.get(Document, same["id"]).expiry_notification_sent
+        assert db.query(DocumentNotification).count() == 0
+
+
+def test_version_upload_for_unknown_document_is_404_and_removes_file(client, tmp_path):
+    response = client.post("/participants/1/documents/99/versions", files=_file(b"orphan"))
+
+    assert response.status_code == 404
+    assert not list((tmp_path / "uploads" / "documents" / "1").iterdir())
+
+
+def test_current_listing_is_served_by_an_index(client):
+    with client.session_factory() as db:
+        index_sql = db.execute(
+            text("SELECT sql FROM sqlite_master WHERE name = 'ix_documents_participant_current'")
+        ).scalar()
+        query = DocumentService.build_document_query(db, participant_id=1).order_by(
+            Document.created_at.desc(), Document.id.desc()
+        )
+        sql = str(query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+        plan = " ".join(str(row) for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+    assert "WHERE is_current_version = 1" in index_sql
+    # SQLite may pick either (participant_id, created_at, id) index; both avoid a scan and a sort.
+    assert "USING INDEX ix_documents_participant_" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,189 @@
+"""Tests for merged participant dossier PDFs."""
+
+from __future__ import annotations
+
+import io
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.document import DocumentAccess  # noqa: E402
+from app.models.document_generation import DocumentGenerationTemplate, GeneratedDocument  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+from app.services.dossier_service import PYPDF_AVAILABLE  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not PYPDF_AVAILABLE, reason="pypdf is not installed")
+
+if PYPDF_AVAILABLE:
+    from pypdf import PdfReader, PdfWriter
+
+
+def _pdf(pages: int, width: int = 300) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width, 400)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _participant(first_name: str, ndis_number: str) -> Participant:
+    return Participant(
+        first_name=first_name,
+        last_name="Tester",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+        ndis_number=ndis_number,
+    )
+
+
+@pytest.fixture(name="client")
+def _client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        db.add_all([_participant("Ada", "430000001"), _participant("Grace", "430000002")])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(document_endpoints.router)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.session_factory = TestingSessionLocal
+
+    def upload(participant_id, name, content, category="medical_consent"):
+        response = client.post(
+            f"/participants/{participant_id}/documents",
+            files={"file": (name, io.BytesIO(content), "application/pdf")},
+            data={"title": name, "category": category},
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    client.upload = upload
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def _add_generated(client, participant_id, document_type, pages, key):
+    get_storage().save(key, io.BytesIO(_pdf(pages, width=500)))
+    with client.session_factory() as db:
+        template = db.query(DocumentGenerationTemplate).first()
+        if template is None:
+            template = DocumentGenerationTemplate(template_type=document_type, name="Template", template_content="<p/>")
+            db.add(template)
+            db.flush()
+        db.add(GeneratedDocument(
+            template_id=template.id,
+            participant_id=participant_id,
+            document_name=f"{document_type} output",
+            document_type=document_type,
+            generated_content="<p/>",
+            file_path=key,
+            file_format="pdf",
+        ))
+        db.commit()
+
+
+def test_dossier_merges_generated_and_uploaded_pdfs(client):
+    _add_generated(client, 1, "service_agreement", 1, "generated/1/old_agreement.pdf")
+    _add_generated(client, 1, "service_agreement", 2, "generated/1/agreement.pdf")
+    first = client.upload(1, "assessment.pdf", _pdf(3))
+    client.upload(1, "notes.txt.pdf", b"not really a pdf")
+    client.upload(2, "other.pdf", _pdf(5))
+
+    response = client.get("/participants/1/documents/dossier")
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/pdf"
+    assert int(response.headers["content-length"]) == len(response.content)
+
+    reader = PdfReader(io.BytesIO(response.content))
+    # Cover, contents, the latest service agreement (2 pages) and the upload (3 pages).
+    assert len(reader.pages) == 1 + 1 + 2 + 3
+    assert int(response.headers["x-dossier-pages"]) == 7
+    assert "Ada Tester" in reader.pages[0].extract_text()
+    contents = reader.pages[1].extract_text()
+    assert "service_agreement output" in contents and "assessment.pdf" in contents
+    assert [item.title for item in reader.outline] == ["service_agreement output", "assessment.pdf"]
+    assert reader.get_destination_page_number(reader.outline[1]) == 4
+    # Source pages are copied untouched.
+    assert float(reader.pages[2].mediabox.width) == 500
+    assert float(reader.pages[4].mediabox.width) == 300
+    assert len(reader.pages[1]["/Annots"]) == 2
+
+    skipped = json.loads(response.headers["x-dossier-skipped"])
+    assert [(item["kind"], item["reason"]) for item in skipped] == [("document", "unreadable")]
+
+    with client.session_factory() as db:
+        logged = db.query(DocumentAccess.document_id).filter(DocumentAccess.access_type == "dossier").all()
+    assert logged == [(first["id"],)]
+
+
+def test_dossier_filters_and_missing_participant(client):
+    client.upload(1, "consent.pdf", _pdf(1))
+    wanted = client.upload(1, "report.pdf", _pdf(2), category="medical_reports")
+
+    response = client.get("/participants/1/documents/dossier", params={"document_ids": [wanted["id"]]})
+    assert response.status_code == 200
+    assert len(PdfReader(io.BytesIO(response.content)).pages) == 1 + 1 + 2
+    by_category = client.get("/participants/1/documents/dossier", params={"categories": ["medical_consent"]})
+    assert len(PdfReader(io.BytesIO(by_category.content)).pages) == 1 + 1 + 1
+
+    empty = client.get("/participants/2/documents/dossier")
+    assert empty.status_code == 200
+    assert len(PdfReader(io.BytesIO(empty.content)).pages) == 2
+
+    assert client.get("/participants/999/documents/dossier").status_code == 404
@@ -0,0 +1,172 @@
+"""Tests for duplicate candidate detection across referrals and participants."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.participant import router as participant_router  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.duplicate import DuplicateBlockingKey, DuplicateCandidate  # noqa: E402
+from app.schemas.referral import ReferralCreate  # noqa: E402
+from app.services import duplicate_detection  # noqa: E402
+from app.services.deletion_service import CascadeDeletionService  # noqa: E402
+from app.services.duplicate_detection import DuplicateDetectionService, similarities, soundex  # noqa: E402
+from app.services.participant_service import ParticipantService  # noqa: E402
+from app.services.referral_service import ReferralService  # noqa: E402
+
+
+def _referral(first_name, last_name, **overrides) -> ReferralCreate:
+    values = dict(
+        first_name=first_name, last_name=last_name, date_of_birth=date(1990, 5, 17),
+        phone_number="0400 000 000", street_address="1 Test St", city="Sydney", state="NSW",
+        postcode="2000", preferred_contact="phone", disability_type="physical",
+        plan_type="self-managed", plan_start_date=date(2024, 1, 1), plan_review_date=date(2025, 1, 1),
+        client_goals="Independence", support_category="core",
+        referrer_first_name="Sam", referrer_last_name="Referrer", referrer_email="sam@example.com",
+        referrer_phone="0400000001", referred_for="support", reason_for_referral="Needs support",
+        urgency_level="high", consent_checkbox=True,
+    )
+    values.update(overrides)
+    return ReferralCreate(**values)
+
+
+@pytest.fixture(name="session_factory")
+def _session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield TestingSessionLocal
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _pairs(db):
+    return {
+        ((c.left_type, c.left_id), (c.right_type, c.right_id)): c.status
+        for c in db.query(DuplicateCandidate).all()
+    }
+
+
+def test_soundex_and_similarity_fallback(monkeypatch):
+    assert soundex("Smith") == soundex("Smyth") == "S530"
+    assert soundex("Robert") == soundex("Rupert") == "R163"
+    assert soundex("Ashcraft") == "A261"
+    assert soundex("Pfister") == "P236"
+    assert soundex("") is None
+
+    fast = similarities("ada lovelace", ["lovelace ada", "grace hopper", None])
+    monkeypatch.setattr(duplicate_detection, "RAPIDFUZZ_AVAILABLE", False)
+    slow = similarities("ada lovelace", ["lovelace ada", "grace hopper", None])
+    for scores in (fast, slow):
+        assert scores[0] == 1.0
+        assert scores[1] < 0.5
+        assert scores[2] == 0.0
+
+
+def test_incremental_check_on_insert_and_deletion(session_factory):
+    with session_factory() as db:
+        jon = ReferralService.create_referral(db, _referral("Jon", "Smith"))
+        john = ReferralService.create_referral(
+            db, _referral("John", "Smyth", phone_number="+61 400 000 000", street_address="1 Test Street")
+        )
+        # Same birthday, different person.
+        ReferralService.create_referral(db, _referral("Grace", "Hopper", phone_number="0499999999"))
+        # Different birthday, but the same NDIS number puts them in one block.
+        ReferralService.create_referral(db, _referral("Ada", "Lovelace", ndis_number="430 000 001"))
+        ada = ReferralService.create_referral(
+            db, _referral("Ada", "Lovelace", date_of_birth=date(1985, 1, 1), ndis_number="430000001")
+        )
+
+        assert _pairs(db) == {
+            (("referral", jon.id), ("referral", john.id)): "open",
+            (("referral", ada.id - 1), ("referral", ada.id)): "open",
+        }
+        assert db.query(DuplicateBlockingKey).filter(
+            DuplicateBlockingKey.block_key == "ndis:430000001"
+        ).count() == 2
+
+        # Converting Jon's referral pairs the participant with John's referral,
+        # but never with the referral it came from.
+        participant = ParticipantService.create_participant_from_referral(db, jon.id)
+        pairs = _pairs(db)
+        assert (("participant", participant.id), ("referral", john.id)) in pairs
+        assert (("participant", participant.id), ("referral", jon.id)) not in pairs
+
+        result = CascadeDeletionService.delete_participant(db, participant.id)
+        assert result.counts["duplicate_candidates"] == 1
+        assert result.counts["duplicate_blocking_keys"] == 2
+        assert len(_pairs(db)) == 2
+
+
+def test_sweep_and_review_endpoints(session_factory):
+    with session_factory() as db:
+        for first_name, last_name in (("Jon", "Smith"), ("John", "Smyth"), ("Jonny", "Smith")):
+            db.add(models.Referral(**_referral(first_name, last_name).dict()))
+        db.add(models.Referral(**_referral("Grace", "Hopper", phone_number="0499999999").dict()))
+        db.commit()
+        assert _pairs(db) == {}
+
+        stats = DuplicateDetectionService.sweep(db, max_block_size=3)
+        # The date-of-birth block holds all four records and is skipped as oversized;
+        # the three Smiths still meet in their postcode/surname block.
+        assert stats["skipped_blocks"] == 1
+        assert stats["comparisons"] == 3
+        assert stats["candidates"] == 3
+
+    app = FastAPI()
+    app.include_router(participant_router, prefix="/participants")
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    listed = client.get("/participants/duplicates").json()
+    assert len(listed) == 3
+    assert listed[0]["score"] >= listed[-1]["score"]
+    assert {listed[0]["left"]["last_name"], listed[0]["right"]["last_name"]} <= {"Smith", "Smyth"}
+    assert set(listed[0]["field_scores"]) == {"name", "address", "date_of_birth", "phone"}
+
+    dismissed = listed[0]["id"]
+    response = client.patch(f"/participants/duplicates/{dismissed}", params={"status": "dismissed", "reviewed_by": "intake"})
+    assert response.status_code == 200
+    assert client.patch(f"/participants/duplicates/{dismissed}", params={"status": "merged"}).status_code == 400
+    assert client.patch("/participants/duplicates/999", params={"status": "dismissed"}).status_code == 404
+
+    # A later sweep keeps the review and does not reopen the pair.
+    with session_factory() as db:
+        DuplicateDetectionService.sweep(db, max_block_size=3)
+    assert [c["id"] for c in client.get("/participants/duplicates", params={"status": "dismissed"}).json()] == [dismissed]
+    assert len(client.get("/participants/duplicates").json()) == 2
+    record = listed[1]["left"]
+    filtered = client.get(
+        "/participants/duplicates", params={"record_type": record["type"], "record_id": record["id"]}
+    ).json()
+    assert all(record in (c["left"], c["right"]) for c in filtered)
@@ -0,0 +1,190 @@
+"""Tests for per-participant duplicate upload detection."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.document import Document  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.deletion_service import CascadeDeletionService  # noqa: E402
+from app.services.document_import_service import DirectoryImportSource, DocumentImportService  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+
+CONSENT = b"%PDF-1.4 signed consent form"
+
+
+def _participant(first_name: str, ndis_number: str) -> Participant:
+    return Participant(
+        first_name=first_name,
+        last_name="Tester",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+        ndis_number=ndis_number,
+    )
+
+
+@pytest.fixture(name="client")
+def _client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path / "storage"))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        db.add_all([_participant("Ada", "430000001"), _participant("Grace", "430000002")])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(document_endpoints.router)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.session_factory = TestingSessionLocal
+
+    def upload(participant_id, name, content, **data):
+        return client.post(
+            f"/participants/{participant_id}/documents",
+            files={"file": (name, io.BytesIO(content), "application/pdf")},
+            data={"title": name, "category": "medical_consent", **data},
+        )
+
+    client.upload = upload
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def _stored_keys(participant_id):
+    return {obj.key for obj in get_storage().list(f"uploads/documents/{participant_id}/")}
+
+
+def test_duplicate_policies(client):
+    first = client.upload(1, "consent.pdf", CONSENT)
+    assert first.status_code == 200, first.text
+    original = first.json()
+    assert original["sha256"] == hashlib.sha256(CONSENT).hexdigest()
+    assert "duplicate_of" not in original
+
+    rejected = client.upload(1, "consent-copy.pdf", CONSENT)
+    assert rejected.status_code == 409
+    assert rejected.json()["detail"]["existing_document_id"] == original["id"]
+
+    existing = client.upload(1, "consent-copy.pdf", CONSENT, duplicate_policy="return_existing")
+    assert existing.status_code == 200
+    assert existing.json()["id"] == original["id"]
+    assert existing.json()["duplicate_of"] == original["id"]
+
+    # Another participant may hold the same file.
+    assert client.upload(2, "consent.pdf", CONSENT).status_code == 200
+    assert client.upload(1, "other.pdf", b"%PDF-1.4 other").status_code == 200
+    assert client.upload(1, "x.pdf", CONSENT, duplicate_policy="merge").status_code == 400
+
+    # Rejected and returned uploads left nothing behind in storage.
+    assert len(_stored_keys(1)) == 2
+
+    with client.session_factory() as db:
+        assert db.query(Document).filter(Document.participant_id == 1).count() == 2
+
+
+def test_new_version_shares_the_stored_file(client):
+    original = client.upload(1, "agreement.pdf", CONSENT).json()
+
+    linked = client.upload(1, "agreement-signed.pdf", CONSENT, duplicate_policy="new_version")
+    assert linked.status_code == 200, linked.text
+    version = linked.json()
+    assert version["duplicate_of"] == original["id"]
+    assert version["id"] != original["id"]
+    assert version["version"] == original["version"] + 1
+    assert version["original_filename"] == "agreement-signed.pdf"
+
+    # The new version is now the current document with this content.
+    again = client.upload(1, "agreement.pdf", CONSENT)
+    assert again.json()["detail"]["existing_document_id"] == version["id"]
+
+    with client.session_factory() as db:
+        rows = db.query(Document).order_by(Document.id).all()
+        assert rows[0].file_path == rows[1].file_path
+        shared = rows[0].file_path
+
+        # Deleting only the later version keeps the file the original still uses.
+        result = CascadeDeletionService.delete_document_tree(db, version["id"], 1)
+        assert result.file_paths == []
+        assert get_storage().exists(shared)
+
+        result = CascadeDeletionService.delete_document_tree(db, original["id"], 1)
+        assert result.file_paths == [shared]
+
+
+def test_import_skips_documents_already_in_the_database(client, tmp_path):
+    assert client.upload(1, "consent.pdf", CONSENT).status_code == 200
+    root = tmp_path / "legacy"
+    root.mkdir()
+    (root / "consent.pdf").write_bytes(CONSENT)
+    (root / "consent-scan.pdf").write_bytes(CONSENT)
+    (root / "new.pdf").write_bytes(b"%PDF-1.4 new")
+    rows = [
+        {"path": "consent.pdf", "participant_id": "1", "category": "medical_consent"},
+        {"path": "consent-scan.pdf", "participant_id": "1", "category": "medical_consent"},
+        {"path": "new.pdf", "participant_id": "1", "category": "medical_consent"},
+    ]
+
+    with client.session_factory() as db:
+        existing_id = db.query(Document.id).scalar()
+        report = DocumentImportService.run(db, DirectoryImportSource(root), rows=rows)
+
+    assert [(r.status, r.document_id) for r in report.results[:2]] == [
+        ("duplicate", existing_id),
+        ("duplicate", existing_id),
+    ]
+    assert report.results[2].status == "imported"
+    assert len(_stored_keys(1)) == 2
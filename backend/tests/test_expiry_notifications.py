@@ -0,0 +1,235 @@
+"""Tests for document expiry notification scheduling and delivery."""
+
+from __future__ import annotations
+
+import socketserver
+import sys
+import threading
+from datetime import date, datetime, timedelta
+from email import message_from_bytes
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.database import Base  # noqa: E402
+from app.models.document import Document, DocumentNotification  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+from app.services import notification_service  # noqa: E402
+from app.services.notification_service import (  # noqa: E402
+    DocumentNotificationService,
+    SMTPSender,
+)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for ``smtplib`` to deliver a message."""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 localhost test SMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command.startswith("DATA"):
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b".\n", b""):
+                        break
+                    lines.append(data)
+                self.server.messages.append(message_from_bytes(b"".join(lines)))
+                self.reply("250 OK")
+            elif command.startswith("QUIT"):
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture(name="smtp_server")
+def _smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(name="db")
+def _db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+class _FlakySender:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, message):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("relay unavailable")
+        self.sent.append(message)
+
+
+def _seed(db, now: datetime):
+    participant = Participant(
+        first_name="Ada",
+        last_name="Lovelace",
+        email_address="ada@example.com",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="email",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+    )
+    db.add(participant)
+    db.flush()
+
+    for title, days in (("Soon", 10), ("Later", 90), ("Lapsed", -2)):
+        db.add(
+            Document(
+                participant_id=participant.id,
+                title=title,
+                filename=f"{title}.pdf",
+                original_filename=f"{title}.pdf",
+                file_path=f"uploads/documents/1/{title}.pdf",
+                file_size=1,
+                mime_type="application/pdf",
+                category="general_documents",
+                uploaded_by="tester",
+                expiry_date=now + timedelta(days=days),
+            )
+        )
+    db.commit()
+    return participant
+
+
+def test_schedule_is_batched_and_idempotent(db):
+    now = datetime(2025, 6, 1, 9)
+    _seed(db, now)
+
+    created = DocumentNotificationService.schedule_expiry_notifications(db, now=now, batch_size=1)
+    again = DocumentNotificationService.schedule_expiry_notifications(db, now=now, batch_size=1)
+
+    assert created == 2
+    assert again == 0
+    types = {n.notification_type for n in db.query(DocumentNotification).all()}
+    assert types == {"expiry_warning", "expired"}
+
+
+def test_documents_without_recipients_stay_unflagged(db, monkeypatch):
+    monkeypatch.setattr(notification_service, "NOTIFICATION_ADMIN_EMAILS", [])
+    now = datetime(2025, 6, 1, 9)
+    participant = _seed(db, now)
+    participant.email_address = None
+    db.commit()
+
+    assert DocumentNotificationService.schedule_expiry_notifications(db, now=now) == 0
+    assert not any(d.expiry_notification_sent for d in db.query(Document).all())
+
+    # Once someone can be told, the documents are picked up.
+    participant.email_address = "ada@example.com"
+    db.commit()
+    assert DocumentNotificationService.schedule_expiry_notifications(db, now=now) == 2
+
+
+def test_due_notifications_are_delivered_over_smtp(db, smtp_server):
+    now = datetime(2025, 6, 1, 9)
+    _seed(db, now)
+    DocumentNotificationService.schedule_expiry_notifications(db, now=now)
+
+    sender = SMTPSender(host="127.0.0.1", port=smtp_server.server_address[1], sender="docs@example.com")
+    stats = DocumentNotificationService.process_due_notifications(db, sender=sender, now=now)
+
+    assert stats == {"sent": 2, "failed": 0, "abandoned": 0}
+    assert sorted(message["Subject"] for message in smtp_server.messages) == [
+        "Document expired: Lapsed",
+        "Document expiring soon: Soon",
+    ]
+    assert all(message["To"] == "ada@example.com" for message in smtp_server.messages)
+    assert db.query(DocumentNotification).filter_by(is_sent=True).count() == 2
+
+
+def test_failed_delivery_backs_off_then_gives_up(db):
+    now = datetime(2025, 6, 1, 9)
+    _seed(db, now)
+    DocumentNotificationService.schedule_expiry_notifications(db, now=now, days_ahead=0)
+
+    sender = _FlakySender(failures=10)
+    first = DocumentNotificationService.process_due_notifications(db, sender=sender, now=now, max_retries=2)
+    notification = db.query(DocumentNotification).one()
+
+    assert first == {"sent": 0, "failed": 1, "abandoned": 0}
+    assert notification.retry_count == 1
+    assert notification.scheduled_for > now
+
+    # Not due again until the backoff has elapsed.
+    idle = DocumentNotificationService.process_due_notifications(db, sender=sender, now=now, max_retries=2)
+    assert idle == {"sent": 0, "failed": 0, "abandoned": 0}
+
+    later = now + timedelta(days=1)
+    second = DocumentNotificationService.process_due_notifications(db, sender=sender, now=later, max_retries=2)
+    assert second == {"sent": 0, "failed": 0, "abandoned": 1}
+    assert notification.retry_count == 2
+    assert not notification.is_sent
+
+
+def test_changing_expiry_date_rearms_notification(db):
+    now = datetime(2025, 6, 1, 9)
+    participant = _seed(db, now)
+    DocumentNotificationService.schedule_expiry_notifications(db, now=now)
+
+    document = db.query(Document).filter_by(title="Soon").one()
+    DocumentService.update_document(
+        db, document.id, participant.id, expiry_date=now + timedelta(days=20)
+    )
+
+    assert document.expiry_notification_sent is False
+    assert db.query(DocumentNotification).filter_by(document_id=document.id).count() == 0
+    assert DocumentNotificationService.schedule_expiry_notifications(db, now=now) == 1
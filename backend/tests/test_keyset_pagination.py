@@ -0,0 +1,215 @@
+"""Tests for cursor-based keyset pagination of the list endpoints."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.participant import router as participant_router  # noqa: E402
+from app.core.pagination import decode_cursor, encode_cursor  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.document import Document  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+from app.services.participant_service import ParticipantService  # noqa: E402
+
+
+@pytest.fixture(name="session_factory")
+def _session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield TestingSessionLocal
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _participant(index: int) -> Participant:
+    return Participant(
+        first_name=f"First{index}",
+        last_name=f"Last{index % 3}",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+        status="active" if index % 2 else "prospective",
+    )
+
+
+def test_cursor_round_trip_and_sort_mismatch():
+    cursor = encode_cursor("created_at:desc", datetime(2024, 5, 1, 12, 30), 42)
+
+    assert decode_cursor(cursor, "created_at:desc") == (datetime(2024, 5, 1, 12, 30), 42)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "title:asc")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "title:asc")
+
+
+def test_participant_listing_walks_every_row_once(session_factory):
+    with session_factory() as db:
+        db.add_all([_participant(i) for i in range(7)])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(participant_router, prefix="/participants")
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3, "sort_by": "last_name", "total": "exact"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/participants/", params=params)
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "7"
+        seen.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert sorted(seen) == list(range(1, 8))
+    assert len(seen) == len(set(seen))
+
+    bad = client.get("/participants/", params={"cursor": cursor or "bogus"})
+    assert bad.status_code == 400
+
+
+def test_document_listing_pages_by_expiry_with_nulls(session_factory):
+    with session_factory() as db:
+        participant = _participant(1)
+        db.add(participant)
+        db.flush()
+        base = datetime(2025, 1, 1)
+        for index in range(5):
+            db.add(
+                Document(
+                    participant_id=participant.id,
+                    title=f"Doc {index}",
+                    filename=f"doc{index}.pdf",
+                    original_filename=f"doc{index}.pdf",
+                    file_path=f"uploads/documents/1/doc{index}.pdf",
+                    file_size=1,
+                    mime_type="application/pdf",
+                    category="general_documents",
+                    uploaded_by="tester",
+                    expiry_date=None if index % 2 else base + timedelta(days=index),
+                )
+            )
+        db.commit()
+
+        first = DocumentService.get_documents_for_participant(
+            db, participant.id, sort_by="expiry_date", sort_order="asc", page_size=2
+        )
+        second = DocumentService.get_documents_for_participant(
+            db,
+            participant.id,
+            sort_by="expiry_date",
+            sort_order="asc",
+            page_size=2,
+            cursor=first.next_cursor,
+        )
+        third = DocumentService.get_documents_for_participant(
+            db,
+            participant.id,
+            sort_by="expiry_date",
+            sort_order="asc",
+            page_size=2,
+            cursor=second.next_cursor,
+        )
+
+    titles = [doc.title for page in (first, second, third) for doc in page.items]
+    assert titles == ["Doc 0", "Doc 2", "Doc 4", "Doc 1", "Doc 3"]
+    assert third.next_cursor is None
+
+
+def _walk(fetch):
+    seen, cursor = [], None
+    for _ in range(10):
+        page = fetch(cursor)
+        seen.extend(item.id for item in page.items)
+        cursor = page.next_cursor
+        if not cursor:
+            return seen
+    raise AssertionError(f"pagination did not finish: {seen}")
+
+
+def test_rows_sharing_a_server_default_timestamp(session_factory):
+    with session_factory() as db:
+        participant = _participant(1)
+        db.add(participant)
+        db.flush()
+        for index in range(7):
+            db.add(
+                Document(
+                    participant_id=participant.id,
+                    title=f"Doc {index}",
+                    filename=f"doc{index}.pdf",
+                    original_filename=f"doc{index}.pdf",
+                    file_path=f"uploads/documents/1/doc{index}.pdf",
+                    file_size=1,
+                    mime_type="application/pdf",
+                    category="general_documents",
+                    uploaded_by="tester",
+                )
+            )
+        db.add_all([_participant(i) for i in range(2, 8)])
+        db.commit()
+        # The text SQLite's CURRENT_TIMESTAMP default writes: no fractional seconds.
+        for table in ("documents", "participants"):
+            db.execute(text(f"UPDATE {table} SET created_at = '2026-01-31 09:15:00'"))
+        db.commit()
+
+        for order in ("desc", "asc"):
+            seen = _walk(
+                lambda cursor: DocumentService.get_documents_for_participant(
+                    db, participant.id, sort_by="created_at", sort_order=order, page_size=2, cursor=cursor
+                )
+            )
+            expected = list(range(1, 8))
+            assert seen == (expected[::-1] if order == "desc" else expected)
+
+        seen = _walk(
+            lambda cursor: ParticipantService.get_participants(db, limit=3, sort_by="created_at", cursor=cursor)
+        )
+        assert seen == list(range(1, 8))
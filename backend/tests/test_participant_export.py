@@ -0,0 +1,232 @@
+"""Tests for participant data portability exports."""
+
+from __future__ import annotations
+
+import io
+import json
+import sys
+import zipfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.api.v1.endpoints import participant as participant_endpoints  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db, get_session_factory  # noqa: E402
+from app.models.audit import ParticipantDataExport  # noqa: E402
+from app.models.care_plan import CarePlan, RiskAssessment  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.models.referral import Referral  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+from app.services.participant_export_service import _IterReader  # noqa: E402
+
+CONTENT = b"Support letter.\n" * 400
+
+
+def _participant(first_name: str, **extra) -> Participant:
+    return Participant(
+        first_name=first_name,
+        last_name="Tester",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+        **extra,
+    )
+
+
+@pytest.fixture(name="client")
+def _client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        referral = Referral(
+            first_name="Ada",
+            last_name="Tester",
+            date_of_birth=date(1990, 1, 1),
+            phone_number="0400000000",
+            street_address="1 Test St",
+            city="Sydney",
+            state="NSW",
+            postcode="2000",
+            preferred_contact="phone",
+            disability_type="physical",
+            plan_type="self-managed",
+            plan_start_date=date(2024, 1, 1),
+            plan_review_date=date(2025, 1, 1),
+            support_category="core",
+            client_goals="Independence",
+            referrer_first_name="Rita",
+            referrer_last_name="Referrer",
+            referrer_agency="Agency",
+            referrer_role="Coordinator",
+            referrer_email="rita@example.com",
+            referrer_phone="0411111111",
+            referred_for="support",
+            reason_for_referral="Needs support",
+            urgency_level="medium",
+            consent_checkbox=True,
+        )
+        db.add(referral)
+        db.flush()
+        ada = _participant("Ada", referral_id=referral.id)
+        db.add_all([ada, _participant("Grace")])
+        db.flush()
+        db.add(CarePlan(
+            participant_id=ada.id,
+            plan_name="Plan A",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 12, 31),
+            summary="Daily living support",
+        ))
+        db.add(RiskAssessment(
+            participant_id=ada.id,
+            assessment_date=date(2024, 1, 2),
+            assessor_name="Sam",
+            review_date=date(2024, 7, 2),
+        ))
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(document_endpoints.router)
+    app.include_router(participant_endpoints.router, prefix="/participants")
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    client = TestClient(app)
+    client.session_factory = TestingSessionLocal
+
+    def upload(participant_id, name, content):
+        response = client.post(
+            f"/participants/{participant_id}/documents",
+            files={"file": (name, io.BytesIO(content), "text/plain")},
+            data={"title": name, "category": "medical_consent"},
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    client.upload = upload
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def _records(archive: zipfile.ZipFile, name: str):
+    return json.loads(archive.read(f"records/{name}.json"))
+
+
+def test_export_streams_every_record_and_file(client):
+    first = client.upload(1, "letter.txt", CONTENT)
+    client.upload(1, "other.txt", b"other participant")
+    client.upload(2, "grace.txt", b"not exported")
+    # The download adds access history on top of the upload events.
+    assert client.get(f"/participants/1/documents/{first['id']}/download").status_code == 200
+
+    response = client.get("/participants/1/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert _records(archive, "participant")["first_name"] == "Ada"
+        assert _records(archive, "referral")["referrer_agency"] == "Agency"
+        assert [plan["plan_name"] for plan in _records(archive, "care_plans")] == ["Plan A"]
+        assert len(_records(archive, "risk_assessments")) == 1
+        documents = _records(archive, "documents")
+        assert sorted(doc["original_filename"] for doc in documents) == ["letter.txt", "other.txt"]
+
+        access = _records(archive, "document_access")
+        assert {row["document_id"] for row in access} <= {doc["id"] for doc in documents}
+        assert any(row["access_type"] == "download" for row in access)
+
+        manifest = json.loads(archive.read("manifest.json"))
+        assert manifest["participant_id"] == 1
+        assert manifest["records"]["records/documents.json"] == 2
+        assert [entry["status"] for entry in manifest["files"]] == ["included", "included"]
+        letter = next(entry for entry in manifest["files"] if entry["id"] == first["id"])
+        assert archive.read(letter["archive_path"]) == CONTENT
+        assert not any("grace" in name for name in archive.namelist())
+
+
+def test_export_unknown_participant_returns_404(client):
+    assert client.get("/participants/999/export").status_code == 404
+    assert client.post("/participants/999/exports").status_code == 404
+
+
+def test_background_export_job_writes_archive_to_storage(client):
+    client.upload(1, "letter.txt", CONTENT)
+
+    created = client.post("/participants/1/exports")
+    assert created.status_code == 202
+    job_id = created.json()["id"]
+
+    status = client.get(f"/participants/1/exports/{job_id}").json()
+    assert status["status"] == "completed"
+    assert status["download_url"] == f"/api/v1/participants/1/exports/{job_id}/download"
+
+    download = client.get(f"/participants/1/exports/{job_id}/download")
+    assert download.status_code == 200
+    assert int(download.headers["content-length"]) == status["size"] == len(download.content)
+    with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+        assert archive.testzip() is None
+        assert _records(archive, "participant")["id"] == 1
+
+    assert client.get(f"/participants/2/exports/{job_id}").status_code == 404
+
+    with client.session_factory() as db:
+        key = db.get(ParticipantDataExport, job_id).storage_key
+    assert get_storage().exists(key)
+    assert client.delete("/participants/1").status_code == 200
+    assert not get_storage().exists(key)
+
+
+def test_iter_reader_splits_and_joins_chunks():
+    reader = _IterReader([b"abc", b"", b"defgh", b"ij"])
+    assert reader.read(2) == b"ab"
+    assert reader.read(4) == b"cdef"
+    assert reader.read(10) == b"ghij"
+    assert reader.read(1) == b""
+    assert _IterReader(iter([b"x", b"yz"])).read() == b"xyz"
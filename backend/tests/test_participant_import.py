@@ -0,0 +1,194 @@
+"""Tests for bulk participant and referral imports."""
+
+from __future__ import annotations
+
+import csv
+import io
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.participant import router as participant_router  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.participant import Participant, ParticipantStatusCount  # noqa: E402
+from app.models.referral import Referral  # noqa: E402
+from app.services.participant_import_service import (  # noqa: E402
+    OPENPYXL_AVAILABLE,
+    ParticipantImportService,
+    iter_rows,
+    normalize_header,
+)
+
+HEADER = [
+    "First Name", "lastName", "date_of_birth", "phone_number", "street_address", "city", "state",
+    "postcode", "preferred_contact", "disability_type", "ndis_number", "plan_type", "plan_start_date",
+    "plan_review_date", "support_category", "client_goals", "email_address",
+]
+
+
+def _row(first_name, ndis_number, **overrides):
+    row = {
+        "First Name": first_name, "lastName": "Tester", "date_of_birth": "1990-01-01",
+        "phone_number": "0400000000", "street_address": "1 Test St", "city": "Sydney", "state": "NSW",
+        "postcode": "2000", "preferred_contact": "phone", "disability_type": "physical",
+        "ndis_number": ndis_number, "plan_type": "self-managed", "plan_start_date": "2024-01-01",
+        "plan_review_date": "2025-01-01", "support_category": "core", "client_goals": "Independence",
+        "email_address": "",
+    }
+    row.update(overrides)
+    return row
+
+
+def _csv(rows) -> io.BytesIO:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=HEADER)
+    writer.writeheader()
+    writer.writerows(rows)
+    return io.BytesIO(buffer.getvalue().encode())
+
+
+@pytest.fixture(name="session_factory")
+def _session_factory(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield TestingSessionLocal
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def test_normalize_header():
+    assert normalize_header("firstName") == "first_name"
+    assert normalize_header(" First Name ") == "first_name"
+    assert normalize_header("ndis_number") == "ndis_number"
+
+
+def test_csv_import_upserts_on_ndis_number(session_factory):
+    with session_factory() as db:
+        db.add(Participant(**{
+            "first_name": "Old", "last_name": "Name", "date_of_birth": date(1980, 1, 1),
+            "phone_number": "0411111111", "street_address": "9 Old Rd", "city": "Perth", "state": "WA",
+            "postcode": "6000", "preferred_contact": "email", "disability_type": "physical",
+            "ndis_number": "430000001", "plan_type": "self-managed", "plan_start_date": date(2024, 1, 1),
+            "plan_review_date": date(2025, 1, 1), "support_category": "core", "client_goals": "Goals",
+            "email_address": "old@example.com", "status": "active",
+        }))
+        db.commit()
+
+    rows = [
+        _row("Ada", "430000001"),
+        _row("Grace", "430000002"),
+        _row("Broken", "430000003", date_of_birth="not a date"),
+        _row("", "430000004"),
+        _row("NoNumber", ""),
+        _row("Grace Again", "430000002"),
+    ]
+    with session_factory() as db:
+        report = ParticipantImportService.run(db, "participants", iter_rows(_csv(rows), "p.csv"), workers=2, batch_size=4)
+
+    assert report.counts == {"updated": 2, "created": 2, "invalid": 2}
+    assert [(error.row, error.status) for error in report.errors] == [(4, "invalid"), (5, "invalid")]
+    assert "date_of_birth" in report.errors[0].error
+
+    with session_factory() as db:
+        people = {p.ndis_number: p for p in db.query(Participant).all()}
+        assert len(people) == 3
+        # The existing participant was updated in place; blank cells left values alone.
+        assert people["430000001"].first_name == "Ada"
+        assert people["430000001"].email_address == "old@example.com"
+        assert people["430000001"].status == "active"
+        # Separate batches: the later row updated the record the earlier one created.
+        assert people["430000002"].first_name == "Grace Again"
+        assert people[None].status == "prospective"
+        counts = dict(db.query(ParticipantStatusCount.status, ParticipantStatusCount.count).all())
+        assert counts == {"prospective": 2}
+
+    buffer = io.StringIO()
+    ParticipantImportService.write_report(report, buffer)
+    assert len(buffer.getvalue().strip().splitlines()) == 3
+
+
+@pytest.mark.skipif(not OPENPYXL_AVAILABLE, reason="openpyxl is not installed")
+def test_xlsx_referral_import_endpoint_and_error_report(session_factory):
+    from openpyxl import Workbook
+
+    header = HEADER + [
+        "referrerFirstName", "referrer_last_name", "referrer_email", "referrer_phone", "referred_for",
+        "reason_for_referral", "urgency_level", "consent_checkbox",
+    ]
+    referrer = ["Sam", "Referrer", "sam@example.com", "0400000001", "support", "Needs support", "high", True]
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for first_name, ndis_number, consent in (("Ada", 430000001, True), ("Grace", 430000002, False)):
+        values = _row(first_name, ndis_number, postcode=2000, plan_start_date=datetime(2024, 1, 1))
+        sheet.append([values[name] for name in HEADER] + referrer[:-1] + [consent])
+    upload = io.BytesIO()
+    workbook.save(upload)
+
+    app = FastAPI()
+    app.include_router(participant_router, prefix="/participants")
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    def post(content, kind="referrals", name="referrals.xlsx"):
+        return client.post(
+            "/participants/imports",
+            data={"kind": kind},
+            files={"file": (name, io.BytesIO(content), "application/octet-stream")},
+        )
+
+    response = post(upload.getvalue())
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["counts"] == {"created": 1, "invalid": 1}
+    assert "consent" in body["errors"][0]["error"].lower()
+
+    assert body["report_url"] == f"/api/v1/participants/imports/{body['import_id']}/report"
+    report = client.get(f"/participants/imports/{body['import_id']}/report")
+    assert report.status_code == 200
+    assert list(csv.DictReader(io.StringIO(report.text)))[0]["row"] == "3"
+
+    # Importing again updates the referral instead of adding another.
+    assert post(upload.getvalue()).json()["counts"] == {"updated": 1, "invalid": 1}
+    with session_factory() as db:
+        referral = db.query(Referral).one()
+        assert (referral.ndis_number, referral.postcode, referral.plan_start_date) == ("430000001", "2000", date(2024, 1, 1))
+
+    assert post(b"a,b", name="referrals.txt").status_code == 400
+    assert post(b"a,b", kind="staff", name="x.csv").status_code == 422
+    assert client.get("/participants/imports/not-an-id/report").status_code == 404
@@ -0,0 +1,143 @@
+"""Tests for streaming participant list exports."""
+
+from __future__ import annotations
+
+import csv
+import io
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.participant import router as participant_router  # noqa: E402
+from app.database import Base, get_session_factory  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.participant_list_export import (  # noqa: E402
+    OPENPYXL_AVAILABLE,
+    PYARROW_AVAILABLE,
+    ParticipantListExportService,
+)
+
+
+def _participant(index: int) -> Participant:
+    return Participant(
+        first_name=f"First{index}",
+        last_name="Tester",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1 + index),
+        support_category="core" if index % 2 else "capacity",
+        client_goals="Independence",
+        ndis_number=f"4300000{index:02d}",
+        status="active" if index % 2 else "prospective",
+    )
+
+
+@pytest.fixture(name="client")
+def _client():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        db.add_all([_participant(i) for i in range(7)])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(participant_router, prefix="/participants")
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    client = TestClient(app)
+    client.session_factory = TestingSessionLocal
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def test_csv_export_streams_selected_columns_in_batches(client):
+    chunks = list(ParticipantListExportService.stream(
+        client.session_factory, "csv", ["id", "first_name", "plan_review_date"], batch_size=3,
+    ))
+    # Header plus one chunk per batch of three rows.
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["id", "first_name", "plan_review_date"]
+    assert rows[1] == ["1", "First0", "2025-01-01"]
+    assert len(rows) == 8
+
+    response = client.get("/participants/export", params={"status": "active", "columns": "ndis_number,status"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["ndis_number", "status"]
+    assert [row[1] for row in rows[1:]] == ["active"] * 3
+
+    assert client.get("/participants/export", params={"columns": "id,password"}).status_code == 400
+    assert client.get("/participants/export", params={"format": "pdf"}).status_code == 422
+
+
+@pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow is not installed")
+def test_parquet_export_is_typed(client):
+    import pyarrow.parquet as pq
+
+    response = client.get(
+        "/participants/export",
+        params=[("format", "parquet"), ("columns", "id"), ("columns", "plan_review_date"), ("columns", "created_at")],
+    )
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 7
+    assert str(table.schema.field("id").type) == "int64"
+    assert str(table.schema.field("plan_review_date").type) == "date32[day]"
+    assert table.column("plan_review_date")[6].as_py() == date(2025, 1, 7)
+
+
+@pytest.mark.skipif(not OPENPYXL_AVAILABLE, reason="openpyxl is not installed")
+def test_xlsx_export(client):
+    from openpyxl import load_workbook
+
+    response = client.get("/participants/export", params={"format": "xlsx", "support_category": "capacity"})
+    assert response.status_code == 200
+    sheet = load_workbook(io.BytesIO(response.content), read_only=True).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0][:3] == ("id", "first_name", "last_name")
+    assert [row[0] for row in rows[1:]] == [1, 3, 5, 7]
+
+
+@pytest.mark.skipif(not OPENPYXL_AVAILABLE, reason="openpyxl is not installed")
+def test_xlsx_workbook_is_sent_in_chunks():
+    from openpyxl import load_workbook
+
+    from app.core.storage import CHUNK_SIZE
+
+    batches = ([(i, f"First{i}-{'x' * 40}", f"{i:08d}")] for i in range(5000))
+    chunks = list(ParticipantListExportService._write_xlsx(batches, ["id", "first_name", "ndis_number"]))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= CHUNK_SIZE for chunk in chunks)
+    sheet = load_workbook(io.BytesIO(b"".join(chunks)), read_only=True).active
+    assert sum(1 for _ in sheet.iter_rows(values_only=True)) == 5001
@@ -0,0 +1,174 @@
+"""Tests for the participant overview endpoint."""
+
+from __future__ import annotations
+
+import io
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.api.v1.endpoints.participant import router as participant_router  # noqa: E402
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.care_plan import CarePlan, RiskAssessment  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.models.referral import Referral  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+
+PERSON = dict(
+    first_name="Ada",
+    last_name="Tester",
+    date_of_birth=date(1990, 1, 1),
+    phone_number="0400000000",
+    street_address="1 Test St",
+    city="Sydney",
+    state="NSW",
+    postcode="2000",
+    preferred_contact="phone",
+    disability_type="physical",
+    plan_type="self-managed",
+    plan_start_date=date(2024, 1, 1),
+    plan_review_date=date(2025, 1, 1),
+    support_category="core",
+    client_goals="Independence",
+)
+
+
+@pytest.fixture(name="client")
+def _client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        referral = Referral(
+            **PERSON,
+            referrer_first_name="Sam",
+            referrer_last_name="Referrer",
+            referrer_email="sam@example.com",
+            referrer_phone="0400000001",
+            referred_for="support",
+            reason_for_referral="Needs support",
+            urgency_level="high",
+            consent_checkbox=True,
+        )
+        db.add(referral)
+        db.flush()
+        db.add(Participant(**PERSON, referral_id=referral.id, ndis_number="430000001"))
+        db.add(Participant(**PERSON, ndis_number="430000002"))
+        db.flush()
+        for version in ("1.0", "2.0"):
+            db.add(CarePlan(
+                participant_id=1, plan_name=f"Plan {version}", plan_version=version,
+                start_date=date(2024, 1, 1), end_date=date(2025, 1, 1), summary="Summary",
+            ))
+        db.add(RiskAssessment(
+            participant_id=1, assessment_date=date(2024, 1, 1), assessor_name="Assessor",
+            review_date=date(2024, 7, 1), overall_risk_rating="low",
+        ))
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(participant_router, prefix="/participants")
+    app.include_router(document_endpoints.router)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.engine = engine
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def _upload(client, index, category="medical_reports"):
+    response = client.post(
+        "/participants/1/documents",
+        files={"file": (f"report{index}.pdf", io.BytesIO(f"%PDF report {index}".encode()), "application/pdf")},
+        data={"title": f"Report {index}", "category": category},
+    )
+    assert response.status_code == 200, response.text
+
+
+def _overview(client, **params):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(client.engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/participants/1/overview", params=params)
+    finally:
+        event.remove(client.engine, "before_cursor_execute", record)
+    return response, statements
+
+
+def test_overview_uses_a_fixed_number_of_queries(client):
+    _upload(client, 0)
+    response, statements = _overview(client)
+    assert response.status_code == 200, response.text
+    baseline = len(statements)
+    assert baseline == 6
+
+    for index in range(1, 6):
+        _upload(client, index, category="care_plans" if index % 2 else "medical_reports")
+    response, statements = _overview(client, document_limit=4)
+    assert len(statements) == baseline
+
+    body = response.json()
+    assert body["participant"]["ndis_number"] == "430000001"
+    assert body["referral"]["urgency_level"] == "high"
+    assert body["care_plan"]["plan_version"] == "2.0"
+    assert body["risk_assessment"]["assessor_name"] == "Assessor"
+    assert body["workflow"] is None
+    assert [doc["title"] for doc in body["documents"]] == ["Report 5", "Report 4", "Report 3", "Report 2"]
+    assert body["document_stats"]["total_documents"] == 6
+    assert body["document_stats"]["by_category"] == {"Medical Reports": 3, "Care Plans": 3}
+
+
+def test_overview_field_selection(client):
+    response, statements = _overview(client, include="participant,care_plan", fields=["first_name", "status"])
+    assert response.status_code == 200
+    assert len(statements) == 2
+    body = response.json()
+    assert set(body) == {"participant_id", "participant", "care_plan"}
+    assert body["participant"] == {"id": 1, "first_name": "Ada", "status": "prospective"}
+
+    assert client.get("/participants/1/overview", params={"include": "billing"}).status_code == 400
+    assert client.get("/participants/1/overview", params={"fields": "password"}).status_code == 400
+    assert client.get("/participants/99/overview").status_code == 404
+    assert client.get("/participants/2/overview").json()["referral"] is None
@@ -0,0 +1,173 @@
+"""Tests for the participant dashboard statistics."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.participant import router as participant_router  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.participant import Participant, ParticipantStatusCount  # noqa: E402
+from app.services.participant_stats import (  # noqa: E402
+    ParticipantStatsCache,
+    ParticipantStatsService,
+    get_participant_stats_cache,
+)
+
+PAYLOAD = {
+    "first_name": "Ada",
+    "last_name": "Tester",
+    "date_of_birth": "1990-01-01",
+    "phone_number": "0400000000",
+    "street_address": "1 Test St",
+    "city": "Sydney",
+    "state": "NSW",
+    "postcode": "2000",
+    "preferred_contact": "phone",
+    "disability_type": "physical",
+    "plan_type": "self-managed",
+    "plan_start_date": "2024-01-01",
+    "plan_review_date": "2025-01-01",
+    "support_category": "core",
+    "client_goals": "Independence",
+}
+
+
+def _participant(index: int, status: str, created_at: datetime) -> Participant:
+    return Participant(
+        first_name=f"First{index}",
+        last_name="Tester",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+        status=status,
+        created_at=created_at,
+    )
+
+
+@pytest.fixture(name="engine")
+def _engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    get_participant_stats_cache().invalidate()
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_compute_uses_one_query_and_matches_counters(engine):
+    session_factory = sessionmaker(bind=engine)
+    old = datetime.now() - timedelta(days=30)
+    with session_factory() as db:
+        db.add_all([
+            _participant(1, "active", old),
+            _participant(2, "active", datetime.now()),
+            _participant(3, "prospective", old),
+            _participant(4, "onboarded", datetime.now()),
+            _participant(5, "inactive", old),
+        ])
+        db.commit()
+
+        statements = _count_queries(engine)
+        stats = ParticipantStatsService.compute(db)
+        assert len(statements) == 1
+        assert stats == {"total": 5, "active": 2, "prospective": 1, "onboarded": 1, "new_this_week": 2}
+
+        # Rows inserted behind the service's back are picked up by a rebuild.
+        assert ParticipantStatsService.rebuild_counters(db) == {
+            "active": 2, "prospective": 1, "onboarded": 1, "inactive": 1,
+        }
+        assert ParticipantStatsService.from_counters(db) == stats
+
+
+def test_counters_follow_writes_and_cache_is_invalidated(engine):
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    app = FastAPI()
+    app.include_router(participant_router, prefix="/participants")
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    assert client.get("/participants/stats").json()["total"] == 0
+
+    ids = []
+    for index in range(3):
+        response = client.post("/participants/", json={**PAYLOAD, "ndis_number": f"43000000{index}"})
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    # Each write invalidated the cached (empty) result.
+    assert client.get("/participants/stats").json()["prospective"] == 3
+
+    assert client.patch(f"/participants/{ids[0]}/status", params={"status": "active"}).status_code == 200
+    # A full update that changes the status moves the counters too.
+    assert client.get("/participants/stats").json()["onboarded"] == 0
+    assert client.put(f"/participants/{ids[2]}", json={"status": "onboarded"}).status_code == 200
+    assert client.get("/participants/stats").json()["onboarded"] == 1
+    assert client.put(f"/participants/{ids[2]}", json={"status": "prospective"}).status_code == 200
+    assert client.delete(f"/participants/{ids[1]}").status_code == 200
+    stats = client.get("/participants/stats").json()
+    assert stats == {"total": 2, "active": 1, "prospective": 1, "onboarded": 0, "new_this_week": 2}
+
+    with session_factory() as db:
+        counts = dict(db.query(ParticipantStatusCount.status, ParticipantStatusCount.count).all())
+        assert counts == {"prospective": 1, "active": 1, "onboarded": 0}
+        assert ParticipantStatsService.from_counters(db) == stats
+
+        # A cached result is served without touching the database until refreshed.
+        cache = ParticipantStatsCache(ttl=60, source="counters")
+        cache.get(db)
+        statements = _count_queries(engine)
+        db.add(_participant(9, "onboarded", datetime.now()))
+        db.flush()
+        ParticipantStatsService.record_transition(db, None, "onboarded")
+        db.commit()
+        statements.clear()
+        assert cache.get(db)["onboarded"] == 0
+        assert statements == []
+        assert cache.get(db, refresh=True)["onboarded"] == 1
+        cache.invalidate()
+        assert cache.get(db)["total"] == 3
@@ -0,0 +1,142 @@
+"""Tests for batched referral ingestion with idempotency keys."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.referral import router as referral_router  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.referral import Referral  # noqa: E402
+from app.services import referral_ingest_service  # noqa: E402
+from app.services.referral_ingest_service import ReferralIngestService  # noqa: E402
+
+
+def _item(key, first_name="Ada", **overrides):
+    item = {
+        "idempotencyKey": key,
+        "firstName": first_name, "lastName": "Tester", "dateOfBirth": "1990-01-01",
+        "phoneNumber": "0400000000", "streetAddress": "1 Test St", "city": "Sydney", "state": "NSW",
+        "postcode": "2000", "preferredContact": "phone", "disabilityType": "physical",
+        "planType": "self-managed", "planStartDate": "2024-01-01", "planReviewDate": "2025-01-01",
+        "clientGoals": "Independence", "supportCategory": "core",
+        "referrerFirstName": "Sam", "referrerLastName": "Referrer", "referrerEmail": "sam@example.com",
+        "referrerPhone": "0400000001", "referredFor": "support", "reasonForReferral": "Needs support",
+        "urgencyLevel": "high", "consentCheckbox": True,
+    }
+    item.update(overrides)
+    return item
+
+
+@pytest.fixture(name="session_factory")
+def _session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield TestingSessionLocal
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@pytest.fixture(name="client")
+def _client(session_factory):
+    app = FastAPI()
+    app.include_router(referral_router, prefix="/participants")
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def test_batch_reports_per_item_results_and_replays_retries(client, session_factory):
+    batch = [
+        _item("partner-1"),
+        _item("partner-2", "Grace"),
+        _item("partner-3", consentCheckbox=False),
+        _item(""),
+        "not an object",
+        _item("partner-1"),  # repeated within the batch
+        _item("partner-2", "Someone Else"),  # key reused for a different referral
+    ]
+    response = client.post("/participants/referrals/batch", json=batch)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["counts"] == {"invalid": 3, "created": 2, "duplicate": 1, "conflict": 1}
+    statuses = [(result["index"], result["status"]) for result in body["results"]]
+    assert statuses == [
+        (0, "created"), (1, "created"), (2, "invalid"), (3, "invalid"),
+        (4, "invalid"), (5, "duplicate"), (6, "conflict"),
+    ]
+    assert body["results"][5]["referral_id"] == body["results"][0]["referral_id"]
+    assert "consent" in body["results"][2]["error"].lower()
+
+    # A retry of the whole batch after a timeout creates nothing new.
+    ndjson = "\n".join(json.dumps(item) for item in batch[:2])
+    retry = client.post(
+        "/participants/referrals/batch",
+        content=ndjson,
+        headers={"content-type": "application/x-ndjson"},
+    ).json()
+    assert retry["counts"] == {"duplicate": 2}
+    assert [result["referral_id"] for result in retry["results"]] == [
+        result["referral_id"] for result in body["results"][:2]
+    ]
+
+    with session_factory() as db:
+        assert db.query(Referral).count() == 2
+        grace = db.query(Referral).filter(Referral.idempotency_key == "partner-2").one()
+        assert grace.first_name == "Grace"
+        assert grace.status == "submitted"
+
+
+def test_parallel_validation_and_chunked_inserts(session_factory, monkeypatch):
+    monkeypatch.setattr(referral_ingest_service, "REFERRAL_INGEST_PARALLEL_THRESHOLD", 0)
+    items = [_item(f"bulk-{index}", f"Person{index}") for index in range(9)]
+    items[4]["dateOfBirth"] = "not a date"
+    with session_factory() as db:
+        report = ReferralIngestService.ingest(db, items, workers=2, chunk_size=3)
+    assert report.counts == {"invalid": 1, "created": 8}
+
+    with session_factory() as db:
+        names = [name for (name,) in db.query(Referral.first_name).order_by(Referral.id)]
+    assert names == [f"Person{index}" for index in range(9) if index != 4]
+
+
+def test_unreadable_batches_are_rejected(client):
+    post = client.post
+    assert post("/participants/referrals/batch", content=b"{not json").status_code == 400
+    assert post("/participants/referrals/batch", json={"firstName": "Ada"}).status_code == 400
+    response = post(
+        "/participants/referrals/batch",
+        content=b'{"idempotencyKey": "a"}\nnope',
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 400
+    assert "Line 2" in response.json()["detail"]
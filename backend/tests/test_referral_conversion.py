@@ -0,0 +1,166 @@
+"""Tests for converting referrals to participants, singly and in bulk."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.participant import router as participant_router  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.participant import Participant, ParticipantStatusCount  # noqa: E402
+from app.models.referral import Referral  # noqa: E402
+from app.services import duplicate_detection  # noqa: E402
+
+
+def _referral(index: int) -> Referral:
+    return Referral(
+        first_name=f"First{index}", last_name=f"Last{index}", date_of_birth=date(1980, 1, 1 + index),
+        phone_number=f"04000000{index:02d}", street_address=f"{index} Test St", city="Sydney", state="NSW",
+        postcode=f"2{index:03d}", preferred_contact="phone", disability_type="physical",
+        rep_first_name="Rep" if index == 0 else None,
+        plan_type="self-managed", ndis_number=f"4300000{index:02d}", plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1), client_goals="Independence", support_category="core",
+        support_goals="Goals", referrer_first_name="Sam", referrer_last_name="Referrer",
+        referrer_email="sam@example.com", referrer_phone="0400000001", referred_for="support",
+        reason_for_referral="Needs support", urgency_level="high", consent_checkbox=True,
+    )
+
+
+@pytest.fixture(name="client")
+def _client(monkeypatch):
+    # Keep the statement counts about conversion alone.
+    monkeypatch.setattr(duplicate_detection, "DUPLICATE_CHECK_ON_INSERT", False)
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        db.add_all([_referral(i) for i in range(6)])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(participant_router, prefix="/participants")
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.engine = engine
+    client.session_factory = TestingSessionLocal
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def test_bulk_conversion_reports_each_referral(client):
+    assert client.post("/participants/create-from-referral/1").status_code == 201
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(client.engine, "before_cursor_execute", record)
+    try:
+        response = client.post(
+            "/participants/create-from-referrals", json={"referral_ids": [2, 1, 99, 3, 2, 4, 5, 6]}
+        )
+    finally:
+        event.remove(client.engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.text
+    body = response.json()
+
+    assert body["counts"] == {"converted": 5, "already_converted": 1, "not_found": 1}
+    assert [(r["referral_id"], r["status"]) for r in body["results"]] == [
+        (2, "converted"), (1, "already_converted"), (99, "not_found"),
+        (3, "converted"), (4, "converted"), (5, "converted"), (6, "converted"),
+    ]
+    # One load, one insert, one id lookup, one status update and the counter
+    # upsert, however many referrals are converted.
+    assert len([s for s in statements if not s.lstrip().upper().startswith("SELECT")]) <= 4
+    assert len(statements) <= 7
+
+    with client.session_factory() as db:
+        participants = {p.referral_id: p for p in db.query(Participant).all()}
+        assert len(participants) == 6
+        converted = participants[2]
+        assert converted.id == body["results"][0]["participant_id"]
+        assert (converted.first_name, converted.ndis_number, converted.support_goals) == ("First1", "430000001", "Goals")
+        assert (converted.status, converted.risk_level, converted.onboarding_completed) == ("prospective", "low", False)
+        assert participants[1].rep_first_name == "Rep"
+        assert {r.status for r in db.query(Referral).all()} == {"converted_to_participant"}
+        counts = dict(db.query(ParticipantStatusCount.status, ParticipantStatusCount.count).all())
+        assert counts == {"prospective": 6}
+
+    # Converting again changes nothing.
+    again = client.post("/participants/create-from-referrals", json={"referral_ids": [2, 3]}).json()
+    assert again["counts"] == {"already_converted": 2}
+    assert client.post("/participants/create-from-referral/2").status_code == 400
+    assert client.post("/participants/create-from-referrals", json={"referral_ids": []}).status_code == 422
+
+
+def test_bulk_conversion_reports_ndis_conflicts(client):
+    assert client.post("/participants/create-from-referral/1").status_code == 201
+    with client.session_factory() as db:
+        referrals = {r.id: r for r in db.query(Referral).all()}
+        # A re-referral of participant 1, and two new referrals sharing a number.
+        referrals[4].ndis_number = referrals[1].ndis_number
+        referrals[3].ndis_number = referrals[2].ndis_number
+        db.commit()
+
+    response = client.post("/participants/create-from-referrals", json={"referral_ids": [2, 3, 4, 5]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["counts"] == {"converted": 2, "ndis_conflict": 2}
+    results = {r["referral_id"]: r for r in body["results"]}
+    assert results[3]["status"] == "ndis_conflict" and results[3]["participant_id"] is None
+    assert "referral 2" in results[3]["error"]
+    assert (results[4]["status"], results[4]["participant_id"]) == ("ndis_conflict", 1)
+
+    with client.session_factory() as db:
+        assert {p.referral_id for p in db.query(Participant).all()} == {1, 2, 5}
+        assert db.get(Referral, 3).status != "converted_to_participant"
+        counts = dict(db.query(ParticipantStatusCount.status, ParticipantStatusCount.count).all())
+        assert counts == {"prospective": 3}
+
+
+def test_conversion_releases_triage_claims(client):
+    with client.session_factory() as db:
+        expires = datetime.now(timezone.utc) + timedelta(minutes=15)
+        for referral in db.query(Referral).all():
+            referral.claimed_by, referral.claim_expires_at = "triager@example.com", expires
+        db.commit()
+
+    assert client.post("/participants/create-from-referral/1").status_code == 201
+    body = client.post("/participants/create-from-referrals", json={"referral_ids": [2, 3]}).json()
+    assert body["counts"] == {"converted": 2}
+
+    with client.session_factory() as db:
+        claims = {r.id: (r.claimed_by, r.claim_expires_at) for r in db.query(Referral).all()}
+        assert all(claims[referral_id] == (None, None) for referral_id in (1, 2, 3))
+        assert claims[4][0] == "triager@example.com"
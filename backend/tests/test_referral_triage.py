@@ -0,0 +1,158 @@
+"""Tests for the referral triage queue and its claim leases."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.referral import router as referral_router  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.referral import Referral  # noqa: E402
+from app.services.referral_service import ReferralService  # noqa: E402
+from app.services.referral_triage import ReferralTriageService  # noqa: E402
+
+# (first name, urgency, status, days old)
+REFERRALS = [
+    ("Low", "low", "submitted", 9),
+    ("HighNew", "high", "submitted", 1),
+    ("HighOld", "High", "submitted", 5),
+    ("Urgent", "URGENT", "submitted", 0),
+    ("Medium", "medium", "submitted", 3),
+    ("Other", "whenever", "submitted", 20),
+    ("Done", "urgent", "converted_to_participant", 30),
+]
+
+
+def _referral(first_name, urgency, status, days_old) -> Referral:
+    return Referral(
+        first_name=first_name, last_name="Tester", date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000", street_address="1 Test St", city="Sydney", state="NSW",
+        postcode="2000", preferred_contact="phone", disability_type="physical",
+        plan_type="self-managed", plan_start_date=date(2024, 1, 1), plan_review_date=date(2025, 1, 1),
+        client_goals="Independence", support_category="core",
+        referrer_first_name="Sam", referrer_last_name="Referrer", referrer_email="sam@example.com",
+        referrer_phone="0400000001", referred_for="support", reason_for_referral="Needs support",
+        urgency_level=urgency, consent_checkbox=True, status=status,
+        created_at=datetime(2026, 1, 31, tzinfo=timezone.utc) - timedelta(days=days_old),
+    )
+
+
+@pytest.fixture(name="client")
+def _client():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        db.add_all([_referral(*values) for values in REFERRALS])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(referral_router, prefix="/participants")
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.engine = engine
+    client.session_factory = TestingSessionLocal
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _names(items):
+    return [item["first_name"] for item in items]
+
+
+def test_queue_order_counts_and_index(client):
+    body = client.get("/participants/referrals/triage").json()
+    assert _names(body["items"]) == ["Urgent", "HighOld", "HighNew", "Medium", "Low", "Other"]
+    assert body["counts"] == {
+        "urgent": {"submitted": 1, "converted_to_participant": 1},
+        "high": {"submitted": 2},
+        "medium": {"submitted": 1},
+        "low": {"submitted": 1},
+        "whenever": {"submitted": 1},
+    }
+    high = client.get("/participants/referrals/triage", params={"urgency": "HIGH", "limit": 1}).json()
+    assert _names(high["items"]) == ["HighOld"]
+
+    # The queue is read in index order, with no sort step.
+    query = ReferralTriageService._queue_query("submitted", None, datetime.now(timezone.utc)).limit(5)
+    compiled = query.compile(client.engine)
+    with client.engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)
+        ).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_referrals_triage" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_claims_are_exclusive_leases(client):
+    claim = client.post("/participants/referrals/triage/claim", params={"claimed_by": "alice", "count": 2}).json()
+    assert _names(claim["claimed"]) == ["Urgent", "HighOld"]
+    assert {item["claimed_by"] for item in claim["claimed"]} == {"alice"}
+
+    bob = client.post("/participants/referrals/triage/claim", params={"claimed_by": "bob"}).json()
+    assert _names(bob["claimed"]) == ["HighNew"]
+
+    queue = client.get("/participants/referrals/triage").json()
+    assert _names(queue["items"]) == ["Medium", "Low", "Other"]
+    everything = client.get("/participants/referrals/triage", params={"include_claimed": True}).json()
+    assert len(everything["items"]) == 6
+
+    urgent_id = claim["claimed"][0]["id"]
+    assert client.post(f"/participants/referrals/{urgent_id}/claim/renew", params={"claimed_by": "bob"}).status_code == 409
+    renewed = client.post(f"/participants/referrals/{urgent_id}/claim/renew", params={"claimed_by": "alice"})
+    assert renewed.status_code == 200
+    assert renewed.json()["claimed_by"] == "alice"
+
+    assert client.delete(f"/participants/referrals/{urgent_id}/claim", params={"claimed_by": "bob"}).status_code == 409
+    assert client.delete(f"/participants/referrals/{urgent_id}/claim", params={"claimed_by": "alice"}).status_code == 200
+    assert _names(client.get("/participants/referrals/triage").json()["items"])[0] == "Urgent"
+
+    # An expired lease goes back to the queue.
+    high_old_id = claim["claimed"][1]["id"]
+    with client.session_factory() as db:
+        referral = db.get(Referral, high_old_id)
+        referral.claim_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+    carol = client.post("/participants/referrals/triage/claim", params={"claimed_by": "carol", "count": 2}).json()
+    assert _names(carol["claimed"]) == ["Urgent", "HighOld"]
+
+    # Finishing triage clears the claim and takes the referral out of the queue.
+    with client.session_factory() as db:
+        done = ReferralService.update_referral_status(db, high_old_id, "accepted")
+        assert (done.claimed_by, done.claim_expires_at) == (None, None)
+    assert client.post(
+        f"/participants/referrals/{high_old_id}/claim/renew", params={"claimed_by": "carol"}
+    ).status_code == 409
+    counts = client.get("/participants/referrals/triage").json()["counts"]
+    assert counts["high"] == {"submitted": 1, "accepted": 1}
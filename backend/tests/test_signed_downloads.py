@@ -0,0 +1,215 @@
+"""Tests for signed, database-free document download URLs."""
+
+from __future__ import annotations
+
+import io
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints import document as document_endpoints  # noqa: E402
+from app.core.download_tokens import (  # noqa: E402
+    PERMISSION_DOWNLOAD,
+    DownloadGrant,
+    InvalidDownloadToken,
+    sign_download,
+    verify_download,
+)
+from app.core.storage import get_storage  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.document import DocumentAccess  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.access_log_buffer import AccessLogBuffer, get_access_log_buffer  # noqa: E402
+from app.services.document_service import DocumentService  # noqa: E402
+
+CONTENT = b"%PDF-1.4 signed preview"
+
+
+@pytest.fixture(name="client")
+def _client(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_LOCAL_ROOT", str(tmp_path))
+    get_storage.cache_clear()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with TestingSessionLocal() as db:
+        DocumentService.create_default_categories(db)
+        db.add(
+            Participant(
+                first_name="Ada",
+                last_name="Lovelace",
+                date_of_birth=date(1990, 1, 1),
+                phone_number="0400000000",
+                street_address="1 Test St",
+                city="Sydney",
+                state="NSW",
+                postcode="2000",
+                preferred_contact="phone",
+                disability_type="physical",
+                plan_type="self-managed",
+                plan_start_date=date(2024, 1, 1),
+                plan_review_date=date(2025, 1, 1),
+                support_category="core",
+                client_goals="Independence",
+            )
+        )
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(document_endpoints.router, prefix="/api/v1")
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    access_log = AccessLogBuffer(TestingSessionLocal, batch_size=2)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_access_log_buffer] = lambda: access_log
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    client = TestClient(app)
+    client.session_factory = TestingSessionLocal
+    client.access_log = access_log
+    client.statements = statements
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        get_storage.cache_clear()
+
+
+def test_listing_signed_url_streams_without_database_and_batches_audit(client):
+    upload = client.post(
+        "/api/v1/participants/1/documents",
+        files={"file": ("plan.pdf", io.BytesIO(CONTENT), "application/pdf")},
+        data={"title": "Plan", "category": "general_documents"},
+    )
+    assert upload.status_code == 200, upload.text
+    listing = client.get("/api/v1/participants/1/documents").json()
+    signed_url = listing[0]["signed_url"]
+
+    client.statements.clear()
+    for _ in range(3):
+        preview = client.get(signed_url, params={"inline": "true"})
+        assert preview.status_code == 200
+        assert preview.content == CONTENT
+        assert preview.headers["content-disposition"].startswith("inline")
+    download = client.get(signed_url)
+    assert download.headers["content-disposition"].startswith("attachment")
+
+    assert client.statements == []
+    assert client.access_log.pending() == 4
+
+    assert client.access_log.flush() == 4
+    with client.session_factory() as db:
+        types = [
+            row.access_type
+            for row in db.query(DocumentAccess).filter(DocumentAccess.access_type != "upload").order_by(DocumentAccess.id)
+        ]
+    assert types == ["preview", "preview", "preview", "download"]
+
+
+def test_rejects_tampered_expired_and_unpermitted_tokens(client):
+    grant = DownloadGrant(
+        document_id=1,
+        participant_id=1,
+        key="uploads/documents/1/plan.pdf",
+        mime_type="application/pdf",
+        filename="plan.pdf",
+        file_size=len(CONTENT),
+        permissions=(PERMISSION_DOWNLOAD,),
+    )
+    get_storage().save(grant.key, io.BytesIO(CONTENT))
+    token = sign_download(grant)
+
+    payload, signature = token.split(".")
+    forged = sign_download(DownloadGrant(**{**grant.__dict__, "key": "../secrets.txt"}))
+    assert client.get(f"/api/v1/documents/files/{forged.split('.')[0]}.{signature}").status_code == 403
+    assert client.get(f"/api/v1/documents/files/{sign_download(grant, ttl=-1)}").status_code == 403
+    assert client.get(f"/api/v1/documents/files/{token}", params={"inline": "true"}).status_code == 403
+    assert client.get(f"/api/v1/documents/files/{token}").content == CONTENT
+
+
+def test_verify_download_round_trip():
+    secret = b"shared-secret"
+    token = sign_download(
+        DownloadGrant(
+            document_id=7,
+            participant_id=3,
+            key="uploads/documents/3/a.txt.zst",
+            mime_type="text/plain",
+            filename="a.txt",
+            file_size=100,
+            codec="zstd",
+            stored_size=20,
+        ),
+        ttl=60,
+        secret=secret,
+    )
+
+    grant = verify_download(token, secret=secret)
+    assert (grant.document_id, grant.codec, grant.stored_size) == (7, "zstd", 20)
+    with pytest.raises(InvalidDownloadToken):
+        verify_download(token, secret=b"other-secret")
+    with pytest.raises(InvalidDownloadToken):
+        verify_download(token, secret=secret, now=grant.expires_at + 1)
+
+
+def test_access_log_queue_is_bounded_and_never_written_inline():
+    sessions = []
+
+    class _DownSession:
+        def execute(self, *args, **kwargs):
+            raise ConnectionError("database unavailable")
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    def session_factory():
+        sessions.append(1)
+        return _DownSession()
+
+    access_log = AccessLogBuffer(session_factory, batch_size=2, max_pending=3)
+    for document_id in range(1, 6):
+        access_log.record(document_id, 1, "admin", "download")
+    # Requests only queue: nothing was written inline, and the oldest rows went first.
+    assert sessions == []
+    assert access_log.pending() == 3
+    assert access_log.dropped == 2
+
+    # Failed batches are re-queued but the cap still holds.
+    assert access_log.flush() == 0
+    access_log.record(6, 1, "admin", "download")
+    assert access_log.pending() == 3
+    assert access_log.dropped == 3
+    assert [row["document_id"] for row in access_log._pending] == [4, 5, 6]
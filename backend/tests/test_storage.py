@@ -0,0 +1,158 @@
+"""Tests for the pluggable upload storage backends."""
+
+from __future__ import annotations
+
+import importlib.util
+import io
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.core.storage import (  # noqa: E402
+    LocalStorageBackend,
+    S3StorageBackend,
+    copy_objects,
+)
+from app.database import Base  # noqa: E402
+from app.models.document import Document  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+
+# Both come from requirements-dev.txt.
+boto3 = pytest.importorskip("boto3")
+moto_server = pytest.importorskip("moto.server", reason="pip install -r requirements-dev.txt")
+
+
+@pytest.fixture(scope="module", name="s3_endpoint")
+def _s3_endpoint():
+    # A local S3-compatible server, standing in for MinIO.
+    server = moto_server.ThreadedMotoServer(port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.stop()
+
+
+@pytest.fixture(name="s3")
+def _s3(s3_endpoint, request):
+    bucket = request.node.name.replace("_", "-")[:60]
+    backend = S3StorageBackend(
+        bucket=bucket,
+        endpoint_url=s3_endpoint,
+        region_name="us-east-1",
+        access_key_id="test",
+        secret_access_key="test",
+        prefix="ndis",
+        multipart_threshold=5 * 1024 * 1024,
+        multipart_chunksize=5 * 1024 * 1024,
+    )
+    backend.client.create_bucket(Bucket=bucket)
+    return backend
+
+
+def test_s3_backend_round_trip(s3):
+    size = s3.save("uploads/documents/1/a.txt", io.BytesIO(b"hello"), content_type="text/plain")
+
+    assert size == 5
+    assert s3.exists("uploads/documents/1/a.txt")
+    assert not s3.exists("uploads/documents/1/b.txt")
+    assert s3.size("uploads/documents/1/a.txt") == 5
+    assert b"".join(s3.iter_chunks("uploads/documents/1/a.txt", chunk_size=2)) == b"hello"
+    assert [item.key for item in s3.list("uploads/documents/")] == ["uploads/documents/1/a.txt"]
+    with pytest.raises(FileNotFoundError):
+        s3.open("uploads/documents/1/b.txt")
+
+    s3.delete("uploads/documents/1/a.txt")
+    assert not s3.exists("uploads/documents/1/a.txt")
+
+
+def test_s3_backend_uses_multipart_upload_for_large_objects(s3):
+    payload = os.urandom(11 * 1024 * 1024)
+
+    assert s3.save("uploads/big.bin", io.BytesIO(payload)) == len(payload)
+
+    head = s3.client.head_object(Bucket=s3.bucket, Key="ndis/uploads/big.bin")
+    assert head["ETag"].strip('"').endswith("-3")  # three parts
+    with s3.open("uploads/big.bin") as stream:
+        assert stream.read() == payload
+
+
+def test_copy_objects_skips_objects_already_present(tmp_path, s3):
+    local = LocalStorageBackend(tmp_path)
+    for name in ("a", "b"):
+        local.save(f"uploads/7/{name}.pdf", io.BytesIO(name.encode() * 10))
+
+    first = copy_objects(local, s3, ["uploads/7/a.pdf", "uploads/7/b.pdf", "uploads/7/gone.pdf"], workers=2)
+    second = copy_objects(local, s3, ["uploads/7/a.pdf", "uploads/7/b.pdf"], workers=2)
+
+    assert (first.copied, first.missing, first.copied_bytes) == (2, 1, 20)
+    assert (second.copied, second.skipped) == (0, 2)
+
+
+def test_migrate_storage_normalises_absolute_paths(tmp_path, s3):
+    spec = importlib.util.spec_from_file_location(
+        "migrate_storage", BACKEND_DIR / "scripts" / "migrate_storage.py"
+    )
+    migrate_storage = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migrate_storage)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    local = LocalStorageBackend(tmp_path)
+    local.save("uploads/documents/1/plan.pdf", io.BytesIO(b"plan"))
+    participant = Participant(
+        first_name="Ada",
+        last_name="Lovelace",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+    )
+    db.add(participant)
+    db.flush()
+    document = Document(
+        participant_id=participant.id,
+        title="Plan",
+        filename="plan.pdf",
+        original_filename="plan.pdf",
+        file_path=str(tmp_path / "uploads/documents/1/plan.pdf"),
+        file_size=4,
+        mime_type="application/pdf",
+        category="general_documents",
+        uploaded_by="tester",
+    )
+    db.add(document)
+    db.commit()
+
+    totals = migrate_storage.migrate(db, local, s3, batch_size=1, workers=2)
+
+    assert totals["copied"] == 1 and totals["normalised"] == 1
+    assert db.get(Document, document.id).file_path == "uploads/documents/1/plan.pdf"
+    assert b"".join(s3.iter_chunks("uploads/documents/1/plan.pdf")) == b"plan"
+    db.close()
+    engine.dispose()
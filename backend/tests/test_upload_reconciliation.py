@@ -0,0 +1,148 @@
+"""Tests for the orphaned upload reconciliation job."""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.database import Base  # noqa: E402
+from app.models import Candidate, CandidateProfile  # noqa: E402
+from app.models.document import Document  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.document_generation_service import BULK_ZIP_TEMP_PREFIX  # noqa: E402
+from app.services.upload_reconciliation import UploadReconciler  # noqa: E402
+
+
+@pytest.fixture(name="db")
+def _db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _write(path: Path, size: int, age_hours: float = 2) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age_hours * 3600
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+@pytest.fixture(name="tree")
+def _tree(db, tmp_path):
+    base = tmp_path / "backend"
+    temp_dir = tmp_path / "tmp"
+
+    participant = Participant(
+        first_name="Ada",
+        last_name="Lovelace",
+        date_of_birth=date(1990, 1, 1),
+        phone_number="0400000000",
+        street_address="1 Test St",
+        city="Sydney",
+        state="NSW",
+        postcode="2000",
+        preferred_contact="phone",
+        disability_type="physical",
+        plan_type="self-managed",
+        plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        support_category="core",
+        client_goals="Independence",
+    )
+    candidate = Candidate(first_name="Grace", last_name="Hopper", email="grace@example.com")
+    db.add_all([participant, candidate])
+    db.flush()
+
+    _write(base / "uploads/documents/1/kept.pdf", 10)
+    _write(base / "uploads/documents/1/orphan.pdf", 100)
+    _write(base / "uploads/documents/1/uploading.pdf", 50, age_hours=0)
+    _write(base / "uploads/7/resume.pdf", 20)
+    _write(base / "uploads/7/old_resume.pdf", 30)
+    zip_path = _write(temp_dir / f"{BULK_ZIP_TEMP_PREFIX}abc/documents.zip", 40)
+    stamp = time.time() - 2 * 3600
+    os.utime(zip_path.parent, (stamp, stamp))
+
+    for name in ("kept.pdf", "missing.pdf"):
+        db.add(
+            Document(
+                participant_id=participant.id,
+                title=name,
+                filename=name,
+                original_filename=name,
+                file_path=f"uploads/documents/1/{name}",
+                file_size=1,
+                mime_type="application/pdf",
+                category="general_documents",
+                uploaded_by="tester",
+            )
+        )
+    db.add(CandidateProfile(candidate_id=candidate.id, resume_path="uploads/7/resume.pdf"))
+    db.commit()
+
+    return base, temp_dir
+
+
+def test_dry_run_reports_without_deleting(db, tree):
+    base, temp_dir = tree
+
+    report = UploadReconciler(db, base_dir=base, temp_dir=temp_dir, batch_size=2, workers=2).run()
+
+    assert sorted(item.path for item in report.orphaned_files) == [
+        "uploads/7/old_resume.pdf",
+        "uploads/documents/1/orphan.pdf",
+    ]
+    assert [item.size for item in report.stale_temp_dirs] == [40]
+    assert [(row.table, row.path) for row in report.dangling_rows] == [
+        ("documents", "uploads/documents/1/missing.pdf")
+    ]
+    assert report.orphaned_bytes == 170
+    assert report.scanned_files == 4
+    assert (base / "uploads/documents/1/orphan.pdf").exists()
+
+
+def test_apply_reclaims_orphans_within_byte_budget(db, tree):
+    base, temp_dir = tree
+    reconciler = UploadReconciler(
+        db, base_dir=base, temp_dir=temp_dir, grace_period=timedelta(hours=1), max_deletes_per_second=0
+    )
+
+    report = reconciler.run(dry_run=False, max_bytes=1)
+
+    assert report.reclaimed_files == 1
+    assert (base / "uploads/documents/1/kept.pdf").exists()
+    assert (base / "uploads/documents/1/uploading.pdf").exists()
+
+    report = reconciler.run(dry_run=False)
+
+    assert not (base / "uploads/7/old_resume.pdf").exists()
+    assert not (base / "uploads/documents/1/orphan.pdf").exists()
+    assert not list(temp_dir.iterdir())
+    assert (base / "uploads/7/resume.pdf").exists()
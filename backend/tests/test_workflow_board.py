@@ -0,0 +1,199 @@
+"""Tests for the prospective-participant workflow board."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.care_workflow import router as care_router  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.care_plan import CarePlan, ProspectiveWorkflow, RiskAssessment  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.workflow_state import WorkflowStateService  # noqa: E402
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _participant(index: int, status: str = "prospective") -> Participant:
+    return Participant(
+        first_name=f"First{index}", last_name=f"Last{index}", date_of_birth=date(1980, 1, 1),
+        phone_number="0400000000", street_address="1 Test St", city="Sydney", state="NSW",
+        postcode="2000", preferred_contact="phone", disability_type="physical",
+        plan_type="self-managed", support_category="core", plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1),
+        client_goals="Independence", status=status, created_at=CREATED + timedelta(days=index),
+    )
+
+
+def _care_plan(participant_id: int) -> CarePlan:
+    return CarePlan(
+        participant_id=participant_id, plan_name="Plan", start_date=date(2026, 1, 1),
+        end_date=date(2027, 1, 1), summary="Summary",
+    )
+
+
+def _risk_assessment(participant_id: int) -> RiskAssessment:
+    return RiskAssessment(
+        participant_id=participant_id, assessment_date=date(2026, 1, 1),
+        assessor_name="Assessor", review_date=date(2026, 7, 1),
+    )
+
+
+def _seed(db, prospective: int) -> None:
+    """``prospective`` participants cycling through the three stages, plus one onboarded."""
+
+    participants = [_participant(i) for i in range(prospective)] + [_participant(prospective, "onboarded")]
+    db.add_all(participants)
+    db.flush()
+    for i, participant in enumerate(participants[:prospective]):
+        if i % 3 >= 1:
+            care_plan = _care_plan(participant.id)
+            db.add(care_plan)
+            WorkflowStateService.record(db, participant.id, care_plan=care_plan)
+        if i % 3 == 2:
+            risk_assessment = _risk_assessment(participant.id)
+            db.add(risk_assessment)
+            WorkflowStateService.record(db, participant.id, risk_assessment=risk_assessment)
+    care_plan = _care_plan(participants[-1].id)
+    db.add(care_plan)
+    WorkflowStateService.record(db, participants[-1].id, care_plan=care_plan)
+    db.commit()
+
+
+@pytest.fixture(name="client")
+def _client():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    app = FastAPI()
+    app.include_router(care_router, prefix="/care")
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.engine = engine
+    client.session_factory = TestingSessionLocal
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _count_statements(client, *args, **kwargs):
+    statements = []
+
+    def record(conn, cursor, statement, *rest):
+        statements.append(statement)
+
+    event.listen(client.engine, "before_cursor_execute", record)
+    try:
+        response = client.get(*args, **kwargs)
+    finally:
+        event.remove(client.engine, "before_cursor_execute", record)
+    return response, statements
+
+
+def test_board_flags_stages_and_pages(client):
+    with client.session_factory() as db:
+        _seed(db, 6)
+        # A workflow row flagged by hand, with no care plan on file.
+        first = db.query(Participant).order_by(Participant.id).first()
+        db.add(ProspectiveWorkflow(participant_id=first.id, care_plan_completed=True, quotation_generated=True))
+        db.commit()
+
+    response, statements = _count_statements(client, "/care/workflow-board")
+    assert response.status_code == 200, response.text
+    assert len(statements) == 1
+    body = response.json()
+    assert body["counts"] == {"total": 6, "care_plan": 1, "risk_assessment": 3, "ready_for_onboarding": 2}
+    assert [item["participant_name"] for item in body["items"]] == [f"First{i} Last{i}" for i in range(6)]
+    assert body["next_cursor"] is None
+
+    flagged, pending, ready = body["items"][0], body["items"][3], body["items"][5]
+    assert (flagged["stage"], flagged["care_plan_id"], flagged["quotation_generated"]) == ("risk_assessment", None, True)
+    assert (pending["stage"], pending["workflow_id"], pending["care_plan_completed"]) == ("care_plan", None, False)
+    assert ready["stage"] == "ready_for_onboarding"
+    assert ready["ready_for_onboarding"] and ready["care_plan_id"] and ready["risk_assessment_id"]
+
+    # Reading the board creates no workflow rows.
+    with client.session_factory() as db:
+        assert db.query(ProspectiveWorkflow).count() == 6
+
+    page = client.get("/care/workflow-board", params={"stage": "risk_assessment", "limit": 2}).json()
+    assert [item["participant_id"] for item in page["items"]] == [1, 2]
+    assert page["counts"]["total"] == 6
+    rest = client.get(
+        "/care/workflow-board", params={"stage": "risk_assessment", "limit": 2, "cursor": page["next_cursor"]}
+    ).json()
+    assert [item["participant_id"] for item in rest["items"]] == [5]
+    assert rest["next_cursor"] is None
+
+    both = client.get("/care/workflow-board", params=[("stage", "care_plan"), ("stage", "ready_for_onboarding")]).json()
+    assert [item["stage"] for item in both["items"]] == ["ready_for_onboarding", "care_plan", "ready_for_onboarding"]
+    assert client.get("/care/workflow-board", params={"stage": "quotation"}).status_code == 400
+    assert client.get("/care/workflow-board", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_board_is_one_query_however_many_participants(client):
+    response, statements = _count_statements(client, "/care/workflow-board")
+    assert response.json() == {
+        "items": [],
+        "counts": {"total": 0, "care_plan": 0, "risk_assessment": 0, "ready_for_onboarding": 0},
+        "next_cursor": None,
+    }
+    assert len(statements) == 1
+
+    with client.session_factory() as db:
+        _seed(db, 60)
+    response, statements = _count_statements(client, "/care/workflow-board", params={"limit": 100})
+    assert len(response.json()["items"]) == 60
+    assert len(statements) == 1
+
+
+def test_board_pages_through_participants_created_together(client):
+    with client.session_factory() as db:
+        participants = [_participant(i) for i in range(6)]
+        for participant in participants:
+            participant.created_at = None
+        db.add_all(participants)
+        db.commit()
+        # Bulk conversion gives a whole batch one server-default timestamp.
+        db.execute(text("UPDATE participants SET created_at = '2026-01-31 09:15:00'"))
+        db.commit()
+
+    pages, cursor = [], None
+    for _ in range(5):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/care/workflow-board", params=params).json()
+        pages.append([item["participant_id"] for item in body["items"]])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert pages == [[1, 2], [3, 4], [5, 6]]
@@ -0,0 +1,176 @@
+"""Tests for write-time prospective workflow state and its backfill."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.api.v1.endpoints.care_workflow import router as care_router  # noqa: E402
+from app.database import Base, get_db  # noqa: E402
+from app.models.care_plan import CarePlan, ProspectiveWorkflow, RiskAssessment  # noqa: E402
+from app.models.participant import Participant  # noqa: E402
+from app.services.workflow_state import WorkflowStateService  # noqa: E402
+
+CARE_PLAN = {"plan_name": "Plan", "start_date": "2026-01-01", "end_date": "2027-01-01", "summary": "Summary"}
+RISK_ASSESSMENT = {"assessment_date": "2026-01-01", "assessor_name": "Assessor", "review_date": "2026-07-01"}
+
+
+def _participant(index: int) -> Participant:
+    return Participant(
+        first_name=f"First{index}", last_name=f"Last{index}", date_of_birth=date(1980, 1, 1),
+        phone_number="0400000000", street_address="1 Test St", city="Sydney", state="NSW",
+        postcode="2000", preferred_contact="phone", disability_type="physical",
+        plan_type="self-managed", support_category="core", plan_start_date=date(2024, 1, 1),
+        plan_review_date=date(2025, 1, 1), client_goals="Independence", status="prospective",
+    )
+
+
+@pytest.fixture(name="client")
+def _client():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        db.add_all([_participant(i) for i in range(4)])
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(care_router, prefix="/care")
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.engine = engine
+    client.session_factory = TestingSessionLocal
+    try:
+        yield client
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def _get_workflow(client, participant_id):
+    statements = []
+
+    def record(conn, cursor, statement, *rest):
+        statements.append(statement)
+
+    event.listen(client.engine, "before_cursor_execute", record)
+    try:
+        response = client.get(f"/care/participants/{participant_id}/prospective-workflow")
+    finally:
+        event.remove(client.engine, "before_cursor_execute", record)
+    # A single lookup, never a write.
+    assert len(statements) == 1 and statements[0].lstrip().upper().startswith("SELECT")
+    return response
+
+
+def test_saves_maintain_workflow_and_reads_do_not_write(client):
+    empty = _get_workflow(client, 1)
+    assert empty.status_code == 200
+    assert empty.json()["id"] is None
+    assert not empty.json()["care_plan_completed"]
+    assert _get_workflow(client, 99).status_code == 404
+    with client.session_factory() as db:
+        assert db.query(ProspectiveWorkflow).count() == 0
+
+    care_plan = client.post("/care/participants/1/care-plan", json=CARE_PLAN).json()
+    workflow = _get_workflow(client, 1).json()
+    assert (workflow["care_plan_completed"], workflow["care_plan_id"]) == (True, care_plan["id"])
+    assert not workflow["risk_assessment_completed"] and not workflow["ready_for_onboarding"]
+    assert client.post("/care/participants/1/convert-to-onboarded").status_code == 400
+
+    with client.session_factory() as db:
+        assert db.get(Participant, 1).care_plan_completed
+        completed_on = db.query(ProspectiveWorkflow).one().care_plan_completed_date
+
+    # Updating the plan keeps the date it was first completed.
+    assert client.put("/care/participants/1/care-plan", json={"summary": "Revised"}).status_code == 200
+    risk_assessment = client.post("/care/participants/1/risk-assessment", json=RISK_ASSESSMENT).json()
+    workflow = _get_workflow(client, 1).json()
+    assert workflow["risk_assessment_id"] == risk_assessment["id"]
+    assert workflow["ready_for_onboarding"]
+    with client.session_factory() as db:
+        assert db.query(ProspectiveWorkflow).one().care_plan_completed_date == completed_on
+
+    assert client.post("/care/participants/1/convert-to-onboarded").status_code == 200
+    assert _get_workflow(client, 1).json()["participant_status"] == "onboarded"
+
+    # A risk assessment alone still creates the workflow row.
+    client.put("/care/participants/2/risk-assessment", json=RISK_ASSESSMENT)
+    workflow = _get_workflow(client, 2).json()
+    assert workflow["risk_assessment_completed"] and not workflow["care_plan_completed"]
+
+
+def test_backfill_creates_and_repairs_workflows(client):
+    with client.session_factory() as db:
+        # Records saved before workflow state was maintained on write.
+        created = datetime(2026, 2, 1, tzinfo=timezone.utc)
+        db.add_all([
+            CarePlan(participant_id=1, plan_name="Old", start_date=date(2025, 1, 1), end_date=date(2026, 1, 1),
+                     summary="Old", created_at=datetime(2025, 1, 1, tzinfo=timezone.utc)),
+            CarePlan(participant_id=1, plan_name="Plan", start_date=date(2026, 1, 1), end_date=date(2027, 1, 1),
+                     summary="Summary", created_at=created),
+            RiskAssessment(participant_id=1, assessment_date=date(2026, 1, 1), assessor_name="Assessor",
+                           review_date=date(2026, 7, 1)),
+            RiskAssessment(participant_id=2, assessment_date=date(2026, 1, 1), assessor_name="Assessor",
+                           review_date=date(2026, 7, 1)),
+            CarePlan(participant_id=3, plan_name="Plan", start_date=date(2026, 1, 1), end_date=date(2027, 1, 1),
+                     summary="Summary"),
+            ProspectiveWorkflow(participant_id=3, care_plan_completed=False, quotation_generated=True,
+                                ready_for_onboarding=True),
+        ])
+        db.commit()
+
+        stats = WorkflowStateService.backfill(db, batch_size=2)
+        assert stats == {"participants": 3, "created": 2, "updated": 1}
+        assert WorkflowStateService.backfill(db) == {"participants": 3, "created": 0, "updated": 0}
+
+        workflows = {w.participant_id: w for w in db.query(ProspectiveWorkflow).all()}
+        assert set(workflows) == {1, 2, 3}
+        first = workflows[1]
+        assert (first.care_plan_id, first.risk_assessment_id, first.ready_for_onboarding) == (2, 1, True)
+        assert first.care_plan_completed_date.replace(tzinfo=timezone.utc) == created
+        assert (workflows[2].risk_assessment_completed, workflows[2].care_plan_completed) == (True, False)
+        assert (workflows[3].care_plan_completed, workflows[3].quotation_generated) == (True, True)
+        assert not workflows[3].ready_for_onboarding
+        assert {p.id for p in db.query(Participant).filter(Participant.care_plan_completed.is_(True))} == {1, 3}
+
+
+def test_ready_for_onboarding_follows_the_completed_steps(client):
+    with client.session_factory() as db:
+        # Flagged ready by hand while the risk assessment is still outstanding.
+        db.add(ProspectiveWorkflow(participant_id=1, risk_assessment_completed=False, ready_for_onboarding=True))
+        db.commit()
+
+    client.post("/care/participants/1/care-plan", json=CARE_PLAN)
+    workflow = _get_workflow(client, 1).json()
+    assert workflow["care_plan_completed"] and not workflow["ready_for_onboarding"]
+
+    client.post("/care/participants/1/risk-assessment", json=RISK_ASSESSMENT)
+    assert _get_workflow(client, 1).json()["ready_for_onboarding"]